@@ -1,19 +1,281 @@
 """
 API Routes for Meeting Agent Backend
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import base64
+import hmac
+import importlib
+import json
+import os
+import time
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Callable
 from services.transcription import TranscriptionService
+from services.transcript_store import TranscriptStore
+from services.transcript_model import Transcript, segment_from_utterance
+from services.transcript_stream import TranscriptBroadcaster
+from services.session_manager import SessionManager
 from services.ai_processor import AIProcessor
 from services.voice import VoiceService
+from services.speech_pipeline import SpeechPipeline
+from services.live_summary import LiveSummarizer
+from services.job_queue import JobQueue, Job
+from services.metrics import registry, Histogram
+from services.meeting_db import MeetingDatabase
+from services.llm_cache import cache_key
+from services.session_manager import DONE
+from services.shared_state import get_shared_state
+from services.search_index import SearchIndex, VectorIndex, semantic_search_available
+from services.http_client import get_upstream
+from services.providers import Provider, ServiceUnavailable
+from services.response_encoding import (
+    EncodedBody, JSON, MSGPACK, TEXT, choose_media_type, choose_encoding, data_media_types, encode
+)
 
 router = APIRouter()
 
 # Initialize services
-transcription_service = TranscriptionService()
-ai_processor = AIProcessor()
-voice_service = VoiceService()
+# Set when several worker processes serve the API (SHARED_STATE_URL)
+shared_state = get_shared_state()
+meeting_db = MeetingDatabase.from_env()
+transcript_store = TranscriptStore(shared=shared_state)
+# Services needing an API key are built on first use; until then (or without
+# the key) the rest of the API is served and their routes answer 503
+transcription_service: Provider[TranscriptionService] = Provider(
+    "Transcription", lambda: TranscriptionService(store=transcript_store, database=meeting_db)
+)
+ai_processor: Provider[AIProcessor] = Provider("AI", AIProcessor)
+voice_service: Provider[VoiceService] = Provider("Voice", VoiceService)
+transcript_broadcaster = TranscriptBroadcaster(transcription_service, store=transcript_store)
+session_manager = SessionManager(transcription_service, shared=shared_state)
+speech_pipeline = SpeechPipeline(ai_processor, voice_service)
+live_summarizer = LiveSummarizer(ai_processor, transcript_broadcaster, shared=shared_state)
+job_queue = JobQueue(meeting_db, shared=shared_state)
+
+# Queue an analysis of every meeting the bot leaves
+AUTO_ANALYZE = os.getenv('AUTO_ANALYZE', '1').lower() in ('1', 'true', 'yes')
+
+search_index = SearchIndex()
+# Semantic search embeds every transcript chunk with OpenAI, so it is opt-in
+vector_index = None
+if os.getenv('SEARCH_SEMANTIC', '').lower() in ('1', 'true', 'yes') and semantic_search_available():
+    vector_index = VectorIndex(
+        lambda texts: ai_processor.embed(texts),
+        embed_query=lambda query: ai_processor.embed_query(query),
+        on_embedded=meeting_db.save_chunks if meeting_db is not None else None
+    )
+
+# Archive tasks for finished meetings, kept referenced until they complete
+_archive_tasks = set()
+
+
+def _on_utterance(bot_id: str, seq: int) -> None:
+    """Persist and embed each utterance once, in the worker that received it"""
+    utterances = [transcript_store.transcript(bot_id)[seq].to_dict()]
+    if meeting_db is not None:
+        meeting_db.add_segments(bot_id, utterances)
+    if vector_index is not None:
+        for utterance in utterances:
+            vector_index.add(bot_id, utterance)
+
+
+def _index_utterance(bot_id: str, seq: int) -> None:
+    """Add each utterance to this worker's keyword index, whichever worker received it"""
+    search_index.add_utterance(bot_id, transcript_store.transcript(bot_id)[seq].to_dict())
+
+
+def _on_session_change(bot_id: str, old_state: str, new_state: str) -> None:
+    """Persist lifecycle changes and archive the transcript of finished meetings"""
+    session = session_manager.get(bot_id)
+    if session is not None:
+        search_index.set_meeting_url(bot_id, session.meeting_url)
+    if new_state == DONE:
+        live_summarizer.finish(bot_id)
+        if vector_index is not None:
+            vector_index.flush(bot_id)
+    if meeting_db is None:
+        if new_state == DONE:
+            _schedule_analysis(bot_id)
+        return
+    meeting_db.save_meeting(
+        bot_id,
+        meeting_url=session.meeting_url if session else None,
+        bot_name=session.bot_name if session else None,
+        state=new_state
+    )
+    if new_state == DONE:
+        task = asyncio.ensure_future(_archive(bot_id))
+        _archive_tasks.add(task)
+        task.add_done_callback(_archive_done)
+
+
+async def _archive(bot_id: str) -> None:
+    """Archive a finished meeting, re-index it under its archived sequence numbers, then analyze it"""
+    try:
+        if await transcription_service.archive(bot_id):
+            await asyncio.to_thread(meeting_db.flush)
+            search_index.replace_meeting(bot_id, await asyncio.to_thread(meeting_db.segments, bot_id))
+    finally:
+        _schedule_analysis(bot_id)
+
+
+def _schedule_analysis(bot_id: str) -> None:
+    """Queue the post-meeting analysis of a finished meeting"""
+    if AUTO_ANALYZE:
+        job_queue.submit("analyze", {"max_sentences": 3, "num_points": 5}, bot_id=bot_id)
+
+
+def _archive_done(task: asyncio.Future) -> None:
+    _archive_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error archiving meeting: {task.exception()}")
+
+
+transcript_store.add_listener(_on_utterance)
+transcript_store.add_listener(_index_utterance, every_worker=True)
+session_manager.add_listener(_on_session_change)
+
+
+async def load_search_index(page_size: int = 5000) -> int:
+    """
+    Index every stored transcript, a page at a time
+
+    Pages are read in a worker thread and indexed on the event loop, which
+    keeps serving requests in between.
+
+    Returns:
+        Number of utterances indexed
+    """
+    if meeting_db is None:
+        return 0
+    for meeting in await asyncio.to_thread(meeting_db.meetings, None, None, -1):
+        search_index.set_meeting_url(meeting["bot_id"], meeting["meeting_url"])
+    count = 0
+    after = None
+    while rows := await asyncio.to_thread(meeting_db.segment_page, after, page_size):
+        for row in rows:
+            search_index.add_utterance(row["bot_id"], row)
+        count += len(rows)
+        after = (rows[-1]["bot_id"], rows[-1]["seq"])
+    if vector_index is not None:
+        last = 0
+        while chunks := await asyncio.to_thread(meeting_db.chunk_page, last, page_size):
+            vector_index.restore(chunks)
+            last = chunks[-1]["rowid"]
+    return count
+
+
+async def warm_up() -> None:
+    """
+    Build the configured services and open a connection to each upstream
+
+    Run in the background at startup, so the first requests neither import
+    the OpenAI SDK nor wait on TCP and TLS handshakes. Services whose API
+    keys are not set are skipped.
+    """
+    connections = []
+    for provider in (transcription_service, voice_service):
+        try:
+            service = provider.get()
+        except ServiceUnavailable:
+            continue
+        connections.append(service.upstream.warm_up(service.api_url))
+    try:
+        processor = ai_processor.get()
+    except ServiceUnavailable:
+        processor = None
+    if processor is not None:
+        # Most of a cold start is this import; keep it off the event loop
+        await asyncio.to_thread(importlib.import_module, "openai")
+        connections.append(get_upstream("openai").warm_up(str(processor.client.base_url)))
+    await asyncio.gather(*connections)
+
+# Seconds between SSE keep-alive comments on idle streams
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data, event_id: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON payload"""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_text_events(
+    deltas,
+    result_key: str,
+    on_done: Optional[Callable[[str], None]] = None
+) -> StreamingResponse:
+    """
+    Relay streamed completion text as server-sent events
+
+    Sends a `delta` event per piece of text, then `done` with the full text
+    and the time to first token and total time as seen by this request.
+    `on_done` is called with the full text once the stream completes.
+    """
+    async def events():
+        started = time.perf_counter()
+        first_token = None
+        parts = []
+        try:
+            async for delta in deltas:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        total = time.perf_counter() - started
+        text = "".join(parts).strip()
+        if on_done is not None:
+            on_done(text)
+        yield sse_event("done", {
+            result_key: text,
+            "ttft_ms": round((first_token if first_token is not None else total) * 1000, 1),
+            "total_ms": round(total * 1000, 1)
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _replay(text: str):
+    """Yield stored text as a single delta"""
+    yield text
+
+
+def output_hash(kind: str, request: BaseModel) -> str:
+    """Hash of everything an AI output for a request depends on"""
+    return cache_key(kind=kind, model=ai_processor.model, **request.model_dump(exclude={"bot_id"}))
+
+
+async def stored_output(bot_id: Optional[str], kind: str, input_hash: str) -> Optional[Any]:
+    """Get a meeting's stored AI output if it was produced from the same input"""
+    if meeting_db is None or not bot_id:
+        return None
+    return await asyncio.to_thread(meeting_db.analysis, bot_id, kind, input_hash)
+
+
+def store_output(bot_id: Optional[str], kind: str, input_hash: str, value: Any) -> None:
+    """Persist an AI output for a meeting (batched, off the request path)"""
+    if meeting_db is not None and bot_id:
+        meeting_db.save_analysis(bot_id, kind, input_hash, value)
+
+
+def requires(*providers: Provider) -> List[Any]:
+    """Route dependencies building the services a route uses (503 if one is not configured)"""
+    def dependency(provider: Provider):
+        def provide():
+            try:
+                return provider.get()
+            except ServiceUnavailable as e:
+                raise HTTPException(status_code=503, detail=str(e))
+        return Depends(provide)
+
+    return [dependency(provider) for provider in providers]
 
 
 # Request/Response Models
@@ -25,6 +287,7 @@ class JoinMeetingRequest(BaseModel):
 class SummarizeRequest(BaseModel):
     transcript: str
     max_sentences: Optional[int] = 3
+    bot_id: Optional[str] = None
 
 
 class GenerateQuestionRequest(BaseModel):
@@ -34,116 +297,667 @@ class GenerateQuestionRequest(BaseModel):
 class ExtractKeyPointsRequest(BaseModel):
     transcript: str
     num_points: Optional[int] = 5
+    bot_id: Optional[str] = None
+
+
+class AnalyzeRequest(BaseModel):
+    transcript: str
+    max_sentences: Optional[int] = 3
+    num_points: Optional[int] = 5
+    bot_id: Optional[str] = None
+
+
+class AnalyzeJobRequest(BaseModel):
+    transcript: Optional[str] = None
+    max_sentences: Optional[int] = 3
+    num_points: Optional[int] = 5
+    bot_id: Optional[str] = None
 
 
 class GenerateAudioRequest(BaseModel):
     text: str
     voice: Optional[str] = "a0e99841-438c-4a64-b679-ae501e7d6091"
+    format: Optional[str] = None
 
 
 # Transcription Endpoints
-@router.post("/join")
+@router.post("/join", dependencies=requires(transcription_service))
 async def join_meeting(request: JoinMeetingRequest):
     """Join a meeting with the bot"""
     try:
-        result = transcription_service.join_meeting(
+        result = await session_manager.join(
             meeting_url=request.meeting_url,
             bot_name=request.bot_name
         )
+        search_index.set_meeting_url(result["id"], request.meeting_url)
+        if meeting_db is not None:
+            meeting_db.save_meeting(
+                result["id"],
+                meeting_url=request.meeting_url,
+                bot_name=request.bot_name,
+                state=session_manager.get(result["id"]).state
+            )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/transcript/{bot_id}")
-async def get_transcript(bot_id: str):
-    """Get transcript for a bot"""
+def negotiate(request: Request, offered: List[str]) -> str:
+    """Media type to respond with, by the Accept header (406 if none is acceptable)"""
+    media_type = choose_media_type(request.headers.get("accept"), offered)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Available as {', '.join(offered)}")
+    return media_type
+
+
+def encoded_response(body: EncodedBody) -> Response:
+    return Response(body.body, media_type=body.media_type, headers=body.headers)
+
+
+def _transcript_content(
+    bot_id: str,
+    model: Transcript,
+    positions: Optional[List[int]],
+    format: Optional[str],
+    media_type: str
+) -> Any:
+    """The body of a transcript response before serialization"""
+    if media_type == TEXT:
+        return (model if positions is None else model.take(positions)).render()
+    if positions is None:
+        positions = model.positions()
+    if media_type == MSGPACK:
+        # Columns with a speaker table instead of one object per utterance
+        return {"bot_id": bot_id, **model.columns(positions)}
+    if format == "utterances":
+        return {"bot_id": bot_id, "utterances": [model[seq].to_dict() for seq in positions]}
+    return [segment_from_utterance(model[seq].to_dict()) for seq in positions]
+
+
+@router.get("/transcript/{bot_id}", dependencies=requires(transcription_service))
+async def get_transcript(
+    request: Request,
+    bot_id: str,
+    since: Optional[int] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    speaker: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    Get transcript for a bot, or only the segments after a `since` cursor
+
+    `start`/`end` (seconds) and `speaker` select part of the transcript;
+    `format` picks segments (default), utterances or plain text. Bodies are
+    JSON, or msgpack columns when asked for with `Accept`, and compressed
+    per `Accept-Encoding`. Whole transcripts are encoded once per version.
+    """
+    if format not in (None, "segments", "utterances", "text"):
+        raise HTTPException(status_code=400, detail="format must be segments, utterances or text")
+    # Deltas after a cursor are always structured data
+    media_type = negotiate(request, [TEXT] if format == "text" and since is None else data_media_types())
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
     try:
-        result = transcription_service.get_transcript(bot_id)
-        return result
+        try:
+            model = await transcription_service.get_transcript_model(bot_id)
+        except ValueError:
+            # Recall.ai sent something other than segments; pass it through
+            return await transcription_service.get_transcript(bot_id)
+
+        if since is not None:
+            if media_type == MSGPACK:
+                since, next_cursor = transcription_service.cursor_range(bot_id, model, since)
+                content = {
+                    "bot_id": bot_id,
+                    **model.columns(range(since, len(model))),
+                    "start": since,
+                    "next_cursor": next_cursor
+                }
+            else:
+                content = transcription_service.delta(bot_id, model, since)
+            return encoded_response(encode(content, media_type, encoding))
+
+        if start is None and end is None and speaker is None:
+            def build() -> EncodedBody:
+                recall_segments = transcription_service.recall_segments(bot_id, model)
+                if recall_segments is not None and media_type == JSON and format in (None, "segments"):
+                    return encode(recall_segments, media_type, encoding)
+                return encode(_transcript_content(bot_id, model, None, format, media_type), media_type, encoding)
+
+            return encoded_response(model.encoded((format or "segments", media_type, encoding), build))
+
+        positions = model.positions(start, end, speaker)
+        return encoded_response(encode(
+            _transcript_content(bot_id, model, positions, format, media_type), media_type, encoding
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/bot/{bot_id}/status")
+@router.get("/transcript/{bot_id}/speakers", dependencies=requires(transcription_service))
+async def get_transcript_speakers(bot_id: str):
+    """Turns and speaking time of each speaker in a transcript"""
+    try:
+        model = await transcription_service.get_transcript_model(bot_id)
+        return {"bot_id": bot_id, "speakers": model.speaker_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/transcript/{bot_id}/stream", dependencies=requires(transcription_service))
+async def stream_transcript(bot_id: str, since: int = 0):
+    """Stream new transcript utterances as server-sent events"""
+    async def events():
+        async with transcript_broadcaster.subscribe(bot_id, since) as updates:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(updates.get(), SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if batch is None:
+                    break
+                next_index = batch["start"] + len(batch["utterances"])
+                yield sse_event("utterances", batch, event_id=str(next_index))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.websocket("/ws/transcript/{bot_id}")
+async def transcript_websocket(websocket: WebSocket, bot_id: str, since: int = 0):
+    """Push new transcript utterances over a WebSocket"""
+    await websocket.accept()
+    async with transcript_broadcaster.subscribe(bot_id, since) as updates:
+        async def pump():
+            try:
+                async for batch in updates:
+                    await websocket.send_json(batch)
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+
+        # Watch for the client going away so the shared fetcher can stop
+        async def watch():
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+
+        tasks = [asyncio.create_task(pump()), asyncio.create_task(watch())]
+        _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass  # Already closed by the client
+
+
+@router.post("/webhooks/recall/transcript")
+async def recall_transcript_webhook(request: Request, token: Optional[str] = None):
+    """Receive real-time transcript events from Recall.ai"""
+    expected = os.getenv('RECALL_WEBHOOK_TOKEN')
+    if expected and not hmac.compare_digest(token or "", expected):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook body must be a JSON object")
+
+    try:
+        seq = await transcript_store.ingest(payload)
+    except (ConnectionError, OSError) as e:
+        # Recall.ai retries failed deliveries
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"accepted": seq is not None, "seq": seq}
+
+
+@router.get("/bots")
+async def list_bots(state: Optional[str] = None):
+    """List tracked bots, optionally only those in one lifecycle state"""
+    return {"bots": await session_manager.all_sessions(state)}
+
+
+@router.get("/bot/{bot_id}/status", dependencies=requires(transcription_service))
 async def get_bot_status(bot_id: str):
-    """Get status of a bot"""
+    """Get status of a bot from the session manager's cache"""
     try:
-        result = transcription_service.get_bot_status(bot_id)
+        result = await session_manager.status(bot_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.delete("/bot/{bot_id}")
+@router.delete("/bot/{bot_id}", dependencies=requires(transcription_service))
 async def leave_meeting(bot_id: str):
     """Make the bot leave a meeting"""
     try:
-        result = transcription_service.leave_meeting(bot_id)
+        result = await session_manager.leave(bot_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # AI Processing Endpoints
-@router.post("/summarize")
-async def summarize_transcript(request: SummarizeRequest):
-    """Summarize a transcript"""
+@router.post("/summarize", dependencies=requires(ai_processor))
+async def summarize_transcript(request: SummarizeRequest, stream: bool = False):
+    """Summarize a transcript (stream=true for server-sent events)"""
+    input_hash = output_hash("summary", request)
+    stored = await stored_output(request.bot_id, "summary", input_hash)
+    if stream:
+        deltas = _replay(stored) if stored is not None else ai_processor.stream_summary(
+            transcript=request.transcript,
+            max_sentences=request.max_sentences
+        )
+        return stream_text_events(
+            deltas,
+            "summary",
+            on_done=lambda text: store_output(request.bot_id, "summary", input_hash, text)
+        )
+    if stored is not None:
+        return {"summary": stored}
     try:
-        summary = ai_processor.summarize_transcript(
+        summary = await ai_processor.summarize_transcript(
             transcript=request.transcript,
             max_sentences=request.max_sentences
         )
+        store_output(request.bot_id, "summary", input_hash, summary)
         return {"summary": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate-question")
-async def generate_question(request: GenerateQuestionRequest):
-    """Generate a professional question from user input"""
+@router.get("/summary/{bot_id}/live")
+async def get_live_summary(bot_id: str):
+    """Read a bot's running summary from memory, starting it on the first read"""
+    return live_summarizer.read(bot_id)
+
+
+@router.get("/summary/{bot_id}/live/stream")
+async def stream_live_summary(bot_id: str):
+    """Stream a bot's running summary as server-sent events, one per update"""
+    async def events():
+        async for state in live_summarizer.watch(bot_id, heartbeat=SSE_KEEPALIVE_INTERVAL):
+            if state is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield sse_event("summary", state, event_id=str(state["version"]))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/generate-question", dependencies=requires(ai_processor))
+async def generate_question(request: GenerateQuestionRequest, stream: bool = False):
+    """Generate a professional question from user input (stream=true for server-sent events)"""
+    if stream:
+        return stream_text_events(ai_processor.stream_question(request.user_input), "question")
     try:
-        question = ai_processor.generate_question(request.user_input)
+        question = await ai_processor.generate_question(request.user_input)
         return {"question": question}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/extract-key-points")
+@router.post("/ask", dependencies=requires(ai_processor, voice_service))
+async def ask_question(request: GenerateQuestionRequest, http_request: Request):
+    """
+    Generate a question and start synthesizing its audio
+
+    Each sentence goes to TTS as soon as it is written, so by the time the
+    question text is returned most of its audio is ready. The audio stays
+    available at `audio_url` for a short time.
+    """
+    try:
+        question = await speech_pipeline.ask(request.user_input)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await question.text_ready.wait()
+    if question.error and not question.text:
+        raise HTTPException(status_code=500, detail=question.error)
+    return {
+        "question": question.text,
+        "audio_id": question.id,
+        "audio_url": str(http_request.url_for("ask_audio", question_id=question.id)),
+        "media_type": question.media_type
+    }
+
+
+@router.get("/ask/{question_id}/audio", name="ask_audio")
+async def ask_audio(question_id: str):
+    """Stream the audio of a question started with /ask"""
+    question = speech_pipeline.get(question_id)
+    if question is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired question audio")
+    return StreamingResponse(
+        question.audio(),
+        media_type=question.media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/extract-key-points", dependencies=requires(ai_processor))
 async def extract_key_points(request: ExtractKeyPointsRequest):
     """Extract key points from a transcript"""
+    input_hash = output_hash("key_points", request)
+    stored = await stored_output(request.bot_id, "key_points", input_hash)
+    if stored is not None:
+        return {"key_points": stored}
     try:
-        points = ai_processor.extract_key_points(
+        points = await ai_processor.extract_key_points(
             transcript=request.transcript,
             num_points=request.num_points
         )
+        store_output(request.bot_id, "key_points", input_hash, points)
         return {"key_points": points}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/action-items")
+@router.post("/action-items", dependencies=requires(ai_processor))
 async def generate_action_items(request: SummarizeRequest):
     """Generate action items from a transcript"""
+    input_hash = cache_key(kind="action_items", model=ai_processor.model, transcript=request.transcript)
+    stored = await stored_output(request.bot_id, "action_items", input_hash)
+    if stored is not None:
+        return {"action_items": stored}
     try:
-        items = ai_processor.generate_action_items(request.transcript)
+        items = await ai_processor.generate_action_items(request.transcript)
+        store_output(request.bot_id, "action_items", input_hash, items)
         return {"action_items": items}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/analyze", dependencies=requires(ai_processor))
+async def analyze_transcript(request: AnalyzeRequest, stream: bool = False):
+    """Summary, key points and action items from a single completion"""
+    input_hash = output_hash("analysis", request)
+    stored = await stored_output(request.bot_id, "analysis", input_hash)
+    if stream:
+        async def events():
+            if stored is not None:
+                for section, value in stored.items():
+                    yield sse_event(section, {section: value})
+                yield sse_event("done", {})
+                return
+            result = {}
+            try:
+                async for section, value in ai_processor.stream_analysis(
+                    transcript=request.transcript,
+                    max_sentences=request.max_sentences,
+                    num_points=request.num_points
+                ):
+                    result[section] = value
+                    yield sse_event(section, {section: value})
+                store_output(request.bot_id, "analysis", input_hash, result)
+                yield sse_event("done", {})
+            except Exception as e:
+                yield sse_event("error", {"detail": str(e)})
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    if stored is not None:
+        return stored
+    try:
+        result = await ai_processor.analyze(
+            transcript=request.transcript,
+            max_sentences=request.max_sentences,
+            num_points=request.num_points
+        )
+        store_output(request.bot_id, "analysis", input_hash, result)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Background Job Endpoints
+async def _run_analysis_job(job: Job) -> Dict[str, Any]:
+    """Analyze a posted transcript, or the whole transcript of a meeting"""
+    transcript = job.params.get("transcript")
+    if transcript is None:
+        job.report(0.0, "transcript")
+        transcript = (await transcription_service.get_transcript_model(job.bot_id)).render()
+    if not transcript.strip():
+        raise ValueError("Transcript is empty")
+    request = AnalyzeRequest(
+        transcript=transcript,
+        max_sentences=job.params.get("max_sentences", 3),
+        num_points=job.params.get("num_points", 5),
+        bot_id=job.bot_id
+    )
+    input_hash = output_hash("analysis", request)
+    stored = await stored_output(job.bot_id, "analysis", input_hash)
+    if stored is not None:
+        return stored
+    job.report(0.05, "condense")
+    result = await ai_processor.analyze(
+        transcript=request.transcript,
+        max_sentences=request.max_sentences,
+        num_points=request.num_points,
+        on_progress=lambda done, total: job.report(0.05 + 0.85 * done / total)
+    )
+    store_output(job.bot_id, "analysis", input_hash, result)
+    return result
+
+
+job_queue.register("analyze", _run_analysis_job)
+
+
+@router.post("/jobs/analyze", status_code=202, dependencies=requires(ai_processor))
+async def submit_analysis_job(request: AnalyzeJobRequest):
+    """Queue a summary/key points/action items analysis and return its job at once"""
+    if request.transcript is None and not request.bot_id:
+        raise HTTPException(status_code=400, detail="Either transcript or bot_id is required")
+    params = request.model_dump(exclude={"bot_id"}, exclude_none=True)
+    return job_queue.submit("analyze", params, bot_id=request.bot_id).to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and (once done) result of a background job"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Stream a job's progress as server-sent events, ending with `done` or `failed`"""
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for state in job_queue.watch(job_id, heartbeat=SSE_KEEPALIVE_INTERVAL):
+            if state is None:
+                yield ": keep-alive\n\n"
+            elif state["state"] in ("done", "failed"):
+                yield sse_event(state["state"], state)
+            else:
+                yield sse_event("progress", state)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# Meeting Storage Endpoints
+def _require_db() -> MeetingDatabase:
+    if meeting_db is None:
+        raise HTTPException(status_code=503, detail="Meeting storage is disabled (MEETING_DB_PATH is empty)")
+    return meeting_db
+
+
+@router.get("/meetings")
+async def list_meetings(meeting_url: Optional[str] = None, finished: Optional[bool] = None, limit: int = 100):
+    """List stored meetings, newest first"""
+    db = _require_db()
+    meetings = await asyncio.to_thread(db.meetings, meeting_url, finished, limit)
+    return {"meetings": meetings}
+
+
+@router.get("/meetings/{bot_id}")
+async def get_meeting(bot_id: str):
+    """Reopen a stored meeting: its record, transcript and AI outputs, all read locally"""
+    db = _require_db()
+    meeting = await asyncio.to_thread(db.meeting, bot_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    segments, analyses = await asyncio.gather(
+        asyncio.to_thread(db.segments, bot_id),
+        asyncio.to_thread(db.analyses, bot_id)
+    )
+    return {"meeting": meeting, "segments": segments, "analyses": analyses}
+
+
+@router.get("/meetings/{bot_id}/segments")
+async def query_meeting_segments(
+    bot_id: str,
+    speaker: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+):
+    """Query a stored transcript by speaker and time range"""
+    db = _require_db()
+    segments = await asyncio.to_thread(db.segments, bot_id, speaker, start, end)
+    return {"bot_id": bot_id, "segments": segments}
+
+
+# Search Endpoints
+# Latency series per search mode, looked up once
+_search_durations: Dict[str, Histogram] = {}
+
+
+@router.get("/search")
+async def search_transcripts(
+    q: str,
+    mode: str = "keyword",
+    bot_id: Optional[str] = None,
+    speaker: Optional[str] = None,
+    limit: int = 10
+):
+    """Search live and stored transcripts by keywords and phrases, or by meaning"""
+    limit = max(1, min(limit, 100))
+    started = time.perf_counter()
+    if mode == "keyword":
+        # Index what the other workers received since the last search
+        await transcript_store.sync_all()
+        results = search_index.search(q, limit=limit, bot_id=bot_id, speaker=speaker)
+    elif mode == "semantic":
+        if vector_index is None:
+            raise HTTPException(status_code=503, detail="Semantic search is disabled (set SEARCH_SEMANTIC=1)")
+        try:
+            results = await vector_index.search(q, limit=limit, bot_id=bot_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="mode must be 'keyword' or 'semantic'")
+    took = time.perf_counter() - started
+    durations = _search_durations.get(mode)
+    if durations is None:
+        durations = _search_durations[mode] = registry.histogram("search_duration_seconds", mode=mode)
+    durations.observe(took)
+    return {"query": q, "mode": mode, "results": results, "took_ms": round(took * 1000, 2)}
+
+
+@router.get("/search/stats")
+async def search_stats():
+    """Size of the search indexes"""
+    stats = search_index.stats()
+    stats["semantic_chunks"] = len(vector_index) if vector_index is not None else None
+    return stats
+
+
+@router.get("/cache/stats", dependencies=requires(ai_processor))
+async def cache_stats():
+    """Hit/miss counters of the AI response cache"""
+    return ai_processor.cache.stats()
+
+
+@router.get("/cache/audio/stats", dependencies=requires(voice_service))
+async def audio_cache_stats():
+    """Hit/miss counters and size of the synthesized audio cache"""
+    return voice_service.cache.stats()
+
+
+@router.get("/stats/scheduler", dependencies=requires(ai_processor))
+async def scheduler_stats():
+    """Queue depth, calls in flight and remaining rate-limit budgets of the AI scheduler"""
+    return ai_processor.scheduler.stats()
+
+
+@router.get("/stats/latency")
+async def latency_stats():
+    """Latency histograms (time to first token, total) per AI operation"""
+    return registry.snapshot()
+
+
 # Voice Endpoints
-@router.post("/speak")
-async def generate_audio(request: GenerateAudioRequest):
-    """Generate audio from text"""
+@router.post("/speak", dependencies=requires(voice_service))
+async def generate_audio(request: GenerateAudioRequest, http_request: Request):
+    """
+    Generate audio from text
+
+    Returned as base64 inside JSON by default, or as the raw audio body
+    when the client's Accept header prefers the audio type (e.g. `audio/*`).
+    """
+    try:
+        output_format = voice_service.resolve_format(request.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    audio_type = voice_service.media_type(output_format)
+    media_type = negotiate(http_request, [JSON, audio_type])
     try:
-        audio_bytes = voice_service.generate_audio(
+        audio_bytes = await voice_service.generate_audio(
             text=request.text,
-            voice=request.voice
+            voice=request.voice,
+            output_format=output_format
         )
-        # Return as base64 or save to file
-        import base64
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-        return {"audio": audio_base64, "format": "wav"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if media_type == audio_type:
+        return Response(audio_bytes, media_type=audio_type, headers={"Vary": "Accept"})
+    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+    return {"audio": audio_base64, "format": output_format.get("container", "wav")}
+
+
+@router.post("/speak/stream", dependencies=requires(voice_service))
+async def stream_audio(request: GenerateAudioRequest):
+    """
+    Stream generated audio as a raw binary body
+
+    Chunks are relayed as Cartesia sends them so playback can start after
+    the first one. The first chunk is awaited before responding so that
+    upstream failures still surface as an HTTP error.
+    """
+    try:
+        output_format = voice_service.resolve_format(request.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    chunks = voice_service.stream_audio(
+        text=request.text,
+        voice=request.voice,
+        output_format=output_format
+    )
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        await chunks.aclose()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body():
+        try:
+            if first:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=voice_service.media_type(output_format),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
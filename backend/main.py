@@ -1,51 +1,167 @@
 """
 Main FastAPI Application for Meeting Agent Backend
+
+`python main.py` serves the API with one worker process per CPU core
+(WORKERS overrides the count); `python main.py --reload` runs a single
+auto-reloading process for development.
 """
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router
-import uvicorn
-
-# Create FastAPI app
-app = FastAPI(
-    title="Meeting Agent API",
-    description="Backend API for meeting agent with transcription, AI processing, and voice",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include API routes
-app.include_router(router, prefix="/api/v1", tags=["Meeting Agent"])
-
-
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "message": "Meeting Agent API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
-
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+import argparse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
 
+# Before any module reads its settings
+load_dotenv()
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+from fastapi import FastAPI, Response  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from services.shared_state import start_state_server  # noqa: E402
+from services.metrics import registry, RequestMetricsMiddleware, PROMETHEUS_CONTENT_TYPE  # noqa: E402
+from services.profiler import SamplingProfiler  # noqa: E402
+
+# Build services and connect to their upstreams in the background at startup
+WARM_UP = os.getenv('WARM_UP', '1').lower() in ('1', 'true', 'yes')
+
+
+def create_app() -> FastAPI:
+    """
+    Build the application
+
+    Importing the routes builds every service and opens the database, so
+    it happens here, in the processes serving requests, rather than in the
+    launcher that only supervises the workers.
+    """
+    from api.routes import (
+        router, transcript_broadcaster, session_manager, ai_processor, speech_pipeline, meeting_db,
+        vector_index, load_search_index, live_summarizer, job_queue, shared_state, warm_up
+    )
+    from services.http_client import close_upstreams
+
+    # Dumps the stacks of slow requests when PROFILE_SLOW_REQUEST_SECONDS is set
+    profiler = SamplingProfiler.from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Application startup and shutdown"""
+        session_manager.start()
+        # Index stored transcripts in the background; searches return partial results meanwhile
+        search_loader = asyncio.ensure_future(load_search_index())
+        # Resume the analysis jobs a previous run left unfinished
+        await job_queue.start()
+        warm_up_task = asyncio.ensure_future(warm_up()) if WARM_UP else None
+        yield
+        search_loader.cancel()
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+        await job_queue.close()
+        await session_manager.close()
+        await transcript_broadcaster.close()
+        await speech_pipeline.close()
+        await live_summarizer.close()
+        if vector_index is not None:
+            await vector_index.close()
+        if ai_processor.built is not None:
+            ai_processor.cache.close()
+        if meeting_db is not None:
+            # Commit queued writes
+            meeting_db.close()
+        # Release pooled upstream connections
+        await close_upstreams()
+        if shared_state is not None:
+            await shared_state.close()
+        if profiler is not None:
+            profiler.stop()
+
+    app = FastAPI(
+        title="Meeting Agent API",
+        description="Backend API for meeting agent with transcription, AI processing, and voice",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify exact origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Outermost, so the time spent in CORS handling is counted too
+    app.add_middleware(RequestMetricsMiddleware, profiler=profiler)
+
+    # Include API routes
+    app.include_router(router, prefix="/api/v1", tags=["Meeting Agent"])
+
+    @app.get("/")
+    async def root():
+        """Root endpoint"""
+        return {
+            "message": "Meeting Agent API",
+            "version": "1.0.0",
+            "docs": "/docs"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy"}
+
+    @app.get("/metrics")
+    async def metrics():
+        """Every latency histogram and counter in the Prometheus text format"""
+        return Response(registry.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return app
+
+
+def __getattr__(name: str):
+    """Build `app` on first access (`uvicorn main:app`, `from main import app`)"""
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def serve() -> None:
+    """Run the API server with the options given on the command line or in env vars"""
+    parser = argparse.ArgumentParser(description="Meeting Agent API server")
+    parser.add_argument("--host", default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument("--port", type=int, default=int(os.getenv('PORT', '8000')))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv('WORKERS') or os.cpu_count() or 1),
+        help="worker processes (defaults to WORKERS, then the number of CPU cores)"
     )
+    parser.add_argument("--reload", action="store_true", help="one process restarted on code changes (development)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.reload:
+        uvicorn.run("main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    workers = max(args.workers, 1)
+    if workers == 1:
+        # Serve an app built here rather than importing main a second time
+        uvicorn.run(create_app(), host=args.host, port=args.port)
+        return
+    server = None
+    if not os.getenv('SHARED_STATE_URL'):
+        # Workers share sessions, transcripts and caches through a local socket
+        server = start_state_server()
+        os.environ['SHARED_STATE_URL'] = server.url
+    # Read by each worker, e.g. to split the OpenAI rate limits
+    os.environ['WORKER_COUNT'] = str(workers)
+    try:
+        # Each worker builds its own app; this process only supervises them
+        uvicorn.run("main:create_app", factory=True, host=args.host, port=args.port, workers=workers)
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    serve()
@@ -2,33 +2,356 @@
 AI Processor Service for Meeting Agent
 Handles summarization and question generation with OpenAI
 """
+import functools
+import json
 import os
-from typing import Optional, List, Dict, Any
-from openai import OpenAI
-from dotenv import load_dotenv
+import time
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, TYPE_CHECKING
 
-load_dotenv()
+from .ai_scheduler import AIScheduler
+from .http_client import get_upstream
+from .llm_cache import LLMCache, cache_key
+from .metrics import registry, Counter, Histogram, DEFAULT_BUCKETS, TOKEN_BUCKETS
+from .summarizer import SummarizationEngine, ProgressFn
+from .transcript_prep import compact_transcript, count_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+ANALYSIS_SECTIONS = ("summary", "key_points", "action_items")
+
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that summarizes meeting transcripts concisely."
+LIVE_SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a meeting that is still in progress. "
+    "Keep decisions, owners and open questions; drop small talk."
+)
+QUESTION_SYSTEM_PROMPT = "You are a helpful assistant that rephrases informal questions into professional meeting questions."
+
+
+class _SectionParser:
+    """Incrementally parses a streamed JSON object into its top-level members"""
+    
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = None
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Add streamed text and return the members it completed
+        
+        Args:
+            text: Next piece of the JSON document
+            
+        Returns:
+            List of (key, value) pairs finished by this piece
+        """
+        self.buffer += text
+        completed = []
+        buffer = self.buffer
+        for i in range(self.pos, len(buffer)):
+            char = buffer[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = i + 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    completed.extend(self._member(buffer[self.member_start:i]))
+            elif char == ',' and self.depth == 1:
+                completed.extend(self._member(buffer[self.member_start:i]))
+                self.member_start = i + 1
+        self.pos = len(buffer)
+        return completed
+    
+    @staticmethod
+    def _member(fragment: str) -> List[Tuple[str, Any]]:
+        fragment = fragment.strip()
+        if not fragment:
+            return []
+        return list(json.loads("{" + fragment + "}").items())
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalize a model-provided section into a list of strings"""
+    if isinstance(value, str):
+        return [line.strip() for line in value.split('\n') if line.strip()]
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return []
+
+
+def _reported(usage: Any, field: str, estimate: int) -> int:
+    """Token count OpenAI reported in a response's usage, or the local estimate without one"""
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else estimate
 
 
 class AIProcessor:
     """Service for AI processing using OpenAI"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        scheduler: Optional[AIScheduler] = None
+    ):
         """
         Initialize the AI processor
         
         Args:
             api_key: OpenAI API key (defaults to env var)
+            cache: Completion cache (defaults to one configured from env vars)
+            scheduler: Admission of upstream calls (defaults to one configured from env vars)
         """
         api_key = api_key or os.getenv('OPENAI_API_KEY')
         
         if not api_key:
             raise ValueError("OPENAI_API_KEY must be set in environment or passed to constructor")
         
-        self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self._client: Optional["AsyncOpenAI"] = None
         self.model = "gpt-4o-mini"  # Cost-effective model
+        self.embedding_model = "text-embedding-3-small"
+        self.cache = cache or LLMCache.from_env()
+        # Identical requests are coalesced by the cache; the rest queue here for rate limits
+        self.scheduler = scheduler or AIScheduler()
+        # Prompt token budget (model context minus completion); longer prompts are cut locally
+        self.max_input_tokens = int(os.getenv('LLM_MAX_INPUT_TOKENS', '100000'))
+        # Condenses transcripts that do not fit in one prompt; shared by all analyses
+        self.summarizer = SummarizationEngine(
+            functools.partial(self._complete, operation="condense"),
+            model=self.model
+        )
+        # Per-operation series, looked up in the registry once rather than on every call
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], Counter] = {}
+    
+    def _histogram(self, name: str, operation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = self._histograms.get((name, operation))
+        if histogram is None:
+            histogram = self._histograms[(name, operation)] = registry.histogram(name, buckets, operation=operation)
+        return histogram
+    
+    def _counter(self, name: str, operation: str, kind: str = "") -> Counter:
+        counter = self._counters.get((name, operation, kind))
+        if counter is None:
+            labels = {"kind": kind} if kind else {}
+            counter = self._counters[(name, operation, kind)] = registry.counter(name, operation=operation, **labels)
+        return counter
+    
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """OpenAI SDK client, created on first use (importing the SDK is slow)"""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # Share the pooled keep-alive connections of the "openai" upstream
+            self._client = AsyncOpenAI(api_key=self._api_key, http_client=get_upstream("openai").client)
+        return self._client
+    
+    async def _complete(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float = 0.3,
+        json_mode: bool = False,
+        operation: str = "completion"
+    ) -> str:
+        """
+        Run a single chat completion, served from the cache when the exact
+        same model, prompts and parameters were seen recently
+        
+        Args:
+            system: System prompt
+            prompt: User prompt
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            json_mode: Constrain the completion to a JSON object
+            operation: Name the call's latency is recorded under
+            
+        Returns:
+            Completion text
+        """
+        prompt = self._fit_prompt(system, prompt, max_tokens)
+        key = self._cache_key(system, prompt, max_tokens, temperature, json_mode)
+        return await self.cache.get_or_compute(
+            key,
+            lambda: self._request_completion(system, prompt, max_tokens, temperature, json_mode, operation)
+        )
+    
+    def _fit_prompt(self, system: str, prompt: str, max_tokens: int) -> str:
+        """Cut a prompt that would not fit the input token budget, keeping its head and tail"""
+        budget = self.max_input_tokens - count_tokens(system) - max_tokens
+        return truncate_to_tokens(prompt, max(budget, 0))
+    
+    @staticmethod
+    def _request_tokens(system: str, prompt: str, max_tokens: int) -> int:
+        """Tokens a call counts against the rate limit: prompt plus completion limit"""
+        return count_tokens(system) + count_tokens(prompt) + max_tokens
+    
+    def _cache_key(self, system: str, prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> str:
+        return cache_key(
+            model=self.model,
+            system=system,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode
+        )
+    
+    async def _request_completion(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool,
+        operation: str
+    ) -> str:
+        """Call the OpenAI chat completions API once scheduled, recording its latency"""
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        async with self.scheduler.slot(operation, self._request_tokens(system, prompt, max_tokens)):
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **extra
+                )
+            except Exception:
+                self._counter("llm_errors_total", operation).inc()
+                raise
+            self._histogram("llm_call_duration_seconds", operation).observe(
+                time.perf_counter() - started
+            )
+        content = response.choices[0].message.content.strip()
+        usage = getattr(response, "usage", None)
+        self._record_tokens(
+            operation,
+            _reported(usage, "prompt_tokens", count_tokens(system) + count_tokens(prompt)),
+            _reported(usage, "completion_tokens", count_tokens(content))
+        )
+        return content
+    
+    def _record_tokens(self, operation: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Add a call's tokens to the per-operation counters (estimated when OpenAI reports no usage)"""
+        self._counter("llm_tokens_total", operation, "prompt").inc(prompt_tokens)
+        self._counter("llm_tokens_total", operation, "completion").inc(completion_tokens)
+    
+    async def _stream(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float = 0.3,
+        json_mode: bool = False,
+        operation: str = "completion"
+    ) -> AsyncIterator[str]:
+        """
+        Run a chat completion, yielding text deltas as they arrive
+        
+        Upstream streams hold a scheduler slot until they end; their time
+        to first token and total duration are recorded under `operation`.
+        
+        Args:
+            system: System prompt
+            prompt: User prompt
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            json_mode: Constrain the completion to a JSON object
+            operation: Name the call's latency is recorded under
+            
+        Yields:
+            Pieces of the completion text (the whole text at once on a cache hit)
+        """
+        prompt = self._fit_prompt(system, prompt, max_tokens)
+        key = self._cache_key(system, prompt, max_tokens, temperature, json_mode)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        parts = []
+        async with self.scheduler.slot(operation, self._request_tokens(system, prompt, max_tokens)):
+            started = time.perf_counter()
+            first_token = None
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **extra
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token is None:
+                            first_token = time.perf_counter() - started
+                            self._histogram("llm_time_to_first_token_seconds", operation).observe(first_token)
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            except Exception:
+                self._counter("llm_errors_total", operation).inc()
+                raise
+            self._histogram("llm_call_duration_seconds", operation).observe(
+                time.perf_counter() - started
+            )
+        content = "".join(parts).strip()
+        self._record_tokens(operation, count_tokens(system) + count_tokens(prompt), count_tokens(content))
+        await self.cache.set(key, content)
+    
+    async def _prepare_transcript(
+        self,
+        transcript: str,
+        operation: str = "completion",
+        on_progress: Optional[ProgressFn] = None
+    ) -> Tuple[str, str]:
+        """
+        Compact a transcript and fit it into a single prompt
+        
+        The tokens sent and saved by compaction are recorded under `operation`.
+        
+        Args:
+            transcript: The transcript text
+            operation: Name the call's token counts are recorded under
+            on_progress: Called with (chunks done, total chunks) while condensing
+            
+        Returns:
+            Tuple of (text to send, what the text is) - the compacted transcript,
+            or map-reduced notes when it is longer than one chunk
+        """
+        compact = compact_transcript(transcript)
+        self._histogram("llm_transcript_tokens", operation, TOKEN_BUCKETS).observe(compact.tokens)
+        self._histogram("llm_transcript_tokens_saved", operation, TOKEN_BUCKETS).observe(compact.saved)
+        if self.summarizer.fits(compact.text):
+            return compact.text, "meeting transcript"
+        return await self.summarizer.condense(compact.text, on_progress), "meeting notes"
     
-    def summarize_transcript(self, transcript: str, max_sentences: int = 3) -> str:
+    async def summarize_transcript(self, transcript: str, max_sentences: int = 3) -> str:
         """
         Summarize a meeting transcript
         
@@ -40,24 +363,86 @@ class AIProcessor:
             Summarized text
         """
         try:
-            prompt = f"Summarize this meeting transcript in {max_sentences} sentences: {transcript}"
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes meeting transcripts concisely."},
-                    {"role": "user", "content": prompt}
-                ],
+            text, source = await self._prepare_transcript(transcript, "summarize")
+            prompt = f"Summarize this {source} in {max_sentences} sentences: {text}"
+            
+            return await self._complete(
+                SUMMARY_SYSTEM_PROMPT,
+                prompt,
+                max_tokens=150,
                 temperature=0.3,  # Lower temperature for more focused summaries
-                max_tokens=150
+                operation="summarize"
             )
+        except Exception as e:
+            print(f"Error summarizing transcript: {e}")
+            raise
+    
+    async def stream_summary(self, transcript: str, max_sentences: int = 3) -> AsyncIterator[str]:
+        """
+        Summarize a meeting transcript, yielding text as it is generated
+        
+        Args:
+            transcript: The transcript text to summarize
+            max_sentences: Maximum number of sentences in summary
             
-            return response.choices[0].message.content.strip()
+        Yields:
+            Pieces of the summary text
+        """
+        try:
+            text, source = await self._prepare_transcript(transcript, "summarize")
+            prompt = f"Summarize this {source} in {max_sentences} sentences: {text}"
+            
+            async for delta in self._stream(
+                SUMMARY_SYSTEM_PROMPT,
+                prompt,
+                max_tokens=150,
+                temperature=0.3,
+                operation="summarize"
+            ):
+                yield delta
         except Exception as e:
             print(f"Error summarizing transcript: {e}")
             raise
     
-    def generate_question(self, user_input: str) -> str:
+    async def update_summary(self, summary: str, new_transcript: str, max_sentences: int = 5) -> str:
+        """
+        Fold new transcript lines into a running meeting summary
+        
+        Only the previous summary and the new lines are sent, so each update
+        costs the same however long the meeting has run.
+        
+        Args:
+            summary: Summary of the meeting so far (empty for the first update)
+            new_transcript: Transcript lines since the last update
+            max_sentences: Maximum number of sentences in the updated summary
+            
+        Returns:
+            Updated summary text
+        """
+        try:
+            text, source = await self._prepare_transcript(new_transcript, "live_summary")
+            if summary:
+                prompt = (
+                    f"Summary of the meeting so far:\n{summary}\n\n"
+                    f"New {source}:\n{text}\n\n"
+                    f"Rewrite the summary in at most {max_sentences} sentences so it covers "
+                    "the whole meeting, including the new part."
+                )
+            else:
+                prompt = f"Summarize this {source} in at most {max_sentences} sentences: {text}"
+            
+            return await self._complete(
+                LIVE_SUMMARY_SYSTEM_PROMPT,
+                prompt,
+                max_tokens=250,
+                temperature=0.3,
+                operation="live_summary"
+            )
+        except Exception as e:
+            print(f"Error updating live summary: {e}")
+            raise
+    
+    async def generate_question(self, user_input: str) -> str:
         """
         Generate a formal meeting question from user input
         
@@ -70,22 +455,43 @@ class AIProcessor:
         try:
             prompt = f"Rephrase this as a professional meeting question: {user_input}"
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that rephrases informal questions into professional meeting questions."},
-                    {"role": "user", "content": prompt}
-                ],
+            return await self._complete(
+                QUESTION_SYSTEM_PROMPT,
+                prompt,
+                max_tokens=100,
                 temperature=0.5,
-                max_tokens=100
+                operation="question"
             )
+        except Exception as e:
+            print(f"Error generating question: {e}")
+            raise
+    
+    async def stream_question(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Generate a formal meeting question, yielding text as it is generated
+        
+        Args:
+            user_input: User's informal question or statement
             
-            return response.choices[0].message.content.strip()
+        Yields:
+            Pieces of the question text
+        """
+        try:
+            prompt = f"Rephrase this as a professional meeting question: {user_input}"
+            
+            async for delta in self._stream(
+                QUESTION_SYSTEM_PROMPT,
+                prompt,
+                max_tokens=100,
+                temperature=0.5,
+                operation="question"
+            ):
+                yield delta
         except Exception as e:
             print(f"Error generating question: {e}")
             raise
     
-    def extract_key_points(self, transcript: str, num_points: int = 5) -> List[str]:
+    async def extract_key_points(self, transcript: str, num_points: int = 5) -> List[str]:
         """
         Extract key points from a transcript
         
@@ -97,19 +503,16 @@ class AIProcessor:
             List of key points
         """
         try:
-            prompt = f"Extract {num_points} key points from this meeting transcript: {transcript}"
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts key points from meeting transcripts. Return the points as a numbered list."},
-                    {"role": "user", "content": prompt}
-                ],
+            text, source = await self._prepare_transcript(transcript, "key_points")
+            prompt = f"Extract {num_points} key points from this {source}: {text}"
+            
+            content = await self._complete(
+                "You are a helpful assistant that extracts key points from meeting transcripts. Return the points as a numbered list.",
+                prompt,
+                max_tokens=200,
                 temperature=0.3,
-                max_tokens=200
+                operation="key_points"
             )
-            
-            content = response.choices[0].message.content.strip()
             # Parse numbered list into array
             points = [line.strip() for line in content.split('\n') if line.strip()]
             return points
@@ -117,7 +520,7 @@ class AIProcessor:
             print(f"Error extracting key points: {e}")
             raise
     
-    def generate_action_items(self, transcript: str) -> List[str]:
+    async def generate_action_items(self, transcript: str) -> List[str]:
         """
         Extract action items from a transcript
         
@@ -128,22 +531,144 @@ class AIProcessor:
             List of action items
         """
         try:
-            prompt = f"Extract all action items and next steps from this meeting transcript: {transcript}"
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that identifies action items from meetings. Return them as a bulleted list with responsible parties if mentioned."},
-                    {"role": "user", "content": prompt}
-                ],
+            text, source = await self._prepare_transcript(transcript, "action_items")
+            prompt = f"Extract all action items and next steps from this {source}: {text}"
+            
+            content = await self._complete(
+                "You are a helpful assistant that identifies action items from meetings. Return them as a bulleted list with responsible parties if mentioned.",
+                prompt,
+                max_tokens=200,
                 temperature=0.3,
-                max_tokens=200
+                operation="action_items"
             )
-            
-            content = response.choices[0].message.content.strip()
             # Parse list into array
             items = [line.strip() for line in content.split('\n') if line.strip()]
             return items
         except Exception as e:
             print(f"Error generating action items: {e}")
             raise
+    
+    def _analysis_prompt(self, text: str, source: str, max_sentences: int, num_points: int) -> Tuple[str, str]:
+        """Build the system and user prompts for a combined analysis"""
+        system = (
+            "You are a helpful assistant that analyzes meetings. Respond with a JSON object "
+            "with exactly these keys, in this order: \"summary\" (a string), \"key_points\" "
+            "(an array of strings) and \"action_items\" (an array of strings naming "
+            "responsible parties if mentioned)."
+        )
+        prompt = (
+            f"Analyze this {source}. Summarize it in {max_sentences} sentences, extract "
+            f"{num_points} key points, and list all action items and next steps: {text}"
+        )
+        return system, prompt
+    
+    async def analyze(
+        self,
+        transcript: str,
+        max_sentences: int = 3,
+        num_points: int = 5,
+        on_progress: Optional[ProgressFn] = None
+    ) -> Dict[str, Any]:
+        """
+        Produce summary, key points and action items in one completion
+        
+        Args:
+            transcript: The transcript text to analyze
+            max_sentences: Maximum number of sentences in the summary
+            num_points: Number of key points to extract
+            on_progress: Called with (chunks done, total chunks) while a long transcript is condensed
+            
+        Returns:
+            Dictionary with summary, key_points and action_items
+        """
+        try:
+            text, source = await self._prepare_transcript(transcript, "analyze", on_progress)
+            system, prompt = self._analysis_prompt(text, source, max_sentences, num_points)
+            
+            content = await self._complete(
+                system, prompt, max_tokens=600, temperature=0.3, json_mode=True, operation="analyze"
+            )
+            result = json.loads(content)
+            return {
+                "summary": str(result.get("summary", "")).strip(),
+                "key_points": _as_list(result.get("key_points")),
+                "action_items": _as_list(result.get("action_items"))
+            }
+        except Exception as e:
+            print(f"Error analyzing transcript: {e}")
+            raise
+    
+    async def stream_analysis(
+        self,
+        transcript: str,
+        max_sentences: int = 3,
+        num_points: int = 5
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Produce the combined analysis, yielding each section as it finishes
+        
+        Args:
+            transcript: The transcript text to analyze
+            max_sentences: Maximum number of sentences in the summary
+            num_points: Number of key points to extract
+            
+        Yields:
+            (section, value) pairs for summary, key_points and action_items
+        """
+        try:
+            text, source = await self._prepare_transcript(transcript, "analyze")
+            system, prompt = self._analysis_prompt(text, source, max_sentences, num_points)
+            
+            parser = _SectionParser()
+            async for delta in self._stream(
+                system, prompt, max_tokens=600, temperature=0.3, json_mode=True, operation="analyze"
+            ):
+                for key, value in parser.feed(delta):
+                    if key == "summary":
+                        yield key, str(value).strip()
+                    elif key in ANALYSIS_SECTIONS:
+                        yield key, _as_list(value)
+        except Exception as e:
+            print(f"Error analyzing transcript: {e}")
+            raise
+    
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts for semantic search, in one request
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One embedding vector per text
+        """
+        tokens = sum(count_tokens(text) for text in texts)
+        async with self.scheduler.slot("embed", tokens):
+            started = time.perf_counter()
+            try:
+                response = await self.client.embeddings.create(model=self.embedding_model, input=texts)
+            except Exception:
+                self._counter("llm_errors_total", "embed").inc()
+                raise
+            self._histogram("llm_call_duration_seconds", "embed").observe(
+                time.perf_counter() - started
+            )
+        self._record_tokens("embed", _reported(getattr(response, "usage", None), "prompt_tokens", tokens), 0)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    async def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query, served from the cache when it was seen recently
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Embedding vector
+        """
+        key = cache_key(kind="embedding", model=self.embedding_model, text=query)
+        
+        async def compute() -> str:
+            return json.dumps((await self.embed([query]))[0])
+        
+        return json.loads(await self.cache.get_or_compute(key, compute))
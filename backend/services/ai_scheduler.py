@@ -0,0 +1,189 @@
+"""
+AI Request Scheduler for Meeting Agent
+Admits OpenAI calls by priority within rate-limit budgets and a concurrency cap
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, AsyncIterator
+
+from .metrics import registry, Histogram
+
+# Lower runs first: questions asked in a live meeting, then the live summary,
+# then on-demand analyses, then background work
+PRIORITIES = {
+    "question": 0,
+    "live_summary": 1,
+    "summarize": 2,
+    "key_points": 2,
+    "action_items": 2,
+    "analyze": 2,
+    "condense": 2,
+    "embed": 3
+}
+DEFAULT_PRIORITY = 2
+
+
+class _Budget:
+    """Per-minute allowance refilled continuously, allowing a one-minute burst"""
+
+    __slots__ = ("per_minute", "available", "updated_at")
+
+    def __init__(self, per_minute: float, now: float):
+        self.per_minute = per_minute
+        self.available = per_minute
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.available = min(self.per_minute, self.available + elapsed * self.per_minute / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (after refill)"""
+        missing = min(amount, self.per_minute) - self.available
+        return max(missing * 60.0 / self.per_minute, 0.0)
+
+
+class _Waiter:
+    """A queued call; its future is resolved when the call may start"""
+
+    __slots__ = ("priority", "seq", "tokens", "operation", "future")
+
+    def __init__(self, priority: int, seq: int, tokens: int, operation: str, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.operation = operation
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AIScheduler:
+    """Queues upstream AI calls and starts them in priority order within budget"""
+
+    def __init__(
+        self,
+        tokens_per_minute: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        clock=time.monotonic
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            tokens_per_minute: Token budget across all calls (defaults to env var)
+            requests_per_minute: Request budget across all calls (defaults to env var)
+            max_concurrency: Most calls in flight at once (defaults to env var)
+            clock: Monotonic time source, overridable for tests
+        """
+        self.clock = clock
+        now = clock()
+        # The account's limits are split evenly between the worker processes
+        workers = max(int(os.getenv('WORKER_COUNT') or 1), 1)
+        self.tokens = _Budget(tokens_per_minute or int(os.getenv('AI_TOKENS_PER_MINUTE', '200000')) / workers, now)
+        self.requests = _Budget(requests_per_minute or int(os.getenv('AI_REQUESTS_PER_MINUTE', '500')) / workers, now)
+        self.max_concurrency = max_concurrency or int(os.getenv('AI_MAX_CONCURRENCY', '8'))
+        self.running = 0
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.started = 0
+        self.delayed = 0
+        self._waits: Dict[str, Histogram] = {}
+
+    @asynccontextmanager
+    async def slot(self, operation: str, tokens: int) -> AsyncIterator[None]:
+        """
+        Hold one admitted call for the duration of the block
+
+        Calls wait in a queue ordered by the priority of their operation,
+        then arrival. The head of the queue starts once a concurrency slot
+        is free and both per-minute budgets cover it; lower priorities
+        never overtake it.
+
+        Args:
+            operation: Kind of call, which sets its priority (see PRIORITIES)
+            tokens: Tokens the call may use (prompt plus completion limit)
+        """
+        queued_at = self.clock()
+        waiter = _Waiter(
+            PRIORITIES.get(operation, DEFAULT_PRIORITY), next(self._seq), tokens, operation,
+            asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._queue, waiter)
+        self._pump()
+        if not waiter.future.done():
+            self.delayed += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller went away; give the slot back
+                self._release()
+            else:
+                waiter.future.cancel()
+                self._pump()
+            raise
+        wait = self._waits.get(operation)
+        if wait is None:
+            wait = self._waits[operation] = registry.histogram("ai_queue_wait_seconds", operation=operation)
+        wait.observe(self.clock() - queued_at)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        """Start queued calls from the head while slots and budgets allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self.clock()
+        self.tokens.refill(now)
+        self.requests.refill(now)
+        while self._queue and self.running < self.max_concurrency:
+            waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = max(self.tokens.wait_time(waiter.tokens), self.requests.wait_time(1))
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+            heapq.heappop(self._queue)
+            self.tokens.available -= min(waiter.tokens, self.tokens.per_minute)
+            self.requests.available -= 1
+            self.running += 1
+            self.started += 1
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per operation, calls in flight and remaining budgets"""
+        queued: Dict[str, int] = {}
+        for waiter in self._queue:
+            if not waiter.future.done():
+                queued[waiter.operation] = queued.get(waiter.operation, 0) + 1
+        self.tokens.refill(self.clock())
+        self.requests.refill(self.clock())
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "queued": queued,
+            "started": self.started,
+            "delayed": self.delayed,
+            "tokens_available": int(self.tokens.available),
+            "tokens_per_minute": self.tokens.per_minute,
+            "requests_available": int(self.requests.available),
+            "requests_per_minute": self.requests.per_minute
+        }
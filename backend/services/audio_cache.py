@@ -0,0 +1,183 @@
+"""
+Audio Cache for Meeting Agent
+Size-bounded cache of synthesized speech with a disk tier
+"""
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from .shared_state import SharedState, get_shared_state
+from .tiered_cache import TieredCache
+
+
+class _DiskTier:
+    """Directory of audio files, one per key"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.evictions = 0
+        os.makedirs(path, exist_ok=True)
+        # Oldest files first so eviction continues where the last run left off
+        entries = sorted(
+            (entry for entry in os.scandir(path) if entry.is_file() and not entry.name.endswith(".tmp")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            self._sizes[entry.name] = entry.stat().st_size
+        self._total = sum(self._sizes.values())
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._total
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            self._sizes.move_to_end(key)
+        try:
+            with open(os.path.join(self.path, key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._sizes.pop(key, 0)
+            return None
+
+    def set(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        target = os.path.join(self.path, key)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, target)
+        with self._lock:
+            self._total += len(audio) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(audio)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.path, key))
+            except FileNotFoundError:
+                pass
+
+
+class AudioCache(TieredCache[bytes]):
+    """In-memory LRU cache of audio clips bounded by total bytes"""
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        path: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        shared: Optional[SharedState] = None,
+        shared_ttl: float = 3600.0
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Most audio bytes kept in memory
+            path: Directory for the persistent tier (memory only if None)
+            max_disk_bytes: Most audio bytes kept on disk
+            shared: Storage shared with the other worker processes, checked
+                after memory and before disk
+            shared_ttl: Seconds a clip stays in shared state
+        """
+        super().__init__(_DiskTier(path, max_disk_bytes) if path else None, shared)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]"
+        self._bytes = 0
+        self.shared_ttl = shared_ttl
+
+    @classmethod
+    def from_env(cls) -> "AudioCache":
+        """Build a cache from AUDIO_CACHE_MB, AUDIO_CACHE_PATH and AUDIO_CACHE_DISK_MB"""
+        return cls(
+            max_bytes=int(float(os.getenv('AUDIO_CACHE_MB', '32')) * 1024 * 1024),
+            path=os.getenv('AUDIO_CACHE_PATH') or None,
+            max_disk_bytes=int(float(os.getenv('AUDIO_CACHE_DISK_MB', '512')) * 1024 * 1024),
+            shared=get_shared_state()
+        )
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = audio
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a clip in memory, then in shared state, then on disk
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            The cached audio, or None on a miss
+        """
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+        if self._shared is not None:
+            try:
+                audio = await self._shared.get(f"audio:{key}")
+            except (ConnectionError, OSError) as e:
+                print(f"Error reading shared audio cache: {e}")
+            if audio is not None:
+                self._remember(key, audio)
+                self.shared_hits += 1
+                return audio
+
+        if self._disk is not None:
+            audio = await asyncio.to_thread(self._disk.get, key)
+            if audio is not None:
+                self._remember(key, audio)
+                self.disk_hits += 1
+                return audio
+        return None
+
+    async def set(self, key: str, audio: bytes) -> None:
+        """
+        Store a clip in memory, shared state and on disk
+
+        Args:
+            key: Cache key from cache_key()
+            audio: Encoded audio bytes
+        """
+        self._remember(key, audio)
+        if self._shared is not None and len(audio) <= self.max_bytes:
+            try:
+                await self._shared.set(f"audio:{key}", audio, ttl=self.shared_ttl)
+            except (ConnectionError, OSError) as e:
+                print(f"Error writing shared audio cache: {e}")
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, audio)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size, in memory and on disk"""
+        stats = super().stats()
+        stats["bytes"] = self._bytes
+        stats["disk_bytes"] = self._disk.size if self._disk is not None else 0
+        return stats
@@ -0,0 +1,319 @@
+"""
+Shared HTTP Client Pool for Meeting Agent
+Keeps one persistent keep-alive client per upstream API with bounded
+concurrency and retries
+"""
+import asyncio
+import os
+import random
+import time
+import httpx
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, AsyncIterator
+
+from .metrics import registry, Histogram, Counter
+
+# Methods that are safe to replay after the upstream may have seen them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _env_number(name: str, default, cast=float):
+    """Read a numeric setting from the environment"""
+    value = os.getenv(name)
+    return cast(value) if value not in (None, "") else default
+
+
+@dataclass
+class UpstreamConfig:
+    """Connection pool and retry settings for one upstream API"""
+    pool_size: int = 20
+    max_concurrency: int = 20
+    connect_timeout: float = 5.0
+    timeout: float = 30.0
+    keepalive_expiry: float = 60.0
+    max_retries: int = 3
+    backoff_base: float = 0.25
+    backoff_max: float = 4.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "UpstreamConfig":
+        """
+        Build a config from HTTP_* defaults and <NAME>_HTTP_* overrides
+
+        Args:
+            name: Upstream name, e.g. "recall" reads RECALL_HTTP_POOL_SIZE
+
+        Returns:
+            UpstreamConfig for the upstream
+        """
+        config = cls()
+        prefix = name.upper()
+        for field, cast in (
+            ("pool_size", int),
+            ("max_concurrency", int),
+            ("connect_timeout", float),
+            ("timeout", float),
+            ("keepalive_expiry", float),
+            ("max_retries", int),
+            ("backoff_base", float),
+            ("backoff_max", float),
+        ):
+            key = field.upper()
+            value = _env_number(f"HTTP_{key}", getattr(config, field), cast)
+            value = _env_number(f"{prefix}_HTTP_{key}", value, cast)
+            setattr(config, field, value)
+        return config
+
+
+class UpstreamClient:
+    """Pooled keep-alive HTTP client for a single upstream API"""
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[UpstreamConfig] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initialize the upstream client
+
+        Args:
+            name: Upstream name used for configuration and logging
+            config: Pool and retry settings (defaults to env vars)
+            client: Pre-built httpx client (defaults to a pooled client)
+        """
+        self.name = name
+        self.config = config or UpstreamConfig.from_env(name)
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        # Series are looked up once, so recording a request allocates nothing
+        self._latency: Dict[str, Histogram] = {}
+        self._responses: Dict[int, Counter] = {}
+        self._errors = registry.counter("upstream_errors_total", upstream=name)
+        self._retries = registry.counter("upstream_retries_total", upstream=name)
+        self._sent = registry.counter("upstream_sent_bytes_total", upstream=name)
+        self._received = registry.counter("upstream_received_bytes_total", upstream=name)
+        self._client = client
+        if client is not None:
+            self._instrument(client)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Underlying httpx client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            config = self.config
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.pool_size,
+                    max_keepalive_connections=config.pool_size,
+                    keepalive_expiry=config.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout)
+            )
+            self._instrument(self._client)
+        return self._client
+
+    def _instrument(self, client: httpx.AsyncClient) -> None:
+        """
+        Record every request sent through a client
+
+        Event hooks see the OpenAI SDK's requests too, since it shares the
+        "openai" pool. Latency is measured up to the response headers.
+        """
+        client.event_hooks["request"].append(self._on_request)
+        client.event_hooks["response"].append(self._on_response)
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["sent_at"] = time.perf_counter()
+        self._sent.inc(int(request.headers.get("Content-Length") or 0))
+        # The OpenAI SDK retries on its own and numbers its attempts
+        if request.headers.get("x-stainless-retry-count", "0") != "0":
+            self._retries.inc()
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        request = response.request
+        latency = self._latency.get(request.method)
+        if latency is None:
+            latency = self._latency[request.method] = registry.histogram(
+                "upstream_request_duration_seconds", upstream=self.name, method=request.method
+            )
+        latency.observe(time.perf_counter() - request.extensions.get("sent_at", time.perf_counter()))
+        responses = self._responses.get(response.status_code)
+        if responses is None:
+            responses = self._responses[response.status_code] = registry.counter(
+                "upstream_responses_total", upstream=self.name, status=str(response.status_code)
+            )
+        responses.inc()
+        if response.status_code >= 500:
+            self._errors.inc()
+
+    def _should_retry(self, method: str, status_code: int) -> bool:
+        """Decide whether a response status is worth another attempt"""
+        if status_code == 429:
+            return True
+        return status_code in RETRY_STATUS_CODES and method in IDEMPOTENT_METHODS
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                return min(float(retry_after), self.config.backoff_max)
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request with bounded concurrency and retries
+
+        429 responses and connection failures are retried for every method;
+        5xx responses are only retried for idempotent methods.
+
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            **kwargs: Arguments passed to httpx.AsyncClient.request
+
+        Returns:
+            The final httpx.Response (callers check its status)
+
+        Raises:
+            httpx.HTTPError: If the request cannot be sent after all retries
+        """
+        method = method.upper()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                self._errors.inc()
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            except httpx.HTTPError:
+                self._errors.inc()
+                raise
+            else:
+                self._received.inc(response.num_bytes_downloaded)
+                if attempt >= self.config.max_retries or not self._should_retry(method, response.status_code):
+                    return response
+                await response.aclose()
+                delay = self._backoff(attempt, response)
+            attempt += 1
+            self._retries.inc()
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request and stream the response body
+
+        Retries follow the same rules as request(), but only until response
+        headers arrive; the concurrency slot is held until the body is closed.
+
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            **kwargs: Arguments passed to httpx.AsyncClient.build_request
+
+        Yields:
+            The httpx.Response with its body not yet read
+
+        Raises:
+            httpx.HTTPError: If the request cannot be sent after all retries
+        """
+        method = method.upper()
+        attempt = 0
+        while True:
+            response = None
+            async with self._semaphore:
+                try:
+                    request = self.client.build_request(method, url, **kwargs)
+                    response = await self.client.send(request, stream=True)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                    self._errors.inc()
+                    if attempt >= self.config.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                except httpx.HTTPError:
+                    self._errors.inc()
+                    raise
+                else:
+                    if attempt >= self.config.max_retries or not self._should_retry(method, response.status_code):
+                        try:
+                            yield response
+                        finally:
+                            await response.aclose()
+                            self._received.inc(response.num_bytes_downloaded)
+                        return
+                    await response.aclose()
+                    delay = self._backoff(attempt, response)
+            attempt += 1
+            self._retries.inc()
+            await asyncio.sleep(delay)
+
+    async def warm_up(self, url: str) -> bool:
+        """
+        Open a pooled connection before the first real request needs it
+
+        Sends one HEAD request, whatever its status, so the TCP and TLS
+        handshakes are done ahead of time. Failures are not retried.
+
+        Args:
+            url: Any URL on the upstream's host
+
+        Returns:
+            Whether the upstream answered
+        """
+        try:
+            response = await self.client.head(url)
+        except httpx.HTTPError as e:
+            print(f"Could not warm up {self.name}: {e}")
+            return False
+        await response.aclose()
+        return True
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+_upstreams: Dict[str, UpstreamClient] = {}
+
+
+def get_upstream(name: str) -> UpstreamClient:
+    """
+    Get the shared pooled client for an upstream, creating it on first use
+
+    Args:
+        name: Upstream name ("recall", "cartesia", ...)
+
+    Returns:
+        The process-wide UpstreamClient for that upstream
+    """
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        upstream = _upstreams[name] = UpstreamClient(name)
+    return upstream
+
+
+async def close_upstreams() -> None:
+    """Close every shared upstream client"""
+    upstreams = list(_upstreams.values())
+    _upstreams.clear()
+    for upstream in upstreams:
+        await upstream.aclose()
@@ -0,0 +1,362 @@
+"""
+Job Queue Service for Meeting Agent
+Runs long post-meeting analyses in the background, persisted across restarts
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Awaitable, AsyncIterator
+
+from .meeting_db import MeetingDatabase
+from .shared_state import SharedState
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED_STATES = (DONE, FAILED)
+
+
+class Job:
+    """One background job and its progress"""
+
+    __slots__ = (
+        "job_id", "kind", "bot_id", "params", "state", "progress", "stage", "result", "error",
+        "attempts", "created_at", "updated_at", "changed", "_queue"
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        bot_id: Optional[str],
+        params: Dict[str, Any],
+        state: str = QUEUED,
+        progress: float = 0.0,
+        stage: Optional[str] = None,
+        result: Any = None,
+        error: Optional[str] = None,
+        attempts: int = 0,
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.bot_id = bot_id
+        self.params = params
+        self.state = state
+        self.progress = progress
+        self.stage = stage
+        self.result = result
+        self.error = error
+        self.attempts = attempts
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        # Replaced after each update; watchers wait on the current one
+        self.changed = asyncio.Event()
+        self._queue: Optional["JobQueue"] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def report(self, progress: float, stage: Optional[str] = None) -> None:
+        """
+        Record the progress of a running job
+
+        Args:
+            progress: Fraction done, between 0 and 1
+            stage: Name of the current step
+        """
+        self.progress = min(max(progress, self.progress), 1.0)
+        if stage is not None:
+            self.stage = stage
+        if self._queue is not None:
+            self._queue._changed(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "bot_id": self.bot_id,
+            "state": self.state,
+            "progress": round(self.progress, 3),
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Everything needed to resume the job after a restart"""
+        record = self.to_dict()
+        record["params"] = self.params
+        record["attempts"] = self.attempts
+        return record
+
+
+# Runs one job and returns its JSON-serializable result
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    """Background workers for long-running jobs, with state kept in the meeting database"""
+
+    def __init__(
+        self,
+        database: Optional[MeetingDatabase] = None,
+        workers: Optional[int] = None,
+        max_attempts: int = 3,
+        max_jobs: int = 1000,
+        shared: Optional[SharedState] = None
+    ):
+        """
+        Initialize the job queue
+
+        Args:
+            database: Where jobs are persisted (in memory only if None)
+            workers: Jobs run at once (defaults to env var)
+            max_attempts: Runs a job gets across restarts before it is failed
+            max_jobs: Most finished jobs kept in memory (older ones are read from the database)
+            shared: Storage shared with the other worker processes; a running
+                job is claimed there so only one worker runs it
+        """
+        self.database = database
+        self.workers = workers or int(os.getenv('JOB_WORKERS', '2'))
+        self.max_attempts = max_attempts
+        self.max_jobs = max_jobs
+        self._handlers: Dict[str, JobHandler] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self.shared = shared
+        self.claim_ttl = 60.0
+        # Seconds a finished job stays marked done in shared state
+        self.done_ttl = 86400.0
+        self._origin = uuid.uuid4().hex
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Set the coroutine function that runs jobs of a kind"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: Dict[str, Any], bot_id: Optional[str] = None) -> Job:
+        """
+        Queue a job, returning at once
+
+        An unfinished job of the same kind, bot and parameters is returned
+        instead of queueing a duplicate.
+
+        Args:
+            kind: Registered job kind
+            params: JSON-serializable job parameters
+            bot_id: Meeting the job is about, if any
+
+        Returns:
+            The queued (or already queued) job
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        for job in self._jobs.values():
+            if not job.finished and job.kind == kind and job.bot_id == bot_id and job.params == params:
+                return job
+        job = Job(uuid.uuid4().hex, kind, bot_id, params)
+        self._add(job)
+        self._save(job)
+        self._pending.put_nowait(job)
+        return job
+
+    def _add(self, job: Job) -> None:
+        job._queue = self
+        self._jobs[job.job_id] = job
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+
+    def _save(self, job: Job) -> None:
+        if self.database is not None:
+            self.database.save_job(job.to_record())
+
+    def _changed(self, job: Job) -> None:
+        """Persist a job update and wake its watchers"""
+        job.updated_at = time.time()
+        self._save(job)
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, from memory or the database
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Job dictionary, or None if unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.database is None:
+            return None
+        record = await asyncio.to_thread(self.database.job, job_id)
+        if record is None:
+            return None
+        return Job(**record).to_dict()
+
+    async def watch(self, job_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job's status now and after every update, until it finishes
+
+        Args:
+            job_id: ID of the job
+            heartbeat: Yield None after this many seconds without an update
+
+        Yields:
+            Job dictionaries (or None heartbeats); the last one is finished
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            status = await self.get(job_id)
+            if status is not None:
+                yield status
+            return
+        while True:
+            changed = job.changed
+            yield job.to_dict()
+            if job.finished:
+                return
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                    break
+                except asyncio.TimeoutError:
+                    yield None
+
+    async def start(self) -> int:
+        """
+        Requeue the jobs left unfinished by the last run and start the workers
+
+        Jobs that were running are started again from the beginning; one
+        that was interrupted `max_attempts` times is failed instead.
+
+        Returns:
+            Number of jobs requeued
+        """
+        requeued = 0
+        if self.database is not None:
+            for record in await asyncio.to_thread(self.database.unfinished_jobs):
+                job = Job(**record)
+                self._add(job)
+                if job.kind not in self._handlers or job.attempts >= self.max_attempts:
+                    job.state = FAILED
+                    job.error = "Interrupted too many times" if job.kind in self._handlers else "Unknown job kind"
+                    self._changed(job)
+                    continue
+                job.state = QUEUED
+                self._pending.put_nowait(job)
+                requeued += 1
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.ensure_future(self._work()))
+        return requeued
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._pending.get()
+            if job.state != QUEUED:
+                continue
+            if not await self._claim(job) or await self._finished_elsewhere(job):
+                # Another worker runs or ran it; its state is read from the database from now on
+                self._jobs.pop(job.job_id, None)
+                continue
+            holder = asyncio.ensure_future(self._hold(job)) if self.shared is not None else None
+            try:
+                await self._run(job)
+            finally:
+                if holder is not None:
+                    holder.cancel()
+                    await self._release(job)
+
+    async def _claim(self, job: Job) -> bool:
+        """Claim a job for this worker, so workers resuming the same jobs run each once"""
+        if self.shared is None:
+            return True
+        try:
+            return await self.shared.set(f"job:{job.job_id}", self._origin, ttl=self.claim_ttl, only_new=True)
+        except (ConnectionError, OSError) as e:
+            print(f"Error claiming job {job.job_id}: {e}")
+            return True
+
+    async def _finished_elsewhere(self, job: Job) -> bool:
+        """Whether the database says another worker finished a job this one requeued"""
+        if self.shared is None or self.database is None:
+            return False
+        record = await asyncio.to_thread(self.database.job, job.job_id)
+        if record is None or record["state"] not in FINISHED_STATES:
+            return False
+        await self._release(job, finished=True)
+        return True
+
+    async def _hold(self, job: Job) -> None:
+        """Renew a job's claim while it runs; it lapses if this worker dies"""
+        while True:
+            await asyncio.sleep(self.claim_ttl / 3)
+            try:
+                await self.shared.touch(f"job:{job.job_id}", self.claim_ttl)
+            except (ConnectionError, OSError) as e:
+                print(f"Error renewing claim on job {job.job_id}: {e}")
+
+    async def _release(self, job: Job, finished: Optional[bool] = None) -> None:
+        """
+        Give up a job's claim
+
+        A finished job's claim is replaced by a marker kept for `done_ttl`,
+        so workers that requeued it at startup do not run it again; an
+        interrupted one is deleted so the next start can resume it.
+        """
+        if finished is None:
+            finished = job.finished
+        try:
+            if finished:
+                await self.shared.set(f"job:{job.job_id}", "done", ttl=self.done_ttl)
+            else:
+                await self.shared.delete(f"job:{job.job_id}")
+        except (ConnectionError, OSError) as e:
+            print(f"Error releasing job {job.job_id}: {e}")
+
+    async def _run(self, job: Job) -> None:
+        job.state = RUNNING
+        job.attempts += 1
+        self._changed(job)
+        try:
+            result = await self._handlers[job.kind](job)
+        except asyncio.CancelledError:
+            # Shutting down: left as running, so the next start runs it again
+            raise
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e) or type(e).__name__
+        else:
+            job.state = DONE
+            job.result = result
+            job.progress = 1.0
+        self._changed(job)
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of jobs in memory by state"""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.state] += 1
+        return {"workers": self.workers, "jobs": counts}
+
+    async def close(self) -> None:
+        """Stop the workers; unfinished jobs resume on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
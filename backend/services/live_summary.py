@@ -0,0 +1,392 @@
+"""
+Live Summary Service for Meeting Agent
+Keeps a running summary of each live meeting, folding in only new utterances
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+from .ai_processor import AIProcessor
+from .shared_state import SharedState
+from .transcript_prep import count_tokens
+from .transcript_stream import TranscriptBroadcaster
+
+
+def format_utterances(utterances: List[Dict[str, Any]]) -> str:
+    """Render utterances as `Speaker: text` lines"""
+    return "\n".join(f"{u['speaker']}: {u['text']}" for u in utterances)
+
+
+class LiveSummary:
+    """Running summary of one bot's meeting"""
+
+    __slots__ = (
+        "bot_id", "summary", "covered", "received", "pending", "pending_tokens", "version",
+        "updated_at", "folded_at", "read_at", "error", "finished", "watchers", "changed", "task"
+    )
+
+    def __init__(self, bot_id: str, now: float):
+        self.bot_id = bot_id
+        self.summary = ""
+        # Utterances folded into the summary, and received from the feed
+        self.covered = 0
+        self.received = 0
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_tokens = 0
+        self.version = 0
+        self.updated_at: Optional[float] = None
+        self.folded_at = now
+        self.read_at = now
+        self.error: Optional[str] = None
+        # Set once the bot left its meeting; the task stops after a last fold
+        self.finished = False
+        self.watchers = 0
+        # Replaced after each update; watchers wait on the current one
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bot_id": self.bot_id,
+            "summary": self.summary,
+            "version": self.version,
+            "covered": self.covered,
+            "pending": len(self.pending),
+            "updated_at": self.updated_at,
+            "running": self.running,
+            "error": self.error
+        }
+
+
+class LiveSummarizer:
+    """Runs one summarizing task per live bot, shared by every client reading its summary
+
+    With several worker processes sharing state, the worker that claims a
+    bot summarizes it and publishes each update; the others only mirror the
+    published summary, and take over if the owner stops.
+    """
+
+    def __init__(
+        self,
+        ai_processor: AIProcessor,
+        broadcaster: TranscriptBroadcaster,
+        interval: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+        max_sentences: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_bots: int = 256,
+        clock=time.monotonic,
+        shared: Optional[SharedState] = None,
+        follow_interval: Optional[float] = None
+    ):
+        """
+        Initialize the live summarizer
+
+        Args:
+            ai_processor: Produces the summary updates
+            broadcaster: Source of each bot's live utterances
+            interval: Longest seconds new utterances wait before being folded in (defaults to env var)
+            min_tokens: Tokens of new utterances that trigger a fold right away (defaults to env var)
+            max_sentences: Sentences in the running summary (defaults to env var)
+            idle_timeout: Seconds a summary keeps updating after its last read (defaults to env var)
+            max_bots: Most summaries kept in memory
+            clock: Monotonic time source, overridable for tests
+            shared: Storage shared with the other worker processes
+            follow_interval: Seconds between reads of a summary another
+                worker owns (defaults to env var)
+        """
+        self.ai_processor = ai_processor
+        self.broadcaster = broadcaster
+        self.interval = interval if interval is not None else float(os.getenv('LIVE_SUMMARY_INTERVAL', '30'))
+        self.min_tokens = min_tokens or int(os.getenv('LIVE_SUMMARY_TOKENS', '500'))
+        self.max_sentences = max_sentences or int(os.getenv('LIVE_SUMMARY_SENTENCES', '5'))
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(
+            os.getenv('LIVE_SUMMARY_IDLE', '600')
+        )
+        self.max_bots = max_bots
+        self.clock = clock
+        self.shared = shared
+        self.follow_interval = follow_interval or float(os.getenv('LIVE_SUMMARY_FOLLOW_INTERVAL', '1'))
+        # An owner renews its claim at least every interval, so it lapses soon after the owner dies
+        self._claim_ttl = max(self.interval * 3, 10.0)
+        self._origin = uuid.uuid4().hex
+        self._writes = set()
+        self._summaries: "OrderedDict[str, LiveSummary]" = OrderedDict()
+
+    def get(self, bot_id: str) -> Optional[LiveSummary]:
+        return self._summaries.get(bot_id)
+
+    def start(self, bot_id: str) -> LiveSummary:
+        """
+        Get a bot's live summary, starting its background task if needed
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            The bot's running summary state
+        """
+        live = self._summaries.get(bot_id)
+        if live is None:
+            live = self._summaries[bot_id] = LiveSummary(bot_id, self.clock())
+            self._evict()
+        self._summaries.move_to_end(bot_id)
+        live.read_at = self.clock()
+        if not live.running and not live.finished:
+            live.task = asyncio.ensure_future(self._run(live))
+        return live
+
+    def _evict(self) -> None:
+        for bot_id in list(self._summaries):
+            if len(self._summaries) <= self.max_bots:
+                break
+            if not self._summaries[bot_id].running:
+                del self._summaries[bot_id]
+
+    def read(self, bot_id: str) -> Dict[str, Any]:
+        """
+        Read a bot's current summary from memory
+
+        The first read starts summarizing the bot; later reads return
+        immediately and keep the summary updating.
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            Summary dictionary
+        """
+        return self.start(bot_id).to_dict()
+
+    async def watch(self, bot_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a bot's summary now and after every update
+
+        Args:
+            bot_id: ID of the bot
+            heartbeat: Yield None after this many seconds without an update
+
+        Yields:
+            Summary dictionaries (or None heartbeats), until summarizing stops
+        """
+        live = self.start(bot_id)
+        live.watchers += 1
+        try:
+            version = None
+            while True:
+                changed = live.changed
+                running = live.running
+                if live.version != version or not running:
+                    version = live.version
+                    yield live.to_dict()
+                if not running:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            live.watchers -= 1
+
+    def finish(self, bot_id: str) -> None:
+        """Fold in the last utterances of a bot that left its meeting, then stop"""
+        live = self._summaries.get(bot_id)
+        if live is not None:
+            live.finished = True
+        if self.shared is not None:
+            # The worker summarizing the bot may be another one
+            task = asyncio.ensure_future(self.shared.set(
+                f"live-summary-finished:{bot_id}", "1", ttl=self.idle_timeout + self._claim_ttl
+            ))
+            self._writes.add(task)
+            task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Future) -> None:
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error marking live summary finished: {task.exception()}")
+
+    def _notify(self, live: LiveSummary) -> None:
+        changed, live.changed = live.changed, asyncio.Event()
+        changed.set()
+
+    async def _run(self, live: LiveSummary) -> None:
+        try:
+            while not await self._claim(live.bot_id):
+                if await self._follow(live):
+                    return
+            try:
+                await self._lead(live)
+            finally:
+                await self._publish(live, release=True)
+        except Exception as e:
+            live.error = str(e)
+        finally:
+            self._notify(live)
+
+    async def _claim(self, bot_id: str) -> bool:
+        """
+        Claim (or renew) the summarizing of a bot for this worker
+
+        Returns:
+            Whether this worker summarizes the bot; always True without shared state
+        """
+        if self.shared is None:
+            return True
+        key = f"live-summary-owner:{bot_id}"
+        try:
+            if await self.shared.set(key, self._origin, ttl=self._claim_ttl, only_new=True):
+                return True
+            if await self.shared.get(key) != self._origin.encode():
+                return False
+            await self.shared.touch(key, self._claim_ttl)
+            return True
+        except (ConnectionError, OSError) as e:
+            print(f"Error claiming live summary of {bot_id}: {e}")
+            return True
+
+    async def _follow(self, live: LiveSummary) -> bool:
+        """
+        Mirror the summary another worker publishes, until that worker stops
+
+        Returns:
+            Whether this worker should stop too (the meeting ended or nobody reads it here)
+        """
+        key = f"live-summary:{live.bot_id}"
+        while True:
+            raw = await self.shared.get(key)
+            state = json.loads(raw) if raw is not None else None
+            if state is not None:
+                self._mirror(live, state)
+            if live.finished:
+                return True
+            if not live.watchers and self.clock() - live.read_at > self.idle_timeout:
+                return True
+            if await self.shared.get(f"live-summary-owner:{live.bot_id}") is None:
+                return False
+            await asyncio.sleep(self.follow_interval)
+
+    def _mirror(self, live: LiveSummary, state: Dict[str, Any]) -> None:
+        """Adopt a summary published by another worker"""
+        live.finished = live.finished or state["finished"]
+        if state["version"] == live.version:
+            return
+        live.summary = state["summary"]
+        live.covered = state["covered"]
+        live.version = state["version"]
+        live.updated_at = state["updated_at"]
+        live.error = state["error"]
+        self._notify(live)
+
+    async def _publish(self, live: LiveSummary, release: bool = False) -> None:
+        """Share a summary this worker owns with the other workers, and with release give up the claim"""
+        if self.shared is None:
+            return
+        state = {
+            "summary": live.summary,
+            "covered": live.covered,
+            "version": live.version,
+            "updated_at": live.updated_at,
+            "error": live.error,
+            "finished": live.finished
+        }
+        try:
+            ttl = self.idle_timeout + self._claim_ttl
+            await self.shared.set(f"live-summary:{live.bot_id}", json.dumps(state), ttl=ttl)
+            if release:
+                await self.shared.delete(f"live-summary-owner:{live.bot_id}")
+        except (ConnectionError, OSError) as e:
+            print(f"Error publishing live summary of {live.bot_id}: {e}")
+
+    async def _lead(self, live: LiveSummary) -> None:
+        """Summarize a bot this worker claimed, carrying on from any published summary"""
+        if self.shared is not None:
+            raw = await self.shared.get(f"live-summary:{live.bot_id}")
+            if raw is not None:
+                self._mirror(live, json.loads(raw))
+            # Utterances a previous owner received but did not fold in are received again
+            live.received = live.covered
+            live.pending.clear()
+            live.pending_tokens = 0
+        async with self.broadcaster.subscribe(live.bot_id, live.received) as updates:
+            renewed_at = self.clock()
+            while True:
+                now = self.clock()
+                if live.pending:
+                    timeout = max(live.folded_at + self.interval - now, 0.0)
+                else:
+                    timeout = self.interval
+                try:
+                    batch = await asyncio.wait_for(updates.get(), timeout)
+                except asyncio.TimeoutError:
+                    batch = {}
+                if batch is None:
+                    break
+                if batch:
+                    self._receive(live, batch)
+
+                now = self.clock()
+                if self.shared is not None and now - renewed_at >= self._claim_ttl / 3:
+                    renewed_at = now
+                    await self._renew(live)
+                due = now - live.folded_at >= self.interval or live.finished
+                if live.pending and (live.pending_tokens >= self.min_tokens or due):
+                    await self._fold(live)
+                    await self._publish(live)
+                if live.finished and (not live.pending or live.error):
+                    break
+                if not live.watchers and now - live.read_at > self.idle_timeout:
+                    break
+
+    async def _renew(self, live: LiveSummary) -> None:
+        """Keep this worker's claim on a bot, and learn whether another worker saw it finish"""
+        try:
+            await self.shared.touch(f"live-summary-owner:{live.bot_id}", self._claim_ttl)
+            if await self.shared.get(f"live-summary-finished:{live.bot_id}") is not None:
+                live.finished = True
+        except (ConnectionError, OSError) as e:
+            print(f"Error renewing live summary of {live.bot_id}: {e}")
+
+    def _receive(self, live: LiveSummary, batch: Dict[str, Any]) -> None:
+        """Queue the utterances of a feed batch that were not received before"""
+        start = batch["start"]
+        fresh = batch["utterances"][max(live.received - start, 0):]
+        live.pending.extend(fresh)
+        live.pending_tokens += sum(count_tokens(u["text"]) for u in fresh)
+        live.received = max(live.received, start + len(batch["utterances"]))
+
+    async def _fold(self, live: LiveSummary) -> None:
+        """Update the summary with the pending utterances only"""
+        count = len(live.pending)
+        live.folded_at = self.clock()
+        try:
+            summary = await self.ai_processor.update_summary(
+                live.summary, format_utterances(live.pending[:count]), self.max_sentences
+            )
+        except Exception as e:
+            # Keep the utterances for the next attempt
+            live.error = str(e)
+            return
+        live.summary = summary
+        live.covered += count
+        del live.pending[:count]
+        live.pending_tokens = sum(count_tokens(u["text"]) for u in live.pending)
+        live.version += 1
+        live.updated_at = time.time()
+        live.error = None
+        self._notify(live)
+
+    async def close(self) -> None:
+        """Stop every summarizing task"""
+        tasks = [live.task for live in self._summaries.values() if live.running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
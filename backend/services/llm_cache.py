@@ -0,0 +1,174 @@
+"""
+LLM Response Cache for Meeting Agent
+Content-addressed cache for OpenAI completions with an optional disk tier
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Tuple
+
+from .shared_state import SharedState, get_shared_state
+from .tiered_cache import TieredCache
+
+
+def cache_key(**parts: Any) -> str:
+    """
+    Build a content-addressed cache key
+
+    Args:
+        **parts: Everything that determines the completion (model, prompts, params)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding of the parts
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """SQLite-backed cache tier that survives restarts"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at >= ?",
+                (key, now)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMCache(TieredCache[str]):
+    """In-memory LRU/TTL cache of completions with single-flight deduplication"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        shared: Optional[SharedState] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Most completions kept in memory
+            ttl: Seconds a completion stays valid
+            path: SQLite file for the persistent tier (memory only if None)
+            clock: Time source, overridable for tests
+            shared: Storage shared with the other worker processes, checked
+                after memory and before disk
+        """
+        super().__init__(_DiskTier(path) if path else None, shared)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, float]]"
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        """Build a cache from LLM_CACHE_SIZE, LLM_CACHE_TTL and LLM_CACHE_PATH"""
+        return cls(
+            max_entries=int(os.getenv('LLM_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('LLM_CACHE_TTL', '3600')),
+            path=os.getenv('LLM_CACHE_PATH') or None,
+            shared=get_shared_state()
+        )
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a completion in memory, then in shared state, then on disk
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            The cached completion, or None on a miss
+        """
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+
+        if self._shared is not None:
+            try:
+                found = await self._shared.get(f"llm:{key}")
+            except (ConnectionError, OSError) as e:
+                print(f"Error reading shared LLM cache: {e}")
+                found = None
+            if found is not None:
+                self._remember(key, found.decode("utf-8"), now + self.ttl)
+                self.shared_hits += 1
+                return found.decode("utf-8")
+
+        if self._disk is not None:
+            found = await asyncio.to_thread(self._disk.get, key, now)
+            if found is not None:
+                self._remember(key, *found)
+                self.disk_hits += 1
+                return found[0]
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """
+        Store a completion in memory, shared state and on disk
+
+        Args:
+            key: Cache key from cache_key()
+            value: Completion text
+        """
+        expires_at = self.clock() + self.ttl
+        self._remember(key, value, expires_at)
+        if self._shared is not None:
+            try:
+                await self._shared.set(f"llm:{key}", value, ttl=self.ttl)
+            except (ConnectionError, OSError) as e:
+                print(f"Error writing shared LLM cache: {e}")
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, value, expires_at)
+
+    def close(self) -> None:
+        """Close the disk tier"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
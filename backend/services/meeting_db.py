@@ -0,0 +1,433 @@
+"""
+Meeting Database for Meeting Agent
+Persists meetings, transcript segments and AI outputs in SQLite (WAL mode)
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    bot_id TEXT PRIMARY KEY,
+    meeting_url TEXT,
+    bot_name TEXT,
+    state TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_url ON meetings (meeting_url, created_at);
+CREATE TABLE IF NOT EXISTS segments (
+    bot_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    text TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    PRIMARY KEY (bot_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_segments_time ON segments (bot_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_segments_speaker ON segments (speaker, bot_id, start_time);
+CREATE TABLE IF NOT EXISTS analyses (
+    bot_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (bot_id, kind)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    bot_id TEXT NOT NULL,
+    speakers TEXT NOT NULL,
+    text TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    embedding BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    bot_id TEXT,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    progress REAL NOT NULL,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, created_at);
+"""
+
+_UPSERT_MEETING = (
+    "INSERT INTO meetings (bot_id, meeting_url, bot_name, state, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (bot_id) DO UPDATE SET "
+    "meeting_url = COALESCE(excluded.meeting_url, meetings.meeting_url), "
+    "bot_name = COALESCE(excluded.bot_name, meetings.bot_name), "
+    "state = COALESCE(excluded.state, meetings.state), "
+    "updated_at = excluded.updated_at"
+)
+
+_INSERT_SEGMENT = (
+    "INSERT OR REPLACE INTO segments (bot_id, seq, speaker, text, start_time, end_time) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _segment_row(bot_id: str, seq: int, utterance: Dict[str, Any]) -> Tuple:
+    return (
+        bot_id,
+        seq,
+        utterance.get("speaker") or "Unknown",
+        utterance.get("text") or "",
+        float(utterance.get("start_time") or 0.0),
+        float(utterance.get("end_time") or utterance.get("start_time") or 0.0)
+    )
+
+
+class MeetingDatabase:
+    """SQLite store of meetings, transcripts and analyses with batched background writes"""
+
+    def __init__(self, path: str, batch_size: int = 500):
+        """
+        Open (or create) the database
+
+        Args:
+            path: SQLite file path
+            batch_size: Most queued writes committed in one transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._finished = {
+            row[0] for row in self._conn.execute("SELECT bot_id FROM meetings WHERE finished_at IS NOT NULL")
+        }
+        self._writes: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["MeetingDatabase"]:
+        """Open the database at MEETING_DB_PATH (None if set to an empty value)"""
+        path = os.getenv('MEETING_DB_PATH', 'meetings.db')
+        return cls(path) if path else None
+
+    # Writes are queued and committed in batches by a background thread
+
+    def _enqueue(
+        self,
+        statements: List[Tuple[str, Iterable[Tuple]]],
+        committed: Optional[Callable[[], None]] = None
+    ) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="meeting-db-writer", daemon=True)
+            self._writer.start()
+        self._writes.put((statements, committed))
+
+    def _write_loop(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._writes.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            # None is the stop marker; commit what was queued before it
+            stop = None in batch
+            writes = [write for write in batch if write is not None]
+            try:
+                with self._lock, self._conn:
+                    for statements, _ in writes:
+                        for sql, rows in statements:
+                            self._conn.executemany(sql, rows)
+                for _, committed in writes:
+                    if committed is not None:
+                        committed()
+            except sqlite3.Error as e:
+                print(f"Error writing meeting data: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def save_meeting(
+        self,
+        bot_id: str,
+        meeting_url: Optional[str] = None,
+        bot_name: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> None:
+        """
+        Record a meeting, updating only the fields given
+
+        Args:
+            bot_id: ID of the bot in the meeting
+            meeting_url: URL of the meeting
+            bot_name: Display name of the bot
+            state: Lifecycle state of the bot
+        """
+        now = time.time()
+        self._enqueue([(_UPSERT_MEETING, [(bot_id, meeting_url, bot_name, state, now, now)])])
+
+    def add_segments(self, bot_id: str, utterances: List[Dict[str, Any]]) -> None:
+        """
+        Record transcript utterances as they arrive
+
+        Args:
+            bot_id: ID of the bot
+            utterances: Utterances with their `seq`
+        """
+        if utterances:
+            rows = [_segment_row(bot_id, utterance["seq"], utterance) for utterance in utterances]
+            self._enqueue([(_INSERT_SEGMENT, rows)])
+
+    def finish_meeting(self, bot_id: str, utterances: List[Dict[str, Any]]) -> None:
+        """
+        Store a meeting's final transcript and mark it finished
+
+        Replaces any segments recorded while the meeting was live; from
+        then on the transcript is served from this database.
+
+        Args:
+            bot_id: ID of the bot
+            utterances: Complete transcript ordered by start time
+        """
+        now = time.time()
+        self._enqueue([
+            (_UPSERT_MEETING, [(bot_id, None, None, None, now, now)]),
+            ("DELETE FROM segments WHERE bot_id = ?", [(bot_id,)]),
+            (_INSERT_SEGMENT, [_segment_row(bot_id, seq, u) for seq, u in enumerate(utterances)]),
+            ("UPDATE meetings SET finished_at = ? WHERE bot_id = ?", [(now, bot_id)])
+        ], committed=lambda: self._finished.add(bot_id))
+
+    def save_analysis(self, bot_id: str, kind: str, input_hash: str, content: Any) -> None:
+        """
+        Record an AI output for a meeting
+
+        Args:
+            bot_id: ID of the bot
+            kind: Output type (summary, key_points, action_items, analysis)
+            input_hash: Hash of the transcript and parameters it was produced from
+            content: JSON-serializable output
+        """
+        self._enqueue([(
+            "INSERT OR REPLACE INTO analyses (bot_id, kind, input_hash, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(bot_id, kind, input_hash, json.dumps(content), time.time())]
+        )])
+
+    def save_chunks(self, chunks: List[Dict[str, Any]], embeddings: List[bytes]) -> None:
+        """
+        Record embedded transcript chunks for semantic search
+
+        Args:
+            chunks: Chunks with bot_id, speakers, text, start_time and end_time
+            embeddings: Encoded embedding of each chunk
+        """
+        self._enqueue([(
+            "INSERT INTO chunks (bot_id, speakers, text, start_time, end_time, embedding) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (chunk["bot_id"], json.dumps(chunk["speakers"]), chunk["text"],
+                 chunk["start_time"], chunk["end_time"], embedding)
+                for chunk, embedding in zip(chunks, embeddings)
+            ]
+        )])
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """
+        Record a background job and its current state
+
+        Args:
+            job: Job dictionary (see job_queue.Job.to_record)
+        """
+        self._enqueue([(
+            "INSERT OR REPLACE INTO jobs (job_id, kind, bot_id, params, state, progress, stage, "
+            "result, error, attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(
+                job["job_id"], job["kind"], job["bot_id"], json.dumps(job["params"]), job["state"],
+                job["progress"], job["stage"], json.dumps(job["result"]), job["error"],
+                job["attempts"], job["created_at"], job["updated_at"]
+            )]
+        )])
+
+    def flush(self) -> None:
+        """Block until every queued write is committed"""
+        self._writes.join()
+
+    # Reads are synchronous; call them from async code with asyncio.to_thread
+
+    def is_finished(self, bot_id: str) -> bool:
+        """Whether a meeting's final transcript is stored (no I/O)"""
+        return bot_id in self._finished
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def meeting(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        """Get one meeting record"""
+        rows = self._query("SELECT * FROM meetings WHERE bot_id = ?", (bot_id,))
+        return rows[0] if rows else None
+
+    def meetings(
+        self,
+        meeting_url: Optional[str] = None,
+        finished: Optional[bool] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        List meetings, newest first
+
+        Args:
+            meeting_url: Only meetings at this URL
+            finished: Only finished (True) or unfinished (False) meetings
+            limit: Most meetings returned
+
+        Returns:
+            Meeting records
+        """
+        clauses, params = [], []
+        if meeting_url is not None:
+            clauses.append("meeting_url = ?")
+            params.append(meeting_url)
+        if finished is not None:
+            clauses.append("finished_at IS NOT NULL" if finished else "finished_at IS NULL")
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        return self._query(f"SELECT * FROM meetings {where}ORDER BY created_at DESC LIMIT ?", (*params, limit))
+
+    def segments(
+        self,
+        bot_id: str,
+        speaker: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query a meeting's transcript
+
+        Args:
+            bot_id: ID of the bot
+            speaker: Only utterances by this speaker
+            start: Only utterances starting at or after this offset (seconds)
+            end: Only utterances starting before this offset (seconds)
+
+        Returns:
+            Utterances with their seq, ordered by start time
+        """
+        clauses, params = ["bot_id = ?"], [bot_id]
+        if speaker is not None:
+            clauses.append("speaker = ?")
+            params.append(speaker)
+        if start is not None:
+            clauses.append("start_time >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("start_time < ?")
+            params.append(end)
+        return self._query(
+            "SELECT seq, speaker, text, start_time, end_time FROM segments "
+            f"WHERE {' AND '.join(clauses)} ORDER BY start_time, seq",
+            tuple(params)
+        )
+
+    def segment_page(self, after: Optional[Tuple[str, int]] = None, limit: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Page through every stored segment, in (bot_id, seq) order
+
+        Args:
+            after: (bot_id, seq) of the last segment of the previous page
+            limit: Most segments returned
+
+        Returns:
+            Segments with their bot_id and seq; an empty list after the last page
+        """
+        where, params = "", ()
+        if after is not None:
+            where, params = "WHERE (bot_id, seq) > (?, ?) ", tuple(after)
+        return self._query(
+            f"SELECT bot_id, seq, speaker, text, start_time, end_time FROM segments {where}"
+            "ORDER BY bot_id, seq LIMIT ?",
+            (*params, limit)
+        )
+
+    def chunk_page(self, after: int = 0, limit: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Page through every embedded chunk, oldest first
+
+        Args:
+            after: `rowid` of the last chunk of the previous page
+            limit: Most chunks returned
+
+        Returns:
+            Chunks with their rowid and encoded embedding; an empty list after the last page
+        """
+        rows = self._query(
+            "SELECT rowid, bot_id, speakers, text, start_time, end_time, embedding FROM chunks "
+            "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after, limit)
+        )
+        for row in rows:
+            row["speakers"] = json.loads(row["speakers"])
+        return rows
+
+    def analysis(self, bot_id: str, kind: str, input_hash: Optional[str] = None) -> Optional[Any]:
+        """
+        Get a stored AI output
+
+        Args:
+            bot_id: ID of the bot
+            kind: Output type
+            input_hash: Only return it if produced from this input
+
+        Returns:
+            The stored output, or None
+        """
+        rows = self._query(
+            "SELECT input_hash, content FROM analyses WHERE bot_id = ? AND kind = ?", (bot_id, kind)
+        )
+        if not rows or (input_hash is not None and rows[0]["input_hash"] != input_hash):
+            return None
+        return json.loads(rows[0]["content"])
+
+    def analyses(self, bot_id: str) -> Dict[str, Any]:
+        """Get every stored AI output of a meeting, by kind"""
+        rows = self._query("SELECT kind, content FROM analyses WHERE bot_id = ?", (bot_id,))
+        return {row["kind"]: json.loads(row["content"]) for row in rows}
+
+    def _job_rows(self, where: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        rows = self._query(f"SELECT * FROM jobs WHERE {where} ORDER BY created_at", params)
+        for row in rows:
+            row["params"] = json.loads(row["params"])
+            row["result"] = json.loads(row["result"]) if row["result"] is not None else None
+        return rows
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get one background job"""
+        rows = self._job_rows("job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Get the queued and running jobs, oldest first"""
+        return self._job_rows("state IN ('queued', 'running')")
+
+    def close(self) -> None:
+        """Commit queued writes and close the database"""
+        if self._writer is not None and self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,250 @@
+"""
+Metrics for Meeting Agent
+Fixed-bucket histograms and counters kept in a process-wide registry,
+exported in the Prometheus text format
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Tuple, List, Optional
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; the last bucket catches everything above
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Upper bounds for per-call token counts
+TOKEN_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() allocates nothing"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one measurement"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Bucket upper bound (infinity for the overflow bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class Counter:
+    """Monotonic counter; inc() allocates nothing and needs no lock under the GIL"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], le: str = "") -> str:
+    """Render a label set as `{name="value",...}` (empty without labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if le:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Named, labelled histograms and counters created on first use"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Counter] = {}
+
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: str) -> Histogram:
+        """
+        Get or create a histogram
+
+        Hot paths should keep the returned object rather than look it up
+        on every call.
+
+        Args:
+            name: Metric name
+            buckets: Bucket upper bounds, used when the series is created
+            **labels: Label values identifying the series
+
+        Returns:
+            The Histogram for that name and label set
+        """
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets)
+        return histogram
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """
+        Get or create a counter
+
+        As with histograms, hot paths should keep the returned object.
+
+        Args:
+            name: Metric name (ending in `_total` by convention)
+            **labels: Label values identifying the series
+
+        Returns:
+            The Counter for that name and label set
+        """
+        key = (name, tuple(sorted(labels.items())))
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = Counter()
+        return counter
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summaries of every histogram and counter, grouped by metric name"""
+        result: Dict[str, Any] = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            entry = dict(labels)
+            entry.update(histogram.snapshot())
+            result.setdefault(name, []).append(entry)
+        for (name, labels), counter in sorted(self._counters.items()):
+            entry = dict(labels)
+            entry["value"] = counter.value
+            result.setdefault(name, []).append(entry)
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        Every series in the Prometheus text exposition format
+
+        Histogram buckets are cumulative and end with `le="+Inf"`, as
+        Prometheus expects.
+
+        Returns:
+            Exposition text, ending with a newline
+        """
+        lines: List[str] = []
+        last = None
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            if name != last:
+                lines.append(f"# TYPE {name} histogram")
+                last = name
+            seen = 0
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                seen += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels, _number(bound))} {seen}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        for (name, labels), counter in sorted(self._counters.items()):
+            if name != last:
+                lines.append(f"# TYPE {name} counter")
+                last = name
+            lines.append(f"{name}{_labels(labels)} {_number(counter.value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording the latency, status and response size of every route
+
+    Routes are labelled by their path template (`/api/v1/transcript/{bot_id}`),
+    so series stay bounded; requests no route matched share "unmatched".
+    Streaming responses are timed until their last byte.
+    """
+
+    def __init__(self, app, profiler: Optional[Any] = None):
+        """
+        Args:
+            app: ASGI application to wrap
+            profiler: SamplingProfiler told when requests start and end, if any
+        """
+        self.app = app
+        self.profiler = profiler
+        self._series: Dict[Tuple[str, str], Tuple[Histogram, Counter]] = {}
+        self._responses: Dict[Tuple[str, str, int], Counter] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        size = 0
+
+        async def send_recorded(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.begin()
+        try:
+            await self.app(scope, receive, send_recorded)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self._record(scope["method"], route, status, elapsed, size)
+            if self.profiler is not None:
+                self.profiler.end(f"{scope['method']} {route}", started, elapsed)
+
+    def _record(self, method: str, route: str, status: int, elapsed: float, size: int) -> None:
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = (
+                registry.histogram("http_request_duration_seconds", method=method, route=route),
+                registry.counter("http_response_bytes_total", method=method, route=route)
+            )
+        series[0].observe(elapsed)
+        series[1].inc(size)
+        responses = self._responses.get((method, route, status))
+        if responses is None:
+            responses = self._responses[(method, route, status)] = registry.counter(
+                "http_responses_total", method=method, route=route, status=str(status)
+            )
+        responses.inc()
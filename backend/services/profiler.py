@@ -0,0 +1,162 @@
+"""
+Sampling Profiler for Meeting Agent
+Samples the event loop's stack while requests run and dumps the stacks of
+slow requests in the folded format flamegraph tools read
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from queue import SimpleQueue, Empty
+from typing import Optional, Dict, Tuple, List
+
+from .metrics import registry
+
+
+class SamplingProfiler:
+    """Background thread sampling the event loop thread's stack
+
+    Samples are only taken while at least one request is in flight and
+    are kept for `window` seconds. When a request ends slower than the
+    threshold, the samples taken during it are written to
+    `<directory>/<time>-<route>-<ms>ms.folded` - one `frame;frame;... count`
+    line per stack, ready for flamegraph.pl or speedscope. Requests share
+    the event loop, so the dump also holds whatever ran concurrently.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        directory: str = "profiles",
+        interval: float = 0.005,
+        window: float = 60.0
+    ):
+        """
+        Initialize the profiler
+
+        Args:
+            threshold: Requests taking at least this many seconds are dumped
+            directory: Where folded stack files are written
+            interval: Seconds between samples
+            window: Seconds of samples kept
+        """
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self.active = 0
+        self.written = registry.counter("profiles_written_total")
+        self._samples: deque = deque(maxlen=max(int(window / interval), 1))
+        self._labels: Dict[object, str] = {}
+        self._stacks: Dict[Tuple[object, ...], str] = {}
+        self._dumps: SimpleQueue = SimpleQueue()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["SamplingProfiler"]:
+        """Profiler configured by PROFILE_* env vars, or None when PROFILE_SLOW_REQUEST_SECONDS is unset"""
+        threshold = os.getenv('PROFILE_SLOW_REQUEST_SECONDS')
+        if not threshold:
+            return None
+        return cls(
+            float(threshold),
+            directory=os.getenv('PROFILE_DIR', 'profiles'),
+            interval=float(os.getenv('PROFILE_INTERVAL_MS', '5')) / 1000.0
+        )
+
+    def begin(self) -> None:
+        """Note a request started (called on the event loop thread)"""
+        if self._thread is None:
+            self._loop_thread = threading.get_ident()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        self.active += 1
+        self._wake.set()
+
+    def end(self, name: str, started: float, duration: float) -> None:
+        """
+        Note a request ended, dumping its samples if it was slow
+
+        Args:
+            name: Route the request was for
+            started: time.perf_counter() when it started
+            duration: Seconds it took
+        """
+        self.active -= 1
+        if duration >= self.threshold:
+            self._dumps.put((name, started, started + duration))
+            self._wake.set()
+
+    def stop(self) -> None:
+        """Stop sampling and write any pending dumps"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self._write_pending()
+            if self._stopped:
+                return
+            if not self.active:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), self._fold(frame)))
+            del frame
+            time.sleep(self.interval)
+
+    def _fold(self, frame) -> str:
+        """Render a stack root first as `frame;frame;...`, memoized per stack"""
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        key = tuple(codes)
+        stack = self._stacks.get(key)
+        if stack is None:
+            if len(self._stacks) > 10000:
+                self._stacks.clear()
+            stack = self._stacks[key] = ";".join(self._label(code) for code in reversed(codes))
+        return stack
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _write_pending(self) -> List[str]:
+        """Write every queued dump, returning the paths written"""
+        paths = []
+        while True:
+            try:
+                name, started, ended = self._dumps.get_nowait()
+            except Empty:
+                return paths
+            stacks = Counter(stack for at, stack in list(self._samples) if started <= at <= ended)
+            if not stacks:
+                continue
+            slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') or "request"
+            path = os.path.join(
+                self.directory,
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{int((ended - started) * 1000)}ms.folded"
+            )
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "w") as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+            except OSError as e:
+                print(f"Error writing profile: {e}")
+                continue
+            self.written.inc()
+            paths.append(path)
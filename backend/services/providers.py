@@ -0,0 +1,81 @@
+"""
+Service Providers for Meeting Agent
+Build services on first use rather than at import, so the API starts without
+the keys or SDKs of the services no request has needed yet
+"""
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ServiceUnavailable(RuntimeError):
+    """A service could not be built, e.g. because its API key is not set"""
+
+
+class Provider(Generic[T]):
+    """
+    Process-wide instance of a service, built the first time it is used
+
+    `provider.get()` (or calling the provider) returns the service. Public
+    attributes are forwarded to it, so code holding the provider can use it
+    as if it were the service itself.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        """
+        Initialize the provider
+
+        Args:
+            name: Service name used in error messages
+            factory: Builds the service; a ValueError means it is not configured
+        """
+        self._name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+
+    @property
+    def built(self) -> Optional[T]:
+        """The service if it has been built, without building it"""
+        return self._instance
+
+    def get(self) -> T:
+        """
+        Get the service, building it on first use
+
+        Raises:
+            ServiceUnavailable: If the factory rejected its configuration
+        """
+        if self._instance is None:
+            try:
+                self._instance = self._factory()
+            except ValueError as e:
+                raise ServiceUnavailable(f"{self._name} service unavailable: {e}") from e
+        return self._instance
+
+    __call__ = get
+
+    def override(self, instance: T) -> None:
+        """Use a pre-built service instead of the factory's"""
+        self._instance = instance
+
+    def reset(self) -> None:
+        """Drop the service; the next use builds a new one"""
+        self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names the provider itself does not have
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.get(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if name.startswith("_"):
+            object.__delattr__(self, name)
+        else:
+            delattr(self.get(), name)
@@ -0,0 +1,171 @@
+"""
+Response Encoding for Meeting Agent
+Content negotiation between JSON and msgpack bodies, and gzip/zstd compression
+"""
+import gzip
+import json
+from typing import Optional, Dict, Any, List, Sequence
+
+try:
+    import msgpack
+except ImportError:  # msgpack bodies are optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+TEXT = "text/plain; charset=utf-8"
+
+# Media types clients may ask for by another name
+_ALIASES = {"application/x-msgpack": MSGPACK, "text/plain": TEXT}
+
+# Smaller bodies are not worth compressing
+MIN_COMPRESSED_BYTES = 1024
+
+# Content-Encodings in order of preference when the client accepts several equally
+_ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
+
+
+def msgpack_available() -> bool:
+    """Whether msgpack bodies can be produced"""
+    return msgpack is not None
+
+
+def data_media_types() -> List[str]:
+    """Media types structured data can be sent as, the default first"""
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def _weights(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-style header into {value: q}"""
+    weights = {}
+    for part in (header or "").split(","):
+        value, _, params = part.strip().partition(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        weights[_ALIASES.get(value, value)] = q
+    return weights
+
+
+def choose_media_type(accept: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick the media type to respond with
+
+    Args:
+        accept: The request's Accept header
+        offered: Media types the route can produce, the default first
+
+    Returns:
+        The client's most preferred offered type (the default on ties or
+        without an Accept header), or None if it accepts none of them
+    """
+    if not accept:
+        return offered[0]
+    weights = _weights(accept)
+    best, best_q = None, 0.0
+    for media_type in offered:
+        base = media_type.split(";")[0]
+        q = weights.get(media_type, weights.get(base))
+        if q is None:
+            q = weights.get(f"{base.split('/')[0]}/*", weights.get("*/*", 0.0))
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the Content-Encoding to compress with
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+
+    Returns:
+        "zstd" or "gzip", or None to send the body uncompressed
+    """
+    weights = _weights(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in _ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class EncodedBody:
+    """A serialized and possibly compressed response body"""
+
+    __slots__ = ("body", "media_type", "encoding")
+
+    def __init__(self, body: bytes, media_type: str, encoding: Optional[str]):
+        self.body = body
+        self.media_type = media_type
+        self.encoding = encoding
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Headers describing the body"""
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if self.encoding is not None:
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+
+def serialize(content: Any, media_type: str) -> bytes:
+    """
+    Serialize content as JSON, msgpack or UTF-8 text
+
+    Args:
+        content: JSON-compatible data, or a str for text
+        media_type: JSON, MSGPACK or TEXT
+
+    Returns:
+        The body bytes
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb(content, use_bin_type=True)
+    if media_type == TEXT:
+        return content.encode("utf-8")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a body with gzip or zstd (unchanged if encoding is None)"""
+    if encoding == "zstd":
+        return _zstd_compressor.compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def encode(content: Any, media_type: str, encoding: Optional[str] = None) -> EncodedBody:
+    """
+    Serialize content and compress it if it is large enough to be worth it
+
+    Args:
+        content: Data to send
+        media_type: JSON, MSGPACK or TEXT
+        encoding: Content-Encoding the client accepts, if any
+
+    Returns:
+        EncodedBody ready to send
+    """
+    body = serialize(content, media_type)
+    if encoding is None or len(body) < MIN_COMPRESSED_BYTES:
+        return EncodedBody(body, media_type, None)
+    return EncodedBody(compress(body, encoding), media_type, encoding)
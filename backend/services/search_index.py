@@ -0,0 +1,623 @@
+"""
+Search Index for Meeting Agent
+Keyword (BM25) and semantic search over meeting transcripts, updated as utterances arrive
+"""
+import asyncio
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Tuple, Set, Callable, Awaitable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: keyword search falls back to pure Python
+    np = None
+
+_word = re.compile(r"\w+")
+_quoted = re.compile(r'"([^"]*)"')
+
+
+def semantic_search_available() -> bool:
+    """Whether NumPy, which the vector index needs, is installed"""
+    return np is not None
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _word.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Parse a search query
+
+    Quoted parts are phrases whose words must appear next to each other;
+    every word, quoted or not, contributes to the ranking.
+
+    Args:
+        query: Query text, e.g. `budget "next quarter"`
+
+    Returns:
+        Tuple of (distinct terms, phrases of two or more terms)
+    """
+    phrases = [words for words in map(tokenize, _quoted.findall(query)) if len(words) > 1]
+    return list(dict.fromkeys(tokenize(query))), phrases
+
+
+class _Postings:
+    """Documents containing one term, with term frequencies and positions
+
+    Documents are appended in increasing id order, so `docs` stays sorted
+    and can be searched with bisect. Positions of all documents share one
+    flat array; `offsets[i]` is where those of `docs[i]` start.
+    """
+
+    __slots__ = ("docs", "freqs", "offsets", "positions", "df")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.freqs = array("I")
+        self.offsets = array("I")
+        self.positions = array("I")
+        self.df = 0  # Live documents only
+
+    def find(self, doc: int) -> int:
+        """Index of a document in this list, or -1"""
+        i = bisect_left(self.docs, doc)
+        return i if i < len(self.docs) and self.docs[i] == doc else -1
+
+    def positions_at(self, i: int) -> array:
+        start = self.offsets[i]
+        return self.positions[start:start + self.freqs[i]]
+
+
+class SearchIndex:
+    """In-memory inverted index of transcript utterances with BM25 ranking"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._reset()
+        self._meeting_urls: Dict[str, Optional[str]] = {}
+
+    def _reset(self) -> None:
+        # One entry per utterance (document) in each column
+        self._bots: List[str] = []
+        self._bot_index: Dict[str, int] = {}
+        self._speakers: List[str] = []
+        self._speaker_index: Dict[str, int] = {}
+        self._doc_bot = array("I")
+        self._doc_speaker = array("I")
+        self._seqs = array("I")
+        self._texts: List[str] = []
+        self._starts = array("d")
+        self._ends = array("d")
+        self._lengths = array("I")
+        self._live = bytearray()
+        self._postings: Dict[str, _Postings] = {}
+        self._docs_by_bot: Dict[str, Dict[int, int]] = {}
+        self._live_count = 0
+        self._live_length = 0
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @staticmethod
+    def _intern(value: str, values: List[str], index: Dict[str, int]) -> int:
+        number = index.get(value)
+        if number is None:
+            number = index[value] = len(values)
+            values.append(value)
+        return number
+
+    def set_meeting_url(self, bot_id: str, meeting_url: Optional[str]) -> None:
+        """Record the meeting URL returned with a bot's results"""
+        if meeting_url:
+            self._meeting_urls[bot_id] = meeting_url
+
+    def add(
+        self,
+        bot_id: str,
+        seq: int,
+        speaker: str,
+        text: str,
+        start_time: float,
+        end_time: float
+    ) -> int:
+        """
+        Index one utterance, replacing any indexed under the same bot and seq
+
+        Args:
+            bot_id: ID of the bot
+            seq: Sequence number of the utterance in the bot's transcript
+            speaker: Speaker name
+            text: Utterance text
+            start_time: Start offset in seconds
+            end_time: End offset in seconds
+
+        Returns:
+            Internal document id
+        """
+        by_seq = self._docs_by_bot.setdefault(bot_id, {})
+        previous = by_seq.get(seq)
+        if previous is not None:
+            self._remove(previous)
+
+        doc = len(self._texts)
+        tokens = tokenize(text)
+        self._doc_bot.append(self._intern(bot_id, self._bots, self._bot_index))
+        self._doc_speaker.append(self._intern(speaker, self._speakers, self._speaker_index))
+        self._seqs.append(seq)
+        self._texts.append(text)
+        self._starts.append(start_time)
+        self._ends.append(end_time)
+        self._lengths.append(len(tokens))
+        self._live.append(1)
+        by_seq[seq] = doc
+        self._live_count += 1
+        self._live_length += len(tokens)
+
+        term_positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens):
+            term_positions.setdefault(token, []).append(position)
+        for term, positions in term_positions.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.docs.append(doc)
+            postings.freqs.append(len(positions))
+            postings.offsets.append(len(postings.positions))
+            postings.positions.extend(positions)
+            postings.df += 1
+        return doc
+
+    def add_utterance(self, bot_id: str, utterance: Dict[str, Any]) -> int:
+        """Index an utterance dictionary with seq, speaker, text, start_time and end_time"""
+        return self.add(
+            bot_id,
+            utterance["seq"],
+            utterance["speaker"],
+            utterance["text"],
+            utterance["start_time"],
+            utterance["end_time"]
+        )
+
+    def _remove(self, doc: int) -> None:
+        """Mark a document deleted; its postings are dropped at the next compaction"""
+        if not self._live[doc]:
+            return
+        self._live[doc] = 0
+        self._live_count -= 1
+        self._live_length -= self._lengths[doc]
+        for term in set(tokenize(self._texts[doc])):
+            postings = self._postings[term]
+            postings.df -= 1
+            if postings.df == 0:
+                del self._postings[term]
+
+    def remove_meeting(self, bot_id: str) -> None:
+        """Drop every utterance of a bot"""
+        for doc in self._docs_by_bot.pop(bot_id, {}).values():
+            self._remove(doc)
+        self._maybe_compact()
+
+    def replace_meeting(self, bot_id: str, utterances: List[Dict[str, Any]]) -> None:
+        """
+        Re-index a bot's whole transcript, e.g. once it is archived
+
+        Args:
+            bot_id: ID of the bot
+            utterances: Utterances with their seq
+        """
+        self.remove_meeting(bot_id)
+        for utterance in utterances:
+            self.add_utterance(bot_id, utterance)
+
+    def _maybe_compact(self) -> None:
+        """Rebuild the index once deleted documents outnumber live ones"""
+        dead = len(self._texts) - self._live_count
+        if dead < 1024 or dead < self._live_count:
+            return
+        live = [
+            (self._bots[self._doc_bot[doc]], self._seqs[doc], self._speakers[self._doc_speaker[doc]],
+             self._texts[doc], self._starts[doc], self._ends[doc])
+            for doc in range(len(self._texts)) if self._live[doc]
+        ]
+        self._reset()
+        for row in live:
+            self.add(*row)
+
+    def _phrase_docs(self, words: List[str]) -> Set[int]:
+        """Live documents containing the words consecutively"""
+        postings = [self._postings.get(word) for word in words]
+        if any(p is None for p in postings):
+            return set()
+        rarest = min(postings, key=lambda p: len(p.docs))
+        matches = set()
+        for doc in rarest.docs:
+            if not self._live[doc]:
+                continue
+            starts = None
+            for offset, p in enumerate(postings):
+                i = p.find(doc)
+                if i < 0:
+                    starts = None
+                    break
+                shifted = {position - offset for position in p.positions_at(i)}
+                starts = shifted if starts is None else starts & shifted
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def _phrase_docs_numpy(self, words: List[str]) -> Any:
+        """Documents containing the words consecutively, as a sorted array
+
+        Every occurrence becomes the key (doc << 32 | position - offset of
+        the word in the phrase); phrase matches are the keys all words share.
+        """
+        keys = None
+        for offset, word in enumerate(words):
+            postings = self._postings.get(word)
+            if postings is None:
+                return np.empty(0, dtype=np.int64)
+            docs = np.frombuffer(postings.docs, dtype=np.uintc).astype(np.int64)
+            positions = np.frombuffer(postings.positions, dtype=np.uintc).astype(np.int64) - offset
+            word_keys = np.repeat(docs << 32, np.frombuffer(postings.freqs, dtype=np.uintc)) | (positions & 0xFFFFFFFF)
+            word_keys = word_keys[positions >= 0]
+            if keys is None:
+                keys = word_keys
+            else:
+                # Both are sorted: probe the longer array for each key of the shorter
+                probe, keys = (keys, word_keys) if len(keys) <= len(word_keys) else (word_keys, keys)
+                found = np.minimum(np.searchsorted(keys, probe), len(keys) - 1)
+                keys = probe[keys[found] == probe] if len(keys) else keys
+            if not len(keys):
+                break
+        return np.unique(keys >> 32)
+
+    def _idf(self, postings: _Postings) -> float:
+        df = postings.df
+        return math.log(1.0 + (self._live_count - df + 0.5) / (df + 0.5))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        bot_id: Optional[str] = None,
+        speaker: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the utterances that best match a query
+
+        Args:
+            query: Words to look for; quoted parts must match as phrases
+            limit: Most results returned
+            bot_id: Only search this bot's transcript
+            speaker: Only search utterances by this speaker
+
+        Returns:
+            Matching utterances with bot_id, meeting_url, seq, speaker, text,
+            start_time, end_time and BM25 score, best first
+        """
+        terms, phrases = parse_query(query)
+        # Bare terms are ORed, so a term no utterance contains adds nothing;
+        # the words of a quoted phrase must all be found (see _phrase_docs)
+        postings = [p for p in (self._postings.get(term) for term in terms) if p is not None]
+        if not postings or limit <= 0:
+            return []
+
+        bot_number = speaker_number = None
+        if bot_id is not None:
+            bot_number = self._bot_index.get(bot_id)
+            if bot_number is None:
+                return []
+        if speaker is not None:
+            speaker_number = self._speaker_index.get(speaker)
+            if speaker_number is None:
+                return []
+
+        weights = [(p, self._idf(p)) for p in postings]
+        if np is None:
+            allowed: Optional[Set[int]] = None
+            for words in phrases:
+                matches = self._phrase_docs(words)
+                allowed = matches if allowed is None else allowed & matches
+                if not allowed:
+                    return []
+            ranked = self._rank_python(weights, allowed, bot_number, speaker_number, limit)
+        else:
+            phrase_docs = None
+            for words in phrases:
+                matches = self._phrase_docs_numpy(words)
+                phrase_docs = matches if phrase_docs is None else np.intersect1d(phrase_docs, matches)
+                if not len(phrase_docs):
+                    return []
+            ranked = self._rank_numpy(weights, phrase_docs, bot_number, speaker_number, limit)
+        return [self._result(doc, score) for doc, score in ranked]
+
+    def _rank_python(
+        self,
+        weights: List[Tuple[_Postings, float]],
+        allowed: Optional[Set[int]],
+        bot_number: Optional[int],
+        speaker_number: Optional[int],
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        k1, b = self.k1, self.b
+        avgdl = self._live_length / self._live_count or 1.0
+        lengths = self._lengths
+
+        def bm25(tf: int, doc: int) -> float:
+            return tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[doc] / avgdl))
+
+        scores: Dict[int, float] = {}
+        if allowed is not None:
+            # Phrase queries: only score the few documents that matched
+            for doc in allowed:
+                score = 0.0
+                for postings, idf in weights:
+                    i = postings.find(doc)
+                    if i >= 0:
+                        score += idf * bm25(postings.freqs[i], doc)
+                scores[doc] = score
+        else:
+            for postings, idf in weights:
+                for doc, tf in zip(postings.docs, postings.freqs):
+                    scores[doc] = scores.get(doc, 0.0) + idf * bm25(tf, doc)
+        candidates = (
+            (doc, score) for doc, score in scores.items()
+            if self._live[doc]
+            and (bot_number is None or self._doc_bot[doc] == bot_number)
+            and (speaker_number is None or self._doc_speaker[doc] == speaker_number)
+        )
+        return heapq.nsmallest(limit, candidates, key=lambda item: (-item[1], item[0]))
+
+    def _rank_numpy(
+        self,
+        weights: List[Tuple[_Postings, float]],
+        allowed: Any,
+        bot_number: Optional[int],
+        speaker_number: Optional[int],
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        # Views over the column arrays; they must not outlive this call, since
+        # an array cannot grow while a view of it exists
+        lengths = np.frombuffer(self._lengths, dtype=np.uintc)
+        live = np.frombuffer(self._live, dtype=np.uint8)
+        doc_bots = np.frombuffer(self._doc_bot, dtype=np.uintc)
+        doc_speakers = np.frombuffer(self._doc_speaker, dtype=np.uintc)
+        avgdl = self._live_length / self._live_count or 1.0
+
+        # Only the documents in the query terms' postings are touched
+        doc_parts, score_parts = [], []
+        for postings, idf in weights:
+            docs = np.frombuffer(postings.docs, dtype=np.uintc)
+            tf = np.frombuffer(postings.freqs, dtype=np.uintc)
+            keep = live[docs].astype(bool)
+            if bot_number is not None:
+                keep &= doc_bots[docs] == bot_number
+            if speaker_number is not None:
+                keep &= doc_speakers[docs] == speaker_number
+            if allowed is not None:
+                keep &= np.isin(docs, allowed, assume_unique=True)
+            docs = docs[keep]
+            tf = tf[keep].astype(np.float64)
+            doc_parts.append(docs)
+            score_parts.append(
+                idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * lengths[docs] / avgdl))
+            )
+        docs = np.concatenate(doc_parts)
+        scores = np.concatenate(score_parts)
+        if len(weights) > 1:
+            docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores, minlength=len(docs))
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        ranked = [(int(doc), float(score)) for doc, score in zip(docs, scores)]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+
+    def _result(self, doc: int, score: float) -> Dict[str, Any]:
+        bot_id = self._bots[self._doc_bot[doc]]
+        return {
+            "bot_id": bot_id,
+            "meeting_url": self._meeting_urls.get(bot_id),
+            "seq": self._seqs[doc],
+            "speaker": self._speakers[self._doc_speaker[doc]],
+            "text": self._texts[doc],
+            "start_time": self._starts[doc],
+            "end_time": self._ends[doc],
+            "score": round(score, 4)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Size of the index"""
+        return {
+            "documents": self._live_count,
+            "deleted": len(self._texts) - self._live_count,
+            "terms": len(self._postings),
+            "meetings": len(self._docs_by_bot),
+            "vectorized": np is not None
+        }
+
+
+class VectorIndex:
+    """Cosine similarity search over embeddings of transcript chunks (requires NumPy)
+
+    Consecutive utterances of a meeting are grouped into chunks of about
+    `chunk_words` words. Finished chunks are embedded in the background, in
+    batches, and appended to one normalized float32 matrix.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], Awaitable[List[List[float]]]],
+        embed_query: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        chunk_words: int = 120,
+        batch_size: int = 64,
+        on_embedded: Optional[Callable[[List[Dict[str, Any]], List[bytes]], None]] = None
+    ):
+        """
+        Initialize an empty index
+
+        Args:
+            embed: Coroutine function returning one embedding per text
+            embed_query: Coroutine function embedding a query (defaults to embed)
+            chunk_words: Approximate words per embedded chunk
+            batch_size: Most chunks embedded per request
+            on_embedded: Called with newly embedded chunks and their float32
+                embeddings as bytes, e.g. to persist them
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("Semantic search requires NumPy")
+        self.embed = embed
+        self.embed_query = embed_query
+        self.chunk_words = chunk_words
+        self.batch_size = batch_size
+        self.on_embedded = on_embedded
+        self._matrix = None
+        self._chunks: List[Dict[str, Any]] = []
+        self._bots: Dict[str, int] = {}
+        self._chunk_bots = array("I")
+        self._open: Dict[str, List[Dict[str, Any]]] = {}
+        self._open_words: Dict[str, int] = {}
+        self._queue: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def add(self, bot_id: str, utterance: Dict[str, Any]) -> None:
+        """
+        Add an utterance to its meeting's open chunk
+
+        Args:
+            bot_id: ID of the bot
+            utterance: Utterance with speaker, text, start_time and end_time
+        """
+        self._open.setdefault(bot_id, []).append(utterance)
+        words = self._open_words.get(bot_id, 0) + len(utterance["text"].split())
+        self._open_words[bot_id] = words
+        if words >= self.chunk_words:
+            self.flush(bot_id)
+
+    def flush(self, bot_id: str) -> None:
+        """Close a meeting's open chunk and queue it for embedding"""
+        utterances = self._open.pop(bot_id, None)
+        self._open_words.pop(bot_id, None)
+        if not utterances:
+            return
+        self._queue.append({
+            "bot_id": bot_id,
+            "speakers": list(dict.fromkeys(u["speaker"] for u in utterances)),
+            "text": "\n".join(f"{u['speaker']}: {u['text']}" for u in utterances),
+            "start_time": utterances[0]["start_time"],
+            "end_time": utterances[-1]["end_time"]
+        })
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._drain())
+
+    async def _drain(self) -> None:
+        while self._queue:
+            batch = self._queue[:self.batch_size]
+            del self._queue[:self.batch_size]
+            try:
+                vectors = await self.embed([chunk["text"] for chunk in batch])
+            except Exception as e:
+                print(f"Error embedding transcript chunks: {e}")
+                continue
+            vectors = self._append(batch, np.asarray(vectors, dtype=np.float32))
+            if self.on_embedded is not None:
+                self.on_embedded(batch, [vector.tobytes() for vector in vectors])
+
+    def restore(self, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Add chunks embedded earlier, e.g. loaded from the database
+
+        Args:
+            chunks: Chunks with bot_id, speakers, text, start_time, end_time
+                and `embedding` (float32 bytes, as passed to on_embedded)
+        """
+        if chunks:
+            vectors = np.stack([np.frombuffer(chunk["embedding"], dtype=np.float32) for chunk in chunks])
+            self._append([
+                {key: chunk[key] for key in ("bot_id", "speakers", "text", "start_time", "end_time")}
+                for chunk in chunks
+            ], vectors)
+
+    def _append(self, chunks: List[Dict[str, Any]], vectors: Any) -> Any:
+        """Add embedded chunks, returning their normalized vectors"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        count = len(self._chunks)
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(chunks), 64), vectors.shape[1]), dtype=np.float32)
+        elif count + len(chunks) > len(self._matrix):
+            # Grow geometrically so appends stay amortized O(1)
+            grown = np.empty((max(2 * len(self._matrix), count + len(chunks)), self._matrix.shape[1]), dtype=np.float32)
+            grown[:count] = self._matrix[:count]
+            self._matrix = grown
+        self._matrix[count:count + len(chunks)] = vectors
+        self._chunks.extend(chunks)
+        self._chunk_bots.extend(self._bots.setdefault(chunk["bot_id"], len(self._bots)) for chunk in chunks)
+        return vectors
+
+    async def wait(self) -> None:
+        """Wait until every queued chunk is embedded"""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def search(self, query: str, limit: int = 10, bot_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the chunks closest in meaning to a query
+
+        Args:
+            query: Natural language query
+            limit: Most results returned
+            bot_id: Only search this bot's chunks
+
+        Returns:
+            Chunks with bot_id, speakers, text, start_time, end_time and
+            cosine score, best first
+        """
+        if not self._chunks or limit <= 0 or not query.strip() or (bot_id is not None and bot_id not in self._bots):
+            return []
+        if self.embed_query is not None:
+            vector = await self.embed_query(query)
+        else:
+            vector = (await self.embed([query]))[0]
+        vector = np.asarray(vector, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        count = len(self._chunks)
+        scores = self._matrix[:count] @ vector
+        if bot_id is not None:
+            candidates = np.flatnonzero(np.frombuffer(self._chunk_bots, dtype=np.uintc, count=count) == self._bots[bot_id])
+        else:
+            candidates = np.arange(count)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = sorted(candidates.tolist(), key=lambda i: (-scores[i], i))
+        return [dict(self._chunks[i], score=round(float(scores[i]), 4)) for i in ranked]
+
+    async def close(self) -> None:
+        """Stop embedding queued chunks"""
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,439 @@
+"""
+Session Manager for Meeting Agent
+Tracks every active bot's lifecycle and keeps its Recall.ai status fresh
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable
+
+from .shared_state import SharedState
+from .transcription import TranscriptionService
+
+JOINING = "joining"
+IN_CALL = "in_call"
+RECORDING = "recording"
+DONE = "done"
+
+# Recall.ai status codes (and the plain statuses of older responses) per state
+_STATE_BY_CODE = {
+    "ready": JOINING,
+    "joining": JOINING,
+    "joining_call": JOINING,
+    "in_waiting_room": JOINING,
+    "in_call": IN_CALL,
+    "in_meeting": IN_CALL,
+    "in_call_not_recording": IN_CALL,
+    "recording_permission_allowed": IN_CALL,
+    "recording_permission_denied": IN_CALL,
+    "recording": RECORDING,
+    "in_call_recording": RECORDING,
+    "call_ended": DONE,
+    "done": DONE,
+    "fatal": DONE,
+    "analysis_done": DONE,
+    "analysis_failed": DONE,
+    "media_expired": DONE,
+}
+
+# Allowed transitions; recording may pause back to in_call
+_TRANSITIONS = {
+    JOINING: {IN_CALL, RECORDING, DONE},
+    IN_CALL: {RECORDING, DONE},
+    RECORDING: {IN_CALL, DONE},
+    DONE: set(),
+}
+
+
+def status_code(bot: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the latest status code from a Recall.ai bot payload
+
+    Args:
+        bot: Bot object as returned by Recall.ai
+
+    Returns:
+        Latest status code, or None if the payload has none
+    """
+    changes = bot.get("status_changes")
+    if changes:
+        return changes[-1].get("code")
+    status = bot.get("status")
+    if isinstance(status, dict):
+        return status.get("code")
+    return status
+
+
+class BotSession:
+    """Lifecycle and cached status of one bot"""
+
+    __slots__ = (
+        "bot_id", "meeting_url", "bot_name", "state", "status", "joined_at",
+        "updated_at", "checked_at", "error", "interval", "next_check"
+    )
+
+    def __init__(self, bot_id: str, meeting_url: Optional[str], bot_name: Optional[str], now: float):
+        self.bot_id = bot_id
+        self.meeting_url = meeting_url
+        self.bot_name = bot_name
+        self.state = JOINING
+        self.status: Optional[str] = None
+        self.joined_at = time.time()
+        self.updated_at = self.joined_at
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.interval = 0.0
+        self.next_check = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.bot_id,
+            "state": self.state,
+            "status": self.status,
+            "meeting_url": self.meeting_url,
+            "bot_name": self.bot_name,
+            "joined_at": self.joined_at,
+            "updated_at": self.updated_at,
+            "checked_at": self.checked_at,
+            "error": self.error
+        }
+
+
+class SessionManager:
+    """In-memory registry of bots with batched, adaptive status polling
+
+    With several worker processes sharing state, each bot is tracked and
+    polled by the one worker that claimed it; every worker publishes its
+    sessions so the others can answer for them.
+    """
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        done_retention: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[SharedState] = None
+    ):
+        """
+        Initialize the session manager
+
+        Args:
+            service: Transcription service used to talk to Recall.ai
+            min_interval: Seconds between checks of a bot whose status just changed (defaults to env var)
+            max_interval: Longest interval an idle bot backs off to (defaults to env var)
+            batch_size: Most status requests sent concurrently per sweep (defaults to env var)
+            done_retention: Seconds finished bots stay listed
+            clock: Monotonic time source, overridable for tests
+            shared: Storage shared with the other worker processes
+        """
+        self.service = service
+        self.min_interval = min_interval if min_interval is not None else float(
+            os.getenv('SESSION_POLL_MIN_INTERVAL', '2')
+        )
+        self.max_interval = max_interval if max_interval is not None else float(
+            os.getenv('SESSION_POLL_MAX_INTERVAL', '30')
+        )
+        self.batch_size = batch_size or int(os.getenv('SESSION_POLL_BATCH', '20'))
+        self.done_retention = done_retention
+        self.clock = clock
+        self._sessions: "OrderedDict[str, BotSession]" = OrderedDict()
+        self._listeners: List[Callable[[str, str, str], None]] = []
+        self._wakeup = asyncio.Event()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.shared = shared
+        self._origin = uuid.uuid4().hex
+        # Claims and published sessions outlive a few idle polls, then expire with their worker
+        self._claim_ttl = max(self.max_interval * 4, 60.0)
+        self._publishing: Optional[asyncio.Future] = None
+
+    def add_listener(self, listener: Callable[[str, str, str], None]) -> None:
+        """Call listener(bot_id, old_state, new_state) on every state change"""
+        self._listeners.append(listener)
+
+    def get(self, bot_id: str) -> Optional[BotSession]:
+        return self._sessions.get(bot_id)
+
+    def sessions(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List tracked bots
+
+        Args:
+            state: Only bots in this state
+
+        Returns:
+            Session dictionaries, oldest first
+        """
+        return [
+            session.to_dict() for session in self._sessions.values()
+            if state is None or session.state == state
+        ]
+
+    async def all_sessions(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List the bots tracked by every worker
+
+        Args:
+            state: Only bots in this state
+
+        Returns:
+            Session dictionaries, oldest first
+        """
+        sessions = self.sessions(state)
+        if self.shared is not None:
+            tracked = {session["id"] for session in sessions}
+            sessions += [
+                session for session in await self._shared_sessions()
+                if session["id"] not in tracked and (state is None or session["state"] == state)
+            ]
+            sessions.sort(key=lambda session: session["joined_at"])
+        return sessions
+
+    async def _shared_sessions(self) -> List[Dict[str, Any]]:
+        """Sessions published by the other workers"""
+        try:
+            origins = {origin.decode() for origin in await self.shared.range("session-workers")}
+            origins.discard(self._origin)
+            published = await asyncio.gather(*(self.shared.get(f"sessions:{origin}") for origin in origins))
+        except (ConnectionError, OSError) as e:
+            print(f"Error reading shared sessions: {e}")
+            return []
+        return [session for raw in published if raw for session in json.loads(raw)]
+
+    async def _shared_session(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        """A bot's session as published by the worker tracking it"""
+        for session in await self._shared_sessions():
+            if session["id"] == bot_id:
+                return session
+        return None
+
+    async def _claim(self, bot_id: str, ttl: Optional[float] = None, force: bool = False) -> bool:
+        """
+        Claim (or with force, renew) the tracking of a bot for this worker
+
+        Returns:
+            Whether this worker tracks the bot; always True without shared state
+        """
+        if self.shared is None:
+            return True
+        key = f"session-owner:{bot_id}"
+        ttl = ttl or self._claim_ttl
+        try:
+            if await self.shared.set(key, self._origin, ttl=ttl, only_new=not force):
+                return True
+            return await self.shared.get(key) == self._origin.encode()
+        except (ConnectionError, OSError) as e:
+            print(f"Error claiming bot {bot_id}: {e}")
+            return True
+
+    def _publish(self) -> None:
+        """Publish this worker's sessions once the current changes are done"""
+        if self.shared is not None and self._publishing is None:
+            self._publishing = asyncio.ensure_future(self._publish_now())
+
+    async def _publish_now(self) -> None:
+        await asyncio.sleep(0)
+        self._publishing = None
+        try:
+            await self.shared.set(f"sessions:{self._origin}", json.dumps(self.sessions()), ttl=self._claim_ttl)
+            await self.shared.touch("session-workers", self.done_retention)
+        except (ConnectionError, OSError) as e:
+            print(f"Error publishing sessions: {e}")
+
+    def track(self, bot_id: str, meeting_url: Optional[str] = None, bot_name: Optional[str] = None) -> BotSession:
+        """
+        Start tracking a bot (no-op if already tracked)
+
+        Args:
+            bot_id: ID of the bot
+            meeting_url: Meeting the bot joined
+            bot_name: Display name of the bot
+
+        Returns:
+            The bot's session
+        """
+        session = self._sessions.get(bot_id)
+        if session is None:
+            session = BotSession(bot_id, meeting_url, bot_name, self.clock())
+            self._sessions[bot_id] = session
+            self._wakeup.set()
+            self._publish()
+        return session
+
+    async def join(self, meeting_url: str, bot_name: str = "Meeting Agent") -> Dict[str, Any]:
+        """
+        Join a meeting and start tracking the new bot
+
+        Args:
+            meeting_url: URL of the meeting to join
+            bot_name: Display name for the bot
+
+        Returns:
+            Bot information from Recall.ai
+        """
+        bot = await self.service.join_meeting(meeting_url, bot_name)
+        await self._claim(bot["id"])
+        session = self.track(bot["id"], meeting_url, bot_name)
+        self._apply(session, bot)
+        return bot
+
+    async def status(self, bot_id: str) -> Dict[str, Any]:
+        """
+        Get a bot's cached status
+
+        Bots that are not tracked yet are fetched once and tracked from then
+        on, unless another worker already tracks them.
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            Session dictionary
+        """
+        session = self._sessions.get(bot_id)
+        if session is None:
+            if self.shared is not None:
+                shared = await self._shared_session(bot_id)
+                if shared is not None:
+                    return shared
+            bot = await self.service.get_bot_status(bot_id)
+            if not await self._claim(bot_id):
+                # Another worker started tracking it meanwhile; describe it without tracking
+                session = BotSession(bot_id, bot.get("meeting_url"), bot.get("bot_name"), self.clock())
+                session.status = status_code(bot)
+                session.state = _STATE_BY_CODE.get(session.status, JOINING)
+                return session.to_dict()
+            session = self.track(bot_id, bot.get("meeting_url"), bot.get("bot_name"))
+            self._apply(session, bot)
+        return session.to_dict()
+
+    async def leave(self, bot_id: str) -> Dict[str, Any]:
+        """
+        Make a bot leave its meeting and mark it done
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            Response data from Recall.ai
+        """
+        result = await self.service.leave_meeting(bot_id)
+        if bot_id not in self._sessions and not await self._claim(bot_id):
+            return result  # The worker tracking the bot sees it end on its next check
+        session = self.track(bot_id)
+        self._transition(session, DONE, "call_ended")
+        return result
+
+    def _apply(self, session: BotSession, bot: Dict[str, Any]) -> bool:
+        """Update a session from a bot payload, returning whether anything changed"""
+        session.checked_at = time.time()
+        session.error = None
+        code = status_code(bot)
+        state = _STATE_BY_CODE.get(code, session.state) if code else session.state
+        if code == session.status and state == session.state:
+            return False
+        return self._transition(session, state, code)
+
+    def _transition(self, session: BotSession, state: str, code: Optional[str]) -> bool:
+        old = session.state
+        if state != old and state not in _TRANSITIONS[old]:
+            return False  # Stale or out-of-order status
+        changed = state != old or code != session.status
+        session.status = code
+        session.state = state
+        if changed:
+            session.updated_at = time.time()
+            self._publish()
+        if state != old:
+            for listener in self._listeners:
+                listener(session.bot_id, old, state)
+        return changed
+
+    async def _check(self, session: BotSession) -> None:
+        try:
+            changed = self._apply(session, await self.service.get_bot_status(session.bot_id))
+        except Exception as e:
+            session.error = str(e)
+            changed = False
+        # Keep the claim alive while the bot is polled; a finished bot's lasts as long as its session
+        await self._claim(
+            session.bot_id,
+            ttl=self.done_retention if session.state == DONE else None,
+            force=True
+        )
+        # Poll changing bots quickly and back off while nothing happens
+        if changed:
+            session.interval = self.min_interval
+        else:
+            session.interval = min(max(session.interval * 2, self.min_interval), self.max_interval)
+        session.next_check = self.clock() + session.interval
+
+    async def sweep(self) -> int:
+        """
+        Check every bot that is due, in concurrent batches
+
+        Returns:
+            Number of bots checked
+        """
+        now = self.clock()
+        due = [
+            session for session in self._sessions.values()
+            if session.state != DONE and session.next_check <= now
+        ]
+        for start in range(0, len(due), self.batch_size):
+            await asyncio.gather(*(self._check(session) for session in due[start:start + self.batch_size]))
+        self._forget_finished()
+        return len(due)
+
+    def _forget_finished(self) -> None:
+        cutoff = time.time() - self.done_retention
+        for bot_id in [
+            bot_id for bot_id, session in self._sessions.items()
+            if session.state == DONE and session.updated_at < cutoff
+        ]:
+            del self._sessions[bot_id]
+
+    def _next_delay(self) -> float:
+        pending = [session.next_check for session in self._sessions.values() if session.state != DONE]
+        if not pending:
+            return self.max_interval
+        return min(max(min(pending) - self.clock(), 0.0), self.max_interval)
+
+    def start(self) -> None:
+        """Start the background sweeper on the running event loop"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        if self.shared is not None:
+            try:
+                await self.shared.push("session-workers", self._origin, ttl=self.done_retention)
+            except (ConnectionError, OSError) as e:
+                print(f"Error registering with shared state: {e}")
+        while True:
+            self._wakeup.clear()
+            await self.sweep()
+            # Refresh the published sessions before they expire
+            self._publish()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if self._publishing is not None:
+            self._publishing.cancel()
+            self._publishing = None
@@ -0,0 +1,564 @@
+"""
+Shared State for Meeting Agent
+Key/value and list storage shared by every worker process, so that bot
+sessions, live transcripts and caches survive requests landing on
+different workers
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, List, Union
+from urllib.parse import urlparse, unquote
+
+Value = Union[str, bytes]
+
+
+class SharedStateError(Exception):
+    """Error reply from a shared state server"""
+
+
+def _bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class SharedState(ABC):
+    """Storage shared between worker processes
+
+    Values are stored as bytes (str values are UTF-8 encoded). Every key
+    can expire; `ttl` is in seconds. Implementations: LocalState (one
+    process) and RespState (the built-in StateServer or any server
+    speaking the Redis protocol).
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Value of a key, or None if it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None, only_new: bool = False) -> bool:
+        """
+        Store a value
+
+        Args:
+            key: Key to store under
+            value: Value to store
+            ttl: Seconds until the key expires (never if None)
+            only_new: Leave an existing key alone
+
+        Returns:
+            Whether the value was stored (False when only_new found the key)
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key"""
+
+    @abstractmethod
+    async def push(self, key: str, value: Value, ttl: Optional[float] = None) -> int:
+        """
+        Append a value to the list at a key
+
+        Args:
+            key: Key of the list
+            value: Value to append
+            ttl: Seconds until the whole list expires, renewed by each push
+
+        Returns:
+            Length of the list after the push
+        """
+
+    @abstractmethod
+    async def range(self, key: str, start: int = 0) -> List[bytes]:
+        """Values of the list at a key from index `start` to the end"""
+
+    @abstractmethod
+    async def touch(self, key: str, ttl: float) -> bool:
+        """Make a key expire `ttl` seconds from now, returning whether it exists"""
+
+    async def close(self) -> None:
+        """Release any connection"""
+
+
+# Key prefixes of cache entries (see llm_cache and audio_cache), the only
+# keys a full LocalState evicts
+CACHE_PREFIXES = ("llm:", "audio:")
+
+
+class LocalState(SharedState):
+    """In-process storage, for a single worker and for tests
+
+    When full, only cache entries (keys under CACHE_PREFIXES) are evicted,
+    least recently written first. Every other key holds state the workers
+    rely on, such as transcripts, claims and dedup markers, and is dropped
+    only when its ttl runs out.
+    """
+
+    def __init__(self, max_keys: int = 100000, max_bytes: int = 256 * 1024 * 1024, clock=time.monotonic):
+        """
+        Initialize the store
+
+        Args:
+            max_keys: Most cache entries kept
+            max_bytes: Most bytes of cache entries kept
+            clock: Monotonic time source, overridable for tests
+        """
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        # Size of each cache entry, least recently written first
+        self._cached: "OrderedDict[str, int]" = OrderedDict()
+        self._cached_bytes = 0
+
+    def _live(self, key: str) -> Any:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= self.clock():
+            self._drop(key)
+        return self._data.get(key)
+
+    def _drop(self, key: str) -> None:
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+        self._cached_bytes -= self._cached.pop(key, 0)
+
+    def _store(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        if isinstance(value, bytes) and key.startswith(CACHE_PREFIXES):
+            self._cached_bytes += len(value) - self._cached.pop(key, 0)
+            self._cached[key] = len(value)
+            while self._cached and (len(self._cached) > self.max_keys or self._cached_bytes > self.max_bytes):
+                self._drop(next(iter(self._cached)))
+
+    def exists(self, key: str) -> bool:
+        """Whether a key holds a live value"""
+        return self._live(key) is not None
+
+    def expire(self, key: str, ttl: Optional[float]) -> bool:
+        """Set (or with None, remove) a key's expiry, returning whether the key exists"""
+        if self._live(key) is None:
+            return False
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = self.clock() + ttl
+        return True
+
+    def sweep(self) -> int:
+        """Drop every expired key, returning how many"""
+        now = self.clock()
+        expired = [key for key, expires in self._expires.items() if expires <= now]
+        for key in expired:
+            self._drop(key)
+        return len(expired)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._live(key)
+        return value if isinstance(value, bytes) else None
+
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None, only_new: bool = False) -> bool:
+        if only_new and self._live(key) is not None:
+            return False
+        self._store(key, _bytes(value))
+        self.expire(key, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._drop(key)
+
+    async def push(self, key: str, value: Value, ttl: Optional[float] = None) -> int:
+        values = self._live(key)
+        if not isinstance(values, list):
+            values = []
+        values.append(_bytes(value))
+        self._store(key, values)
+        if ttl is not None:
+            self.expire(key, ttl)
+        return len(values)
+
+    async def range(self, key: str, start: int = 0) -> List[bytes]:
+        values = self._live(key)
+        return values[start:] if isinstance(values, list) else []
+
+    async def touch(self, key: str, ttl: float) -> bool:
+        return self.expire(key, ttl)
+
+
+def _encode_command(*args: Any) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        arg = _bytes(arg)
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Read one RESP value
+
+    Error replies are returned as SharedStateError instances rather than
+    raised, so one failed command does not break a pipeline.
+
+    Raises:
+        ConnectionError: If the connection closed
+    """
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Shared state connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return SharedStateError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        return (await reader.readexactly(size + 2))[:-2]
+    if kind == b"*":
+        size = int(rest)
+        if size < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(size)]
+    raise ConnectionError(f"Malformed shared state reply: {line[:40]!r}")
+
+
+class RespState(SharedState):
+    """Client for a server speaking the Redis protocol (RESP)
+
+    Works against the built-in StateServer and against Redis itself or any
+    compatible store. Commands from all callers are pipelined over one
+    connection, which is opened on first use and again after a failure.
+    """
+
+    def __init__(self, url: str):
+        """
+        Initialize the client
+
+        Args:
+            url: unix:///path/to.sock, or redis://[:password@]host[:port][/db]
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("unix", "redis"):
+            raise ValueError(f"Unsupported shared state URL: {url}")
+        self.url = url
+        self._parsed = parsed
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._replies: Optional[asyncio.Task] = None
+        self._waiting: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connecting: Optional[asyncio.Lock] = None
+
+    async def _connect(self) -> None:
+        parsed = self._parsed
+        if parsed.scheme == "unix":
+            self._reader, self._writer = await asyncio.open_unix_connection(unquote(parsed.path))
+        else:
+            self._reader, self._writer = await asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379)
+        self._replies = asyncio.ensure_future(self._read_replies(self._reader))
+        setup = []
+        if parsed.password:
+            setup.append(("AUTH", unquote(parsed.password)))
+        if parsed.path.strip("/") and parsed.scheme == "redis":
+            setup.append(("SELECT", parsed.path.strip("/")))
+        for reply in await self._send(setup):
+            if isinstance(reply, SharedStateError):
+                raise reply
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        """Resolve waiting commands in order as their replies arrive"""
+        try:
+            while True:
+                reply = await _read_reply(reader)
+                future = self._waiting.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError) as e:
+            self._disconnect(ConnectionError(f"Shared state connection lost: {e}"))
+
+    def _disconnect(self, error: Exception) -> None:
+        waiting, self._waiting = self._waiting, deque()
+        for future in waiting:
+            if not future.done():
+                future.set_exception(error)
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _send(self, commands: List[tuple]) -> List[Any]:
+        """Write commands in one go and wait for all of their replies"""
+        loop = asyncio.get_running_loop()
+        if self._writer is None:
+            raise ConnectionError(f"Shared state connection to {self.url} lost")
+        futures = [loop.create_future() for _ in commands]
+        self._waiting.extend(futures)
+        self._writer.write(b"".join(_encode_command(*command) for command in commands))
+        return [await future for future in futures]
+
+    async def execute(self, *commands: tuple) -> List[Any]:
+        """
+        Run commands as one pipeline
+
+        Args:
+            *commands: Command tuples, e.g. ("GET", "key")
+
+        Returns:
+            One reply per command
+
+        Raises:
+            SharedStateError: If any command failed
+            ConnectionError: If the server cannot be reached
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop cannot use the old one's connection
+            self._loop, self._connecting = loop, asyncio.Lock()
+            self._reader = self._writer = None
+            self._waiting = deque()
+        if self._writer is None:
+            async with self._connecting:
+                if self._writer is None:
+                    try:
+                        await self._connect()
+                    except (OSError, SharedStateError) as e:
+                        self._disconnect(ConnectionError(str(e)))
+                        raise ConnectionError(f"Cannot reach shared state at {self.url}: {e}") from e
+        replies = await self._send(list(commands))
+        for reply in replies:
+            if isinstance(reply, SharedStateError):
+                raise reply
+        return replies
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.execute(("GET", key)))[0]
+
+    async def set(self, key: str, value: Value, ttl: Optional[float] = None, only_new: bool = False) -> bool:
+        command = ["SET", key, _bytes(value)]
+        if ttl is not None:
+            command += ["PX", max(int(ttl * 1000), 1)]
+        if only_new:
+            command.append("NX")
+        return (await self.execute(tuple(command)))[0] == "OK"
+
+    async def delete(self, key: str) -> None:
+        await self.execute(("DEL", key))
+
+    async def push(self, key: str, value: Value, ttl: Optional[float] = None) -> int:
+        commands = [("RPUSH", key, _bytes(value))]
+        if ttl is not None:
+            commands.append(("PEXPIRE", key, max(int(ttl * 1000), 1)))
+        return (await self.execute(*commands))[0]
+
+    async def range(self, key: str, start: int = 0) -> List[bytes]:
+        return (await self.execute(("LRANGE", key, start, -1)))[0]
+
+    async def touch(self, key: str, ttl: float) -> bool:
+        return (await self.execute(("PEXPIRE", key, max(int(ttl * 1000), 1))))[0] == 1
+
+    async def close(self) -> None:
+        replies = self._replies
+        if self._writer is not None:
+            self._disconnect(ConnectionError("Shared state client closed"))
+        if replies is not None and not replies.done() and replies.get_loop() is asyncio.get_running_loop():
+            replies.cancel()
+        self._replies = None
+
+
+class StateServer:
+    """Minimal Redis-protocol server backed by a LocalState
+
+    Runs on its own thread in the process that supervises the workers,
+    listening on a Unix socket (or a loopback TCP port where Unix sockets
+    are unavailable). It implements just the commands RespState sends.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_keys: int = 100000,
+        max_bytes: int = 256 * 1024 * 1024,
+        sweep_interval: float = 5.0
+    ):
+        """
+        Initialize the server
+
+        Args:
+            path: Unix socket path (a loopback TCP port if None)
+            max_keys: Most cache entries kept
+            max_bytes: Most bytes of cache entries kept
+            sweep_interval: Seconds between sweeps of expired keys
+        """
+        self.path = path
+        self.port: Optional[int] = None
+        self.state = LocalState(max_keys=max_keys, max_bytes=max_bytes)
+        self.sweep_interval = sweep_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def url(self) -> str:
+        """URL RespState clients connect to"""
+        if self.path is not None:
+            return f"unix://{self.path}"
+        return f"redis://127.0.0.1:{self.port}"
+
+    def start(self) -> "StateServer":
+        """Start serving on a background thread, returning once it listens"""
+        self._thread = threading.Thread(target=self._run, name="state-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket file"""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._thread = None
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _run(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            if self.path is not None:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                server = loop.run_until_complete(asyncio.start_unix_server(self._serve, self.path))
+            else:
+                server = loop.run_until_complete(asyncio.start_server(self._serve, "127.0.0.1", 0))
+                self.port = server.sockets[0].getsockname()[1]
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        sweeper = loop.create_task(self._sweep())
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            sweeper.cancel()
+            server.close()
+            loop.run_until_complete(asyncio.gather(sweeper, return_exceptions=True))
+            loop.close()
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.state.sweep()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command = await _read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR expected a command array\r\n")
+                    continue
+                writer.write(await self._execute(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _execute(self, command: List[bytes]) -> bytes:
+        name = command[0].decode().upper()
+        args = command[1:]
+        state = self.state
+        try:
+            if name == "PING":
+                return b"+PONG\r\n"
+            if name in ("SELECT", "AUTH"):
+                return b"+OK\r\n"
+            if name == "GET":
+                return _bulk(await state.get(args[0].decode()))
+            if name == "SET":
+                key, value, options = args[0].decode(), args[1], [arg.decode().upper() for arg in args[2:]]
+                ttl = None
+                if "EX" in options:
+                    ttl = float(options[options.index("EX") + 1])
+                elif "PX" in options:
+                    ttl = float(options[options.index("PX") + 1]) / 1000.0
+                stored = await state.set(key, value, ttl=ttl, only_new="NX" in options)
+                return b"+OK\r\n" if stored else b"$-1\r\n"
+            if name == "DEL":
+                found = 0
+                for key in args:
+                    found += state.exists(key.decode())
+                    await state.delete(key.decode())
+                return b":%d\r\n" % found
+            if name == "RPUSH":
+                length = 0
+                for value in args[1:]:
+                    length = await state.push(args[0].decode(), value)
+                return b":%d\r\n" % length
+            if name == "LRANGE":
+                values = await state.range(args[0].decode())
+                start, stop = int(args[1]), int(args[2])
+                stop = len(values) if stop == -1 else stop + 1
+                items = values[start:stop]
+                return b"*%d\r\n" % len(items) + b"".join(_bulk(item) for item in items)
+            if name in ("EXPIRE", "PEXPIRE"):
+                ttl = float(args[1]) / (1000.0 if name == "PEXPIRE" else 1.0)
+                return b":1\r\n" if state.expire(args[0].decode(), ttl) else b":0\r\n"
+        except (IndexError, ValueError) as e:
+            return b"-ERR %s\r\n" % _bytes(f"bad arguments for {name}: {e}")
+        return b"-ERR unknown command %s\r\n" % _bytes(name)
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def start_state_server(directory: Optional[str] = None) -> StateServer:
+    """
+    Start a StateServer for the workers of this process
+
+    Args:
+        directory: Where the Unix socket is created (the temp directory if None)
+
+    Returns:
+        The running server; pass its url to the workers as SHARED_STATE_URL
+    """
+    path = None
+    if hasattr(socket, "AF_UNIX"):
+        path = os.path.join(directory or tempfile.gettempdir(), f"meeting-agent-{os.getpid()}.sock")
+    max_bytes = int(os.getenv('SHARED_STATE_MAX_BYTES', str(256 * 1024 * 1024)))
+    return StateServer(path, max_bytes=max_bytes).start()
+
+
+_shared_state: Optional[SharedState] = None
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """
+    Get the process-wide shared state named by SHARED_STATE_URL
+
+    Returns:
+        A RespState client, or None when SHARED_STATE_URL is unset and
+        this process is the only worker
+    """
+    global _shared_state
+    if _shared_state is None:
+        url = os.getenv('SHARED_STATE_URL')
+        if url:
+            _shared_state = RespState(url)
+    return _shared_state
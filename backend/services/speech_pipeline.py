@@ -0,0 +1,285 @@
+"""
+Speech Pipeline for Meeting Agent
+Synthesizes a generated question sentence by sentence while it is still being written
+"""
+import asyncio
+import os
+import re
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+
+from .ai_processor import AIProcessor
+from .metrics import registry
+from .voice import VoiceService
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, whitespace
+_sentence_end = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+# WAV format tag and bits per sample of the PCM encodings Cartesia produces
+_PCM_ENCODINGS = {
+    "pcm_s16le": (1, 16),
+    "pcm_f32le": (3, 32)
+}
+
+
+def split_sentences(text: str) -> Tuple[List[str], str]:
+    """
+    Split complete sentences off the front of a growing text
+
+    Args:
+        text: Text generated so far
+
+    Returns:
+        Tuple of (complete sentences, unfinished remainder)
+    """
+    sentences = []
+    pos = 0
+    for match in _sentence_end.finditer(text):
+        sentence = text[pos:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        pos = match.end()
+    return sentences, text[pos:]
+
+
+def wav_stream_header(encoding: str, sample_rate: int, channels: int = 1) -> bytes:
+    """
+    Build a WAV header for PCM audio of unknown length
+
+    The RIFF and data sizes are set to the maximum, which players treat as
+    "read until the end of the stream".
+
+    Args:
+        encoding: Cartesia PCM encoding (pcm_s16le or pcm_f32le)
+        sample_rate: Samples per second
+        channels: Number of interleaved channels
+
+    Returns:
+        44-byte WAV header
+    """
+    format_tag, bits = _PCM_ENCODINGS[encoding]
+    block_align = channels * bits // 8
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits
+        )
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def segment_format(output_format: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Pick a per-sentence format whose clips can be concatenated
+
+    WAV clips each carry their own header, so sentences are synthesized as
+    raw PCM behind a single streaming header instead. MP3 and raw PCM
+    concatenate as they are.
+
+    Args:
+        output_format: Cartesia output_format the listener expects
+
+    Returns:
+        Tuple of (format to synthesize each sentence in, stream header)
+
+    Raises:
+        ValueError: If WAV audio uses an encoding without a known header
+    """
+    if output_format.get("container") != "wav":
+        return output_format, b""
+    encoding = output_format.get("encoding")
+    if encoding not in _PCM_ENCODINGS:
+        raise ValueError(f"Cannot stream WAV audio with encoding {encoding!r}")
+    raw = {"container": "raw", "encoding": encoding, "sample_rate": output_format["sample_rate"]}
+    return raw, wav_stream_header(encoding, output_format["sample_rate"])
+
+
+class SpokenQuestion:
+    """A question being generated and synthesized, with its audio kept for playback"""
+
+    def __init__(self, question_id: str, media_type: str, header: bytes = b""):
+        self.id = question_id
+        self.media_type = media_type
+        self.text = ""
+        self.error: Optional[str] = None
+        self.done = False
+        self.created_at = time.monotonic()
+        self.text_ready = asyncio.Event()
+        self.task: Optional[asyncio.Future] = None
+        self._chunks: List[bytes] = [header] if header else []
+        self._changed = asyncio.Condition()
+
+    async def _append(self, chunk: bytes) -> None:
+        async with self._changed:
+            self._chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def _finish(self) -> None:
+        async with self._changed:
+            self.done = True
+            self._changed.notify_all()
+
+    async def audio(self) -> AsyncIterator[bytes]:
+        """
+        Iterate over the question's audio from the start
+
+        Sentences already synthesized are yielded immediately; the rest are
+        yielded as they become ready. Can be replayed any number of times.
+
+        Yields:
+            Audio byte chunks
+
+        Raises:
+            RuntimeError: If generation or synthesis failed
+        """
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self._chunks) or self.done)
+                pending = self._chunks[index:]
+                index = len(self._chunks)
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            if finished:
+                if self.error:
+                    raise RuntimeError(self.error)
+                return
+
+
+class SpeechPipeline:
+    """Generates questions and synthesizes their audio concurrently"""
+
+    def __init__(
+        self,
+        ai_processor: AIProcessor,
+        voice_service: VoiceService,
+        ttl: Optional[float] = None,
+        max_entries: int = 64
+    ):
+        """
+        Initialize the pipeline
+
+        Args:
+            ai_processor: Generates the question text
+            voice_service: Synthesizes each sentence
+            ttl: Seconds a question's audio stays available (defaults to env var)
+            max_entries: Most questions whose audio is kept
+        """
+        self.ai_processor = ai_processor
+        self.voice_service = voice_service
+        self.ttl = ttl if ttl is not None else float(os.getenv('ASK_AUDIO_TTL', '120'))
+        self.max_entries = max_entries
+        self._questions: "OrderedDict[str, SpokenQuestion]" = OrderedDict()
+        self._first_audio = registry.histogram("tts_time_to_first_audio_seconds", operation="ask")
+
+    async def ask(self, user_input: str) -> SpokenQuestion:
+        """
+        Start generating a question and its audio in the background
+
+        Each sentence is sent to TTS as soon as the model finishes it, while
+        later sentences are still being generated.
+
+        Args:
+            user_input: User's informal question or statement
+
+        Returns:
+            Handle whose `text_ready` is set once the question text is final
+            and whose `audio()` streams the synthesized speech
+        """
+        self._expire()
+        output_format = self.voice_service.output_format
+        synth_format, header = segment_format(output_format)
+        question = SpokenQuestion(uuid.uuid4().hex, self.voice_service.media_type(output_format), header)
+        self._questions[question.id] = question
+        while len(self._questions) > self.max_entries:
+            _, evicted = self._questions.popitem(last=False)
+            if evicted.task is not None:
+                evicted.task.cancel()
+        question.task = asyncio.ensure_future(self._run(question, user_input, synth_format))
+        return question
+
+    def get(self, question_id: str) -> Optional[SpokenQuestion]:
+        """
+        Look up a question started by ask()
+
+        Args:
+            question_id: ID of the question
+
+        Returns:
+            The question, or None if unknown or expired
+        """
+        self._expire()
+        return self._questions.get(question_id)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._questions:
+            question = next(iter(self._questions.values()))
+            if question.created_at >= cutoff:
+                break
+            self._questions.popitem(last=False)
+            if question.task is not None:
+                question.task.cancel()
+
+    async def _run(self, question: SpokenQuestion, user_input: str, synth_format: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        clips: asyncio.Queue = asyncio.Queue()
+        relay = asyncio.ensure_future(self._relay(question, clips, started))
+
+        def synthesize(sentence: str) -> None:
+            clips.put_nowait(asyncio.ensure_future(
+                self.voice_service.generate_audio(sentence, output_format=synth_format)
+            ))
+
+        parts = []
+        buffer = ""
+        try:
+            async for delta in self.ai_processor.stream_question(user_input):
+                parts.append(delta)
+                sentences, buffer = split_sentences(buffer + delta)
+                for sentence in sentences:
+                    synthesize(sentence)
+            if buffer.strip():
+                synthesize(buffer.strip())
+            question.text = "".join(parts).strip()
+        except Exception as e:
+            question.error = str(e)
+        finally:
+            question.text_ready.set()
+            clips.put_nowait(None)
+        try:
+            await relay
+        except asyncio.CancelledError:
+            relay.cancel()
+            raise
+
+    async def _relay(self, question: SpokenQuestion, clips: asyncio.Queue, started: float) -> None:
+        """Append synthesized sentences to the question's audio in order"""
+        first = True
+        try:
+            while (clip := await clips.get()) is not None:
+                audio = await clip
+                if first:
+                    self._first_audio.observe(time.perf_counter() - started)
+                    first = False
+                await question._append(audio)
+        except Exception as e:
+            question.error = question.error or str(e)
+        finally:
+            while not clips.empty():
+                clip = clips.get_nowait()
+                if clip is not None:
+                    clip.cancel()
+            await question._finish()
+
+    async def close(self) -> None:
+        """Cancel questions still being generated"""
+        tasks = [question.task for question in self._questions.values() if question.task is not None]
+        self._questions.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,207 @@
+"""
+Hierarchical Summarization Engine for Meeting Agent
+Condenses transcripts longer than the model context with map-reduce
+"""
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Optional, List, Callable, Awaitable
+
+from .transcript_prep import count_tokens
+
+# Bump when the map/reduce prompts change so cached notes are not reused
+PROMPT_VERSION = "1"
+
+MAP_SYSTEM_PROMPT = (
+    "You are a helpful assistant that condenses part of a meeting transcript into notes. "
+    "Keep every decision, key fact, open question and action item with its owner."
+)
+REDUCE_SYSTEM_PROMPT = (
+    "You are a helpful assistant that merges consecutive meeting notes into one set of notes. "
+    "Keep every decision, key fact, open question and action item with its owner."
+)
+
+_sentence_end = re.compile(r'(?<=[.!?])\s+')
+
+# Signature of the completion function the engine calls:
+# (system_prompt, user_prompt, max_tokens) -> completion text
+CompleteFn = Callable[[str, str, int], Awaitable[str]]
+
+# Called as chunks are condensed: (chunks done, total chunks)
+ProgressFn = Callable[[int, int], None]
+
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """Split a single over-budget line on sentence, then word, boundaries"""
+    pieces: List[str] = []
+    for sentence in _sentence_end.split(unit):
+        if count_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words, current = sentence.split(), []
+        for word in words:
+            if current and count_tokens(" ".join(current + [word])) > max_tokens:
+                pieces.append(" ".join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_transcript(transcript: str, max_tokens: int) -> List[str]:
+    """
+    Split a transcript into token-bounded chunks on speaker/sentence boundaries
+
+    Lines (one speaker turn each) are packed greedily from the start, so
+    appending to a transcript leaves every chunk but the last unchanged.
+
+    Args:
+        transcript: Transcript text, one speaker turn per line
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunks, each within the budget
+    """
+    units: List[str] = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if count_tokens(line) <= max_tokens:
+            units.append(line)
+        else:
+            units.extend(_split_oversized(line, max_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = count_tokens(unit) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class SummarizationEngine:
+    """Map-reduce condenser shared by all transcript analyses"""
+
+    def __init__(
+        self,
+        complete: CompleteFn,
+        model: str = "",
+        chunk_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        fan_in: int = 8,
+        notes_tokens: int = 400,
+        cache_size: int = 2048
+    ):
+        """
+        Initialize the engine
+
+        Args:
+            complete: Async completion function (system, prompt, max_tokens) -> text
+            model: Model name, part of the cache key
+            chunk_tokens: Token budget per chunk (defaults to env var)
+            max_concurrency: Most completions in flight at once (defaults to env var)
+            fan_in: Most partial notes merged by one reduce call
+            notes_tokens: max_tokens for each map/reduce completion
+            cache_size: Most chunk notes kept in the cache
+        """
+        self.complete = complete
+        self.model = model
+        self.chunk_tokens = chunk_tokens or int(os.getenv('SUMMARY_CHUNK_TOKENS', '3000'))
+        self.max_concurrency = max_concurrency or int(os.getenv('SUMMARY_MAX_CONCURRENCY', '4'))
+        self.fan_in = fan_in
+        self.notes_tokens = notes_tokens
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def fits(self, transcript: str) -> bool:
+        """Whether a transcript is small enough to send in a single prompt"""
+        return count_tokens(transcript) <= self.chunk_tokens
+
+    async def condense(self, transcript: str, on_progress: Optional[ProgressFn] = None) -> str:
+        """
+        Reduce a transcript to notes that fit in a single prompt
+
+        Short transcripts are returned unchanged. Longer ones are chunked,
+        each chunk is condensed concurrently, and the partial notes are
+        merged in a tree until they fit within one chunk budget.
+
+        Args:
+            transcript: Transcript text
+            on_progress: Called with (chunks done, total chunks) as each chunk is condensed
+
+        Returns:
+            The transcript itself, or condensed notes covering all of it
+        """
+        if self.fits(transcript):
+            return transcript
+
+        chunks = chunk_transcript(transcript, self.chunk_tokens)
+        done = 0
+
+        async def condense_chunk(chunk: str) -> str:
+            nonlocal done
+            notes = await self._summarize(
+                MAP_SYSTEM_PROMPT, f"Condense this meeting transcript excerpt into notes:\n{chunk}"
+            )
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(chunks))
+            return notes
+
+        level = await asyncio.gather(*(condense_chunk(chunk) for chunk in chunks))
+
+        depth = 0
+        while len(level) > 1 and count_tokens("\n\n".join(level)) > self.chunk_tokens and depth < 16:
+            groups = self._group(level)
+            level = await asyncio.gather(*(
+                self._summarize(REDUCE_SYSTEM_PROMPT, "Merge these consecutive meeting notes:\n\n" + "\n\n".join(group))
+                for group in groups
+            ))
+            depth += 1
+        return "\n\n".join(level)
+
+    def _group(self, notes: List[str]) -> List[List[str]]:
+        """Pack consecutive notes into groups within the token budget and fan-in"""
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for note in notes:
+            tokens = count_tokens(note) + 1
+            if current and (current_tokens + tokens > self.chunk_tokens or len(current) >= self.fan_in):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(note)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _summarize(self, system: str, prompt: str) -> str:
+        """Run one map/reduce completion, reusing cached notes for identical input"""
+        key = hashlib.sha256(
+            "\0".join((PROMPT_VERSION, self.model, system, prompt)).encode("utf-8")
+        ).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        async with self._semaphore:
+            notes = await self.complete(system, prompt, self.notes_tokens)
+
+        self._cache[key] = notes
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return notes
@@ -0,0 +1,103 @@
+"""
+Tiered Cache Base for Meeting Agent
+Lookup order, single-flight computation and counters shared by the caches
+that keep values in memory, in shared state and on disk
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable, Generic, TypeVar
+
+from .shared_state import SharedState
+
+V = TypeVar("V")
+
+
+class TieredCache(ABC, Generic[V]):
+    """Cache checked in memory, then shared state, then disk, computing each miss once
+
+    Subclasses keep their memory tier in `_entries` and implement get()
+    and set(), counting hits in `hits`, `shared_hits` and `disk_hits`.
+    """
+
+    def __init__(self, disk: Any = None, shared: Optional[SharedState] = None):
+        """
+        Initialize the cache
+
+        Args:
+            disk: Persistent tier (memory only if None)
+            shared: Storage shared with the other worker processes
+        """
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._disk = disk
+        self._shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[V]:
+        """Look up a value in memory, then in shared state, then on disk"""
+
+    @abstractmethod
+    async def set(self, key: str, value: V) -> None:
+        """Store a value in every tier"""
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[V]]) -> V:
+        """
+        Return a cached value or compute it once
+
+        Concurrent callers asking for the same key while it is being
+        computed share the single upstream call.
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory producing the value on a miss
+
+        Returns:
+            The cached or computed value
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Run detached so a cancelled caller does not cancel the shared call
+            task = asyncio.ensure_future(self._compute_and_store(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[V]]) -> V:
+        value = await compute()
+        await self.set(key, value)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller went away
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.shared_hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0,
+            "persistent": self._disk is not None,
+            "shared": self._shared is not None
+        }
@@ -0,0 +1,347 @@
+"""
+Transcript Model for Meeting Agent
+Column-oriented, speaker-aware transcripts shared by every service and route
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# Short utterances ("Yes.", "Okay, thanks.") repeat constantly; longer ones rarely do
+_INTERN_MAX_CHARS = 40
+
+
+def utterance_from_segment(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a Recall.ai transcript segment into a single utterance
+
+    Args:
+        segment: Segment with a speaker and a list of timed words
+
+    Returns:
+        Dictionary with speaker, text, start_time and end_time
+    """
+    words = segment.get("words") or []
+    return {
+        "speaker": segment.get("speaker") or "Unknown",
+        "text": " ".join(word.get("text", "") for word in words).strip(),
+        "start_time": words[0].get("start_time") if words else None,
+        "end_time": words[-1].get("end_time") if words else None
+    }
+
+
+def segment_from_utterance(utterance: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a stored utterance to Recall.ai's segment format
+
+    The utterance becomes one segment holding a single timed span in
+    `words`, so existing consumers keep working unchanged.
+
+    Args:
+        utterance: Utterance with speaker, text, start_time and end_time
+
+    Returns:
+        Segment dictionary
+    """
+    return {
+        "speaker": utterance["speaker"],
+        "words": [{
+            "text": utterance["text"],
+            "start_time": utterance["start_time"],
+            "end_time": utterance["end_time"]
+        }]
+    }
+
+
+class Segment:
+    """One utterance of a transcript, read from its columns"""
+
+    __slots__ = ("seq", "speaker", "text", "start_time", "end_time")
+
+    def __init__(self, seq: int, speaker: str, text: str, start_time: float, end_time: float):
+        self.seq = seq
+        self.speaker = speaker
+        self.text = text
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "speaker": self.speaker,
+            "text": self.text,
+            "start_time": self.start_time,
+            "end_time": self.end_time
+        }
+
+    def __repr__(self) -> str:
+        return f"Segment({self.seq}, {self.speaker!r}, {self.text!r}, {self.start_time}, {self.end_time})"
+
+
+class Transcript:
+    """Append-only transcript stored as columns
+
+    Speakers are kept once in a table and referenced by id, times live in
+    `array('d')` columns and short texts are interned. The position of an
+    utterance is its `seq`. Time-range reads bisect the start times, and
+    each speaker's positions are indexed as utterances arrive.
+    """
+
+    __slots__ = (
+        "speakers", "speaker_index", "speaker_ids", "texts", "starts", "ends",
+        "ordered", "_by_speaker", "_order", "_sorted_starts", "_lines", "_rendered", "_encoded"
+    )
+
+    def __init__(self):
+        self.speakers: List[str] = []
+        self.speaker_index: Dict[str, int] = {}
+        self.speaker_ids = array("I")
+        self.texts: List[str] = []
+        self.starts = array("d")
+        self.ends = array("d")
+        # False once an utterance arrives that starts before the previous one
+        self.ordered = True
+        self._by_speaker: List[array] = []
+        # Start-time order of an unordered transcript, rebuilt after appends
+        self._order: Optional[array] = None
+        self._sorted_starts: Optional[array] = None
+        # "Speaker: text" lines rendered so far, and their joined text
+        self._lines: List[str] = []
+        self._rendered: Optional[str] = None
+        # Response bodies built from the current contents, dropped on any change
+        self._encoded: Dict[Hashable, Any] = {}
+
+    @classmethod
+    def from_utterances(cls, utterances: Iterable[Dict[str, Any]]) -> "Transcript":
+        """Build a transcript from utterance dictionaries (speaker, text, start_time, end_time)"""
+        transcript = cls()
+        for utterance in utterances:
+            transcript.append(
+                utterance.get("speaker") or "Unknown",
+                utterance.get("text") or "",
+                utterance.get("start_time"),
+                utterance.get("end_time")
+            )
+        return transcript
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]]) -> "Transcript":
+        """Build a transcript from Recall.ai segments, one utterance per segment"""
+        return cls.from_utterances(utterance_from_segment(segment) for segment in segments)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, seq: int) -> Segment:
+        return Segment(seq, self.speakers[self.speaker_ids[seq]], self.texts[seq], self.starts[seq], self.ends[seq])
+
+    def __iter__(self) -> Iterator[Segment]:
+        return (self[seq] for seq in range(len(self)))
+
+    def append(self, speaker: str, text: str, start: Optional[float], end: Optional[float]) -> int:
+        """
+        Append an utterance
+
+        Args:
+            speaker: Speaker name
+            text: Utterance text
+            start: Start offset in seconds (None is stored as 0)
+            end: End offset in seconds (defaults to the start)
+
+        Returns:
+            Sequence number of the utterance
+        """
+        start = float(start or 0.0)
+        end = float(end) if end is not None else start
+        speaker_id = self.speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self.speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(sys.intern(speaker))
+            self._by_speaker.append(array("I"))
+        if len(text) <= _INTERN_MAX_CHARS:
+            text = sys.intern(text)
+
+        if self.starts and start < self.starts[-1]:
+            self.ordered = False
+        seq = len(self.texts)
+        self.speaker_ids.append(speaker_id)
+        self.texts.append(text)
+        self.starts.append(start)
+        self.ends.append(end)
+        self._by_speaker[speaker_id].append(seq)
+        self._order = self._sorted_starts = None
+        if self._encoded:
+            self._encoded = {}
+        return seq
+
+    def truncate(self, length: int) -> None:
+        """Drop every utterance from `length` on (to replace a transcript's changed tail)"""
+        if length >= len(self):
+            return
+        for speaker_id in set(self.speaker_ids[length:]):
+            positions = self._by_speaker[speaker_id]
+            del positions[bisect_left(positions, length):]
+        del self.speaker_ids[length:]
+        del self.texts[length:]
+        del self.starts[length:]
+        del self.ends[length:]
+        del self._lines[length:]
+        self._rendered = None
+        self._encoded = {}
+        self._order = self._sorted_starts = None
+        self.ordered = all(self.starts[i - 1] <= self.starts[i] for i in range(1, length))
+
+    def _time_order(self) -> Optional[array]:
+        """Positions sorted by start time (None when arrival order already is)"""
+        if self.ordered:
+            return None
+        if self._order is None:
+            order = sorted(range(len(self)), key=self.starts.__getitem__)
+            self._order = array("I", order)
+            self._sorted_starts = array("d", (self.starts[i] for i in order))
+        return self._order
+
+    def positions(self, start: Optional[float] = None, end: Optional[float] = None,
+                  speaker: Optional[str] = None) -> List[int]:
+        """
+        Sequence numbers of the utterances starting in a time range, in time order
+
+        The range is found by bisecting the start times, so a read costs
+        O(log n) plus the utterances returned.
+
+        Args:
+            start: Earliest start time (inclusive)
+            end: Latest start time (exclusive)
+            speaker: Only this speaker's utterances
+
+        Returns:
+            Sequence numbers ordered by start time
+        """
+        order = self._time_order()
+        starts = self.starts if order is None else self._sorted_starts
+        lo = bisect_left(starts, start) if start is not None else 0
+        hi = bisect_left(starts, end) if end is not None else len(starts)
+        if speaker is not None:
+            speaker_id = self.speaker_index.get(speaker)
+            if speaker_id is None:
+                return []
+            if order is None:
+                positions = self._by_speaker[speaker_id]
+                return list(positions[bisect_left(positions, lo):bisect_left(positions, hi)])
+            return [seq for seq in order[lo:hi] if self.speaker_ids[seq] == speaker_id]
+        return list(range(lo, hi)) if order is None else list(order[lo:hi])
+
+    def view(self, start: Optional[float] = None, end: Optional[float] = None,
+             speaker: Optional[str] = None) -> "Transcript":
+        """
+        Copy of a time range and/or one speaker's utterances, ordered by start time
+
+        Args:
+            start: Earliest start time (inclusive)
+            end: Latest start time (exclusive)
+            speaker: Only this speaker's utterances
+
+        Returns:
+            A new Transcript (its seqs restart at 0)
+        """
+        if start is None and end is None and speaker is None and self.ordered:
+            return self
+        return self.take(self.positions(start, end, speaker))
+
+    def take(self, positions: Iterable[int]) -> "Transcript":
+        """New transcript holding the given utterances, in the given order"""
+        transcript = Transcript()
+        speakers, texts, starts, ends = self.speaker_ids, self.texts, self.starts, self.ends
+        for seq in positions:
+            transcript.append(self.speakers[speakers[seq]], texts[seq], starts[seq], ends[seq])
+        return transcript
+
+    def speaker_stats(self) -> List[Dict[str, Any]]:
+        """Turns and speaking time per speaker, in order of first appearance"""
+        stats = []
+        for speaker_id, speaker in enumerate(self.speakers):
+            positions = self._by_speaker[speaker_id]
+            if positions:
+                stats.append({
+                    "speaker": speaker,
+                    "turns": len(positions),
+                    "seconds": round(sum(self.ends[i] - self.starts[i] for i in positions), 3)
+                })
+        return stats
+
+    def render(self) -> str:
+        """
+        Plain "Speaker: text" lines, in arrival order
+
+        Lines are rendered once each and the joined text is cached until
+        the next append.
+
+        Returns:
+            Transcript text, one utterance per line
+        """
+        lines, texts = self._lines, self.texts
+        if self._rendered is None or len(lines) != len(texts):
+            speakers, speaker_ids = self.speakers, self.speaker_ids
+            lines.extend(f"{speakers[speaker_ids[i]]}: {texts[i]}" for i in range(len(lines), len(texts)))
+            self._rendered = "\n".join(lines)
+        return self._rendered
+
+    def encoded(self, key: Hashable, build: Callable[[], T]) -> T:
+        """
+        Build something from the current contents once, e.g. a response body
+
+        Args:
+            key: What is built (representation, encoding, ...)
+            build: Builds it on the first call for this version of the transcript
+
+        Returns:
+            The cached result, until the next append or truncate
+        """
+        found = self._encoded.get(key)
+        if found is None:
+            found = self._encoded[key] = build()
+        return found
+
+    def columns(self, positions: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Utterances as parallel columns, with speakers as ids into a table
+
+        Args:
+            positions: Utterances to include, in order (all, in arrival order, if None)
+
+        Returns:
+            Dictionary with `speakers` (the table) and the `speaker`, `text`,
+            `start_time` and `end_time` columns
+        """
+        if positions is None:
+            return {
+                "speakers": self.speakers,
+                "speaker": self.speaker_ids.tolist(),
+                "text": self.texts,
+                "start_time": self.starts.tolist(),
+                "end_time": self.ends.tolist()
+            }
+        positions = list(positions)
+        speaker_ids, texts, starts, ends = self.speaker_ids, self.texts, self.starts, self.ends
+        return {
+            "speakers": self.speakers,
+            "speaker": [speaker_ids[seq] for seq in positions],
+            "text": [texts[seq] for seq in positions],
+            "start_time": [starts[seq] for seq in positions],
+            "end_time": [ends[seq] for seq in positions]
+        }
+
+    def utterances(self, start: int = 0) -> List[Dict[str, Any]]:
+        """Utterance dictionaries from seq `start` on, in arrival order"""
+        return [self[seq].to_dict() for seq in range(max(start, 0), len(self))]
+
+    def time_ordered_utterances(self) -> List[Dict[str, Any]]:
+        """Every utterance dictionary, ordered by start time"""
+        order = self._time_order()
+        return [self[seq].to_dict() for seq in (range(len(self)) if order is None else order)]
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Recall.ai-format segments ordered by start time (see segment_from_utterance)"""
+        return [segment_from_utterance(row) for row in self.time_ordered_utterances()]
@@ -0,0 +1,257 @@
+"""
+Transcript Preprocessing for Meeting Agent
+Compacts transcripts before they are sent to the model and counts tokens locally
+"""
+import re
+from typing import Optional, List, Dict, Tuple
+
+# Approximates the GPT tokenizers (cl100k/o200k) without loading one: a
+# common word is one token, longer words one per ten letters, digits group
+# in threes and every punctuation mark counts on its own. Non-Latin scripts
+# are counted every few characters, which errs on the high side.
+_token = re.compile(r"[A-Za-z]{1,10}|[^\W\d_]{1,3}|\d{1,3}|[^\w\s]|\n")
+
+# "Speaker: text" lines; the label may not contain a colon or a slash, and
+# the colon must be followed by whitespace so URLs are not taken for labels
+_speaker_line = re.compile(r"^([^:/\n]{1,60}?):\s+(.*)$")
+
+_filler = re.compile(
+    r"(?:,\s*)?(?<![\w'-])(?:u+m+|u+h+|uhm+|e+r+m*|a+h+|h+m+|m+h*m+)(?![\w'-])[,.]?"
+    r"|(?:,\s*)?(?<![\w'-])(?:you know|i mean),",
+    re.IGNORECASE
+)
+# "w- we", "I- I" false starts
+_false_start = re.compile(r"\b(\w{1,4})-\s+(?=\1)", re.IGNORECASE)
+_repeated_word = re.compile(r"\b(\w+)(?:[,\s]+\1\b)+", re.IGNORECASE)
+_space_before_punct = re.compile(r"\s+([,.!?;:])")
+_spaces = re.compile(r"[ \t]{2,}")
+_leading_punct = re.compile(r"^[\s,.;:]+")
+
+_titles = {"dr", "mr", "mrs", "ms", "prof", "sir"}
+
+OMISSION_MARKER = "[... {} lines omitted ...]"
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the model tokens in a text without a tokenizer
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count, deterministic for a given text
+    """
+    return len(_token.findall(text))
+
+
+def clean_text(text: str) -> str:
+    """
+    Drop disfluencies from one utterance
+
+    Filler words, false starts and immediately repeated words are removed;
+    the wording is otherwise kept as spoken.
+
+    Args:
+        text: Utterance text
+
+    Returns:
+        Cleaned text (empty when the utterance was only filler)
+    """
+    text = _filler.sub(" ", text)
+    text = _false_start.sub("", text)
+    text = _repeated_word.sub(r"\1", text)
+    text = _space_before_punct.sub(r"\1", text)
+    text = _spaces.sub(" ", text)
+    text = _leading_punct.sub("", text).strip()
+    if text and text[0].islower():
+        text = text[0].upper() + text[1:]
+    return text
+
+
+def parse_turns(transcript: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a transcript into (speaker, text) turns
+
+    Args:
+        transcript: Transcript text, one utterance per line
+
+    Returns:
+        List of turns; lines without a speaker label have speaker None
+    """
+    turns: List[Tuple[Optional[str], str]] = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _speaker_line.match(line)
+        if match:
+            turns.append((match.group(1).strip(), match.group(2)))
+        else:
+            turns.append((None, line))
+    return turns
+
+
+def _normalized(text: str) -> str:
+    return text.lower().rstrip(" .,!?;:")
+
+
+def _merge_turns(turns: List[Tuple[Optional[str], str]]) -> List[List]:
+    """Clean turns, drop partial results and merge consecutive same-speaker turns"""
+    merged: List[List] = []
+    # Text of the previous utterance, to recognize a partial and its final result
+    previous = ""
+    for speaker, text in turns:
+        text = clean_text(text)
+        if not text:
+            continue
+        last = merged[-1] if merged else None
+        if last is None or speaker is None or last[0] != speaker:
+            merged.append([speaker, text])
+            previous = text
+            continue
+        current, before = _normalized(text), _normalized(previous)
+        if current.startswith(before):
+            # The earlier utterance was a partial result of this one
+            last[1] = last[1][:len(last[1]) - len(previous)] + text
+        elif not before.startswith(current):
+            last[1] = f"{last[1]} {text}"
+        else:
+            # A partial (or repeat) of what was already said
+            continue
+        previous = text
+    return merged
+
+
+def _aliases(turns: List[List]) -> Dict[str, str]:
+    """
+    Pick a short alias per long speaker name, in order of first appearance
+
+    Whether a speaker gets an alias only depends on their name, not on how
+    often they speak, so the compacted start of a transcript stays the same
+    as the transcript grows. An alias is never another speaker's name.
+    """
+    speakers = list(dict.fromkeys(speaker for speaker, _ in turns if speaker is not None))
+    taken = set(speakers)
+    aliases: Dict[str, str] = {}
+    for speaker in speakers:
+        words = speaker.split()
+        if words and words[0].lower().rstrip(".") in _titles and len(words) > 1:
+            words = words[1:]
+        if len(words) < 2:
+            continue
+        for alias in (words[0], f"{words[0]} {words[-1][0]}"):
+            if alias in taken:
+                continue
+            if count_tokens(alias) < count_tokens(speaker):
+                aliases[speaker] = alias
+                taken.add(alias)
+            break
+    return aliases
+
+
+class CompactTranscript:
+    """A transcript compacted for the model, with its token counts"""
+
+    __slots__ = ("text", "original_tokens", "tokens")
+
+    def __init__(self, text: str, original_tokens: int, tokens: int):
+        self.text = text
+        self.original_tokens = original_tokens
+        self.tokens = tokens
+
+    @property
+    def saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def compact_transcript(transcript: str) -> CompactTranscript:
+    """
+    Normalize and compact a transcript before it reaches the model
+
+    Disfluencies are dropped, partial results are replaced by their final
+    text, consecutive turns of one speaker are merged into one line, and
+    long speaker names are replaced by a short alias (first name, then
+    first name and initial) introduced at the speaker's first line. The
+    output only depends on the input, so compacted prompts stay cacheable,
+    and the compacted lines of a transcript's start do not change as it grows.
+
+    Args:
+        transcript: Transcript text, one "Speaker: text" utterance per line
+
+    Returns:
+        The compacted transcript and its token counts before and after
+    """
+    original_tokens = count_tokens(transcript)
+    turns = _merge_turns(parse_turns(transcript))
+    aliases = _aliases(turns)
+    introduced = set()
+    lines = []
+    for speaker, text in turns:
+        alias = aliases.get(speaker)
+        if speaker is None:
+            lines.append(text)
+        elif alias is None:
+            lines.append(f"{speaker}: {text}")
+        elif speaker in introduced:
+            lines.append(f"{alias}: {text}")
+        else:
+            # The first line of an aliased speaker introduces the alias
+            introduced.add(speaker)
+            lines.append(f"{speaker} ({alias}): {text}")
+    text = "\n".join(lines)
+    tokens = count_tokens(text)
+    if tokens >= original_tokens:
+        # Nothing to gain (e.g. an already compact text); send it untouched
+        return CompactTranscript(transcript, original_tokens, original_tokens)
+    return CompactTranscript(text, original_tokens, tokens)
+
+
+def _truncate_line(line: str, max_tokens: int) -> str:
+    """Cut a single line to its first words within the budget"""
+    kept, used = [], 0
+    for word in line.split(" "):
+        tokens = count_tokens(word)
+        if used + tokens > max_tokens:
+            break
+        kept.append(word)
+        used += tokens
+    return " ".join(kept)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Deterministically cut a text down to a token budget
+
+    Whole lines are kept from the start and the end (where prompts carry
+    their instructions and the latest discussion) and the middle is
+    replaced by a marker saying how many lines were left out.
+
+    Args:
+        text: Text to cut
+        max_tokens: Token budget
+
+    Returns:
+        The text itself when it fits, otherwise its head and tail
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    lines = text.split("\n")
+    costs = [count_tokens(line) + 1 for line in lines]
+    # Keep room for the marker line
+    budget = max(max_tokens - count_tokens(OMISSION_MARKER.format(len(lines))) - 1, 0)
+    head, tail = [], []
+    used = 0
+    i, j = 0, len(lines) - 1
+    # A third of the budget for the head, the rest for the tail
+    while i <= j and used + costs[i] <= budget // 3:
+        head.append(lines[i])
+        used += costs[i]
+        i += 1
+    while j >= i and used + costs[j] <= budget:
+        tail.append(lines[j])
+        used += costs[j]
+        j -= 1
+    if not head and not tail:
+        return _truncate_line(lines[0], max_tokens)
+    return "\n".join(head + [OMISSION_MARKER.format(j - i + 1)] + tail[::-1])
@@ -0,0 +1,409 @@
+"""
+Transcript Store for Meeting Agent
+Keeps real-time transcripts received from Recall.ai webhooks in memory
+"""
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from .shared_state import SharedState
+from .transcript_model import Transcript, segment_from_utterance  # noqa: F401 (re-exported)
+
+
+class _BotTranscript(Transcript):
+    """A bot's live transcript, remembering which events it already holds
+
+    The sequence number of an utterance is its position in the log, so
+    readers can ask for everything from seq N with a single slice.
+    """
+
+    __slots__ = ("keys", "handled")
+
+    def __init__(self):
+        super().__init__()
+        self.keys = set()
+        # Seqs below this were reloaded after the bot was evicted and their
+        # listeners ran the first time
+        self.handled = 0
+
+    def append_once(self, key: Any, speaker: str, text: str, start: float, end: float) -> Optional[int]:
+        """Append an utterance, returning its seq or None for a duplicate"""
+        if key in self.keys:
+            return None
+        self.keys.add(key)
+        return self.append(speaker, text, start, end)
+
+
+def parse_webhook_event(payload: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Extract the bot id and final utterance from a Recall.ai transcript webhook
+
+    Both the legacy `bot.transcription` shape and the newer `transcript.data`
+    shape are accepted. Partial (non-final) results are ignored.
+
+    Args:
+        payload: Webhook JSON body
+
+    Returns:
+        (bot_id, utterance) tuple, or None if the event carries no final utterance
+    """
+    data = payload.get("data") or {}
+
+    if payload.get("event") == "transcript.data":
+        bot_id = (data.get("bot") or {}).get("id")
+        transcript = data.get("data") or {}
+        participant = transcript.get("participant") or {}
+        speaker = participant.get("name")
+        event_id = transcript.get("id")
+        is_final = True
+    elif payload.get("event") == "bot.transcription":
+        bot_id = data.get("bot_id")
+        transcript = data.get("transcript") or {}
+        speaker = transcript.get("speaker")
+        event_id = transcript.get("original_transcript_id")
+        is_final = transcript.get("is_final", True)
+    else:
+        return None
+
+    words = transcript.get("words") or []
+    if not bot_id or not words or not is_final:
+        return None
+
+    start = words[0].get("start_time")
+    if start is None:
+        start = (words[0].get("start_timestamp") or {}).get("relative", 0.0)
+    end = words[-1].get("end_time")
+    if end is None:
+        end = (words[-1].get("end_timestamp") or {}).get("relative", start)
+
+    return bot_id, {
+        "id": event_id,
+        "speaker": speaker or "Unknown",
+        "text": " ".join(word.get("text", "") for word in words).strip(),
+        "start_time": float(start or 0.0),
+        "end_time": float(end or 0.0)
+    }
+
+
+class TranscriptStore:
+    """In-memory per-bot transcript store fed by real-time webhooks
+
+    With several worker processes, a webhook can land on any of them. Given
+    shared state, ingest() appends each utterance to a shared per-bot list
+    first and every worker's log mirrors that list (see sync()), so a seq
+    means the same utterance on every worker. Bots with a shared transcript
+    are listed under "transcript-bots" so any worker can catch up on all of
+    them (see sync_all()).
+    """
+
+    def __init__(
+        self,
+        max_bots: Optional[int] = None,
+        shared: Optional[SharedState] = None,
+        shared_ttl: Optional[float] = None
+    ):
+        """
+        Initialize the transcript store
+
+        Args:
+            max_bots: Most bots kept in memory; beyond this the least
+                recently updated bot nobody is subscribed to is evicted
+                (defaults to env var)
+            shared: Storage shared with the other worker processes
+            shared_ttl: Seconds a bot's shared transcript outlives its last
+                utterance (defaults to env var)
+        """
+        self.max_bots = max_bots or int(os.getenv('TRANSCRIPT_STORE_MAX_BOTS', '256'))
+        self.shared = shared
+        self.shared_ttl = shared_ttl or float(os.getenv('SHARED_TRANSCRIPT_TTL', '86400'))
+        self._bots: "OrderedDict[str, _BotTranscript]" = OrderedDict()
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._mirrors: List[Callable[[str, int], None]] = []
+        self._pins: Dict[str, int] = {}
+        # Length, dedup keys and (without shared state) compressed rows of
+        # evicted bots, so one that comes back continues its seqs and does
+        # not take redelivered events or run listeners again
+        self._retired: "OrderedDict[str, Tuple[int, set, Optional[bytes]]]" = OrderedDict()
+        # Tags the utterances this process received in shared state
+        self._origin = uuid.uuid4().hex
+
+    def add_listener(self, listener: Callable[[str, int], None], every_worker: bool = False) -> None:
+        """
+        Register a callback invoked with (bot_id, seq) after each append
+
+        With shared state, only the worker that received an utterance calls
+        its listeners, so it is persisted once. Listeners added with
+        every_worker are called by each worker as its log catches up, for
+        state every worker keeps for itself, such as search indexes.
+        """
+        if every_worker:
+            self._mirrors.append(listener)
+        else:
+            self._listeners.append(listener)
+
+    def pin(self, bot_id: str) -> None:
+        """Keep a bot in memory until as many unpin() calls, e.g. while it has subscribers"""
+        self._pins[bot_id] = self._pins.get(bot_id, 0) + 1
+
+    def unpin(self, bot_id: str) -> None:
+        count = self._pins.pop(bot_id, 0) - 1
+        if count > 0:
+            self._pins[bot_id] = count
+
+    def has(self, bot_id: str) -> bool:
+        """Whether any utterance has been received for a bot"""
+        return bot_id in self._bots
+
+    def next_seq(self, bot_id: str) -> int:
+        """Sequence number the next utterance for a bot will get"""
+        log = self._bots.get(bot_id)
+        return len(log) if log is not None else 0
+
+    def append(
+        self,
+        bot_id: str,
+        speaker: str,
+        text: str,
+        start_time: float,
+        end_time: float,
+        key: Any = None
+    ) -> Optional[int]:
+        """
+        Append an utterance to a bot's transcript
+
+        Args:
+            bot_id: ID of the bot
+            speaker: Speaker name
+            text: Utterance text
+            start_time: Start offset in seconds
+            end_time: End offset in seconds
+            key: Idempotency key (defaults to speaker, start time and text)
+
+        Returns:
+            Sequence number of the new utterance, or None if it was a duplicate
+        """
+        log = self._log(bot_id)
+        if key is None:
+            key = (speaker, round(start_time, 3), text)
+        seq = log.append_once(key, speaker, text, start_time, end_time)
+
+        if seq is not None:
+            for listener in self._listeners + self._mirrors:
+                listener(bot_id, seq)
+        return seq
+
+    def _log(self, bot_id: str) -> _BotTranscript:
+        """A bot's log, created if needed and marked most recently updated"""
+        log = self._bots.get(bot_id)
+        if log is None:
+            log = self._bots[bot_id] = _BotTranscript()
+            retired = self._retired.pop(bot_id, None)
+            if retired is not None:
+                log.handled, log.keys, rows = retired
+                if rows is not None:
+                    columns = json.loads(zlib.decompress(rows))
+                    speakers = columns["speakers"]
+                    for speaker_id, text, start, end in zip(
+                        columns["speaker"], columns["text"], columns["start_time"], columns["end_time"]
+                    ):
+                        log.append(speakers[speaker_id], text, start, end)
+            self._evict(keep=bot_id)
+        else:
+            self._bots.move_to_end(bot_id)
+        return log
+
+    def _evict(self, keep: str) -> None:
+        """
+        Evict the least recently updated bots beyond max_bots, skipping pinned ones
+
+        With shared state an evicted bot's rows are reloaded from the shared
+        list when it comes back; without, they are kept compressed. Beyond
+        max_bots * 4 evicted bots, the oldest is forgotten entirely.
+        """
+        excess = len(self._bots) - self.max_bots
+        for bot_id in list(self._bots):
+            if excess <= 0:
+                break
+            if bot_id == keep or self._pins.get(bot_id):
+                continue
+            log = self._bots.pop(bot_id)
+            rows = None
+            if self.shared is None:
+                rows = zlib.compress(json.dumps(log.columns()).encode("utf-8"))
+            self._retired[bot_id] = (max(len(log), log.handled), log.keys, rows)
+            excess -= 1
+        while len(self._retired) > self.max_bots * 4:
+            self._retired.popitem(last=False)
+
+    def ingest_event(self, payload: Dict[str, Any]) -> Optional[int]:
+        """
+        Append the utterance carried by a Recall.ai transcript webhook
+
+        Args:
+            payload: Webhook JSON body
+
+        Returns:
+            Sequence number of the new utterance, or None if the event was
+            ignored or already received
+        """
+        parsed = parse_webhook_event(payload)
+        if parsed is None:
+            return None
+        bot_id, utterance = parsed
+        key = ("id", utterance["id"]) if utterance["id"] is not None else None
+        return self.append(
+            bot_id,
+            utterance["speaker"],
+            utterance["text"],
+            utterance["start_time"],
+            utterance["end_time"],
+            key=key
+        )
+
+    async def ingest(self, payload: Dict[str, Any]) -> Optional[int]:
+        """
+        Append the utterance carried by a webhook, through shared state if any
+
+        Without shared state this is ingest_event(). With it, duplicates are
+        rejected across all workers and the utterance is appended to the
+        shared list before this worker's log catches up with it.
+
+        Args:
+            payload: Webhook JSON body
+
+        Returns:
+            Sequence number of the new utterance, or None if the event was
+            ignored or already received
+
+        Raises:
+            ConnectionError: If shared state cannot be reached
+        """
+        if self.shared is None:
+            return self.ingest_event(payload)
+        parsed = parse_webhook_event(payload)
+        if parsed is None:
+            return None
+        bot_id, utterance = parsed
+        if utterance["id"] is not None:
+            key = ["id", utterance["id"]]
+        else:
+            key = [utterance["speaker"], round(utterance["start_time"], 3), utterance["text"]]
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        if not await self.shared.set(f"transcript:{bot_id}:seen:{digest}", "1", ttl=self.shared_ttl, only_new=True):
+            return None
+        row = {field: utterance[field] for field in ("speaker", "text", "start_time", "end_time")}
+        row["origin"] = self._origin
+        length = await self.shared.push(f"transcript:{bot_id}", json.dumps(row), ttl=self.shared_ttl)
+        if length == 1:
+            await self.shared.push("transcript-bots", bot_id, ttl=self.shared_ttl)
+        await self.sync(bot_id)
+        return length - 1
+
+    async def sync(self, bot_id: str) -> int:
+        """
+        Append the utterances other workers received for a bot
+
+        A no-op without shared state. Shared state errors are logged and
+        leave the local log as it was.
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            Number of utterances appended
+        """
+        if self.shared is None:
+            return 0
+        log = self._bots.get(bot_id)
+        start = len(log) if log is not None else 0
+        try:
+            rows = await self.shared.range(f"transcript:{bot_id}", start)
+        except (ConnectionError, OSError) as e:
+            print(f"Error syncing transcript for {bot_id}: {e}")
+            return 0
+        if not rows:
+            return 0
+        log = self._log(bot_id)
+        added = 0
+        for seq, raw in enumerate(rows, start):
+            # A concurrent sync may have appended some of these already
+            if seq != len(log):
+                if seq < len(log):
+                    continue
+                break
+            row = json.loads(raw)
+            log.append(row["speaker"], row["text"], row["start_time"], row["end_time"])
+            added += 1
+            if seq < log.handled:
+                # Reloaded after an eviction; handled the first time
+                continue
+            if row.get("origin") == self._origin:
+                for listener in self._listeners:
+                    listener(bot_id, seq)
+            for listener in self._mirrors:
+                listener(bot_id, seq)
+        return added
+
+    async def sync_all(self) -> int:
+        """
+        Catch up on the utterances every worker received for any bot
+
+        A no-op without shared state. Errors are logged as in sync().
+
+        Returns:
+            Number of utterances appended
+        """
+        if self.shared is None:
+            return 0
+        try:
+            bot_ids = {raw.decode("utf-8") for raw in await self.shared.range("transcript-bots")}
+        except (ConnectionError, OSError) as e:
+            print(f"Error listing shared transcripts: {e}")
+            return 0
+        return sum(await asyncio.gather(*(self.sync(bot_id) for bot_id in bot_ids)))
+
+    def transcript(self, bot_id: str) -> Optional[Transcript]:
+        """Get a bot's live transcript model, or None if nothing was received"""
+        return self._bots.get(bot_id)
+
+    def since(self, bot_id: str, seq: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get every utterance received from sequence number `seq` onward
+
+        Args:
+            bot_id: ID of the bot
+            seq: First sequence number to return
+
+        Returns:
+            Utterances in arrival order, each with its seq
+        """
+        log = self._bots.get(bot_id)
+        return log.utterances(seq) if log is not None else []
+
+    def utterances(self, bot_id: str) -> List[Dict[str, Any]]:
+        """Get a bot's full transcript ordered by start time"""
+        log = self._bots.get(bot_id)
+        return log.time_ordered_utterances() if log is not None else []
+
+    def segments(self, bot_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a bot's transcript in Recall.ai's segment format
+
+        Args:
+            bot_id: ID of the bot
+
+        Returns:
+            List of segments ordered by start time (see segment_from_utterance)
+        """
+        log = self._bots.get(bot_id)
+        return log.segments() if log is not None else []
+
+    def clear(self, bot_id: str) -> None:
+        """Drop everything stored for a bot"""
+        self._bots.pop(bot_id, None)
+        self._retired.pop(bot_id, None)
@@ -0,0 +1,226 @@
+"""
+Transcript Streaming Service for Meeting Agent
+Fans live transcript updates for a bot out to any number of subscribers
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+from .transcription import TranscriptionService
+from .transcript_store import TranscriptStore
+
+# Maximum batches buffered for one subscriber before it is dropped as too slow
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def _close_queue(queue: asyncio.Queue) -> None:
+    """Signal the end of a subscription, making room for the marker if needed"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(None)
+
+
+class TranscriptSubscription:
+    """Async iterator over the utterance batches pushed for one bot"""
+
+    def __init__(self, queue: asyncio.Queue):
+        self._queue = queue
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Wait for the next batch, or None once the feed has closed"""
+        return await self._queue.get()
+
+    def __aiter__(self) -> "TranscriptSubscription":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        batch = await self.get()
+        if batch is None:
+            raise StopAsyncIteration
+        return batch
+
+
+class _BotFeed:
+    """One upstream fetcher for a bot, shared by all of its subscribers"""
+
+    def __init__(
+        self,
+        bot_id: str,
+        service: TranscriptionService,
+        poll_interval: float,
+        store: Optional[TranscriptStore] = None
+    ):
+        self.bot_id = bot_id
+        self.service = service
+        self.poll_interval = poll_interval
+        self.store = store
+        # Set by the store when a webhook appends to this bot
+        self.wakeup = asyncio.Event()
+        self.utterances: List[Dict[str, Any]] = []
+        # Subscriber queue -> index of the next utterance it still needs
+        self.subscribers: Dict[asyncio.Queue, int] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def batch(self, start: int) -> Dict[str, Any]:
+        """Build the message carrying every utterance from index `start`"""
+        return {
+            "type": "utterances",
+            "bot_id": self.bot_id,
+            "start": start,
+            "utterances": self.utterances[start:]
+        }
+
+    def add_subscriber(self, queue: asyncio.Queue, since: int) -> None:
+        """Register a subscriber and hand it any utterances it has not seen"""
+        self.subscribers[queue] = max(since, 0)
+        self.publish()
+
+    def publish(self) -> None:
+        """Push unseen utterances to every subscriber, dropping any that fell behind"""
+        total = len(self.utterances)
+        for queue, since in list(self.subscribers.items()):
+            if since >= total:
+                continue
+            try:
+                queue.put_nowait(self.batch(since))
+                self.subscribers[queue] = total
+            except asyncio.QueueFull:
+                del self.subscribers[queue]
+                _close_queue(queue)
+
+    async def poll_once(self) -> None:
+        """Fetch utterances not seen before, or changed since, and publish them"""
+        cursor = len(self.utterances)
+        if self.store is not None:
+            # Utterances other workers received are only seen by polling
+            await self.store.sync(self.bot_id)
+        if self.store is not None and self.store.has(self.bot_id):
+            # Webhook-fed bots: seq numbers double as utterance indexes
+            start, rows = cursor, self.store.since(self.bot_id, cursor)
+        else:
+            # Recall.ai may have added words to the last segment seen
+            delta = await self.service.get_transcript_since(self.bot_id, max(cursor - 1, 0))
+            rows = delta["segments"]
+            start = rows[0]["index"] if rows else cursor
+        self.update(start, [{key: row[key] for key in ("speaker", "text", "start_time", "end_time")} for row in rows])
+
+    def update(self, start: int, utterances: List[Dict[str, Any]]) -> None:
+        """
+        Apply utterances from index `start` and publish any that changed
+        
+        Subscribers already past a changed utterance are sent it again;
+        batches carry their `start`, so clients replace from there.
+        """
+        changed = start
+        end = start + len(utterances)
+        while changed < min(end, len(self.utterances)) and self.utterances[changed] == utterances[changed - start]:
+            changed += 1
+        if changed == end:
+            return
+        self.utterances[changed:] = utterances[changed - start:]
+        for queue, since in self.subscribers.items():
+            self.subscribers[queue] = min(since, changed)
+        self.publish()
+
+    async def run(self) -> None:
+        """Poll until the last subscriber leaves, waking early on webhook appends"""
+        delay = self.poll_interval
+        while self.subscribers:
+            self.wakeup.clear()
+            try:
+                await self.poll_once()
+                delay = self.poll_interval
+            except Exception as e:
+                print(f"Error streaming transcript for {self.bot_id}: {e}")
+                delay = min(delay * 2, self.poll_interval * 8)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+class TranscriptBroadcaster:
+    """Runs one transcript fetcher per bot and fans updates out to subscribers"""
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        poll_interval: Optional[float] = None,
+        store: Optional[TranscriptStore] = None
+    ):
+        """
+        Initialize the broadcaster
+
+        Args:
+            service: Transcription service used to fetch transcripts
+            poll_interval: Seconds between upstream fetches (defaults to env var)
+            store: Webhook-fed transcript store; bots found there are pushed
+                as soon as an utterance is appended instead of polled
+        """
+        self.service = service
+        self.poll_interval = poll_interval or float(os.getenv('TRANSCRIPT_POLL_INTERVAL', '2.0'))
+        self.store = store
+        self._feeds: Dict[str, _BotFeed] = {}
+        if store is not None:
+            store.add_listener(self._on_append)
+
+    def _on_append(self, bot_id: str, seq: int) -> None:
+        """Wake the fetcher of a bot that just received a webhook utterance"""
+        feed = self._feeds.get(bot_id)
+        if feed is not None:
+            feed.wakeup.set()
+
+    def subscriber_count(self, bot_id: str) -> int:
+        """Number of clients currently subscribed to a bot"""
+        feed = self._feeds.get(bot_id)
+        return len(feed.subscribers) if feed else 0
+
+    @asynccontextmanager
+    async def subscribe(self, bot_id: str, since: int = 0) -> AsyncIterator[TranscriptSubscription]:
+        """
+        Subscribe to live utterances for a bot
+
+        Utterances already fetched from index `since` onward are delivered
+        first, followed by new ones as the shared fetcher finds them.
+
+        Args:
+            bot_id: ID of the bot
+            since: Index of the first utterance the client still needs
+
+        Yields:
+            TranscriptSubscription producing utterance batches
+        """
+        feed = self._feeds.get(bot_id)
+        if feed is None:
+            feed = self._feeds[bot_id] = _BotFeed(bot_id, self.service, self.poll_interval, self.store)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        feed.add_subscriber(queue, since)
+        if self.store is not None:
+            # A subscribed bot's log must keep its seqs
+            self.store.pin(bot_id)
+        if feed.task is None or feed.task.done():
+            feed.task = asyncio.create_task(feed.run())
+
+        try:
+            yield TranscriptSubscription(queue)
+        finally:
+            if self.store is not None:
+                self.store.unpin(bot_id)
+            feed.subscribers.pop(queue, None)
+            if not feed.subscribers and self._feeds.get(bot_id) is feed:
+                if feed.task is not None:
+                    feed.task.cancel()
+                self._feeds.pop(bot_id, None)
+
+    async def close(self) -> None:
+        """Stop every fetcher and end all subscriptions"""
+        feeds = list(self._feeds.values())
+        self._feeds.clear()
+        for feed in feeds:
+            for queue in feed.subscribers:
+                _close_queue(queue)
+            feed.subscribers.clear()
+            if feed.task is not None:
+                feed.task.cancel()
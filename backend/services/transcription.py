@@ -2,27 +2,103 @@
 Transcription Service for Meeting Agent
 Handles joining meetings and transcribing with Recall.ai + Deepgram
 """
+import asyncio
+import json
 import os
-import requests
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+import re
+import httpx
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 
-load_dotenv()
+from .http_client import UpstreamClient, get_upstream
+from .meeting_db import MeetingDatabase
+from .transcript_model import Transcript, utterance_from_segment  # noqa: F401 (re-exported)
+from .transcript_store import TranscriptStore
+
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def _parse_elements(text: str, pos: int) -> Tuple[List[Any], List[int]]:
+    """
+    Parse JSON array elements starting at `pos` up to the closing bracket
+    
+    Args:
+        text: JSON document
+        pos: Offset just past the opening bracket or a separating comma
+        
+    Returns:
+        Tuple of (elements, start offset of each element)
+    """
+    elements, starts = [], []
+    pos = _whitespace.match(text, pos).end()
+    if text[pos] == ']':
+        return elements, starts
+    while True:
+        starts.append(pos)
+        element, pos = _decoder.raw_decode(text, pos)
+        elements.append(element)
+        pos = _whitespace.match(text, pos).end()
+        if text[pos] == ']':
+            return elements, starts
+        if text[pos] != ',':
+            raise ValueError(f"Malformed transcript array at offset {pos}")
+        pos = _whitespace.match(text, pos + 1).end()
+
+
+class _PulledTranscript:
+    """Transcript segments already fetched from Recall.ai for one bot"""
+    
+    __slots__ = ("segments", "model", "prefix", "etag")
+    
+    def __init__(self, segments: List[Dict[str, Any]], model: Transcript, prefix: str, etag: Optional[str]):
+        self.segments = segments
+        # Utterance model of the segments, updated along with them
+        self.model = model
+        # Raw response text up to the start of the last segment; a later
+        # response beginning with it only needs its tail parsed
+        self.prefix = prefix
+        self.etag = etag
 
 
 class TranscriptionService:
     """Service for managing meeting transcription via Recall.ai"""
     
-    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        upstream: Optional[UpstreamClient] = None,
+        store: Optional[TranscriptStore] = None,
+        webhook_url: Optional[str] = None,
+        max_cached_bots: int = 256,
+        database: Optional[MeetingDatabase] = None
+    ):
         """
         Initialize the transcription service
         
         Args:
             api_key: Recall.ai API key (defaults to env var)
             api_url: Recall.ai API base URL (defaults to env var)
+            upstream: Pooled HTTP client (defaults to the shared "recall" pool)
+            store: Webhook-fed transcript store served before calling Recall.ai
+            webhook_url: Public URL of the real-time transcript webhook (defaults to env var)
+            max_cached_bots: Most bots whose fetched transcripts are kept in memory
+            database: Local storage serving the transcripts of finished meetings
         """
         self.api_key = api_key or os.getenv('RECALL_API_KEY')
         self.api_url = api_url or os.getenv('RECALL_API_URL', 'https://api.recall.ai/api/v1')
+        self._upstream = upstream
+        self.store = store
+        self.webhook_url = webhook_url or os.getenv('RECALL_WEBHOOK_URL')
+        self.max_cached_bots = max_cached_bots
+        self.database = database
+        self._pulled: "OrderedDict[str, _PulledTranscript]" = OrderedDict()
+        # In-flight fetches per bot, shared by concurrent readers
+        self._fetching: Dict[str, asyncio.Future] = {}
+        # Models of finished meetings read from the database; they never change
+        self._finished: "OrderedDict[str, Transcript]" = OrderedDict()
         
         if not self.api_key:
             raise ValueError("RECALL_API_KEY must be set in environment or passed to constructor")
@@ -32,7 +108,12 @@ class TranscriptionService:
             'Content-Type': 'application/json'
         }
     
-    def join_meeting(self, meeting_url: str, bot_name: str = "Meeting Agent") -> Dict[str, Any]:
+    @property
+    def upstream(self) -> UpstreamClient:
+        """Pooled HTTP client used for Recall.ai requests"""
+        return self._upstream or get_upstream("recall")
+    
+    async def join_meeting(self, meeting_url: str, bot_name: str = "Meeting Agent") -> Dict[str, Any]:
         """
         Join a meeting with the bot
         
@@ -44,7 +125,7 @@ class TranscriptionService:
             Dictionary with bot information including bot_id
             
         Raises:
-            requests.exceptions.RequestException: If API request fails
+            httpx.HTTPError: If API request fails
         """
         endpoint = f"{self.api_url}/bot/"
         
@@ -56,39 +137,267 @@ class TranscriptionService:
                 "model": "nova-2"
             }
         }
+        if self.webhook_url:
+            # Have Recall.ai push transcript events as they are produced
+            payload["real_time_transcription"] = {
+                "destination_url": self.webhook_url,
+                "partial_results": False
+            }
         
         try:
-            response = requests.post(endpoint, json=payload, headers=self.headers)
+            response = await self.upstream.post(endpoint, json=payload, headers=self.headers)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error joining meeting: {e}")
             raise
     
-    def get_transcript(self, bot_id: str) -> Dict[str, Any]:
+    async def get_transcript(self, bot_id: str) -> Any:
         """
         Get transcript for a bot
         
+        Served from the webhook-fed store when it has the bot, then from
+        the local database for finished meetings, otherwise fetched from
+        Recall.ai.
+        
+        Args:
+            bot_id: ID of the bot
+            
+        Returns:
+            Transcript data (a list of speaker segments)
+            
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        if self.store is not None:
+            await self.store.sync(bot_id)
+            if self.store.has(bot_id):
+                return self.store.segments(bot_id)
+        if self.database is not None and self.database.is_finished(bot_id):
+            return (await self.get_transcript_model(bot_id)).segments()
+        
+        segments = await self._fetch_transcript(bot_id)
+        return list(segments) if isinstance(segments, list) else segments
+    
+    async def get_transcript_model(self, bot_id: str) -> Transcript:
+        """
+        Get a bot's transcript as a Transcript model
+        
+        Sources are tried in the same order as get_transcript. The model
+        is shared and kept up to date, so callers must not modify it.
+        
+        Args:
+            bot_id: ID of the bot
+            
+        Returns:
+            Transcript with one utterance per segment, in arrival order
+            
+        Raises:
+            httpx.HTTPError: If API request fails
+            ValueError: If Recall.ai returns something other than segments
+        """
+        if self.store is not None:
+            await self.store.sync(bot_id)
+            if self.store.has(bot_id):
+                return self.store.transcript(bot_id)
+        if self.database is not None and self.database.is_finished(bot_id):
+            model = self._finished.get(bot_id)
+            if model is None:
+                rows = await asyncio.to_thread(self.database.segments, bot_id)
+                model = self._finished[bot_id] = Transcript.from_utterances(rows)
+                while len(self._finished) > self.max_cached_bots:
+                    self._finished.popitem(last=False)
+            else:
+                self._finished.move_to_end(bot_id)
+            return model
+        
+        segments = await self._fetch_transcript(bot_id)
+        if not isinstance(segments, list):
+            raise ValueError("Unexpected transcript format from Recall.ai")
+        return self._pulled[bot_id].model
+    
+    async def get_transcript_since(self, bot_id: str, since: int = 0) -> Dict[str, Any]:
+        """
+        Get the transcript segments added after a cursor
+        
+        The cursor is a segment index: pass the previous `next_cursor` to
+        receive only what arrived since the last call. The last segment of
+        a transcript fetched from Recall.ai grows while its speaker talks,
+        so it is sent again (with the same `index`) until another follows.
+        
         Args:
             bot_id: ID of the bot
+            since: Index of the first segment to return
             
         Returns:
-            Dictionary with transcript data
+            Dictionary with the new `segments` (flattened utterances, each
+            with its `index`) and the `next_cursor`
             
         Raises:
-            requests.exceptions.RequestException: If API request fails
+            httpx.HTTPError: If API request fails
+        """
+        return self.delta(bot_id, await self.get_transcript_model(bot_id), since)
+    
+    def delta(self, bot_id: str, model: Transcript, since: int = 0) -> Dict[str, Any]:
+        """
+        Build the get_transcript_since response from a transcript model
+        
+        Args:
+            bot_id: ID of the bot
+            model: The bot's transcript
+            since: Index of the first segment to return
+            
+        Returns:
+            Dictionary with the new `segments` and the `next_cursor`
+        """
+        since, next_cursor = self.cursor_range(bot_id, model, since)
+        rows = model.utterances(since)
+        for row in rows:
+            row["index"] = row.pop("seq")
+        return {
+            "bot_id": bot_id,
+            "segments": rows,
+            "next_cursor": next_cursor
+        }
+    
+    def cursor_range(self, bot_id: str, model: Transcript, since: int) -> Tuple[int, int]:
+        """
+        First segment a `since` request returns, and the cursor to hand back
+        
+        Args:
+            bot_id: ID of the bot
+            model: The bot's transcript
+            since: Cursor the client sent
+            
+        Returns:
+            (start, next_cursor); both stop short of the last segment while
+            Recall.ai may still rewrite it
+        """
+        since = max(since, 0)
+        if len(model) and self.recall_segments(bot_id, model) is not None:
+            return min(since, len(model) - 1), len(model) - 1
+        return since, max(len(model), since)
+    
+    def recall_segments(self, bot_id: str, model: Transcript) -> Optional[List[Dict[str, Any]]]:
+        """
+        Recall.ai's own segments behind a model fetched from it
+        
+        Args:
+            bot_id: ID of the bot
+            model: Model returned by get_transcript_model
+            
+        Returns:
+            The segments as Recall.ai sent them, or None for models from the
+            store or the database (see Transcript.segments)
+        """
+        pulled = self._pulled.get(bot_id)
+        return pulled.segments if pulled is not None and pulled.model is model else None
+    
+    async def _fetch_transcript(self, bot_id: str) -> Any:
+        """
+        Fetch a transcript from Recall.ai, parsing only what changed
+        
+        Recall.ai returns the whole transcript on every call. The previous
+        response is remembered per bot: a 304 reuses it outright, and a
+        response that extends it has only its tail parsed. Concurrent
+        fetches for one bot share a single request, since each one updates
+        the remembered segments and model in place.
+        
+        Args:
+            bot_id: ID of the bot
+            
+        Returns:
+            The parsed transcript (normally a list of speaker segments)
         """
+        fetch = self._fetching.get(bot_id)
+        if fetch is None:
+            fetch = self._fetching[bot_id] = asyncio.ensure_future(self._pull(bot_id))
+            fetch.add_done_callback(lambda done: self._fetch_done(bot_id, done))
+        # A cancelled reader must not cancel the fetch the others wait on
+        return await asyncio.shield(fetch)
+    
+    def _fetch_done(self, bot_id: str, fetch: asyncio.Future) -> None:
+        if self._fetching.get(bot_id) is fetch:
+            del self._fetching[bot_id]
+        if not fetch.cancelled():
+            # Retrieved here too, in case every reader was cancelled
+            fetch.exception()
+    
+    async def _pull(self, bot_id: str) -> Any:
+        """Fetch a transcript and update the remembered segments and model (see _fetch_transcript)"""
         endpoint = f"{self.api_url}/bot/{bot_id}/transcript/"
+        cached = self._pulled.get(bot_id)
+        headers = self.headers
+        if cached is not None and cached.etag:
+            headers = dict(headers, **{'If-None-Match': cached.etag})
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = await self.upstream.get(endpoint, headers=headers)
+            if response.status_code == 304 and cached is not None:
+                self._pulled.move_to_end(bot_id)
+                return cached.segments
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error getting transcript: {e}")
             raise
+        
+        text = response.text
+        start = _whitespace.match(text).end()
+        if not text.startswith('[', start):
+            return response.json()
+        
+        tail, starts = [], []
+        if cached is not None and cached.segments and text.startswith(cached.prefix):
+            # Unchanged prefix: re-parse only the last known segment onward
+            tail, starts = _parse_elements(text, len(cached.prefix))
+        if tail:
+            segments, model = cached.segments, cached.model
+            if tail[0] == segments[-1]:
+                # The last segment is unchanged; keep the model (and its encodings) as is
+                segments.extend(tail[1:])
+                tail = tail[1:]
+            else:
+                segments[len(segments) - 1:] = tail
+                model.truncate(len(segments) - len(tail))
+            for segment in tail:
+                utterance = utterance_from_segment(segment)
+                model.append(utterance["speaker"], utterance["text"], utterance["start_time"], utterance["end_time"])
+        else:
+            segments, starts = _parse_elements(text, start + 1)
+            model = Transcript.from_segments(segments)
+        
+        prefix = text[:starts[-1]] if starts else text[:start + 1]
+        self._remember(bot_id, _PulledTranscript(segments, model, prefix, response.headers.get('ETag')))
+        return segments
+    
+    async def archive(self, bot_id: str) -> int:
+        """
+        Store a finished meeting's transcript in the local database
+        
+        Later reads of the transcript are served locally instead of from
+        Recall.ai.
+        
+        Args:
+            bot_id: ID of the bot
+            
+        Returns:
+            Number of utterances stored
+        """
+        if self.database is None or self.database.is_finished(bot_id):
+            return 0
+        utterances = (await self.get_transcript_model(bot_id)).time_ordered_utterances()
+        self.database.finish_meeting(bot_id, utterances)
+        self._pulled.pop(bot_id, None)
+        return len(utterances)
+    
+    def _remember(self, bot_id: str, pulled: _PulledTranscript) -> None:
+        """Cache a fetched transcript, evicting the least recently used bot"""
+        self._pulled[bot_id] = pulled
+        self._pulled.move_to_end(bot_id)
+        while len(self._pulled) > self.max_cached_bots:
+            self._pulled.popitem(last=False)
     
-    def get_bot_status(self, bot_id: str) -> Dict[str, Any]:
+    async def get_bot_status(self, bot_id: str) -> Dict[str, Any]:
         """
         Get status of a bot
         
@@ -101,14 +410,14 @@ class TranscriptionService:
         endpoint = f"{self.api_url}/bot/{bot_id}/"
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = await self.upstream.get(endpoint, headers=self.headers)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error getting bot status: {e}")
             raise
     
-    def leave_meeting(self, bot_id: str) -> Dict[str, Any]:
+    async def leave_meeting(self, bot_id: str) -> Dict[str, Any]:
         """
         Make the bot leave a meeting
         
@@ -121,9 +430,9 @@ class TranscriptionService:
         endpoint = f"{self.api_url}/bot/{bot_id}/"
         
         try:
-            response = requests.delete(endpoint, headers=self.headers)
+            response = await self.upstream.delete(endpoint, headers=self.headers)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error leaving meeting: {e}")
             raise
@@ -3,25 +3,63 @@ Voice Service for Meeting Agent
 Handles text-to-speech with Cartesia
 """
 import os
-import requests
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+import httpx
+from typing import Optional, Dict, Any, AsyncIterator, Union
 
-load_dotenv()
+from .audio_cache import AudioCache
+from .http_client import UpstreamClient, get_upstream
+from .llm_cache import cache_key
+
+
+DEFAULT_VOICE = "a0e99841-438c-4a64-b679-ae501e7d6091"  # Professional male voice
+
+# Named Cartesia output formats, largest first (approximate bytes per second of speech)
+AUDIO_FORMATS = {
+    "wav_f32": {"container": "wav", "encoding": "pcm_f32le", "sample_rate": 44100},  # 176 KB/s
+    "wav_s16": {"container": "wav", "encoding": "pcm_s16le", "sample_rate": 44100},  # 88 KB/s
+    "wav_s16_22k": {"container": "wav", "encoding": "pcm_s16le", "sample_rate": 22050},  # 44 KB/s
+    "wav_s16_16k": {"container": "wav", "encoding": "pcm_s16le", "sample_rate": 16000},  # 32 KB/s
+    "mp3": {"container": "mp3", "sample_rate": 44100, "bit_rate": 128000}  # 16 KB/s
+}
+
+DEFAULT_AUDIO_FORMAT = "wav_s16"
+
+CONTAINER_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "raw": "application/octet-stream"
+}
 
 
 class VoiceService:
     """Service for generating speech using Cartesia TTS"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        upstream: Optional[UpstreamClient] = None,
+        cache: Optional[AudioCache] = None,
+        output_format: Union[str, Dict[str, Any], None] = None
+    ):
         """
         Initialize the voice service
         
         Args:
             api_key: Cartesia API key (defaults to env var)
+            api_url: Cartesia TTS endpoint (defaults to env var)
+            upstream: Pooled HTTP client (defaults to the shared "cartesia" pool)
+            cache: Cache of synthesized clips (defaults to one built from env vars)
+            output_format: Default format, a name from AUDIO_FORMATS or a
+                Cartesia output_format dict (defaults to env var)
         """
         self.api_key = api_key or os.getenv('CARTESIA_API_KEY')
-        self.api_url = "https://api.cartesia.ai/tts/bytes"
+        self.api_url = api_url or os.getenv('CARTESIA_API_URL', 'https://api.cartesia.ai/tts/bytes')
+        self._upstream = upstream
+        self.cache = cache or AudioCache.from_env()
+        self.output_format = self.resolve_format(
+            output_format or os.getenv('VOICE_AUDIO_FORMAT', DEFAULT_AUDIO_FORMAT)
+        )
         
         if not self.api_key:
             raise ValueError("CARTESIA_API_KEY must be set in environment or passed to constructor")
@@ -32,36 +70,57 @@ class VoiceService:
             'Content-Type': 'application/json'
         }
     
-    def generate_audio(
-        self, 
-        text: str, 
-        voice: str = "a0e99841-438c-4a64-b679-ae501e7d6091",  # Professional male voice
-        model: str = "sonic-english",
-        output_format: Dict[str, Any] = None
-    ) -> bytes:
+    @property
+    def upstream(self) -> UpstreamClient:
+        """Pooled HTTP client used for Cartesia requests"""
+        return self._upstream or get_upstream("cartesia")
+    
+    def resolve_format(self, output_format: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
         """
-        Generate audio from text
+        Resolve an output format name or dict to a Cartesia output_format
         
         Args:
-            text: Text to convert to speech
-            voice: Voice ID to use (default is professional male)
-            model: TTS model to use
-            output_format: Audio output format configuration
+            output_format: Name from AUDIO_FORMATS, a format dict, or None
+                for the service default
             
         Returns:
-            Audio bytes
+            Cartesia output_format dict
             
         Raises:
-            requests.exceptions.RequestException: If API request fails
+            ValueError: If the name is not a known format
         """
         if output_format is None:
-            output_format = {
-                "container": "wav",
-                "encoding": "pcm_f32le",
-                "sample_rate": 44100
-            }
+            return self.output_format
+        if isinstance(output_format, dict):
+            return output_format
+        if output_format not in AUDIO_FORMATS:
+            raise ValueError(
+                f"Unknown audio format {output_format!r}; expected one of {', '.join(AUDIO_FORMATS)}"
+            )
+        return AUDIO_FORMATS[output_format]
+    
+    def media_type(self, output_format: Union[str, Dict[str, Any], None] = None) -> str:
+        """
+        Get the MIME type of audio produced with an output format
         
-        payload = {
+        Args:
+            output_format: Audio output format name or configuration
+            
+        Returns:
+            MIME type such as audio/wav
+        """
+        container = self.resolve_format(output_format).get("container", "wav")
+        return CONTAINER_MEDIA_TYPES.get(container, "application/octet-stream")
+    
+    def _payload(
+        self,
+        text: str,
+        voice: str,
+        model: str,
+        output_format: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the Cartesia TTS request body"""
+        return {
             "model_id": model,
             "transcript": text,
             "voice": {
@@ -71,19 +130,113 @@ class VoiceService:
             "output_format": output_format,
             "language": "en"
         }
+    
+    def _cache_key(self, text: str, voice: str, model: str, output_format: Dict[str, Any]) -> str:
+        """Key a clip by everything that determines the synthesized audio"""
+        return cache_key(kind="tts", text=text, voice=voice, model=model, output_format=output_format)
+    
+    async def generate_audio(
+        self, 
+        text: str, 
+        voice: str = DEFAULT_VOICE,
+        model: str = "sonic-english",
+        output_format: Union[str, Dict[str, Any], None] = None
+    ) -> bytes:
+        """
+        Generate audio from text
         
+        Clips are cached by text, voice, model and format, so repeated
+        phrases are only synthesized once.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice ID to use (default is professional male)
+            model: TTS model to use
+            output_format: Audio output format name or configuration
+                (defaults to the service format)
+            
+        Returns:
+            Audio bytes
+            
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        text = " ".join(text.split())
+        output_format = self.resolve_format(output_format)
+        key = self._cache_key(text, voice, model, output_format)
+        return await self.cache.get_or_compute(
+            key, lambda: self._synthesize(self._payload(text, voice, model, output_format))
+        )
+    
+    async def _synthesize(self, payload: Dict[str, Any]) -> bytes:
+        """Request a whole clip from Cartesia"""
         try:
-            response = requests.post(
+            response = await self.upstream.post(
                 self.api_url,
                 json=payload,
                 headers=self.headers
             )
             response.raise_for_status()
             return response.content
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error generating audio: {e}")
             raise
     
+    async def stream_audio(
+        self,
+        text: str,
+        voice: str = DEFAULT_VOICE,
+        model: str = "sonic-english",
+        output_format: Union[str, Dict[str, Any], None] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Generate audio from text, yielding chunks as Cartesia sends them
+        
+        Chunks are passed through exactly as received, without buffering
+        or re-encoding, so playback can start after the first one. A cached
+        clip is yielded as a single chunk; a completed stream is cached.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice ID to use (default is professional male)
+            model: TTS model to use
+            output_format: Audio output format name or configuration
+                (defaults to the service format)
+            
+        Yields:
+            Raw audio byte chunks
+            
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        text = " ".join(text.split())
+        output_format = self.resolve_format(output_format)
+        key = self._cache_key(text, voice, model, output_format)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        payload = self._payload(text, voice, model, output_format)
+        chunks = []
+        try:
+            async with self.upstream.stream(
+                "POST",
+                self.api_url,
+                json=payload,
+                headers=self.headers
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    yield chunk
+        except httpx.HTTPError as e:
+            print(f"Error streaming audio: {e}")
+            raise
+        await self.cache.set(key, b"".join(chunks))
+    
     def save_audio(self, audio_bytes: bytes, filepath: str) -> None:
         """
         Save audio bytes to file
@@ -99,7 +252,7 @@ class VoiceService:
             print(f"Error saving audio: {e}")
             raise
     
-    def generate_and_save(self, text: str, filepath: str, **kwargs) -> str:
+    async def generate_and_save(self, text: str, filepath: str, **kwargs) -> str:
         """
         Generate audio from text and save to file
         
@@ -111,6 +264,6 @@ class VoiceService:
         Returns:
             Path to saved audio file
         """
-        audio_bytes = self.generate_audio(text, **kwargs)
+        audio_bytes = await self.generate_audio(text, **kwargs)
         self.save_audio(audio_bytes, filepath)
         return filepath
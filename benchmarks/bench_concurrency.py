@@ -0,0 +1,87 @@
+"""
+Concurrency benchmark for the Meeting Agent API
+
+Drives the FastAPI app with bursts of concurrent requests while every
+upstream is a local stub with fixed latency. With non-blocking services the
+wall time of a burst stays close to a single upstream round-trip; blocking
+services would make it grow linearly with the burst size.
+
+It also reports how many sockets each upstream saw in total: with the pooled
+keep-alive clients this stays bounded by the pool size instead of growing
+with the number of requests.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--latency 0.2] [--levels 1,10,50,100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from stubs import StubServer, recall_stub, openai_stub, cartesia_stub  # noqa: E402
+
+
+WORKLOADS = {
+    "transcript": ("recall", "GET", "/api/v1/transcript/bot_stub", None),
+    "summarize": ("openai", "POST", "/api/v1/summarize", {"transcript": "Alice: Hello everyone."}),
+    "speak": ("cartesia", "POST", "/api/v1/speak", {"text": "Could you clarify the timeline?"}),
+}
+
+
+async def run_burst(client: httpx.AsyncClient, method: str, path: str, body, size: int) -> float:
+    """Send `size` identical requests concurrently and return the wall time"""
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.request(method, path, json=body) for _ in range(size))
+    )
+    elapsed = time.perf_counter() - start
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"{path}: {len(failed)} failed requests ({failed[0]})")
+    return elapsed
+
+
+async def main(latency: float, levels, stubs) -> None:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client:
+        print(f"upstream latency: {latency * 1000:.0f} ms")
+        print(f"{'workload':<12}{'burst':>8}{'wall (s)':>12}{'req/s':>10}{'serial (s)':>12}{'speedup':>10}")
+        for name, (upstream, method, path, body) in WORKLOADS.items():
+            requests_sent = 0
+            for size in levels:
+                elapsed = await run_burst(client, method, path, body, size)
+                requests_sent += size
+                serial = size * latency
+                print(f"{name:<12}{size:>8}{elapsed:>12.3f}{size / elapsed:>10.1f}"
+                      f"{serial:>12.2f}{serial / elapsed:>9.1f}x")
+            print(f"{'':<12}{requests_sent} requests used {stubs[upstream].connections} upstream connections")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="stub upstream latency in seconds")
+    parser.add_argument("--levels", default="1,10,50,100", help="comma-separated burst sizes")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    with StubServer(recall_stub(args.latency)) as recall, \
+            StubServer(openai_stub(args.latency)) as openai, \
+            StubServer(cartesia_stub(args.latency)) as cartesia:
+        os.environ.update({
+            "RECALL_API_KEY": "bench",
+            "RECALL_API_URL": f"{recall.url}/api/v1",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{openai.url}/v1",
+            "CARTESIA_API_KEY": "bench",
+            "CARTESIA_API_URL": f"{cartesia.url}/tts/bytes",
+        })
+        stubs = {"recall": recall, "openai": openai, "cartesia": cartesia}
+        asyncio.run(main(args.latency, levels, stubs))
@@ -0,0 +1,81 @@
+"""
+Search latency benchmark for the Meeting Agent transcript index
+
+Builds a SearchIndex over synthetic transcripts (about 900 utterances per
+meeting hour, drawn from a Zipf-like vocabulary so common words have long
+posting lists) and times keyword, phrase and filtered queries against it.
+With NumPy installed ranking is vectorized; without it the pure Python
+fallback is timed.
+
+Usage:
+    python benchmarks/bench_search.py [--hours 1000] [--queries 200]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from services.search_index import SearchIndex, semantic_search_available  # noqa: E402
+
+UTTERANCES_PER_HOUR = 900
+MEETING_HOURS = 1
+SPEAKERS = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+
+
+def build(hours: int, seed: int = 7) -> SearchIndex:
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(20000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    index = SearchIndex()
+    utterances = hours * UTTERANCES_PER_HOUR
+    per_meeting = MEETING_HOURS * UTTERANCES_PER_HOUR
+    words = rng.choices(vocabulary, weights, k=utterances * 12)
+    for i in range(utterances):
+        meeting, seq = divmod(i, per_meeting)
+        text = " ".join(words[i * 12:(i + 1) * 12])
+        start = seq * 4.0
+        index.add(f"bot_{meeting}", seq, rng.choice(SPEAKERS), text, start, start + 3.5)
+    return index
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main(hours: int, queries: int) -> None:
+    started = time.perf_counter()
+    index = build(hours)
+    stats = index.stats()
+    print(f"indexed {stats['documents']} utterances ({hours} h), {stats['terms']} terms "
+          f"in {time.perf_counter() - started:.1f} s; numpy: {semantic_search_available()}")
+
+    rng = random.Random(11)
+    workloads = {
+        "common term": lambda: "w1",
+        "two terms": lambda: f"w{rng.randint(0, 50)} w{rng.randint(100, 5000)}",
+        "rare term": lambda: f"w{rng.randint(5000, 19999)}",
+        "phrase": lambda: f'"w{rng.randint(0, 5)} w{rng.randint(0, 5)}"',
+        "one meeting": lambda: f"w{rng.randint(0, 50)}",
+    }
+    print(f"{'query':<14}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for name, make_query in workloads.items():
+        bot_id = "bot_0" if name == "one meeting" else None
+        samples = []
+        for _ in range(queries):
+            query = make_query()
+            begin = time.perf_counter()
+            index.search(query, limit=10, bot_id=bot_id)
+            samples.append((time.perf_counter() - begin) * 1000)
+        print(f"{name:<14}{percentile(samples, 0.5):>10.2f}{percentile(samples, 0.99):>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=int, default=1000, help="hours of transcript to index")
+    parser.add_argument("--queries", type=int, default=200, help="queries timed per workload")
+    args = parser.parse_args()
+    main(args.hours, args.queries)
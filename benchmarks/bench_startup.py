@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark for the API server
+
+Starts `main.py` (one worker) in a fresh interpreter several times against
+a stub OpenAI server and measures, from the moment the process is spawned:
+
+- import:   seconds to import and build the app (`import main; main.app`, timed in its own interpreter)
+- ready:    first successful `GET /health`
+- first AI: first successful `POST /api/v1/summarize` (a distinct transcript
+            each run, so it is never served from the completion cache)
+
+Medians are compared with the targets and the exit status is non-zero
+when one is missed. The default targets are about 60% of what building
+every service at import took on a one-core machine (1.6 s to import,
+2.5 s to the first /health); pass your own on faster or slower hardware.
+With `--without-keys` the API keys are unset, which only the routes that
+need them should notice (there is then no first AI request to time).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--without-keys]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+from stubs import StubProcess, _free_port  # noqa: E402
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; main.app; print(time.perf_counter() - t)"
+
+
+def time_import(env: Dict[str, str]) -> float:
+    """Seconds a fresh interpreter takes to import the app"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def wait_for(request, started: float, timeout: float = 60.0) -> Optional[float]:
+    """Retry a request until it returns 200; seconds since `started`, or None on timeout"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if request().status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def cold_start(env: Dict[str, str], run: int, ask_ai: bool = True) -> Dict[str, Optional[float]]:
+    """Start the server once and time its first successful requests"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            ready = wait_for(lambda: client.get("/health"), started)
+            first_ai = None if not ask_ai else wait_for(
+                lambda: client.post("/api/v1/summarize", json={"transcript": f"Alice: cold start {run} at {time.time()}"}),
+                started,
+                timeout=10.0
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    return {"ready": ready, "first_ai": first_ai}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="cold starts measured")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub OpenAI latency in seconds")
+    parser.add_argument("--without-keys", action="store_true", help="start without any API keys set")
+    parser.add_argument("--target-import-ms", type=float, default=1000.0, help="median import time to stay under")
+    parser.add_argument("--target-ready-ms", type=float, default=1500.0, help="median time to first /health to stay under")
+    args = parser.parse_args()
+
+    with StubProcess("openai_stub", latency=args.latency) as openai:
+        env = dict(os.environ)
+        env.update({
+            "RECALL_API_KEY": "bench",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{openai.url}/v1",
+            "CARTESIA_API_KEY": "bench",
+            "MEETING_DB_PATH": "",
+            "LLM_CACHE_PATH": "",
+        })
+        if args.without_keys:
+            for name in ("RECALL_API_KEY", "OPENAI_API_KEY", "CARTESIA_API_KEY"):
+                env.pop(name)
+        imports = [time_import(env) for _ in range(args.runs)]
+        starts = [cold_start(env, run, ask_ai=not args.without_keys) for run in range(args.runs)]
+
+    results = {
+        "import": statistics.median(imports),
+        "ready": statistics.median(s["ready"] or float("inf") for s in starts),
+    }
+    if not args.without_keys:
+        results["first AI"] = statistics.median(s["first_ai"] or float("inf") for s in starts)
+    targets = {"import": args.target_import_ms, "ready": args.target_ready_ms}
+    missed = []
+    print(f"{'measure':<10}{'median (ms)':>13}{'target (ms)':>13}")
+    for name, seconds in results.items():
+        target = targets.get(name)
+        flag = ""
+        if target is not None and seconds * 1000 > target:
+            flag = "  MISSED"
+            missed.append(name)
+        shown = f"{target:.0f}" if target is not None else "-"
+        print(f"{name:<10}{seconds * 1000:>13.0f}{shown:>13}{flag}")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
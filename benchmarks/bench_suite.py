@@ -0,0 +1,283 @@
+"""
+Offline load benchmark for the Meeting Agent API, compared against a stored baseline
+
+Starts stub Recall.ai, OpenAI and Cartesia servers in child processes (with
+configurable latency, jitter and injected failures) and drives the FastAPI
+app in this process with three concurrent workloads:
+
+- poll:      many bots polling their growing transcripts with `since` cursors
+- summarize: multi-hour transcripts summarized concurrently (map-reduce)
+- speak:     bursts of concurrent /speak requests
+
+For each workload it reports p50/p99 latency, requests per second and the
+process's peak RSS (which only grows, so each workload shows the peak up
+to its end), then compares them with `benchmarks/baseline.json` and exits
+non-zero when one regressed by more than the tolerance. The baseline is
+machine-specific: save a new one with `--save-baseline` on the machine the
+comparison runs on.
+
+With `--workers N` the workloads run over HTTP against `main.py` started
+with N worker processes instead, to measure how throughput scales with
+cores (peak RSS is then this client's, and there is no baseline).
+
+Usage:
+    python benchmarks/bench_suite.py [--quick] [--error-rate 0.05] [--save-baseline] [--workers N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Callable, Awaitable
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+from stubs import StubProcess, transcript_segments  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Metric -> True when a higher value is better
+METRICS = {"p50_ms": False, "p99_ms": False, "rps": True, "peak_rss_mb": False}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Workload:
+    """Latencies and failures of one workload"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    async def timed(self, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        start = time.perf_counter()
+        response = await request()
+        if response.status_code == 200:
+            self.latencies.append(time.perf_counter() - start)
+        else:
+            self.errors += 1
+        return response
+
+    def result(self) -> Dict[str, float]:
+        wall = time.perf_counter() - self.started
+        latencies = self.latencies or [0.0]
+        return {
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "rps": round(len(self.latencies) / wall, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1)
+        }
+
+
+async def poll_transcripts(client: httpx.AsyncClient, bots: int, duration: float, interval: float) -> Workload:
+    """Every bot polls its transcript for new segments every `interval` seconds"""
+    workload = Workload("poll")
+    deadline = time.perf_counter() + duration
+
+    async def poll(bot_id: str) -> None:
+        cursor = 0
+        while time.perf_counter() < deadline:
+            response = await workload.timed(
+                lambda: client.get(f"/transcript/{bot_id}", params={"since": cursor})
+            )
+            if response.status_code == 200:
+                cursor = response.json()["next_cursor"]
+            await asyncio.sleep(min(interval, max(deadline - time.perf_counter(), 0.0)))
+
+    await asyncio.gather(*(poll(f"bot_{i}") for i in range(bots)))
+    return workload
+
+
+async def summarize_transcripts(client: httpx.AsyncClient, count: int, hours: float, concurrency: int) -> Workload:
+    """Summarize `count` distinct multi-hour transcripts, `concurrency` at a time"""
+    transcripts = [
+        "\n".join(
+            f"{segment['speaker']}: {' '.join(word['text'] for word in segment['words'])}"
+            for segment in transcript_segments(int(hours * 900), seed=seed)
+        )
+        for seed in range(count)
+    ]
+    workload = Workload("summarize")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def summarize(transcript: str) -> None:
+        async with semaphore:
+            await workload.timed(lambda: client.post("/summarize", json={"transcript": transcript}))
+
+    await asyncio.gather(*(summarize(transcript) for transcript in transcripts))
+    return workload
+
+
+async def speak_bursts(client: httpx.AsyncClient, bursts: int, size: int) -> Workload:
+    """Send `bursts` bursts of `size` concurrent /speak requests with distinct texts"""
+    workload = Workload("speak")
+    for burst in range(bursts):
+        await asyncio.gather(*(
+            workload.timed(lambda i=i: client.post("/speak", json={"text": f"Question {burst}-{i} about the timeline?"}))
+            for i in range(size)
+        ))
+    return workload
+
+
+async def start_server(workers: int, port: int = 8765) -> subprocess.Popen:
+    """Start main.py with `workers` worker processes and wait until it answers"""
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    async with httpx.AsyncClient() as client:
+        for _ in range(600):
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}/health")).status_code == 200:
+                    # Every worker imports the app; give the slower ones a moment
+                    await asyncio.sleep(workers * 0.5)
+                    return server
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    server = None
+    if args.workers:
+        server = await start_server(args.workers)
+        client_args = {"base_url": "http://127.0.0.1:8765/api/v1", "limits": httpx.Limits(max_connections=None)}
+    else:
+        from main import app
+        client_args = {"transport": httpx.ASGITransport(app=app), "base_url": "http://app/api/v1"}
+
+    results = {}
+    async with httpx.AsyncClient(timeout=300, **client_args) as client:
+        workloads = (
+            lambda: poll_transcripts(client, args.bots, args.duration, args.poll_interval),
+            lambda: summarize_transcripts(client, args.summaries, args.hours, args.concurrency),
+            lambda: speak_bursts(client, args.bursts, args.burst_size),
+        )
+        try:
+            for start in workloads:
+                workload = await start()
+                results[workload.name] = workload.result()
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Print results next to the baseline and return the regressions"""
+    regressions = []
+    print(f"{'workload':<11}{'metric':<13}{'value':>10}{'baseline':>10}{'change':>9}")
+    for name, result in results.items():
+        print(f"{name:<11}{'requests':<13}{result['requests']:>10}{'':>10}   errors {result['errors']}")
+        for metric, higher_is_better in METRICS.items():
+            value = result[metric]
+            base = baseline.get(name, {}).get(metric)
+            if not base:
+                print(f"{'':<11}{metric:<13}{value:>10}{'-':>10}")
+                continue
+            change = (value - base) / base
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSED" if worse > tolerance else ""
+            if flag:
+                regressions.append(f"{name} {metric}: {base} -> {value}")
+            print(f"{'':<11}{metric:<13}{value:>10}{base:>10}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random stub latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests failed with a 503")
+    # About 10 polls a second: well below what one core serves, so latency is not queueing
+    parser.add_argument("--bots", type=int, default=20, help="bots polling transcripts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds the bots poll for")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between polls of one bot")
+    parser.add_argument("--summaries", type=int, default=8, help="transcripts summarized")
+    parser.add_argument("--hours", type=float, default=3.0, help="length of each summarized transcript")
+    parser.add_argument("--concurrency", type=int, default=4, help="summaries in flight at once")
+    parser.add_argument("--bursts", type=int, default=5, help="/speak bursts")
+    parser.add_argument("--burst-size", type=int, default=50, help="requests per /speak burst")
+    parser.add_argument("--quick", action="store_true", help="a smaller run (fewer bots, shorter transcripts)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--workers", type=int, default=0, help="run against main.py with this many worker processes")
+    args = parser.parse_args()
+    if args.quick:
+        args.bots, args.duration, args.summaries, args.hours, args.bursts = 10, 3.0, 2, 1.0, 2
+
+    stubs = (
+        StubProcess("recall_stub", latency=args.latency, jitter=args.jitter, segments=900, growth=0.25,
+                    error_rate=args.error_rate),
+        StubProcess("openai_stub", latency=args.latency, jitter=args.jitter, error_rate=args.error_rate),
+        StubProcess("cartesia_stub", latency=args.latency, jitter=args.jitter, error_rate=args.error_rate),
+    )
+    for stub in stubs:
+        stub.__enter__()
+    try:
+        recall, openai, cartesia = stubs
+        os.environ.update({
+            "RECALL_API_KEY": "bench",
+            "RECALL_API_URL": f"{recall.url}/api/v1",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{openai.url}/v1",
+            "CARTESIA_API_KEY": "bench",
+            "CARTESIA_API_URL": f"{cartesia.url}/tts/bytes",
+            # Measure the backend, not the account's rate limits
+            "AI_TOKENS_PER_MINUTE": "1000000000",
+            "AI_REQUESTS_PER_MINUTE": "1000000",
+            "MEETING_DB_PATH": "",
+        })
+        results = asyncio.run(run(args))
+    finally:
+        for stub in stubs:
+            stub.__exit__(None, None, None)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if (args.quick or args.workers) and args.baseline == BASELINE_PATH:
+        # The stored baseline is a full in-process run; these runs are not comparable
+        baseline = {}
+    regressions = compare(results, baseline, args.tolerance)
+    offered = args.bots / args.poll_interval
+    if results["poll"]["rps"] < offered * 0.8:
+        print(f"\nThe poll workload is saturated ({results['poll']['rps']} of {offered:.0f} requests/s served): "
+              "its latencies are mostly queueing. Use fewer --bots or a longer --poll-interval.")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Time-to-first-audio-byte benchmark for the speech endpoints
+
+Serves the FastAPI app over real HTTP against a stub Cartesia server that
+streams audio in chunks, then compares how long a client waits for the
+first audio byte from `/speak` (whole clip, base64 in JSON) and from
+`/speak/stream` (raw chunks relayed as they arrive).
+
+Usage:
+    python benchmarks/bench_tts.py [--latency 0.2] [--chunks 16] [--chunk-interval 0.05]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from stubs import StubServer, cartesia_stub  # noqa: E402
+
+
+async def time_request(client: httpx.AsyncClient, path: str) -> tuple:
+    """Return (seconds to first body byte, seconds to last byte, body size)"""
+    start = time.perf_counter()
+    first = None
+    size = 0
+    async with client.stream("POST", path, json={"text": "Could you clarify the timeline?"}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            if first is None and chunk:
+                first = time.perf_counter() - start
+            size += len(chunk)
+    return first, time.perf_counter() - start, size
+
+
+async def main(app_url: str, runs: int) -> None:
+    async with httpx.AsyncClient(base_url=f"{app_url}/api/v1", timeout=60) as client:
+        # Warm up the app's upstream pool so both paths reuse connections
+        await time_request(client, "/speak")
+
+        print(f"{'endpoint':<16}{'first byte (ms)':>18}{'complete (ms)':>16}{'bytes':>10}")
+        for path in ("/speak", "/speak/stream"):
+            results = [await time_request(client, path) for _ in range(runs)]
+            first = statistics.median(r[0] for r in results)
+            total = statistics.median(r[1] for r in results)
+            print(f"{path:<16}{first * 1000:>18.1f}{total * 1000:>16.1f}{results[0][2]:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="stub delay before the first audio chunk")
+    parser.add_argument("--chunks", type=int, default=16, help="chunks the stub audio is sent in")
+    parser.add_argument("--chunk-interval", type=float, default=0.05, help="seconds between stub chunks")
+    parser.add_argument("--runs", type=int, default=10, help="requests timed per endpoint")
+    args = parser.parse_args()
+
+    with StubServer(cartesia_stub(args.latency, chunks=args.chunks, chunk_interval=args.chunk_interval)) as cartesia:
+        os.environ.update({
+            "RECALL_API_KEY": "bench",
+            "OPENAI_API_KEY": "bench",
+            "CARTESIA_API_KEY": "bench",
+            "CARTESIA_API_URL": f"{cartesia.url}/tts/bytes",
+        })
+        from main import app
+
+        with StubServer(app) as server:
+            asyncio.run(main(server.url, args.runs))
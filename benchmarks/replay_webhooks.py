@@ -0,0 +1,68 @@
+"""
+Replay Recall.ai transcript webhooks into the Meeting Agent API
+
+Posts generated real-time transcript events (with redeliveries and
+out-of-order arrivals) to the webhook route, then measures how long
+transcript reads take once they are served from the in-memory store.
+
+Usage:
+    python benchmarks/replay_webhooks.py [--events 2000] [--reads 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from stubs import transcript_webhook_events  # noqa: E402
+
+
+async def main(events: int, reads: int) -> None:
+    os.environ.setdefault("RECALL_API_KEY", "bench")
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ.setdefault("CARTESIA_API_KEY", "bench")
+    from main import app
+
+    bot_id = "bot_replay"
+    payloads = transcript_webhook_events(bot_id, events)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        start = time.perf_counter()
+        accepted = 0
+        for payload in payloads:
+            response = await client.post("/api/v1/webhooks/recall/transcript", json=payload)
+            response.raise_for_status()
+            accepted += response.json()["accepted"]
+        ingest = time.perf_counter() - start
+
+        timings = []
+        for _ in range(reads):
+            start = time.perf_counter()
+            response = await client.get(f"/api/v1/transcript/{bot_id}")
+            response.raise_for_status()
+            timings.append(time.perf_counter() - start)
+
+    segments = response.json()
+    in_order = all(a["words"][0]["start_time"] <= b["words"][0]["start_time"]
+                   for a, b in zip(segments, segments[1:]))
+    print(f"delivered {len(payloads)} webhooks, accepted {accepted} "
+          f"({len(payloads) - accepted} duplicates) in {ingest:.2f}s "
+          f"({len(payloads) / ingest:.0f} events/s)")
+    print(f"transcript has {len(segments)} segments, time ordered: {in_order}")
+    print(f"GET /transcript p50 {statistics.median(timings) * 1000:.2f} ms, "
+          f"max {max(timings) * 1000:.2f} ms over {reads} reads (no upstream calls)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000, help="distinct utterances to replay")
+    parser.add_argument("--reads", type=int, default=200, help="transcript reads to time")
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.reads))
@@ -0,0 +1,381 @@
+"""
+Local stub servers mimicking the Recall.ai, OpenAI and Cartesia APIs
+Used by the benchmarks to measure the backend without real upstream calls
+"""
+import asyncio
+import json
+import multiprocessing
+import random
+import socket
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+
+
+def track_connections(app: FastAPI) -> FastAPI:
+    """Record the distinct client sockets that reach a stub in app.state.peers"""
+    app.state.peers = set()
+
+    @app.middleware("http")
+    async def record_peer(request: Request, call_next):
+        app.state.peers.add((request.client.host, request.client.port))
+        return await call_next(request)
+
+    return app
+
+
+def inject_faults(app: FastAPI, error_rate: float = 0.0, error_status: int = 503, seed: int = 0) -> FastAPI:
+    """
+    Fail a fraction of requests before they reach the stub's handlers
+
+    Args:
+        app: Stub app
+        error_rate: Fraction of requests answered with `error_status`
+        error_status: Status of injected failures (503 and 429 are retried by the backend)
+        seed: Random seed for reproducible runs
+    """
+    app.state.errors = 0
+    if error_rate <= 0:
+        return app
+    rng = random.Random(seed)
+
+    @app.middleware("http")
+    async def fail_some(request: Request, call_next):
+        if rng.random() < error_rate:
+            app.state.errors += 1
+            return JSONResponse({"error": "injected failure"}, status_code=error_status)
+        return await call_next(request)
+
+    return app
+
+
+def _delay(latency: float, jitter: float) -> float:
+    """Latency plus up to `jitter` seconds of uniform noise"""
+    return latency + random.uniform(0, jitter) if jitter else latency
+
+
+def transcript_segments(count: int, seed: int = 0):
+    """
+    Generate Recall.ai transcript segments, about 900 per meeting hour
+
+    Args:
+        count: Number of segments
+        seed: Random seed for reproducible runs
+
+    Returns:
+        List of segments with a speaker and timed words
+    """
+    rng = random.Random(seed)
+    speakers = ["Alice", "Bob", "Carol", "Dave"]
+    vocabulary = ["budget", "timeline", "launch", "review", "customer", "design", "we", "should",
+                  "the", "next", "week", "agree", "think", "plan", "ship", "update", "issue", "team"]
+    segments = []
+    for i in range(count):
+        start = i * 4.0
+        words = rng.choices(vocabulary, k=rng.randint(4, 16))
+        segments.append({
+            "speaker": speakers[i % len(speakers)],
+            "words": [
+                {"text": word, "start_time": start + w * 0.25, "end_time": start + w * 0.25 + 0.2}
+                for w, word in enumerate(words)
+            ]
+        })
+    return segments
+
+
+def recall_stub(
+    latency: float = 0.2,
+    jitter: float = 0.0,
+    segments: int = 1,
+    growth: float = 0.0,
+    error_rate: float = 0.0
+) -> FastAPI:
+    """
+    Build a stub Recall.ai API
+
+    Each bot's transcript starts with `segments` segments and grows by
+    `growth` segments per second from its first request, like a live
+    meeting.
+
+    Args:
+        latency: Seconds to wait before answering each request
+        jitter: Up to this many extra seconds of random latency
+        segments: Segments every transcript starts with
+        growth: Segments added per second per bot
+        error_rate: Fraction of requests failed with a 503
+
+    Returns:
+        FastAPI app serving the bot and transcript endpoints
+    """
+    app = inject_faults(track_connections(FastAPI()), error_rate)
+    first_seen = {}
+    if segments == 1 and not growth:
+        full = [{"speaker": "Alice", "words": [{"text": "Hello", "start_time": 0.0, "end_time": 0.4}]}]
+    else:
+        full = transcript_segments(segments + int(growth * 3600))
+    # Encoded once: FastAPI's encoder would make the stub the bottleneck for long transcripts
+    encoded = [json.dumps(segment) for segment in full]
+
+    @app.post("/api/v1/bot/")
+    async def create_bot(request: Request):
+        await asyncio.sleep(_delay(latency, jitter))
+        body = await request.json()
+        return {"id": "bot_stub", "meeting_url": body.get("meeting_url"), "status": "joining"}
+
+    @app.get("/api/v1/bot/{bot_id}/transcript/")
+    async def transcript(bot_id: str):
+        await asyncio.sleep(_delay(latency, jitter))
+        elapsed = time.monotonic() - first_seen.setdefault(bot_id, time.monotonic())
+        body = "[" + ",".join(encoded[:segments + int(elapsed * growth)]) + "]"
+        return Response(body, media_type="application/json")
+
+    @app.get("/api/v1/bot/{bot_id}/")
+    async def bot_status(bot_id: str):
+        await asyncio.sleep(_delay(latency, jitter))
+        return {"id": bot_id, "status": "in_call"}
+
+    @app.delete("/api/v1/bot/{bot_id}/")
+    async def leave(bot_id: str):
+        await asyncio.sleep(_delay(latency, jitter))
+        return {"success": True}
+
+    return app
+
+
+def openai_stub(
+    latency: float = 0.2,
+    jitter: float = 0.0,
+    chunk_interval: float = 0.02,
+    error_rate: float = 0.0
+) -> FastAPI:
+    """
+    Build a stub OpenAI chat completions API
+
+    Streamed requests (`"stream": true`) get the completion word by word
+    as server-sent events, the first after `latency`.
+
+    Args:
+        latency: Seconds to wait before answering each request
+        jitter: Up to this many extra seconds of random latency
+        chunk_interval: Seconds between streamed chunks
+        error_rate: Fraction of requests failed with a 503
+
+    Returns:
+        FastAPI app serving /v1/chat/completions
+    """
+    app = inject_faults(track_connections(FastAPI()), error_rate)
+    words = ["Stub ", "completion ", "of ", "the ", "meeting."]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        await asyncio.sleep(_delay(latency, jitter))
+        body = await request.json()
+        if body.get("stream"):
+            async def events():
+                for i, word in enumerate(words):
+                    if i:
+                        await asyncio.sleep(chunk_interval)
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "Stub completion."},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13}
+        }
+
+    return app
+
+
+def cartesia_stub(
+    latency: float = 0.2,
+    audio_size: int = 64 * 1024,
+    chunks: int = 16,
+    chunk_interval: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0
+) -> FastAPI:
+    """
+    Build a stub Cartesia TTS API
+
+    Like the real endpoint, audio is streamed as it is synthesized: the
+    first chunk follows `latency`, the rest arrive every `chunk_interval`.
+
+    Args:
+        latency: Seconds to wait before the first audio chunk
+        audio_size: Number of audio bytes returned per request
+        chunks: Number of chunks the audio is sent in
+        chunk_interval: Seconds between consecutive chunks
+        jitter: Up to this many extra seconds of random latency
+        error_rate: Fraction of requests failed with a 503
+
+    Returns:
+        FastAPI app serving /tts/bytes
+    """
+    app = inject_faults(track_connections(FastAPI()), error_rate)
+    chunk_size = max(audio_size // max(chunks, 1), 1)
+    audio = b"\x00" * audio_size
+
+    @app.post("/tts/bytes")
+    async def tts_bytes():
+        async def body():
+            await asyncio.sleep(_delay(latency, jitter))
+            for offset in range(0, audio_size, chunk_size):
+                if offset:
+                    await asyncio.sleep(chunk_interval)
+                yield audio[offset:offset + chunk_size]
+
+        return StreamingResponse(body(), media_type="audio/wav")
+
+    return app
+
+
+def transcript_webhook_events(
+    bot_id: str,
+    count: int,
+    duplicate_rate: float = 0.1,
+    reorder_window: int = 3,
+    seed: int = 0
+):
+    """
+    Generate Recall.ai real-time transcript webhook payloads
+
+    Mimics webhook delivery: some events are redelivered and neighbouring
+    events may arrive out of order.
+
+    Args:
+        bot_id: Bot the events belong to
+        count: Number of distinct utterances
+        duplicate_rate: Fraction of events delivered twice
+        reorder_window: Events are shuffled within windows of this size
+        seed: Random seed for reproducible runs
+
+    Returns:
+        List of webhook JSON payloads in delivery order
+    """
+    rng = random.Random(seed)
+    speakers = ["Alice", "Bob", "Carol", "Dave"]
+    events = []
+    for i in range(count):
+        start = i * 4.0
+        words = [f"word{i}_{w}" for w in range(8)]
+        events.append({
+            "event": "bot.transcription",
+            "data": {
+                "bot_id": bot_id,
+                "transcript": {
+                    "original_transcript_id": i,
+                    "speaker": speakers[i % len(speakers)],
+                    "is_final": True,
+                    "words": [
+                        {"text": word, "start_time": start + w * 0.4, "end_time": start + w * 0.4 + 0.3}
+                        for w, word in enumerate(words)
+                    ]
+                }
+            }
+        })
+
+    delivered = []
+    for offset in range(0, count, max(reorder_window, 1)):
+        window = events[offset:offset + reorder_window]
+        rng.shuffle(window)
+        for event in window:
+            delivered.append(event)
+            if rng.random() < duplicate_rate:
+                delivered.append(event)
+    return delivered
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Run a stub app with uvicorn on a background thread"""
+
+    def __init__(self, app: FastAPI, port: int = 0):
+        self.app = app
+        self.port = port or _free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def connections(self) -> int:
+        """Number of distinct client connections seen so far"""
+        return len(self.app.state.peers)
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def _serve(factory_name: str, kwargs: dict, port: int) -> None:
+    uvicorn.run(globals()[factory_name](**kwargs), host="127.0.0.1", port=port, log_level="warning")
+
+
+class StubProcess:
+    """Run a stub app in a child process, so it adds nothing to the caller's CPU time or memory"""
+
+    def __init__(self, factory_name: str, **kwargs):
+        """
+        Args:
+            factory_name: Name of a stub factory in this module, e.g. "recall_stub"
+            **kwargs: Arguments for the factory
+        """
+        self.port = _free_port()
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(factory_name, kwargs, self.port), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "StubProcess":
+        self.process.start()
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        self.process.terminate()
+        raise RuntimeError(f"Stub server on port {self.port} did not start")
+
+    def __exit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.join()
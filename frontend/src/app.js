@@ -99,8 +99,9 @@ async function joinMeeting() {
         extractPointsBtn.disabled = false;
         extractActionsBtn.disabled = false;
         
-        // Start polling for transcript
-        startTranscriptPolling();
+        // Start receiving live transcript and summary updates
+        startTranscriptStream();
+        startLiveSummary();
         
     } catch (error) {
         showStatus(`Error: ${error.message}`, 'error');
@@ -133,40 +134,133 @@ async function leaveMeeting() {
     }
 }
 
-// Poll for transcript updates
-let transcriptPollingInterval = null;
+// Live transcript updates pushed over a WebSocket
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
+let transcriptSocket = null;
+let liveSummarySource = null;
+let transcriptReconnectTimer = null;
+let transcriptUtterances = [];
 
-function startTranscriptPolling() {
-    if (transcriptPollingInterval) {
-        clearInterval(transcriptPollingInterval);
+function startTranscriptStream() {
+    stopTranscriptStream();
+    if (!currentBotId) return;
+    
+    const botId = currentBotId;
+    const since = transcriptUtterances.length;
+    transcriptSocket = new WebSocket(`${WS_BASE_URL}/ws/transcript/${botId}?since=${since}`);
+    
+    transcriptSocket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'utterances') {
+            appendUtterances(data.start, data.utterances);
+        }
+    };
+    
+    transcriptSocket.onclose = () => {
+        transcriptSocket = null;
+        // Reconnect and resume from the last utterance received
+        if (currentBotId === botId) {
+            transcriptReconnectTimer = setTimeout(startTranscriptStream, 2000);
+        }
+    };
+    
+    transcriptSocket.onerror = (error) => {
+        console.error('Transcript stream error:', error);
+    };
+}
+
+function stopTranscriptStream() {
+    if (transcriptReconnectTimer) {
+        clearTimeout(transcriptReconnectTimer);
+        transcriptReconnectTimer = null;
+    }
+    if (transcriptSocket) {
+        transcriptSocket.onclose = null;
+        transcriptSocket.close();
+        transcriptSocket = null;
     }
+}
+
+// Live summary, kept up to date by the backend as the meeting goes on
+function startLiveSummary() {
+    stopLiveSummary();
+    if (!currentBotId) return;
     
-    transcriptPollingInterval = setInterval(async () => {
-        if (!currentBotId) {
-            clearInterval(transcriptPollingInterval);
-            return;
+    // EventSource reconnects on its own; the server ends the stream once the meeting is over
+    liveSummarySource = new EventSource(`${API_BASE_URL}/summary/${currentBotId}/live/stream`);
+    liveSummarySource.addEventListener('summary', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.summary) {
+            summaryArea.innerHTML = '<p><strong>Live summary:</strong></p>';
+            const text = document.createElement('p');
+            text.textContent = data.summary;
+            summaryArea.appendChild(text);
         }
+        if (!data.running) {
+            stopLiveSummary();
+        }
+    });
+}
+
+function stopLiveSummary() {
+    if (liveSummarySource) {
+        liveSummarySource.close();
+        liveSummarySource = null;
+    }
+}
+
+function appendUtterances(start, utterances) {
+    // Ignore anything already rendered (e.g. replayed after a reconnect)
+    const fresh = utterances.slice(Math.max(transcriptUtterances.length - start, 0));
+    if (fresh.length === 0) return;
+    
+    if (transcriptUtterances.length === 0) {
+        transcriptArea.innerHTML = '';
+    }
+    
+    const lines = fresh.map(utterance => `${utterance.speaker}: ${utterance.text}`);
+    lines.forEach(text => {
+        const line = document.createElement('p');
+        line.textContent = text;
+        transcriptArea.appendChild(line);
+    });
+    transcriptUtterances.push(...fresh);
+    // Extend the plain-text transcript instead of re-rendering all of it
+    currentTranscript += (currentTranscript ? '\n' : '') + lines.join('\n');
+}
+
+// Read a server-sent event stream from a fetch response
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
         
-        try {
-            const response = await fetch(`${API_BASE_URL}/transcript/${currentBotId}`);
-            if (response.ok) {
-                const data = await response.json();
-                if (data.transcript) {
-                    updateTranscript(data.transcript);
-                }
-            }
-        } catch (error) {
-            console.error('Error fetching transcript:', error);
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
         }
-    }, 5000); // Poll every 5 seconds
+    }
 }
 
-function updateTranscript(transcript) {
-    currentTranscript = transcript;
-    transcriptArea.innerHTML = `<p>${transcript.replace(/\n/g, '<br>')}</p>`;
+function renderList(element, items) {
+    element.innerHTML = items.map(item => `<p>• ${item}</p>`).join('');
 }
 
-// Generate Summary
+// Generate Summary, key points and action items in one streamed analysis
 async function generateSummary() {
     if (!currentTranscript) {
         showStatus('No transcript available to summarize', 'error');
@@ -175,16 +269,18 @@ async function generateSummary() {
     
     try {
         summarizeBtn.disabled = true;
-        showStatus('Generating summary...', 'info');
+        showStatus('Analyzing meeting...', 'info');
         
-        const response = await fetch(`${API_BASE_URL}/summarize`, {
+        const response = await fetch(`${API_BASE_URL}/analyze?stream=true`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
                 transcript: currentTranscript,
-                max_sentences: 3
+                max_sentences: 3,
+                num_points: 5,
+                bot_id: currentBotId
             })
         });
         
@@ -192,8 +288,22 @@ async function generateSummary() {
             throw new Error('Failed to generate summary');
         }
         
-        const data = await response.json();
-        summaryArea.innerHTML = `<p><strong>Summary:</strong></p><p>${data.summary}</p>`;
+        let failure = null;
+        await readEventStream(response, (event, data) => {
+            if (event === 'summary') {
+                summaryArea.innerHTML = `<p><strong>Summary:</strong></p><p>${data.summary}</p>`;
+            } else if (event === 'key_points') {
+                renderList(keyPointsList, data.key_points);
+            } else if (event === 'action_items') {
+                renderList(actionItemsList, data.action_items);
+            } else if (event === 'error') {
+                failure = data.detail;
+            }
+        });
+        
+        if (failure) {
+            throw new Error(failure);
+        }
         showStatus('Summary generated successfully', 'success');
         
     } catch (error) {
@@ -216,7 +326,7 @@ async function askQuestion() {
         askBtn.disabled = true;
         showStatus('Generating question...', 'info');
         
-        const response = await fetch(`${API_BASE_URL}/generate-question`, {
+        const response = await fetch(`${API_BASE_URL}/ask`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -230,12 +340,20 @@ async function askQuestion() {
             throw new Error('Failed to generate question');
         }
         
+        // Audio is synthesized in the background while the text is generated,
+        // so it is ready to play by the time the user clicks Speak
         const data = await response.json();
-        generatedQuestionDiv.innerHTML = `<p><strong>Generated Question:</strong></p><p>${data.question}</p>`;
+        generatedQuestionDiv.innerHTML = `
+            <p><strong>Generated Question:</strong></p>
+            <p class="question-text">${data.question}</p>
+            <button class="btn btn-secondary speak-btn">Speak</button>
+        `;
         generatedQuestionDiv.classList.add('show');
-        
-        // Generate audio for the question
-        await generateAudio(data.question);
+        generatedQuestionDiv.querySelector('.speak-btn').addEventListener('click', () => {
+            new Audio(data.audio_url).play().catch((error) => {
+                showStatus(`Error playing audio: ${error.message}`, 'error');
+            });
+        });
         
         showStatus('Question generated successfully', 'success');
         
@@ -246,29 +364,6 @@ async function askQuestion() {
     }
 }
 
-// Generate Audio
-async function generateAudio(text) {
-    try {
-        const response = await fetch(`${API_BASE_URL}/speak`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                text: text
-            })
-        });
-        
-        if (response.ok) {
-            const data = await response.json();
-            // Audio is returned as base64, could be played or sent to meeting
-            console.log('Audio generated successfully');
-        }
-    } catch (error) {
-        console.error('Error generating audio:', error);
-    }
-}
-
 // Extract Key Points
 async function extractKeyPoints() {
     if (!currentTranscript) {
@@ -287,7 +382,8 @@ async function extractKeyPoints() {
             },
             body: JSON.stringify({
                 transcript: currentTranscript,
-                num_points: 5
+                num_points: 5,
+                bot_id: currentBotId
             })
         });
         
@@ -296,8 +392,7 @@ async function extractKeyPoints() {
         }
         
         const data = await response.json();
-        const pointsHtml = data.key_points.map(point => `<p>• ${point}</p>`).join('');
-        keyPointsList.innerHTML = pointsHtml;
+        renderList(keyPointsList, data.key_points);
         showStatus('Key points extracted successfully', 'success');
         
     } catch (error) {
@@ -324,7 +419,8 @@ async function extractActionItems() {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                transcript: currentTranscript
+                transcript: currentTranscript,
+                bot_id: currentBotId
             })
         });
         
@@ -333,8 +429,7 @@ async function extractActionItems() {
         }
         
         const data = await response.json();
-        const itemsHtml = data.action_items.map(item => `<p>• ${item}</p>`).join('');
-        actionItemsList.innerHTML = itemsHtml;
+        renderList(actionItemsList, data.action_items);
         showStatus('Action items extracted successfully', 'success');
         
     } catch (error) {
@@ -348,6 +443,7 @@ async function extractActionItems() {
 function resetUI() {
     currentBotId = null;
     currentTranscript = '';
+    transcriptUtterances = [];
     joinBtn.disabled = false;
     leaveBtn.disabled = true;
     summarizeBtn.disabled = true;
@@ -360,7 +456,6 @@ function resetUI() {
     keyPointsList.innerHTML = '<p class="placeholder">Key points will appear here...</p>';
     actionItemsList.innerHTML = '<p class="placeholder">Action items will appear here...</p>';
     
-    if (transcriptPollingInterval) {
-        clearInterval(transcriptPollingInterval);
-    }
+    stopTranscriptStream();
+    stopLiveSummary();
 }
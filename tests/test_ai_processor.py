@@ -2,8 +2,9 @@
 Unit tests for AIProcessor
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from backend.services.ai_processor import AIProcessor
+from backend.services.transcript_prep import count_tokens
 
 
 class TestAIProcessor:
@@ -16,10 +17,15 @@ class TestAIProcessor:
             return AIProcessor()
     
     def test_init_with_api_key(self):
-        """Test initialization with API key"""
-        with patch('backend.services.ai_processor.OpenAI') as mock_openai:
+        """Test the OpenAI client is created with the API key on first use"""
+        with patch('openai.AsyncOpenAI') as mock_openai:
             processor = AIProcessor(api_key='test_key')
-            mock_openai.assert_called_once_with(api_key='test_key')
+            mock_openai.assert_not_called()
+
+            assert processor.client is processor.client
+            mock_openai.assert_called_once()
+            assert mock_openai.call_args.kwargs['api_key'] == 'test_key'
+            assert 'http_client' in mock_openai.call_args.kwargs
     
     def test_init_without_api_key(self):
         """Test initialization without API key raises ValueError"""
@@ -27,46 +33,192 @@ class TestAIProcessor:
             with pytest.raises(ValueError):
                 AIProcessor()
     
-    def test_summarize_transcript(self, processor):
+    @pytest.mark.asyncio
+    async def test_summarize_transcript(self, processor):
         """Test transcript summarization"""
         mock_response = MagicMock()
         mock_response.choices[0].message.content = "This is a summary."
-        processor.client.chat.completions.create = Mock(return_value=mock_response)
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
         
-        result = processor.summarize_transcript("Long transcript here...")
+        result = await processor.summarize_transcript("Long transcript here...")
         
         assert result == "This is a summary."
-        processor.client.chat.completions.create.assert_called_once()
+        processor.client.chat.completions.create.assert_awaited_once()
     
-    def test_generate_question(self, processor):
+    @pytest.mark.asyncio
+    async def test_generate_question(self, processor):
         """Test question generation"""
         mock_response = MagicMock()
         mock_response.choices[0].message.content = "Could you please clarify the status?"
-        processor.client.chat.completions.create = Mock(return_value=mock_response)
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
         
-        result = processor.generate_question("what's the status")
+        result = await processor.generate_question("what's the status")
         
         assert "status" in result.lower()
-        processor.client.chat.completions.create.assert_called_once()
+        processor.client.chat.completions.create.assert_awaited_once()
     
-    def test_extract_key_points(self, processor):
+    @pytest.mark.asyncio
+    async def test_extract_key_points(self, processor):
         """Test key points extraction"""
         mock_response = MagicMock()
         mock_response.choices[0].message.content = "1. Point one\n2. Point two\n3. Point three"
-        processor.client.chat.completions.create = Mock(return_value=mock_response)
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
         
-        result = processor.extract_key_points("Transcript with key points...")
+        result = await processor.extract_key_points("Transcript with key points...")
         
         assert len(result) == 3
-        processor.client.chat.completions.create.assert_called_once()
+        processor.client.chat.completions.create.assert_awaited_once()
     
-    def test_generate_action_items(self, processor):
+    @pytest.mark.asyncio
+    async def test_generate_action_items(self, processor):
         """Test action items generation"""
         mock_response = MagicMock()
         mock_response.choices[0].message.content = "- John: Complete report\n- Sarah: Review document"
-        processor.client.chat.completions.create = Mock(return_value=mock_response)
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
         
-        result = processor.generate_action_items("Transcript with action items...")
+        result = await processor.generate_action_items("Transcript with action items...")
         
         assert len(result) == 2
-        processor.client.chat.completions.create.assert_called_once()
+        processor.client.chat.completions.create.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_analyze_uses_single_json_completion(self, processor):
+        """Test the combined analysis makes one JSON-mode call"""
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = (
+            '{"summary": "Budget approved.", "key_points": ["Budget", "Hiring"], '
+            '"action_items": ["- John: Send report"]}'
+        )
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        
+        result = await processor.analyze("Transcript...")
+        
+        assert result == {
+            "summary": "Budget approved.",
+            "key_points": ["Budget", "Hiring"],
+            "action_items": ["- John: Send report"]
+        }
+        processor.client.chat.completions.create.assert_awaited_once()
+        kwargs = processor.client.chat.completions.create.call_args.kwargs
+        assert kwargs['response_format'] == {"type": "json_object"}
+    
+    @pytest.mark.asyncio
+    async def test_stream_analysis_yields_sections_as_they_finish(self, processor):
+        """Test streamed JSON is split into sections while it arrives"""
+        document = '{"summary": "Done, mostly.", "key_points": ["A, B"], "action_items": ["Ship it"]}'
+        received = []
+        
+        async def stream():
+            for i in range(0, len(document), 7):
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = document[i:i + 7]
+                received.append(i)
+                yield chunk
+        
+        processor.client.chat.completions.create = AsyncMock(return_value=stream())
+        
+        sections = []
+        async for section, value in processor.stream_analysis("Transcript..."):
+            sections.append((section, value, len(received)))
+        
+        assert [s[:2] for s in sections] == [
+            ("summary", "Done, mostly."),
+            ("key_points", ["A, B"]),
+            ("action_items", ["Ship it"])
+        ]
+        # The summary is emitted before the whole document has streamed
+        assert sections[0][2] < len(received)
+    
+    @pytest.mark.asyncio
+    async def test_stream_question_records_latency(self, processor):
+        """Test streamed questions yield deltas and record time to first token"""
+        from backend.services.metrics import registry
+        
+        async def stream():
+            for text in ["Could you ", "clarify the ", "status?"]:
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = text
+                yield chunk
+        
+        processor.client.chat.completions.create = AsyncMock(return_value=stream())
+        ttft = registry.histogram("llm_time_to_first_token_seconds", operation="question")
+        before = ttft.count
+        
+        deltas = [delta async for delta in processor.stream_question("what's the status")]
+        
+        assert "".join(deltas) == "Could you clarify the status?"
+        assert ttft.count == before + 1
+        assert processor.client.chat.completions.create.call_args.kwargs['stream'] is True
+    
+    @pytest.mark.asyncio
+    async def test_stream_summary_replays_cached_completion(self, processor):
+        """Test a cached summary is streamed back without calling OpenAI"""
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "This is a summary."
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        await processor.summarize_transcript("Long transcript here...")
+        
+        deltas = [delta async for delta in processor.stream_summary("Long transcript here...")]
+        
+        assert deltas == ["This is a summary."]
+        processor.client.chat.completions.create.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_embed_query_is_cached(self, processor):
+        """Test repeated search queries are embedded once"""
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(index=0, embedding=[0.1, 0.2])]
+        processor.client.embeddings.create = AsyncMock(return_value=mock_response)
+        
+        first = await processor.embed_query("budget decision")
+        second = await processor.embed_query("budget decision")
+        
+        assert first == second == [0.1, 0.2]
+        processor.client.embeddings.create.assert_awaited_once()
+        assert processor.client.embeddings.create.call_args.kwargs['input'] == ["budget decision"]
+    
+    @pytest.mark.asyncio
+    async def test_update_summary_sends_only_summary_and_new_lines(self, processor):
+        """Test a live summary update does not resend the earlier transcript"""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Updated summary."
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        
+        result = await processor.update_summary("Budget was approved.", "Bob: Next, hiring.", max_sentences=4)
+        
+        assert result == "Updated summary."
+        prompt = processor.client.chat.completions.create.call_args.kwargs['messages'][1]['content']
+        assert "Budget was approved." in prompt
+        assert "Bob: Next, hiring." in prompt
+        assert "at most 4 sentences" in prompt
+    
+    @pytest.mark.asyncio
+    async def test_transcript_is_compacted_before_sending(self, processor):
+        """Test fillers and repeated partial results are not sent to the model"""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Summary."
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        transcript = "Alice: Um, we should\nAlice: We should, uh, ship on Friday.\nBob: Agreed."
+        
+        await processor.summarize_transcript(transcript)
+        
+        prompt = processor.client.chat.completions.create.call_args.kwargs['messages'][1]['content']
+        assert "Alice: We should ship on Friday.\nBob: Agreed." in prompt
+        assert "uh" not in prompt.split()
+    
+    @pytest.mark.asyncio
+    async def test_prompt_is_cut_to_input_budget(self, processor):
+        """Test an oversized prompt is truncated locally instead of sent whole"""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Question?"
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        processor.max_input_tokens = 300
+        
+        await processor.generate_question("\n".join(f"line {i} of a long note" for i in range(500)))
+        
+        prompt = processor.client.chat.completions.create.call_args.kwargs['messages'][1]['content']
+        assert "lines omitted" in prompt
+        assert count_tokens(prompt) <= 300
@@ -0,0 +1,115 @@
+"""
+Unit tests for the AIScheduler
+"""
+import asyncio
+import pytest
+from backend.services.ai_scheduler import AIScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+async def hold(scheduler, operation, tokens, order, release):
+    """Take a slot, note the start order and keep it until released"""
+    async with scheduler.slot(operation, tokens):
+        order.append(operation)
+        await release.wait()
+
+
+class TestAIScheduler:
+    """Test cases for AIScheduler"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more calls run at once than the concurrency cap"""
+        scheduler = AIScheduler(tokens_per_minute=10**6, requests_per_minute=10**6, max_concurrency=2)
+        order, release = [], asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(scheduler, "summarize", 10, order, release)) for _ in range(5)]
+        await asyncio.sleep(0)
+        
+        assert scheduler.running == 2
+        assert scheduler.stats()["queued"] == {"summarize": 3}
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert len(order) == 5
+        assert scheduler.running == 0
+    
+    @pytest.mark.asyncio
+    async def test_live_questions_run_before_summaries(self):
+        """Test a queued question overtakes summaries queued before it"""
+        scheduler = AIScheduler(tokens_per_minute=10**6, requests_per_minute=10**6, max_concurrency=1)
+        order, release = [], asyncio.Event()
+        first = asyncio.ensure_future(hold(scheduler, "embed", 10, order, release))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.ensure_future(hold(scheduler, operation, 10, order, release))
+            for operation in ("summarize", "analyze", "question", "live_summary")
+        ]
+        await asyncio.sleep(0)
+        
+        release.set()
+        await asyncio.gather(first, *queued)
+        
+        assert order == ["embed", "question", "live_summary", "summarize", "analyze"]
+    
+    @pytest.mark.asyncio
+    async def test_token_budget_delays_calls(self):
+        """Test calls wait for the per-minute token budget to refill"""
+        clock = FakeClock()
+        scheduler = AIScheduler(tokens_per_minute=6000, requests_per_minute=1000, max_concurrency=8, clock=clock)
+        
+        async with scheduler.slot("summarize", 5000):
+            pass
+        waiting = asyncio.ensure_future(scheduler.slot("summarize", 5000).__aenter__())
+        await asyncio.sleep(0)
+        
+        assert not waiting.done()
+        assert scheduler.delayed == 1
+        clock.now = 40.0  # 4000 tokens refilled
+        scheduler._pump()
+        await asyncio.sleep(0)
+        assert waiting.done()
+    
+    @pytest.mark.asyncio
+    async def test_request_budget_delays_calls(self):
+        """Test calls wait for the per-minute request budget"""
+        clock = FakeClock()
+        scheduler = AIScheduler(tokens_per_minute=10**6, requests_per_minute=2, max_concurrency=8, clock=clock)
+        for _ in range(2):
+            async with scheduler.slot("question", 1):
+                pass
+        
+        waiting = asyncio.ensure_future(scheduler.slot("question", 1).__aenter__())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        
+        clock.now = 30.0
+        scheduler._pump()
+        await asyncio.sleep(0)
+        assert waiting.done()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """Test a caller that gives up while queued does not hold the queue"""
+        scheduler = AIScheduler(tokens_per_minute=10**6, requests_per_minute=10**6, max_concurrency=1)
+        order, release = [], asyncio.Event()
+        first = asyncio.ensure_future(hold(scheduler, "summarize", 10, order, release))
+        await asyncio.sleep(0)
+        gone = asyncio.ensure_future(hold(scheduler, "question", 10, order, release))
+        after = asyncio.ensure_future(hold(scheduler, "analyze", 10, order, release))
+        await asyncio.sleep(0)
+        
+        gone.cancel()
+        release.set()
+        await asyncio.gather(first, after)
+        
+        assert order == ["summarize", "analyze"]
+        assert scheduler.running == 0
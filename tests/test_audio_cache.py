@@ -0,0 +1,89 @@
+"""
+Unit tests for AudioCache
+"""
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock
+from backend.services.audio_cache import AudioCache
+
+
+class TestAudioCache:
+    """Test cases for AudioCache"""
+    
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Test a synthesized clip is served from memory the second time"""
+        cache = AudioCache()
+        compute = AsyncMock(return_value=b'audio')
+        
+        assert await cache.get_or_compute('k', compute) == b'audio'
+        assert await cache.get_or_compute('k', compute) == b'audio'
+        
+        compute.assert_awaited_once()
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['bytes'] == 5
+    
+    @pytest.mark.asyncio
+    async def test_eviction_is_bounded_by_bytes(self):
+        """Test least recently used clips are evicted once the byte budget is exceeded"""
+        cache = AudioCache(max_bytes=10)
+        await cache.set('a', b'1234')
+        await cache.set('b', b'1234')
+        await cache.get('a')
+        await cache.set('c', b'1234')
+        
+        assert await cache.get('a') == b'1234'
+        assert await cache.get('b') is None
+        assert cache.stats()['bytes'] == 8
+        assert cache.stats()['evictions'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_oversized_clip_is_not_kept_in_memory(self):
+        """Test a clip larger than the whole budget does not flush the cache"""
+        cache = AudioCache(max_bytes=10)
+        await cache.set('a', b'1234')
+        await cache.set('big', b'x' * 11)
+        
+        assert await cache.get('a') == b'1234'
+        assert await cache.get('big') is None
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        """Test only one synthesis runs for concurrent identical keys"""
+        cache = AudioCache()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return b'shared'
+        
+        results = await asyncio.gather(*(cache.get_or_compute('k', compute) for _ in range(5)))
+        
+        assert results == [b'shared'] * 5
+        assert calls == 1
+        assert cache.stats()['coalesced'] == 4
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test clips written to disk are served by a new cache instance"""
+        first = AudioCache(path=str(tmp_path))
+        await first.set('k', b'persisted audio')
+        
+        second = AudioCache(path=str(tmp_path))
+        
+        assert await second.get('k') == b'persisted audio'
+        assert second.stats()['disk_hits'] == 1
+        assert second.stats()['disk_bytes'] == len(b'persisted audio')
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_evicts_oldest_files(self, tmp_path):
+        """Test the disk tier deletes the least recently used files over its budget"""
+        cache = AudioCache(path=str(tmp_path), max_disk_bytes=8)
+        await cache.set('a', b'1234')
+        await cache.set('b', b'1234')
+        await cache.set('c', b'1234')
+        
+        assert sorted(os.listdir(tmp_path)) == ['b', 'c']
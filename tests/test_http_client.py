@@ -0,0 +1,176 @@
+"""
+Unit tests for the pooled upstream HTTP client
+"""
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from backend.services.http_client import UpstreamClient, UpstreamConfig, get_upstream
+from backend.services.metrics import registry
+
+
+def make_upstream(handler, **config):
+    """Build an upstream client backed by a mock transport with no backoff"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return UpstreamClient('test', UpstreamConfig(backoff_base=0, **config), client=client)
+
+
+class TestUpstreamConfig:
+    """Test cases for UpstreamConfig"""
+    
+    def test_from_env_overrides(self):
+        """Test global and per-upstream environment overrides"""
+        env = {'HTTP_POOL_SIZE': '8', 'RECALL_HTTP_POOL_SIZE': '4', 'HTTP_TIMEOUT': '2.5'}
+        with patch.dict('os.environ', env):
+            recall = UpstreamConfig.from_env('recall')
+            cartesia = UpstreamConfig.from_env('cartesia')
+        
+        assert recall.pool_size == 4
+        assert cartesia.pool_size == 8
+        assert recall.timeout == 2.5
+
+
+class TestUpstreamClient:
+    """Test cases for UpstreamClient"""
+    
+    @pytest.mark.asyncio
+    async def test_retries_server_errors_for_get(self):
+        """Test 5xx responses are retried for idempotent requests"""
+        statuses = [503, 502, 200]
+        
+        upstream = make_upstream(lambda request: httpx.Response(statuses.pop(0)))
+        response = await upstream.get('http://upstream/resource')
+        
+        assert response.status_code == 200
+        assert statuses == []
+    
+    @pytest.mark.asyncio
+    async def test_does_not_retry_server_errors_for_post(self):
+        """Test 5xx responses are not replayed for non-idempotent requests"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+        
+        upstream = make_upstream(handler)
+        response = await upstream.post('http://upstream/resource', json={})
+        
+        assert response.status_code == 500
+        assert len(calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_for_post(self):
+        """Test 429 responses are retried for every method"""
+        statuses = [429, 200]
+        
+        upstream = make_upstream(lambda request: httpx.Response(statuses.pop(0)))
+        response = await upstream.post('http://upstream/resource', json={})
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test the last response is returned once retries are exhausted"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+        
+        upstream = make_upstream(handler, max_retries=2)
+        response = await upstream.get('http://upstream/resource')
+        
+        assert response.status_code == 503
+        assert len(calls) == 3
+    
+    @pytest.mark.asyncio
+    async def test_retries_connection_errors(self):
+        """Test connection failures are retried before raising"""
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+        
+        upstream = make_upstream(handler, max_retries=1)
+        
+        with pytest.raises(httpx.ConnectError):
+            await upstream.get('http://upstream/resource')
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_sends_one_head_request(self):
+        """Test warming up accepts any status and never retries"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.method)
+            if len(calls) > 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(404)
+        
+        upstream = make_upstream(handler)
+        
+        assert await upstream.warm_up('http://upstream/') is True
+        assert await upstream.warm_up('http://upstream/') is False
+        assert calls == ['HEAD', 'HEAD']
+    
+    @pytest.mark.asyncio
+    async def test_stream_retries_before_yielding(self):
+        """Test streamed requests are retried until a body is relayed"""
+        statuses = [429, 200]
+        
+        upstream = make_upstream(lambda request: httpx.Response(statuses.pop(0), content=b'body'))
+        async with upstream.stream('POST', 'http://upstream/resource', json={}) as response:
+            body = await response.aread()
+        
+        assert response.status_code == 200
+        assert body == b'body'
+    
+    @pytest.mark.asyncio
+    async def test_requests_are_recorded_per_upstream(self):
+        """Test latency, statuses, retries, errors and bytes are counted for the upstream"""
+        statuses = [503, 200]
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(statuses.pop(0), stream=httpx.ByteStream(b'12345'))
+        ))
+        upstream = UpstreamClient('recorded', UpstreamConfig(backoff_base=0), client=client)
+        
+        await upstream.request('PUT', 'http://upstream/resource', content=b'abc')
+        
+        assert registry.histogram('upstream_request_duration_seconds', upstream='recorded', method='PUT').count == 2
+        assert registry.counter('upstream_responses_total', upstream='recorded', status='503').value == 1
+        assert registry.counter('upstream_responses_total', upstream='recorded', status='200').value == 1
+        assert registry.counter('upstream_errors_total', upstream='recorded').value == 1
+        assert registry.counter('upstream_retries_total', upstream='recorded').value == 1
+        assert registry.counter('upstream_sent_bytes_total', upstream='recorded').value == 6
+        assert registry.counter('upstream_received_bytes_total', upstream='recorded').value == 10
+    
+    def test_backoff_honours_retry_after(self):
+        """Test Retry-After overrides the jittered delay, capped at backoff_max"""
+        upstream = UpstreamClient('test', UpstreamConfig(backoff_max=2.0))
+        
+        assert upstream._backoff(0, httpx.Response(429, headers={'Retry-After': '1'})) == 1.0
+        assert upstream._backoff(0, httpx.Response(429, headers={'Retry-After': '30'})) == 2.0
+        assert 0 <= upstream._backoff(5) <= 2.0
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more than max_concurrency requests are in flight"""
+        in_flight = 0
+        peak = 0
+        
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+        
+        upstream = make_upstream(handler, max_concurrency=3)
+        await asyncio.gather(*(upstream.get('http://upstream/resource') for _ in range(12)))
+        
+        assert peak == 3
+    
+    def test_get_upstream_is_shared(self):
+        """Test the registry returns one client per upstream name"""
+        assert get_upstream('shared-test') is get_upstream('shared-test')
+        assert get_upstream('shared-test') is not get_upstream('other-test')
@@ -0,0 +1,176 @@
+"""
+Unit tests for the background JobQueue
+"""
+import asyncio
+import pytest
+from backend.services.job_queue import JobQueue
+from backend.services.meeting_db import MeetingDatabase
+from backend.services.shared_state import LocalState
+
+
+async def analyze(job):
+    """Handler reporting progress in two steps"""
+    job.report(0.5, "condense")
+    await asyncio.sleep(0.01)
+    return {"summary": f"Summary of {job.params['transcript']}"}
+
+
+async def fail(job):
+    raise ValueError("Transcript is empty")
+
+
+class TestJobQueue:
+    """Test cases for JobQueue"""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """Database in a temporary directory"""
+        database = MeetingDatabase(str(tmp_path / 'meetings.db'))
+        yield database
+        database.close()
+    
+    @pytest.mark.asyncio
+    async def test_submit_returns_at_once_and_runs_in_background(self):
+        """Test a job is queued immediately and streams progress until done"""
+        queue = JobQueue(workers=1)
+        queue.register("analyze", analyze)
+        job = queue.submit("analyze", {"transcript": "Alice: Hi"})
+        assert job.to_dict()["state"] == "queued"
+        
+        await queue.start()
+        states = [state async for state in queue.watch(job.job_id)]
+        await queue.close()
+        
+        assert states[-1]["state"] == "done"
+        assert states[-1]["progress"] == 1.0
+        assert states[-1]["result"] == {"summary": "Summary of Alice: Hi"}
+        assert any(state["stage"] == "condense" and state["state"] == "running" for state in states)
+    
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_its_error(self):
+        """Test a handler exception fails the job with its message"""
+        queue = JobQueue(workers=1)
+        queue.register("analyze", fail)
+        await queue.start()
+        
+        job = queue.submit("analyze", {})
+        states = [state async for state in queue.watch(job.job_id)]
+        await queue.close()
+        
+        assert states[-1]["state"] == "failed"
+        assert states[-1]["error"] == "Transcript is empty"
+    
+    @pytest.mark.asyncio
+    async def test_unfinished_duplicate_is_reused(self):
+        """Test submitting the same job twice while queued returns the first"""
+        queue = JobQueue(workers=1)
+        queue.register("analyze", analyze)
+        
+        first = queue.submit("analyze", {"transcript": "A"}, bot_id="bot_1")
+        
+        assert queue.submit("analyze", {"transcript": "A"}, bot_id="bot_1") is first
+        assert queue.submit("analyze", {"transcript": "B"}, bot_id="bot_1") is not first
+        with pytest.raises(ValueError):
+            queue.submit("translate", {})
+    
+    @pytest.mark.asyncio
+    async def test_jobs_survive_a_restart(self, db):
+        """Test queued and interrupted jobs run again after a restart"""
+        before = JobQueue(db, workers=1)
+        before.register("analyze", analyze)
+        queued = before.submit("analyze", {"transcript": "A"}, bot_id="bot_1")
+        db.flush()
+        
+        after = JobQueue(db, workers=1)
+        after.register("analyze", analyze)
+        assert await after.start() == 1
+        states = [state async for state in after.watch(queued.job_id)]
+        await after.close()
+        db.flush()
+        
+        assert states[-1]["state"] == "done"
+        stored = db.job(queued.job_id)
+        assert stored["state"] == "done"
+        assert stored["result"] == {"summary": "Summary of A"}
+        assert (await after.get(queued.job_id))["result"] == {"summary": "Summary of A"}
+    
+    @pytest.mark.asyncio
+    async def test_repeatedly_interrupted_job_is_failed(self, db):
+        """Test a job that keeps being interrupted is not retried forever"""
+        async def hang(job):
+            await asyncio.Event().wait()
+        
+        job_id = None
+        for _ in range(3):
+            queue = JobQueue(db, workers=1, max_attempts=3)
+            queue.register("analyze", hang)
+            await queue.start()
+            if job_id is None:
+                job_id = queue.submit("analyze", {}).job_id
+            await asyncio.sleep(0.01)
+            await queue.close()
+            db.flush()
+        
+        queue = JobQueue(db, workers=1, max_attempts=3)
+        queue.register("analyze", hang)
+        assert await queue.start() == 0
+        await queue.close()
+        db.flush()
+        
+        assert db.job(job_id)["state"] == "failed"
+        assert db.job(job_id)["attempts"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_workers_resuming_the_same_jobs_run_each_once(self, db):
+        """Test a queue sharing state skips the jobs another worker is running"""
+        runs = []
+        release = asyncio.Event()
+        
+        async def record(job):
+            runs.append(job.job_id)
+            await release.wait()
+            return {}
+        
+        queue = JobQueue(db, workers=1)
+        queue.register("analyze", record)
+        job_ids = [queue.submit("analyze", {"n": n}).job_id for n in range(3)]
+        db.flush()
+        
+        shared = LocalState()
+        queues = [JobQueue(db, workers=3, shared=shared) for _ in range(2)]
+        for resumed in queues:
+            resumed.register("analyze", record)
+            assert await resumed.start() == 3
+            await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.sleep(0.01)
+        for resumed in queues:
+            await resumed.close()
+        
+        assert sorted(runs) == sorted(job_ids)
+    
+    @pytest.mark.asyncio
+    async def test_jobs_finished_by_another_worker_are_not_rerun(self, db):
+        """Test a worker resuming a job another one already finished skips it"""
+        runs = []
+        
+        async def record(job):
+            runs.append(job.job_id)
+            await asyncio.sleep(0.05 if job.params["n"] == 1 else 0.01)
+            return {}
+        
+        queue = JobQueue(db, workers=1)
+        queue.register("analyze", record)
+        job_ids = [queue.submit("analyze", {"n": n}).job_id for n in range(4)]
+        db.flush()
+        
+        shared = LocalState()
+        queues = [JobQueue(db, workers=1, shared=shared) for _ in range(2)]
+        for resumed in queues:
+            resumed.register("analyze", record)
+        await asyncio.gather(*(resumed.start() for resumed in queues))
+        await asyncio.sleep(0.2)
+        for resumed in queues:
+            await resumed.close()
+        
+        assert sorted(runs) == sorted(job_ids)
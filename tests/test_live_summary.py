@@ -0,0 +1,174 @@
+"""
+Unit tests for LiveSummarizer
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from backend.services.live_summary import LiveSummarizer, format_utterances
+from backend.services.shared_state import LocalState
+from backend.services.transcript_store import TranscriptStore
+from backend.services.transcript_stream import TranscriptBroadcaster
+
+
+async def wait_until(condition, timeout=2.0):
+    """Poll until condition() is true"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestLiveSummarizer:
+    """Test cases for LiveSummarizer"""
+    
+    @pytest.fixture
+    def store(self):
+        """Webhook-fed transcript store"""
+        return TranscriptStore()
+    
+    @pytest.fixture
+    def ai_processor(self):
+        """AI processor whose summary lists how many lines each update folded in"""
+        async def update(summary, new_transcript, max_sentences):
+            count = len(new_transcript.splitlines())
+            return f"{summary}+{count}" if summary else str(count)
+        
+        processor = Mock()
+        processor.update_summary = AsyncMock(side_effect=update)
+        return processor
+    
+    def summarizer(self, ai_processor, store, **kwargs):
+        broadcaster = TranscriptBroadcaster(Mock(), poll_interval=0.01, store=store)
+        options = {'interval': 0.05, 'min_tokens': 1000}
+        options.update(kwargs)
+        return LiveSummarizer(ai_processor, broadcaster, **options)
+    
+    def test_format_utterances(self):
+        """Test utterances are rendered one speaker line each"""
+        text = format_utterances([{'speaker': 'Alice', 'text': 'Hi'}, {'speaker': 'Bob', 'text': 'Hello'}])
+        
+        assert text == "Alice: Hi\nBob: Hello"
+    
+    @pytest.mark.asyncio
+    async def test_only_new_utterances_are_folded_in(self, ai_processor, store):
+        """Test each update sends the previous summary and the new lines only"""
+        summarizer = self.summarizer(ai_processor, store)
+        store.append('bot_1', 'Alice', 'Welcome', 0.0, 1.0)
+        store.append('bot_1', 'Bob', 'Thanks', 1.0, 2.0)
+        
+        assert summarizer.read('bot_1')['summary'] == ''
+        await wait_until(lambda: summarizer.get('bot_1').version == 1)
+        store.append('bot_1', 'Alice', 'Budget next', 2.0, 3.0)
+        await wait_until(lambda: summarizer.get('bot_1').version == 2)
+        
+        state = summarizer.read('bot_1')
+        assert state['summary'] == '2+1'
+        assert state['covered'] == 3
+        second_call = ai_processor.update_summary.await_args_list[1].args
+        assert second_call[:2] == ('2', 'Alice: Budget next')
+        await summarizer.close()
+    
+    @pytest.mark.asyncio
+    async def test_readers_share_one_task(self, ai_processor, store):
+        """Test any number of readers and watchers use a single task per bot"""
+        summarizer = self.summarizer(ai_processor, store)
+        
+        task = summarizer.start('bot_1').task
+        for _ in range(5):
+            summarizer.read('bot_1')
+        watchers = [summarizer.watch('bot_1') for _ in range(3)]
+        first = await asyncio.gather(*(w.__anext__() for w in watchers))
+        
+        assert summarizer.get('bot_1').task is task
+        assert summarizer.broadcaster.subscriber_count('bot_1') == 1
+        assert [state['version'] for state in first] == [0, 0, 0]
+        for watcher in watchers:
+            await watcher.aclose()
+        await summarizer.close()
+    
+    @pytest.mark.asyncio
+    async def test_token_budget_triggers_fold_before_interval(self, ai_processor, store):
+        """Test enough new tokens are folded in without waiting for the interval"""
+        summarizer = self.summarizer(ai_processor, store, interval=60, min_tokens=5)
+        summarizer.read('bot_1')
+        
+        store.append('bot_1', 'Alice', 'one two', 0.0, 1.0)
+        await asyncio.sleep(0.1)
+        assert ai_processor.update_summary.await_count == 0
+        store.append('bot_1', 'Bob', 'a rather long utterance about the budget', 1.0, 2.0)
+        await wait_until(lambda: summarizer.get('bot_1').version == 1)
+        
+        assert summarizer.get('bot_1').summary == '2'
+        await summarizer.close()
+    
+    @pytest.mark.asyncio
+    async def test_failed_update_keeps_pending_utterances(self, ai_processor, store):
+        """Test utterances are retried after the model call fails"""
+        update = ai_processor.update_summary.side_effect
+        
+        async def fail_once(*args):
+            if ai_processor.update_summary.await_count == 1:
+                raise RuntimeError('rate limited')
+            return await update(*args)
+        
+        ai_processor.update_summary.side_effect = fail_once
+        summarizer = self.summarizer(ai_processor, store)
+        store.append('bot_1', 'Alice', 'Welcome', 0.0, 1.0)
+        summarizer.read('bot_1')
+        
+        await wait_until(lambda: summarizer.get('bot_1').version == 1)
+        
+        assert summarizer.read('bot_1')['summary'] == '1'
+        assert summarizer.read('bot_1')['error'] is None
+        assert ai_processor.update_summary.await_count == 2
+        await summarizer.close()
+    
+    @pytest.mark.asyncio
+    async def test_finish_folds_remaining_lines_and_stops(self, ai_processor, store):
+        """Test a finished meeting gets a last update and its watchers end"""
+        summarizer = self.summarizer(ai_processor, store, interval=60)
+        summarizer.read('bot_1')
+        store.append('bot_1', 'Alice', 'Wrap up', 0.0, 1.0)
+        await wait_until(lambda: summarizer.get('bot_1').pending)
+        
+        summarizer.finish('bot_1')
+        store.append('bot_1', 'Bob', 'Bye', 1.0, 2.0)
+        states = [state async for state in summarizer.watch('bot_1')]
+        
+        assert states[-1]['summary'] == '2'
+        assert states[-1]['running'] is False
+        assert summarizer.read('bot_1')['running'] is False
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_one_summarizer(self, ai_processor):
+        """Test only the worker owning a bot calls the model and the others mirror it"""
+        shared = LocalState()
+        stores = [TranscriptStore(shared=shared), TranscriptStore(shared=shared)]
+        first, second = (
+            self.summarizer(ai_processor, store, shared=shared, follow_interval=0.01) for store in stores
+        )
+        event = {
+            'event': 'bot.transcription',
+            'data': {'bot_id': 'bot_1', 'transcript': {
+                'original_transcript_id': 1, 'speaker': 'Alice', 'words': [{'text': 'Welcome', 'start_time': 0.0}]
+            }}
+        }
+        await stores[0].ingest(event)
+        
+        first.read('bot_1')
+        await wait_until(lambda: first.get('bot_1').version == 1)
+        second.read('bot_1')
+        await wait_until(lambda: second.get('bot_1').version == 1)
+        
+        assert second.read('bot_1')['summary'] == first.read('bot_1')['summary'] == '1'
+        assert ai_processor.update_summary.await_count == 1
+        
+        # The second worker takes over once the owner stops
+        await first.close()
+        event['data']['transcript'].update(original_transcript_id=2, speaker='Bob')
+        await stores[0].ingest(event)
+        await wait_until(lambda: second.get('bot_1').version == 2)
+        
+        assert second.read('bot_1')['summary'] == '1+1'
+        assert ai_processor.update_summary.await_count == 2
+        await second.close()
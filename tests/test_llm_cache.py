@@ -0,0 +1,141 @@
+"""
+Unit tests for LLMCache
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.services.ai_processor import AIProcessor
+from backend.services.llm_cache import LLMCache, cache_key
+from backend.services.shared_state import LocalState
+
+
+class Clock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestLLMCache:
+    """Test cases for LLMCache"""
+    
+    def test_cache_key_is_content_addressed(self):
+        """Test keys depend on every part but not on argument order"""
+        assert cache_key(model='m', prompt='p') == cache_key(prompt='p', model='m')
+        assert cache_key(model='m', prompt='p') != cache_key(model='m', prompt='q')
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_completions(self):
+        """Test a completion computed by one worker is served to another"""
+        shared = LocalState()
+        first, second = LLMCache(shared=shared), LLMCache(shared=shared)
+        compute = AsyncMock(return_value='summary')
+        
+        assert await first.get_or_compute('k', compute) == 'summary'
+        assert await second.get_or_compute('k', compute) == 'summary'
+        
+        compute.assert_awaited_once()
+        assert second.stats()['shared_hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Test a computed completion is served from memory the second time"""
+        cache = LLMCache()
+        compute = AsyncMock(return_value='summary')
+        
+        assert await cache.get_or_compute('k', compute) == 'summary'
+        assert await cache.get_or_compute('k', compute) == 'summary'
+        
+        compute.assert_awaited_once()
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self):
+        """Test entries older than the TTL are recomputed"""
+        clock = Clock()
+        cache = LLMCache(ttl=60, clock=clock)
+        await cache.set('k', 'old')
+        
+        clock.now += 61
+        
+        assert await cache.get('k') is None
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = LLMCache(max_entries=2)
+        await cache.set('a', '1')
+        await cache.set('b', '2')
+        await cache.get('a')
+        await cache.set('c', '3')
+        
+        assert await cache.get('a') == '1'
+        assert await cache.get('b') is None
+        assert cache.stats()['evictions'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        """Test only one computation runs for concurrent identical keys"""
+        cache = LLMCache()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 'shared'
+        
+        results = await asyncio.gather(*(cache.get_or_compute('k', compute) for _ in range(5)))
+        
+        assert results == ['shared'] * 5
+        assert calls == 1
+        assert cache.stats()['coalesced'] == 4
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test a failed computation propagates and is retried next time"""
+        cache = LLMCache()
+        compute = AsyncMock(side_effect=[RuntimeError('boom'), 'ok'])
+        
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute('k', compute)
+        
+        assert await cache.get_or_compute('k', compute) == 'ok'
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test completions persisted on disk are found by a new cache"""
+        path = str(tmp_path / 'llm_cache.db')
+        first = LLMCache(path=path)
+        await first.set('k', 'persisted')
+        first.close()
+        
+        second = LLMCache(path=path)
+        
+        assert await second.get('k') == 'persisted'
+        assert second.stats()['disk_hits'] == 1
+        second.close()
+
+
+class TestAIProcessorCaching:
+    """Test cases for AIProcessor completions going through the cache"""
+    
+    @pytest.mark.asyncio
+    async def test_identical_requests_call_openai_once(self):
+        """Test repeated identical analyses reuse the cached completion"""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'}):
+            processor = AIProcessor()
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "This is a summary."
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        
+        first = await processor.summarize_transcript("Alice: Hello")
+        second = await processor.summarize_transcript("Alice: Hello")
+        different = await processor.summarize_transcript("Alice: Hello", max_sentences=2)
+        
+        assert first == second == different
+        assert processor.client.chat.completions.create.await_count == 2
@@ -0,0 +1,99 @@
+"""
+Unit tests for MeetingDatabase
+"""
+import pytest
+from backend.services.meeting_db import MeetingDatabase
+
+
+def utterance(seq, speaker, text, start):
+    return {'seq': seq, 'speaker': speaker, 'text': text, 'start_time': start, 'end_time': start + 1}
+
+
+class TestMeetingDatabase:
+    """Test cases for MeetingDatabase"""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """Database in a temporary directory"""
+        database = MeetingDatabase(str(tmp_path / 'meetings.db'))
+        yield database
+        database.close()
+    
+    def test_uses_wal_mode(self, db):
+        """Test the database is opened in write-ahead logging mode"""
+        assert db._conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    
+    def test_meeting_fields_are_merged(self, db):
+        """Test later updates keep fields they do not set"""
+        db.save_meeting('bot_1', meeting_url='https://zoom.us/j/1', bot_name='Agent', state='joining')
+        db.save_meeting('bot_1', state='recording')
+        db.flush()
+        
+        meeting = db.meeting('bot_1')
+        assert meeting['meeting_url'] == 'https://zoom.us/j/1'
+        assert meeting['state'] == 'recording'
+        assert db.meetings(meeting_url='https://zoom.us/j/1')[0]['bot_id'] == 'bot_1'
+    
+    def test_segment_queries(self, db):
+        """Test transcripts can be filtered by speaker and time range"""
+        db.add_segments('bot_1', [
+            utterance(0, 'Alice', 'Welcome', 0.0),
+            utterance(1, 'Bob', 'Thanks', 5.0),
+            utterance(2, 'Alice', 'Budget first', 10.0)
+        ])
+        db.flush()
+        
+        assert [row['text'] for row in db.segments('bot_1', speaker='Alice')] == ['Welcome', 'Budget first']
+        assert [row['seq'] for row in db.segments('bot_1', start=4.0, end=10.0)] == [1]
+    
+    def test_finish_replaces_live_segments(self, db):
+        """Test the final transcript replaces segments recorded live"""
+        db.add_segments('bot_1', [utterance(0, 'Alice', 'partial', 0.0), utterance(1, 'Bob', 'extra', 1.0)])
+        db.finish_meeting('bot_1', [utterance(0, 'Alice', 'final', 0.0)])
+        db.flush()
+        
+        assert db.is_finished('bot_1')
+        assert [row['text'] for row in db.segments('bot_1')] == ['final']
+        assert db.meeting('bot_1')['finished_at'] is not None
+    
+    def test_analysis_is_matched_by_input(self, db):
+        """Test stored outputs are only returned for the same input"""
+        db.save_analysis('bot_1', 'summary', 'hash_a', 'The team agreed.')
+        db.flush()
+        
+        assert db.analysis('bot_1', 'summary', 'hash_a') == 'The team agreed.'
+        assert db.analysis('bot_1', 'summary', 'hash_b') is None
+        assert db.analyses('bot_1') == {'summary': 'The team agreed.'}
+    
+    def test_data_survives_reopen(self, tmp_path):
+        """Test queued writes are committed on close and read after reopening"""
+        path = str(tmp_path / 'meetings.db')
+        first = MeetingDatabase(path)
+        first.finish_meeting('bot_1', [utterance(0, 'Alice', 'Hello', 0.0)])
+        first.save_analysis('bot_1', 'key_points', 'hash', ['Point one'])
+        first.close()
+        
+        second = MeetingDatabase(path)
+        
+        assert second.is_finished('bot_1')
+        assert second.segments('bot_1')[0]['text'] == 'Hello'
+        assert second.analysis('bot_1', 'key_points') == ['Point one']
+        second.close()
+    
+    def test_pages_cover_every_segment_and_chunk(self, db):
+        """Test paging returns all segments and chunks exactly once"""
+        db.add_segments('bot_a', [utterance(i, 'Alice', f'a{i}', float(i)) for i in range(3)])
+        db.add_segments('bot_b', [utterance(i, 'Bob', f'b{i}', float(i)) for i in range(2)])
+        chunk = {'bot_id': 'bot_a', 'speakers': ['Alice'], 'text': 'Alice: a0', 'start_time': 0.0, 'end_time': 1.0}
+        db.save_chunks([chunk, dict(chunk, text='Alice: a1')], [b'\x00' * 8, b'\x01' * 8])
+        db.flush()
+        
+        first = db.segment_page(limit=4)
+        second = db.segment_page(after=(first[-1]['bot_id'], first[-1]['seq']), limit=4)
+        chunks = db.chunk_page()
+        
+        assert [row['text'] for row in first + second] == ['a0', 'a1', 'a2', 'b0', 'b1']
+        assert db.segment_page(after=('bot_b', 1)) == []
+        assert [c['embedding'] for c in chunks] == [b'\x00' * 8, b'\x01' * 8]
+        assert chunks[0]['speakers'] == ['Alice']
+        assert db.chunk_page(after=chunks[-1]['rowid']) == []
@@ -0,0 +1,97 @@
+"""
+Unit tests for metrics, the request middleware and the sampling profiler
+"""
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.services import metrics
+from backend.services.metrics import Histogram, MetricsRegistry, RequestMetricsMiddleware
+from backend.services.profiler import SamplingProfiler
+
+
+class TestHistogram:
+    """Test cases for Histogram and MetricsRegistry"""
+    
+    def test_observe_and_quantiles(self):
+        """Test observations land in buckets and quantiles use bucket bounds"""
+        histogram = Histogram(buckets=(0.1, 0.5, 1.0))
+        for value in (0.05, 0.05, 0.3, 0.7, 5.0):
+            histogram.observe(value)
+        
+        assert histogram.counts == [2, 1, 1, 1]
+        assert histogram.count == 5
+        assert histogram.quantile(0.5) == 0.5
+        assert histogram.quantile(0.99) == float('inf')
+    
+    def test_registry_reuses_series(self):
+        """Test the same name and labels return the same histogram"""
+        registry = MetricsRegistry()
+        a = registry.histogram('latency', operation='summarize')
+        
+        assert registry.histogram('latency', operation='summarize') is a
+        assert registry.histogram('latency', operation='question') is not a
+        a.observe(0.2)
+        assert registry.snapshot()['latency'][1]['count'] == 1
+    
+    def test_counters_and_prometheus_text(self):
+        """Test histograms render cumulative buckets and counters their totals"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('upstream_seconds', buckets=(0.1, 1.0), upstream='recall')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        registry.counter('upstream_errors_total', upstream='re"call').inc(2)
+        
+        text = registry.render_prometheus()
+        
+        assert '# TYPE upstream_seconds histogram' in text
+        assert 'upstream_seconds_bucket{upstream="recall",le="0.1"} 1' in text
+        assert 'upstream_seconds_bucket{upstream="recall",le="+Inf"} 2' in text
+        assert 'upstream_seconds_count{upstream="recall"} 2' in text
+        assert 'upstream_errors_total{upstream="re\\"call"} 2' in text
+        assert registry.snapshot()['upstream_errors_total'][0]['value'] == 2
+    
+    def test_middleware_records_routes_by_template(self):
+        """Test requests are labelled with their route's path template"""
+        app = FastAPI()
+        
+        @app.get('/items/{item_id}')
+        async def item(item_id: str):
+            return {'id': item_id}
+        
+        middleware = RequestMetricsMiddleware(app)
+        with TestClient(middleware) as client:
+            client.get('/items/1')
+            client.get('/items/2')
+            client.get('/missing')
+        
+        responses = metrics.registry.counter('http_responses_total', method='GET', route='/items/{item_id}', status='200')
+        assert responses.value == 2
+        assert metrics.registry.counter('http_responses_total', method='GET', route='unmatched', status='404').value == 1
+        assert metrics.registry.histogram('http_request_duration_seconds', method='GET', route='/items/{item_id}').count == 2
+
+
+class TestSamplingProfiler:
+    """Test cases for SamplingProfiler"""
+    
+    def test_slow_request_is_dumped_as_folded_stacks(self, tmp_path):
+        """Test the stacks sampled during a slow request are written out"""
+        def busy_handler():
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                pass
+        
+        profiler = SamplingProfiler(0.05, directory=str(tmp_path), interval=0.002)
+        profiler.begin()
+        started = time.perf_counter()
+        busy_handler()
+        profiler.end('GET /slow', started, time.perf_counter() - started)
+        profiler.begin()
+        profiler.end('GET /fast', time.perf_counter(), 0.001)
+        profiler.stop()
+        
+        dumps = list(tmp_path.iterdir())
+        assert len(dumps) == 1
+        assert 'GET_slow' in dumps[0].name
+        lines = dumps[0].read_text().splitlines()
+        assert any('busy_handler' in line.rsplit(' ', 1)[0] for line in lines)
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
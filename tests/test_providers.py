@@ -0,0 +1,63 @@
+"""
+Unit tests for lazily built service providers
+"""
+import pytest
+from unittest.mock import patch
+from backend.services.providers import Provider, ServiceUnavailable
+
+
+class Service:
+    """Stand-in for a service that needs configuration"""
+    
+    def __init__(self, key):
+        if not key:
+            raise ValueError("KEY must be set")
+        self.key = key
+    
+    def greet(self):
+        return f"hello {self.key}"
+
+
+class TestProvider:
+    """Test cases for Provider"""
+    
+    def test_builds_once_on_first_use(self):
+        """Test the factory runs on first use and its service is reused"""
+        built = []
+        provider = Provider("Test", lambda: built.append(1) or Service("a"))
+        
+        assert built == []
+        assert provider.built is None
+        assert provider.get() is provider()
+        assert built == [1]
+        assert provider.built is provider.get()
+    
+    def test_attributes_are_forwarded(self):
+        """Test code holding the provider can use it as the service"""
+        provider = Provider("Test", lambda: Service("a"))
+        
+        assert provider.greet() == "hello a"
+        provider.key = "b"
+        assert provider.get().key == "b"
+        with patch.object(provider, 'greet', return_value="patched"):
+            assert provider.get().greet() == "patched"
+        assert provider.greet() == "hello b"
+    
+    def test_unconfigured_service_is_unavailable(self):
+        """Test a rejected configuration is reported and retried on the next use"""
+        keys = ["", "a"]
+        provider = Provider("Test", lambda: Service(keys.pop(0)))
+        
+        with pytest.raises(ServiceUnavailable, match="KEY must be set"):
+            provider.greet()
+        assert provider.greet() == "hello a"
+    
+    def test_override_and_reset(self):
+        """Test a pre-built service replaces the factory's until reset"""
+        provider = Provider("Test", lambda: Service("a"))
+        provider.override(Service("b"))
+        
+        assert provider.key == "b"
+        provider.reset()
+        assert provider.built is None
+        assert provider.key == "a"
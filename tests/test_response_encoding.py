@@ -0,0 +1,70 @@
+"""
+Unit tests for response content negotiation and encoding
+"""
+import gzip
+import json
+import pytest
+from backend.services.response_encoding import (
+    JSON, MSGPACK, TEXT, choose_media_type, choose_encoding, encode, MIN_COMPRESSED_BYTES
+)
+
+
+class TestNegotiation:
+    """Test cases for picking media types and encodings"""
+    
+    def test_media_type_follows_accept(self):
+        """Test the preferred offered type wins and the default breaks ties"""
+        offered = [JSON, MSGPACK]
+        
+        assert choose_media_type(None, offered) == JSON
+        assert choose_media_type('*/*', offered) == JSON
+        assert choose_media_type('application/msgpack', offered) == MSGPACK
+        assert choose_media_type('application/x-msgpack, application/json;q=0.5', offered) == MSGPACK
+        assert choose_media_type('application/*', offered) == JSON
+        assert choose_media_type('text/plain', [TEXT]) == TEXT
+        assert choose_media_type('audio/*', [JSON, 'audio/wav']) == 'audio/wav'
+        assert choose_media_type('image/png', offered) is None
+    
+    def test_encoding_follows_accept_encoding(self):
+        """Test compression is only used when accepted"""
+        assert choose_encoding(None) is None
+        assert choose_encoding('identity') is None
+        assert choose_encoding('gzip, deflate') == 'gzip'
+        assert choose_encoding('gzip;q=0') is None
+        assert choose_encoding('br, *') in ('gzip', 'zstd')
+
+
+class TestEncode:
+    """Test cases for serializing and compressing bodies"""
+    
+    def test_small_bodies_are_not_compressed(self):
+        """Test compression is skipped below the threshold"""
+        body = encode({'a': 1}, JSON, 'gzip')
+        
+        assert body.encoding is None
+        assert json.loads(body.body) == {'a': 1}
+        assert 'Content-Encoding' not in body.headers
+    
+    def test_gzip_round_trip(self):
+        """Test large bodies are gzipped and decode to the same content"""
+        content = {'text': ['Alice: hello'] * MIN_COMPRESSED_BYTES}
+        body = encode(content, JSON, 'gzip')
+        
+        assert body.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(body.body)) == content
+    
+    def test_zstd_round_trip(self):
+        """Test zstd bodies decode to the same content"""
+        zstandard = pytest.importorskip('zstandard')
+        content = 'Alice: hello\n' * MIN_COMPRESSED_BYTES
+        body = encode(content, TEXT, 'zstd')
+        
+        assert body.encoding == 'zstd'
+        assert zstandard.ZstdDecompressor().decompress(body.body).decode() == content
+    
+    def test_msgpack_round_trip(self):
+        """Test msgpack bodies decode to the same content"""
+        msgpack = pytest.importorskip('msgpack')
+        content = {'speakers': ['Alice'], 'speaker': [0, 0], 'start_time': [0.5, 1.5]}
+        
+        assert msgpack.unpackb(encode(content, MSGPACK).body) == content
@@ -0,0 +1,219 @@
+"""
+Unit tests for SearchIndex, VectorIndex and the search endpoint
+"""
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.services import search_index as search_module
+from backend.services.search_index import SearchIndex, VectorIndex, parse_query, tokenize
+
+
+def build_index():
+    """Index with two short meetings"""
+    index = SearchIndex()
+    index.set_meeting_url('bot_1', 'https://zoom.us/j/1')
+    rows = [
+        ('bot_1', 0, 'Alice', 'Let us review the budget for next quarter', 0.0),
+        ('bot_1', 1, 'Bob', 'The budget budget is tight', 5.0),
+        ('bot_1', 2, 'Alice', 'Next we hire a designer', 9.0),
+        ('bot_2', 0, 'Carol', 'Quarter next the plan says', 0.0),
+        ('bot_2', 1, 'Dave', 'Lunch is at noon', 3.0),
+    ]
+    for bot_id, seq, speaker, text, start in rows:
+        index.add(bot_id, seq, speaker, text, start, start + 1.0)
+    return index
+
+
+@pytest.fixture(params=['python', 'numpy'])
+def ranking(request):
+    """Run a test with the pure Python and the NumPy ranking paths"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        yield
+    else:
+        with patch.object(search_module, 'np', None):
+            yield
+
+
+class TestQueryParsing:
+    """Test cases for query parsing"""
+    
+    def test_tokenize_lowercases_words(self):
+        """Test punctuation is dropped and words are lowercased"""
+        assert tokenize("Q3 budget, isn't it?") == ['q3', 'budget', 'isn', 't', 'it']
+    
+    def test_quoted_phrases(self):
+        """Test quoted words form phrases and still count as terms"""
+        terms, phrases = parse_query('budget "next quarter" "solo"')
+        
+        assert terms == ['budget', 'next', 'quarter', 'solo']
+        assert phrases == [['next', 'quarter']]
+
+
+@pytest.mark.usefixtures('ranking')
+class TestSearchIndex:
+    """Test cases for SearchIndex"""
+    
+    def test_bm25_prefers_frequent_terms_in_short_utterances(self):
+        """Test the utterance repeating the term ranks first"""
+        results = build_index().search('budget')
+        
+        assert [(r['bot_id'], r['seq']) for r in results] == [('bot_1', 1), ('bot_1', 0)]
+        assert results[0]['score'] > results[1]['score']
+        assert results[0]['meeting_url'] == 'https://zoom.us/j/1'
+        assert results[0]['speaker'] == 'Bob'
+        assert results[0]['start_time'] == 5.0
+    
+    def test_rare_terms_weigh_more(self):
+        """Test a rare term outweighs a common one"""
+        results = build_index().search('next designer')
+        
+        assert results[0]['text'] == 'Next we hire a designer'
+    
+    def test_phrase_requires_adjacent_words(self):
+        """Test phrase queries only match the words in order"""
+        index = build_index()
+        
+        assert [r['text'] for r in index.search('"next quarter"')] == ['Let us review the budget for next quarter']
+        assert index.search('"quarter budget"') == []
+    
+    def test_unknown_terms_do_not_hide_matches(self):
+        """Test a bare term found nowhere is ignored, like any other term a result lacks"""
+        index = build_index()
+        
+        assert [r['seq'] for r in index.search('budget forecast')] == [r['seq'] for r in index.search('budget')]
+        assert index.search('forecast') == []
+        assert index.search('budget "next forecast"') == []
+    
+    def test_filters(self):
+        """Test results can be limited to a bot, a speaker and a count"""
+        index = build_index()
+        
+        assert [r['bot_id'] for r in index.search('next', bot_id='bot_2')] == ['bot_2']
+        assert [r['speaker'] for r in index.search('next', speaker='Alice')] == ['Alice', 'Alice']
+        assert len(index.search('next', limit=1)) == 1
+        assert index.search('next', bot_id='bot_unknown') == []
+        assert index.search('missing') == []
+    
+    def test_readding_a_seq_replaces_it(self):
+        """Test an utterance indexed again under the same seq replaces the old text"""
+        index = build_index()
+        index.add('bot_2', 1, 'Dave', 'Dinner is at eight', 3.0, 4.0)
+        
+        assert index.search('lunch') == []
+        assert index.search('dinner')[0]['seq'] == 1
+        assert len(index) == 5
+    
+    def test_replace_meeting_and_compaction(self):
+        """Test re-indexing many meetings keeps only the latest utterances"""
+        index = SearchIndex()
+        for round_ in range(3):
+            for bot in range(10):
+                index.replace_meeting(f'bot_{bot}', [
+                    {'seq': seq, 'speaker': 'Alice', 'text': f'round{round_} item {seq}',
+                     'start_time': float(seq), 'end_time': float(seq) + 1}
+                    for seq in range(100)
+                ])
+        
+        assert len(index) == 1000
+        assert index.stats()['deleted'] < 2000
+        assert index.search('round1') == []
+        assert len(index.search('round2', limit=100)) == 100
+
+
+class TestVectorIndex:
+    """Test cases for VectorIndex"""
+    
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip('numpy')
+    
+    @staticmethod
+    async def embed(texts):
+        """Two-dimensional embeddings: budget talk vs. everything else"""
+        return [[1.0, 0.0] if 'budget' in text else [0.0, 1.0] for text in texts]
+    
+    def utterance(self, speaker, text, start):
+        return {'speaker': speaker, 'text': text, 'start_time': start, 'end_time': start + 1}
+    
+    @pytest.mark.asyncio
+    async def test_chunks_are_embedded_and_ranked(self):
+        """Test full chunks are embedded in the background and searched by cosine"""
+        saved = []
+        index = VectorIndex(self.embed, chunk_words=4, on_embedded=lambda chunks, vectors: saved.extend(vectors))
+        index.add('bot_1', self.utterance('Alice', 'the budget is', 0.0))
+        index.add('bot_1', self.utterance('Bob', 'tight', 2.0))
+        index.add('bot_1', self.utterance('Alice', 'lunch is at noon', 4.0))
+        index.add('bot_2', self.utterance('Carol', 'hello', 0.0))
+        index.flush('bot_2')
+        await index.wait()
+        
+        results = await index.search('budget talk', limit=2)
+        
+        assert len(index) == 3
+        assert len(saved) == 3
+        assert results[0]['speakers'] == ['Alice', 'Bob']
+        assert results[0]['start_time'] == 0.0 and results[0]['end_time'] == 3.0
+        assert results[0]['score'] == pytest.approx(1.0)
+        assert [r['bot_id'] for r in await index.search('budget', bot_id='bot_2')] == ['bot_2']
+        assert await index.search('budget', bot_id='bot_unknown') == []
+    
+    @pytest.mark.asyncio
+    async def test_restore_loads_saved_embeddings(self, numpy):
+        """Test chunks saved by on_embedded can be restored without embedding again"""
+        chunk = {'bot_id': 'bot_1', 'speakers': ['Alice'], 'text': 'Alice: budget',
+                 'start_time': 0.0, 'end_time': 1.0,
+                 'embedding': numpy.array([2.0, 0.0], dtype=numpy.float32).tobytes()}
+        
+        async def fail(texts):
+            raise AssertionError('chunks should not be embedded again')
+        
+        async def embed_query(query):
+            return (await self.embed([query]))[0]
+        
+        index = VectorIndex(fail, embed_query=embed_query)
+        index.restore([chunk])
+        
+        results = await index.search('budget')
+        
+        assert results[0]['text'] == 'Alice: budget'
+        assert 'embedding' not in results[0]
+
+
+class TestSearchEndpoint:
+    """Test cases for the /search endpoint"""
+    
+    @pytest.fixture
+    def routes(self):
+        """Import the API routes with test API keys"""
+        env = {'RECALL_API_KEY': 'test', 'OPENAI_API_KEY': 'test', 'CARTESIA_API_KEY': 'test', 'MEETING_DB_PATH': ''}
+        with patch.dict('os.environ', env):
+            from api import routes
+        routes.search_index.remove_meeting('bot_search')
+        return routes
+    
+    @pytest.fixture
+    def client(self, routes):
+        """Test client for an app serving the API routes"""
+        app = FastAPI()
+        app.include_router(routes.router)
+        return TestClient(app)
+    
+    def test_webhook_utterances_are_searchable(self, routes, client):
+        """Test utterances received by webhook are indexed immediately"""
+        routes.transcript_store.clear('bot_search')
+        routes.transcript_store.append('bot_search', 'Alice', 'We decided to ship the zebra feature', 12.0, 14.0)
+        
+        response = client.get('/search', params={'q': '"zebra feature"'})
+        
+        body = response.json()
+        assert response.status_code == 200
+        assert body['results'][0]['bot_id'] == 'bot_search'
+        assert body['results'][0]['start_time'] == 12.0
+        assert 'took_ms' in body
+    
+    def test_semantic_search_requires_opt_in(self, client):
+        """Test semantic mode reports it is disabled unless configured"""
+        assert client.get('/search', params={'q': 'x', 'mode': 'semantic'}).status_code == 503
+        assert client.get('/search', params={'q': 'x', 'mode': 'other'}).status_code == 400
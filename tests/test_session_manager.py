@@ -0,0 +1,171 @@
+"""
+Unit tests for SessionManager
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from backend.services.session_manager import SessionManager, status_code
+from backend.services.shared_state import LocalState
+
+
+class Clock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeRecall:
+    """Transcription service stand-in with settable bot statuses"""
+    
+    def __init__(self):
+        self.statuses = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.join_meeting = AsyncMock(side_effect=lambda url, name: {'id': f'bot_{len(self.statuses)}', 'status': 'joining'})
+        self.leave_meeting = AsyncMock(return_value={'success': True})
+    
+    async def get_bot_status(self, bot_id):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return {'id': bot_id, 'status_changes': [{'code': self.statuses.get(bot_id, 'joining_call')}]}
+
+
+@pytest.fixture
+def recall():
+    return FakeRecall()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def manager(recall, clock):
+    return SessionManager(recall, min_interval=1, max_interval=8, batch_size=2, clock=clock)
+
+
+class TestSessionManager:
+    """Test cases for SessionManager"""
+    
+    def test_status_code_formats(self):
+        """Test status codes are read from both payload shapes"""
+        assert status_code({'status_changes': [{'code': 'ready'}, {'code': 'in_call_recording'}]}) == 'in_call_recording'
+        assert status_code({'status': 'in_meeting'}) == 'in_meeting'
+        assert status_code({}) is None
+    
+    @pytest.mark.asyncio
+    async def test_join_tracks_bot(self, manager):
+        """Test joined bots are listed in the joining state"""
+        bot = await manager.join('https://zoom.us/j/1')
+        
+        assert manager.sessions() == [pytest.approx(manager.get(bot['id']).to_dict())]
+        assert manager.get(bot['id']).state == 'joining'
+        await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_sweep_follows_lifecycle(self, manager, recall, clock):
+        """Test sweeps move bots through joining, in_call, recording and done"""
+        changes = []
+        manager.add_listener(lambda bot_id, old, new: changes.append((old, new)))
+        manager.track('bot_a')
+        
+        for code in ('in_call_not_recording', 'in_call_recording', 'call_ended'):
+            recall.statuses['bot_a'] = code
+            clock.now += 10
+            await manager.sweep()
+        
+        assert changes == [('joining', 'in_call'), ('in_call', 'recording'), ('recording', 'done')]
+        clock.now += 10
+        assert await manager.sweep() == 0
+    
+    @pytest.mark.asyncio
+    async def test_idle_bots_back_off(self, manager, recall, clock):
+        """Test unchanged bots are polled less often up to the maximum interval"""
+        session = manager.track('bot_a')
+        intervals = []
+        for _ in range(6):
+            clock.now = session.next_check
+            await manager.sweep()
+            intervals.append(session.interval)
+        
+        assert intervals == [1, 2, 4, 8, 8, 8]
+        
+        recall.statuses['bot_a'] = 'in_call_recording'
+        clock.now = session.next_check
+        await manager.sweep()
+        assert session.interval == 1
+    
+    @pytest.mark.asyncio
+    async def test_sweeps_are_batched(self, manager, recall):
+        """Test at most batch_size status requests run at once"""
+        for i in range(5):
+            manager.track(f'bot_{i}')
+        
+        assert await manager.sweep() == 5
+        assert recall.max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_status_is_served_from_cache(self, manager, recall):
+        """Test tracked bots are answered without calling Recall.ai"""
+        await manager.status('bot_a')
+        await manager.status('bot_a')
+        
+        assert recall.calls == 1
+        assert manager.get('bot_a').status == 'joining_call'
+        await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_stale_status_does_not_move_backwards(self, manager, recall, clock):
+        """Test a late joining status is ignored once the bot is in the call"""
+        manager.track('bot_a')
+        recall.statuses['bot_a'] = 'in_call_recording'
+        await manager.sweep()
+        
+        recall.statuses['bot_a'] = 'joining_call'
+        clock.now += 10
+        await manager.sweep()
+        
+        assert manager.get('bot_a').state == 'recording'
+    
+    @pytest.mark.asyncio
+    async def test_leave_marks_done(self, manager, recall, clock):
+        """Test leaving marks the bot done and stops polling it"""
+        manager.track('bot_a')
+        await manager.leave('bot_a')
+        
+        clock.now += 10
+        assert await manager.sweep() == 0
+        assert manager.sessions('done')[0]['id'] == 'bot_a'
+    
+    @pytest.mark.asyncio
+    async def test_workers_answer_for_each_others_bots(self, recall, clock):
+        """Test a bot is tracked by one worker and visible from the others"""
+        shared = LocalState()
+        first = SessionManager(recall, min_interval=1, max_interval=8, clock=clock, shared=shared)
+        second = SessionManager(recall, min_interval=1, max_interval=8, clock=clock, shared=shared)
+        first.start()
+        second.start()
+        
+        bot = await first.join('https://zoom.us/j/1')
+        await asyncio.sleep(0.01)
+        calls = recall.calls
+        status = await second.status(bot['id'])
+        
+        assert status['id'] == bot['id'] and status['meeting_url'] == 'https://zoom.us/j/1'
+        assert recall.calls == calls
+        assert second.get(bot['id']) is None
+        assert [session['id'] for session in await second.all_sessions()] == [bot['id']]
+        
+        await second.leave(bot['id'])
+        assert second.get(bot['id']) is None
+        await first.close()
+        await second.close()
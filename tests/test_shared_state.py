@@ -0,0 +1,150 @@
+"""
+Unit tests for the shared state backends
+"""
+import asyncio
+import pytest
+from backend.services.shared_state import LocalState, RespState, StateServer, SharedStateError
+
+
+class Clock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    """State server on a loopback port"""
+    server = StateServer().start()
+    yield server
+    server.stop()
+
+
+class TestLocalState:
+    """Test cases for LocalState"""
+    
+    @pytest.mark.asyncio
+    async def test_set_only_new_and_expiry(self):
+        """Test only_new leaves existing keys alone and keys expire after their ttl"""
+        clock = Clock()
+        state = LocalState(clock=clock)
+        
+        assert await state.set('k', 'first', ttl=10)
+        assert not await state.set('k', 'second', only_new=True)
+        assert await state.get('k') == b'first'
+        
+        clock.now += 10
+        assert await state.get('k') is None
+        assert await state.set('k', 'second', only_new=True)
+    
+    @pytest.mark.asyncio
+    async def test_lists_keep_their_expiry_until_touched(self):
+        """Test pushes without a ttl keep the list's expiry and touch renews it"""
+        clock = Clock()
+        state = LocalState(clock=clock)
+        
+        assert await state.push('log', 'a', ttl=10) == 1
+        assert await state.push('log', b'b') == 2
+        assert await state.range('log', 1) == [b'b']
+        clock.now += 5
+        assert await state.touch('log', 10)
+        clock.now += 8
+        assert await state.range('log') == [b'a', b'b']
+        assert state.sweep() == 0
+        clock.now += 2
+        assert state.sweep() == 1
+        assert await state.range('log') == []
+    
+    @pytest.mark.asyncio
+    async def test_least_recently_written_cache_entry_is_evicted(self):
+        """Test the number of cache entries stays bounded"""
+        state = LocalState(max_keys=2)
+        for key in ('llm:a', 'llm:b', 'llm:c'):
+            await state.set(key, key)
+        
+        assert await state.get('llm:a') is None
+        assert await state.get('llm:c') == b'llm:c'
+    
+    @pytest.mark.asyncio
+    async def test_cache_entries_stay_within_the_byte_budget(self):
+        """Test large cache entries evict older ones beyond max_bytes"""
+        state = LocalState(max_bytes=100)
+        await state.set('audio:a', b'x' * 60)
+        await state.set('audio:b', b'y' * 30)
+        await state.set('audio:a', b'x' * 50)
+        assert await state.get('audio:b') == b'y' * 30
+        
+        await state.set('audio:c', b'z' * 40)
+        
+        assert await state.get('audio:b') is None
+        assert await state.get('audio:a') == b'x' * 50
+        assert await state.get('audio:c') == b'z' * 40
+        await state.set('audio:d', b'w' * 200)
+        assert await state.get('audio:d') is None
+    
+    @pytest.mark.asyncio
+    async def test_state_other_than_caches_is_never_evicted(self):
+        """Test lists, claims and dedup keys only lapse by their ttl"""
+        state = LocalState(max_keys=2, max_bytes=10)
+        await state.push('transcript-bots', 'bot_1')
+        await state.set('job:1', 'worker')
+        for i in range(50):
+            await state.set(f'transcript:bot_1:seen:{i}', '1', ttl=60)
+            await state.push('transcript:bot_1', f'row {i}')
+            await state.set(f'llm:{i}', 'cached')
+        
+        assert await state.range('transcript-bots') == [b'bot_1']
+        assert await state.get('job:1') == b'worker'
+        assert await state.get('transcript:bot_1:seen:0') == b'1'
+        assert len(await state.range('transcript:bot_1')) == 50
+        assert await state.get('llm:47') is None
+        assert await state.get('llm:49') == b'cached'
+
+
+class TestRespState:
+    """Test cases for RespState against the built-in StateServer"""
+    
+    @pytest.mark.asyncio
+    async def test_round_trip(self, server):
+        """Test every operation through the Redis protocol"""
+        client = RespState(server.url)
+        
+        assert await client.set('k', 'v', ttl=60)
+        assert not await client.set('k', 'w', only_new=True)
+        assert await client.get('k') == b'v'
+        assert await client.push('log', 'a', ttl=60) == 1
+        assert await client.push('log', b'\r\nbinary\x00') == 2
+        assert await client.range('log') == [b'a', b'\r\nbinary\x00']
+        assert await client.touch('log', 60)
+        await client.delete('k')
+        assert await client.get('k') is None
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_are_pipelined(self, server):
+        """Test replies reach the right callers when many commands share the connection"""
+        client = RespState(server.url)
+        await asyncio.gather(*(client.set(f'k{i}', str(i)) for i in range(50)))
+        
+        values = await asyncio.gather(*(client.get(f'k{i}') for i in range(50)))
+        
+        assert values == [str(i).encode() for i in range(50)]
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_errors(self, server):
+        """Test error replies raise and an unreachable server is a ConnectionError"""
+        client = RespState(server.url)
+        with pytest.raises(SharedStateError):
+            await client.execute(('FLUSHALL',))
+        assert await client.get('still-usable') is None
+        await client.close()
+        
+        with pytest.raises(ConnectionError):
+            await RespState('redis://127.0.0.1:1').get('k')
+        with pytest.raises(ValueError):
+            RespState('http://localhost')
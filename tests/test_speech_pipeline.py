@@ -0,0 +1,141 @@
+"""
+Unit tests for the question speech pipeline
+"""
+import asyncio
+import json
+import struct
+import httpx
+import pytest
+from backend.services.audio_cache import AudioCache
+from backend.services.http_client import UpstreamClient
+from backend.services.speech_pipeline import SpeechPipeline, split_sentences, wav_stream_header
+from backend.services.voice import VoiceService
+
+
+class FakeProcessor:
+    """Streams a fixed question, pausing after the first sentence until released"""
+    
+    def __init__(self, deltas, error=None):
+        self.deltas = deltas
+        self.error = error
+        self.release = asyncio.Event()
+    
+    async def stream_question(self, user_input):
+        for i, delta in enumerate(self.deltas):
+            yield delta
+            if i == 1:
+                await self.release.wait()
+        if self.error:
+            raise self.error
+
+
+def make_voice(requests_seen):
+    """VoiceService whose Cartesia stub returns the requested text as audio"""
+    def handler(request):
+        body = json.loads(request.content)
+        requests_seen.append(body)
+        return httpx.Response(200, content=body["transcript"].encode())
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return VoiceService(
+        api_key='test_key',
+        upstream=UpstreamClient('cartesia', client=client),
+        cache=AudioCache(),
+        output_format='wav_s16'
+    )
+
+
+class TestSplitSentences:
+    """Test cases for split_sentences"""
+    
+    def test_keeps_unfinished_remainder(self):
+        """Test only sentences followed by whitespace are split off"""
+        sentences, rest = split_sentences('Could you share the plan? And "the budget." Then')
+        
+        assert sentences == ['Could you share the plan?', 'And "the budget."']
+        assert rest == 'Then'
+    
+    def test_no_boundary_yet(self):
+        """Test text ending in punctuation waits for the next delta"""
+        assert split_sentences('Could you share the plan?') == ([], 'Could you share the plan?')
+
+
+class TestWavStreamHeader:
+    """Test cases for wav_stream_header"""
+    
+    def test_pcm_header_fields(self):
+        """Test the header describes mono 16-bit PCM of unknown length"""
+        header = wav_stream_header('pcm_s16le', 22050)
+        
+        assert len(header) == 44
+        assert header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+        format_tag, channels, rate, byte_rate, block_align, bits = struct.unpack('<HHIIHH', header[20:36])
+        assert (format_tag, channels, rate, bits) == (1, 1, 22050, 16)
+        assert byte_rate == 44100 and block_align == 2
+
+
+class TestSpeechPipeline:
+    """Test cases for SpeechPipeline"""
+    
+    @pytest.mark.asyncio
+    async def test_synthesis_starts_before_generation_finishes(self):
+        """Test the first sentence is sent to TTS while the rest is still generated"""
+        requests_seen = []
+        processor = FakeProcessor(['Could you share ', 'the plan? ', 'And the budget?'])
+        pipeline = SpeechPipeline(processor, make_voice(requests_seen))
+        
+        question = await pipeline.ask('plan and budget')
+        for _ in range(20):
+            await asyncio.sleep(0)
+        
+        assert [body['transcript'] for body in requests_seen] == ['Could you share the plan?']
+        assert not question.text_ready.is_set()
+        
+        processor.release.set()
+        await question.text_ready.wait()
+        audio = b''.join([chunk async for chunk in question.audio()])
+        
+        assert question.text == 'Could you share the plan? And the budget?'
+        assert audio == wav_stream_header('pcm_s16le', 44100) + b'Could you share the plan?And the budget?'
+        assert requests_seen[0]['output_format']['container'] == 'raw'
+    
+    @pytest.mark.asyncio
+    async def test_audio_can_be_replayed(self):
+        """Test the buffered audio is served again to a later listener"""
+        processor = FakeProcessor(['Is it ', 'done?'])
+        processor.release.set()
+        pipeline = SpeechPipeline(processor, make_voice([]))
+        
+        question = await pipeline.ask('done?')
+        first = b''.join([chunk async for chunk in question.audio()])
+        second = b''.join([chunk async for chunk in pipeline.get(question.id).audio()])
+        
+        assert first == second
+    
+    @pytest.mark.asyncio
+    async def test_questions_expire(self):
+        """Test audio is no longer available after the TTL"""
+        processor = FakeProcessor(['Is it ', 'done?'])
+        processor.release.set()
+        pipeline = SpeechPipeline(processor, make_voice([]), ttl=0)
+        
+        question = await pipeline.ask('done?')
+        await asyncio.sleep(0.01)
+        
+        assert pipeline.get(question.id) is None
+        await pipeline.close()
+    
+    @pytest.mark.asyncio
+    async def test_generation_error_is_reported(self):
+        """Test a failed completion marks the question and ends its audio"""
+        processor = FakeProcessor(['Is it ', 'done? '], error=RuntimeError('upstream failed'))
+        processor.release.set()
+        pipeline = SpeechPipeline(processor, make_voice([]))
+        
+        question = await pipeline.ask('done?')
+        await question.text_ready.wait()
+        
+        assert question.error == 'upstream failed'
+        with pytest.raises(RuntimeError):
+            async for _ in question.audio():
+                pass
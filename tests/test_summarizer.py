@@ -0,0 +1,154 @@
+"""
+Unit tests for the hierarchical SummarizationEngine
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.services.ai_processor import AIProcessor
+from backend.services.summarizer import SummarizationEngine, chunk_transcript
+from backend.services.transcript_prep import count_tokens
+
+
+WORDS = "we should review the launch plan before release and check every open item with owners".split()
+
+
+def make_transcript(turns, words_per_turn=30):
+    """Build a transcript with one speaker turn per line"""
+    speakers = ['Alice', 'Bob', 'Carol']
+    return "\n".join(
+        f"{speakers[i % 3]}: "
+        + " ".join(WORDS[(i + j) % len(WORDS)] for j in range(words_per_turn))
+        + f" turn {i}."
+        for i in range(turns)
+    )
+
+
+class FakeCompletions:
+    """Completion function that records calls and tracks concurrency"""
+    
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+    
+    async def __call__(self, system, prompt, max_tokens):
+        self.calls.append(prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        return f"notes {len(self.calls)}"
+
+
+class TestChunking:
+    """Test cases for chunk_transcript"""
+    
+    def test_chunks_respect_budget_and_turns(self):
+        """Test chunks stay within budget and never split a short turn"""
+        transcript = make_transcript(40)
+        chunks = chunk_transcript(transcript, 200)
+        
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+        assert "\n".join(chunks).splitlines() == transcript.splitlines()
+    
+    def test_oversized_turn_is_split_on_sentences(self):
+        """Test a single long turn is split at sentence boundaries"""
+        turn = "Alice: " + " ".join(f"Sentence number {i} is here." for i in range(50))
+        chunks = chunk_transcript(turn, 60)
+        
+        assert len(chunks) > 1
+        assert all(chunk.endswith('.') for chunk in chunks)
+    
+    def test_appending_keeps_earlier_chunks(self):
+        """Test growing a transcript only changes its final chunks"""
+        before = chunk_transcript(make_transcript(40), 200)
+        after = chunk_transcript(make_transcript(60), 200)
+        
+        assert after[:len(before) - 1] == before[:-1]
+
+
+class TestSummarizationEngine:
+    """Test cases for SummarizationEngine"""
+    
+    @pytest.mark.asyncio
+    async def test_short_transcript_is_not_condensed(self):
+        """Test transcripts that fit are returned without any completion"""
+        complete = FakeCompletions()
+        engine = SummarizationEngine(complete, chunk_tokens=1000)
+        
+        assert await engine.condense("Alice: Hello") == "Alice: Hello"
+        assert complete.calls == []
+    
+    @pytest.mark.asyncio
+    async def test_map_reduce_with_bounded_concurrency(self):
+        """Test chunks are condensed concurrently within the worker limit"""
+        complete = FakeCompletions()
+        engine = SummarizationEngine(complete, chunk_tokens=200, max_concurrency=3, fan_in=4, notes_tokens=50)
+        transcript = make_transcript(80)
+        chunks = chunk_transcript(transcript, 200)
+        
+        notes = await engine.condense(transcript)
+        
+        assert complete.peak == 3
+        assert len(complete.calls) >= len(chunks)
+        assert count_tokens(notes) <= 200
+    
+    @pytest.mark.asyncio
+    async def test_progress_is_reported_per_chunk(self):
+        """Test on_progress is called once per condensed chunk"""
+        engine = SummarizationEngine(FakeCompletions(), chunk_tokens=200)
+        transcript = make_transcript(40)
+        progress = []
+        
+        await engine.condense(transcript, on_progress=lambda done, total: progress.append((done, total)))
+        
+        total = len(chunk_transcript(transcript, 200))
+        assert progress == [(done, total) for done in range(1, total + 1)]
+    
+    @pytest.mark.asyncio
+    async def test_reduce_builds_a_tree(self):
+        """Test partial notes are merged in groups until they fit"""
+        async def verbose(system, prompt, max_tokens):
+            return "x " * 75  # ~75 tokens of notes per call
+        
+        engine = SummarizationEngine(verbose, chunk_tokens=200, fan_in=2)
+        notes = await engine.condense(make_transcript(60))
+        
+        assert count_tokens(notes) <= 200
+    
+    @pytest.mark.asyncio
+    async def test_growing_transcript_reuses_chunk_notes(self):
+        """Test only chunks that changed are summarized again"""
+        complete = FakeCompletions()
+        engine = SummarizationEngine(complete, chunk_tokens=200, fan_in=100)
+        await engine.condense(make_transcript(40))
+        first_pass = len(complete.calls)
+        
+        await engine.condense(make_transcript(44))
+        map_calls = [c for c in complete.calls[first_pass:] if c.startswith("Condense")]
+        
+        assert 1 <= len(map_calls) <= 2
+
+
+class TestAIProcessorLongTranscripts:
+    """Test cases for AIProcessor with transcripts longer than one chunk"""
+    
+    @pytest.mark.asyncio
+    async def test_analyses_share_condensed_notes(self):
+        """Test summary, key points and action items reuse the same chunk notes"""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'}):
+            processor = AIProcessor()
+        processor.summarizer.chunk_tokens = 200
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "1. Point"
+        processor.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        transcript = make_transcript(40)
+        
+        await processor.summarize_transcript(transcript)
+        calls_after_summary = processor.client.chat.completions.create.await_count
+        await processor.extract_key_points(transcript)
+        await processor.generate_action_items(transcript)
+        
+        assert calls_after_summary > 2
+        assert processor.client.chat.completions.create.await_count == calls_after_summary + 2
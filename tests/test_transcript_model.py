@@ -0,0 +1,116 @@
+"""
+Unit tests for the Transcript model
+"""
+from backend.services.transcript_model import Transcript, utterance_from_segment
+
+
+def meeting():
+    """Three speakers taking turns every ten seconds"""
+    return Transcript.from_utterances(
+        {'speaker': speaker, 'text': f'Point {i}', 'start_time': i * 10.0, 'end_time': i * 10.0 + 4}
+        for i, speaker in enumerate(['Alice', 'Bob', 'Carol', 'Alice', 'Bob', 'Alice'])
+    )
+
+
+class TestTranscript:
+    """Test cases for Transcript"""
+    
+    def test_columns_share_speakers_and_short_texts(self):
+        """Test speakers are stored once and repeated short texts are interned"""
+        transcript = Transcript()
+        transcript.append('Alice', ''.join(['Ok', 'ay.']), 0.0, 1.0)
+        transcript.append('Bob', ''.join(['Ok', 'ay.']), 1.0, 2.0)
+        transcript.append('Alice', 'Hi', None, None)
+        
+        assert transcript.speakers == ['Alice', 'Bob']
+        assert list(transcript.speaker_ids) == [0, 1, 0]
+        assert transcript.texts[0] is transcript.texts[1]
+        assert transcript[2].start_time == 0.0 and transcript[2].end_time == 0.0
+        assert not transcript.ordered
+    
+    def test_time_range_and_speaker_slices(self):
+        """Test a time range selects utterances by start time, optionally per speaker"""
+        transcript = meeting()
+        
+        assert transcript.positions(10.0, 40.0) == [1, 2, 3]
+        assert transcript.positions(start=35.0) == [4, 5]
+        assert transcript.positions(speaker='Alice') == [0, 3, 5]
+        assert transcript.positions(5.0, 45.0, speaker='Alice') == [3]
+        assert transcript.positions(speaker='Dave') == []
+        assert transcript.view(speaker='Bob').render() == "Bob: Point 1\nBob: Point 4"
+    
+    def test_slices_follow_start_time_when_out_of_order(self):
+        """Test late utterances are sliced and listed in time order"""
+        transcript = Transcript()
+        transcript.append('Alice', 'Second', 5.0, 6.0)
+        transcript.append('Bob', 'First', 1.0, 2.0)
+        transcript.append('Alice', 'Third', 9.0, 10.0)
+        
+        assert transcript.positions(0.0, 6.0) == [1, 0]
+        assert transcript.positions(speaker='Alice') == [0, 2]
+        assert [u['text'] for u in transcript.time_ordered_utterances()] == ['First', 'Second', 'Third']
+        assert transcript.segments()[0]['speaker'] == 'Bob'
+    
+    def test_render_is_extended_incrementally(self):
+        """Test rendering after an append reuses the lines already rendered"""
+        transcript = meeting()
+        first = transcript.render()
+        transcript.append('Carol', 'Wrap up', 60.0, 62.0)
+        
+        assert transcript.render() == first + "\nCarol: Wrap up"
+        assert transcript.render() is transcript.render()
+    
+    def test_truncate_replaces_the_tail(self):
+        """Test truncating drops utterances from every column and index"""
+        transcript = meeting()
+        transcript.truncate(4)
+        transcript.append('Bob', 'Rewritten', 40.0, 41.0)
+        
+        assert len(transcript) == 5
+        assert transcript.positions(speaker='Alice') == [0, 3]
+        assert transcript.positions(speaker='Bob') == [1, 4]
+        assert transcript.render().endswith("Alice: Point 3\nBob: Rewritten")
+    
+    def test_from_segments_and_speaker_stats(self):
+        """Test Recall.ai segments are flattened and speaking time is summed"""
+        segments = [
+            {'speaker': 'Alice', 'words': [{'text': 'Hi', 'start_time': 0.0, 'end_time': 0.5},
+                                           {'text': 'all', 'start_time': 0.5, 'end_time': 1.5}]},
+            {'speaker': None, 'words': [{'text': 'Hello', 'start_time': 2.0, 'end_time': 3.0}]}
+        ]
+        transcript = Transcript.from_segments(segments)
+        
+        assert utterance_from_segment(segments[0])['text'] == 'Hi all'
+        assert transcript.utterances(1) == [
+            {'seq': 1, 'speaker': 'Unknown', 'text': 'Hello', 'start_time': 2.0, 'end_time': 3.0}
+        ]
+        assert transcript.speaker_stats() == [
+            {'speaker': 'Alice', 'turns': 1, 'seconds': 1.5},
+            {'speaker': 'Unknown', 'turns': 1, 'seconds': 1.0}
+        ]
+    
+    def test_encodings_are_cached_until_the_transcript_changes(self):
+        """Test encoded() builds once per version and columns() uses the speaker table"""
+        transcript = meeting()
+        builds = []
+        
+        def build():
+            builds.append(len(transcript))
+            return transcript.columns([5, 0])
+        
+        first = transcript.encoded('columns', build)
+        assert transcript.encoded('columns', build) is first
+        assert first == {
+            'speakers': ['Alice', 'Bob', 'Carol'],
+            'speaker': [0, 0],
+            'text': ['Point 5', 'Point 0'],
+            'start_time': [50.0, 0.0],
+            'end_time': [54.0, 4.0]
+        }
+        transcript.append('Dave', 'Late', 60.0, 61.0)
+        transcript.encoded('columns', build)
+        transcript.truncate(6)
+        transcript.encoded('columns', build)
+        
+        assert builds == [6, 7, 6]
+        assert transcript.columns()['speaker'] == [0, 1, 2, 0, 1, 0]
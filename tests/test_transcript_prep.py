@@ -0,0 +1,118 @@
+"""
+Unit tests for transcript preprocessing and local token counting
+"""
+from backend.services.transcript_prep import (
+    clean_text, compact_transcript, count_tokens, parse_turns, truncate_to_tokens
+)
+
+
+class TestCountTokens:
+    """Test cases for count_tokens"""
+    
+    def test_counts_words_digits_and_punctuation(self):
+        """Test common words count once and numbers and punctuation separately"""
+        assert count_tokens("The meeting discussed Q3 results.") == 7
+        assert count_tokens("Revenue was 1234567 dollars") == 6
+        assert count_tokens("") == 0
+    
+    def test_is_deterministic_and_additive_over_lines(self):
+        """Test joining lines adds one token per newline"""
+        a, b = "Alice: Ship it on Friday.", "Bob: Agreed, Friday."
+        
+        assert count_tokens(a + "\n" + b) == count_tokens(a) + count_tokens(b) + 1
+
+
+class TestCleanText:
+    """Test cases for clean_text"""
+    
+    def test_drops_fillers_and_repeats(self):
+        """Test filler words, false starts and repeated words are removed"""
+        assert clean_text("Um, so we we need to, uh, ship the release.") == "So we need to ship the release."
+        assert clean_text("I- I think, you know, Friday works.") == "I think Friday works."
+    
+    def test_keeps_words_containing_fillers(self):
+        """Test fillers are only removed as whole words"""
+        assert clean_text("The umbrella is here, hmm.") == "The umbrella is here"
+        assert clean_text("Hmm.") == ""
+
+
+class TestCompactTranscript:
+    """Test cases for compact_transcript"""
+    
+    def test_parses_speaker_labels_but_not_urls(self):
+        """Test lines without a `Speaker: ` label keep speaker None"""
+        assert parse_turns("Alice: Hi\nhttps://example.com/x\n\n") == [
+            ("Alice", "Hi"), (None, "https://example.com/x")
+        ]
+    
+    def test_merges_turns_and_drops_partials(self):
+        """Test same-speaker turns merge and partial results give way to the final one"""
+        transcript = (
+            "Alice: We should\n"
+            "Alice: We should ship on Friday.\n"
+            "Alice: Friday works.\n"
+            "Bob: Agreed.\n"
+            "Bob: Agreed."
+        )
+        
+        compact = compact_transcript(transcript)
+        
+        assert compact.text == "Alice: We should ship on Friday. Friday works.\nBob: Agreed."
+        assert compact.saved == compact.original_tokens - compact.tokens > 0
+    
+    def test_aliases_long_speaker_names(self):
+        """Test long names are replaced by a first-name alias introduced at their first line"""
+        transcript = "\n".join(
+            f"{speaker}: Point {i}." for i in range(10)
+            for speaker in ("Dr. Alice Johnson-Smith", "Alice Wong-Thompson", "Bob")
+        )
+        
+        lines = compact_transcript(transcript).text.splitlines()
+        
+        assert lines[:3] == [
+            "Dr. Alice Johnson-Smith (Alice): Point 0.", "Alice Wong-Thompson (Alice W): Point 0.", "Bob: Point 0."
+        ]
+        assert lines[3:6] == ["Alice: Point 1.", "Alice W: Point 1.", "Bob: Point 1."]
+    
+    def test_compacted_start_is_stable_as_transcript_grows(self):
+        """Test lines compacted earlier keep their text when later turns arrive"""
+        turns = [f"Bob: Point {i}." for i in range(8)] + [
+            f"{speaker}: Point {i}." for i in range(8) for speaker in ("Carol Anne Whitfield", "Bob")
+        ]
+        
+        full = compact_transcript("\n".join(turns)).text.splitlines()
+        for end in range(10, len(turns)):
+            start = compact_transcript("\n".join(turns[:end])).text.splitlines()
+            assert full[:len(start)] == start
+    
+    def test_compact_text_is_returned_unchanged(self):
+        """Test a transcript with nothing to compact is sent as is"""
+        compact = compact_transcript("Alice: Hello there.\nBob: Hi.")
+        
+        assert compact.text == "Alice: Hello there.\nBob: Hi."
+        assert compact.saved == 0
+
+
+class TestTruncateToTokens:
+    """Test cases for truncate_to_tokens"""
+    
+    def test_keeps_head_and_tail_lines(self):
+        """Test the middle of an over-budget text is replaced by a marker"""
+        text = "\n".join(f"line {i} of the transcript" for i in range(200))
+        
+        cut = truncate_to_tokens(text, 100)
+        lines = cut.splitlines()
+        
+        assert count_tokens(cut) <= 100
+        assert lines[0] == "line 0 of the transcript"
+        assert lines[-1] == "line 199 of the transcript"
+        assert any("lines omitted" in line for line in lines)
+        assert truncate_to_tokens(text, 100) == cut
+    
+    def test_text_within_budget_is_untouched(self):
+        """Test texts that fit are returned as they are"""
+        assert truncate_to_tokens("short text", 100) == "short text"
+    
+    def test_single_long_line_is_cut_on_words(self):
+        """Test a single over-budget line keeps its first words"""
+        assert truncate_to_tokens("one two three four five", 3) == "one two three"
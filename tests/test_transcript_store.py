@@ -0,0 +1,281 @@
+"""
+Unit tests for TranscriptStore and the Recall.ai transcript webhook
+"""
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.services.shared_state import LocalState
+from backend.services.transcript_store import TranscriptStore, parse_webhook_event
+
+
+def webhook_event(bot_id, event_id, speaker, text, start):
+    """Build a Recall.ai real-time transcript webhook payload"""
+    words = text.split()
+    return {
+        'event': 'bot.transcription',
+        'data': {
+            'bot_id': bot_id,
+            'transcript': {
+                'original_transcript_id': event_id,
+                'speaker': speaker,
+                'is_final': True,
+                'words': [
+                    {'text': word, 'start_time': start + i, 'end_time': start + i + 0.5}
+                    for i, word in enumerate(words)
+                ]
+            }
+        }
+    }
+
+
+class TestTranscriptStore:
+    """Test cases for TranscriptStore"""
+    
+    def test_parse_legacy_and_new_events(self):
+        """Test both Recall.ai webhook shapes are understood"""
+        legacy = parse_webhook_event(webhook_event('bot_1', 7, 'Alice', 'Hello there', 3.0))
+        new = parse_webhook_event({
+            'event': 'transcript.data',
+            'data': {
+                'bot': {'id': 'bot_2'},
+                'data': {
+                    'participant': {'name': 'Bob'},
+                    'words': [
+                        {'text': 'Hi', 'start_timestamp': {'relative': 1.0}, 'end_timestamp': {'relative': 1.2}}
+                    ]
+                }
+            }
+        })
+        
+        assert legacy == ('bot_1', {'id': 7, 'speaker': 'Alice', 'text': 'Hello there',
+                                    'start_time': 3.0, 'end_time': 4.5})
+        assert new[0] == 'bot_2'
+        assert new[1]['speaker'] == 'Bob'
+        assert new[1]['start_time'] == 1.0
+    
+    def test_partial_and_unknown_events_are_ignored(self):
+        """Test non-final results and other events are not stored"""
+        partial = webhook_event('bot_1', 1, 'Alice', 'Hel', 0.0)
+        partial['data']['transcript']['is_final'] = False
+        store = TranscriptStore()
+        
+        assert store.ingest_event(partial) is None
+        assert store.ingest_event({'event': 'bot.status_change', 'data': {}}) is None
+        assert not store.has('bot_1')
+    
+    def test_sequence_numbers_and_since(self):
+        """Test utterances get consecutive seqs and can be read from a cursor"""
+        store = TranscriptStore()
+        for i in range(5):
+            assert store.ingest_event(webhook_event('bot_1', i, 'Alice', f'line {i}', float(i))) == i
+        
+        rows = store.since('bot_1', 3)
+        
+        assert [row['seq'] for row in rows] == [3, 4]
+        assert rows[0]['text'] == 'line 3'
+        assert store.next_seq('bot_1') == 5
+    
+    def test_duplicate_events_are_idempotent(self):
+        """Test redelivered events are not appended twice"""
+        store = TranscriptStore()
+        event = webhook_event('bot_1', 1, 'Alice', 'Hello', 0.0)
+        
+        assert store.ingest_event(event) == 0
+        assert store.ingest_event(event) is None
+        assert store.append('bot_1', 'Bob', 'Hi', 2.0, 2.5) == 1
+        assert store.append('bot_1', 'Bob', 'Hi', 2.0, 2.5) is None
+        assert store.next_seq('bot_1') == 2
+    
+    def test_out_of_order_events_are_sorted_on_read(self):
+        """Test late events keep arrival seqs but full reads are time ordered"""
+        store = TranscriptStore()
+        store.ingest_event(webhook_event('bot_1', 2, 'Bob', 'second', 10.0))
+        store.ingest_event(webhook_event('bot_1', 1, 'Alice', 'first', 5.0))
+        
+        assert [row['text'] for row in store.since('bot_1')] == ['second', 'first']
+        assert [row['text'] for row in store.utterances('bot_1')] == ['first', 'second']
+        assert store.segments('bot_1')[0]['speaker'] == 'Alice'
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_one_log(self):
+        """Test stores sharing state agree on seqs and only the receiver notifies"""
+        shared = LocalState()
+        first, second = TranscriptStore(shared=shared), TranscriptStore(shared=shared)
+        received = {'first': [], 'second': []}
+        first.add_listener(lambda bot_id, seq: received['first'].append(seq))
+        second.add_listener(lambda bot_id, seq: received['second'].append(seq))
+        
+        assert await first.ingest(webhook_event('bot_1', 1, 'Alice', 'one', 0.0)) == 0
+        assert await second.ingest(webhook_event('bot_1', 2, 'Bob', 'two', 1.0)) == 1
+        assert await second.ingest(webhook_event('bot_1', 1, 'Alice', 'one', 0.0)) is None
+        assert await first.sync('bot_1') == 1
+        
+        assert [row['text'] for row in first.since('bot_1')] == ['one', 'two']
+        assert [row['text'] for row in second.since('bot_1')] == ['one', 'two']
+        assert received == {'first': [0], 'second': [1]}
+    
+    @pytest.mark.asyncio
+    async def test_every_worker_listeners_see_all_bots(self):
+        """Test every-worker listeners run in each worker once it catches up"""
+        shared = LocalState()
+        first, second = TranscriptStore(shared=shared), TranscriptStore(shared=shared)
+        indexed = []
+        second.add_listener(lambda bot_id, seq: indexed.append((bot_id, seq)), every_worker=True)
+        
+        await first.ingest(webhook_event('bot_1', 1, 'Alice', 'one', 0.0))
+        await first.ingest(webhook_event('bot_2', 2, 'Bob', 'two', 1.0))
+        await first.ingest(webhook_event('bot_2', 3, 'Bob', 'three', 2.0))
+        
+        assert await second.sync_all() == 3
+        assert sorted(indexed) == [('bot_1', 0), ('bot_2', 0), ('bot_2', 1)]
+        assert await second.sync_all() == 0
+    
+    def test_listeners_and_eviction(self):
+        """Test listeners see every append and old bots are evicted"""
+        store = TranscriptStore(max_bots=2)
+        seen = []
+        store.add_listener(lambda bot_id, seq: seen.append((bot_id, seq)))
+        
+        for bot_id in ('bot_1', 'bot_2', 'bot_3'):
+            store.append(bot_id, 'Alice', 'Hello', 0.0, 1.0)
+        
+        assert seen == [('bot_1', 0), ('bot_2', 0), ('bot_3', 0)]
+        assert not store.has('bot_1')
+        assert store.has('bot_3')
+    
+    
+    def test_evicted_bots_keep_their_dedup_keys_and_seqs(self):
+        """Test a bot evicted without shared state comes back whole, continuing its seqs"""
+        store = TranscriptStore(max_bots=1)
+        persisted = {}
+        store.add_listener(lambda bot_id, seq: persisted.__setitem__(
+            (bot_id, seq), store.transcript(bot_id)[seq].text
+        ))
+        
+        assert store.ingest_event(webhook_event('bot_1', 1, 'Alice', 'Hello', 0.0)) == 0
+        assert store.ingest_event(webhook_event('bot_1', 2, 'Bob', 'Hi there', 1.0)) == 1
+        store.append('bot_2', 'Bob', 'Hi', 0.0, 1.0)
+        assert not store.has('bot_1')
+        
+        assert store.ingest_event(webhook_event('bot_1', 1, 'Alice', 'Hello', 0.0)) is None
+        assert store.ingest_event(webhook_event('bot_1', 3, 'Alice', 'Welcome', 2.0)) == 2
+        
+        assert persisted[('bot_1', 0)] == 'Hello'
+        assert persisted[('bot_1', 2)] == 'Welcome'
+        assert len(persisted) == 4
+        assert [row['text'] for row in store.since('bot_1', 1)] == ['Hi there', 'Welcome']
+        assert [row['speaker'] for row in store.utterances('bot_1')] == ['Alice', 'Bob', 'Alice']
+    
+    def test_pinned_bots_are_not_evicted(self):
+        """Test a bot with subscribers stays in memory beyond max_bots"""
+        store = TranscriptStore(max_bots=1)
+        store.append('bot_1', 'Alice', 'Hello', 0.0, 1.0)
+        store.pin('bot_1')
+        
+        store.append('bot_2', 'Bob', 'Hi', 0.0, 1.0)
+        store.append('bot_3', 'Carol', 'Hey', 0.0, 1.0)
+        
+        assert store.has('bot_1') and store.has('bot_3')
+        assert not store.has('bot_2')
+        store.unpin('bot_1')
+        store.append('bot_4', 'Dave', 'Yo', 0.0, 1.0)
+        assert not store.has('bot_1')
+    
+    @pytest.mark.asyncio
+    async def test_reloaded_bots_keep_seqs_and_do_not_notify_again(self):
+        """Test a bot evicted with shared state comes back with the same seqs, notified once"""
+        store = TranscriptStore(max_bots=1, shared=LocalState())
+        seen = []
+        store.add_listener(lambda bot_id, seq: seen.append((bot_id, seq)))
+        await store.ingest(webhook_event('bot_1', 1, 'Alice', 'one', 0.0))
+        await store.ingest(webhook_event('bot_2', 2, 'Bob', 'two', 0.0))
+        assert not store.has('bot_1')
+        
+        assert await store.ingest(webhook_event('bot_1', 3, 'Alice', 'three', 1.0)) == 1
+        
+        assert [row['text'] for row in store.since('bot_1')] == ['one', 'three']
+        assert seen == [('bot_1', 0), ('bot_2', 0), ('bot_1', 1)]
+
+class TestTranscriptWebhook:
+    """Test cases for the webhook route replaying Recall.ai payloads"""
+    
+    @pytest.fixture
+    def routes(self):
+        """Import the API routes with test API keys, which services built later read too"""
+        env = {'RECALL_API_KEY': 'test', 'OPENAI_API_KEY': 'test', 'CARTESIA_API_KEY': 'test', 'MEETING_DB_PATH': ''}
+        with patch.dict('os.environ', env):
+            from api import routes
+            routes.transcript_store.clear('bot_webhook')
+            yield routes
+    
+    @pytest.fixture
+    def client(self, routes):
+        """Test client for an app serving the API routes"""
+        app = FastAPI()
+        app.include_router(routes.router)
+        return TestClient(app)
+    
+    def test_replayed_events_are_served_locally(self, routes, client):
+        """Test replayed webhooks, including duplicates, build the transcript"""
+        events = [webhook_event('bot_webhook', i, 'Alice', f'point {i}', float(i)) for i in range(3)]
+        replay = [events[0], events[2], events[1], events[2]]
+        
+        results = [client.post('/webhooks/recall/transcript', json=event).json() for event in replay]
+        
+        assert [r['accepted'] for r in results] == [True, True, True, False]
+        with patch.object(routes.transcription_service.upstream, 'get') as upstream_get:
+            response = client.get('/transcript/bot_webhook')
+        upstream_get.assert_not_called()
+        texts = [segment['words'][0]['text'] for segment in response.json()]
+        assert texts == ['point 0', 'point 1', 'point 2']
+    
+    def test_transcripts_are_encoded_once_per_version(self, routes, client):
+        """Test compressed bodies are reused until the transcript changes"""
+        for i in range(60):
+            client.post('/webhooks/recall/transcript', json=webhook_event('bot_webhook', i, 'Alice', f'point {i}', float(i)))
+        
+        with patch.object(routes, 'encode', wraps=routes.encode) as encode:
+            first = client.get('/transcript/bot_webhook', headers={'Accept-Encoding': 'gzip'})
+            second = client.get('/transcript/bot_webhook', headers={'Accept-Encoding': 'gzip'})
+            assert encode.call_count == 1
+            client.post('/webhooks/recall/transcript', json=webhook_event('bot_webhook', 60, 'Bob', 'late', 60.0))
+            third = client.get('/transcript/bot_webhook', headers={'Accept-Encoding': 'gzip'})
+            assert encode.call_count == 2
+        
+        assert first.headers['content-encoding'] == 'gzip'
+        assert first.headers['vary'] == 'Accept, Accept-Encoding'
+        assert first.content == second.content
+        assert len(first.json()) == 60
+        assert third.json()[-1]['speaker'] == 'Bob'
+        raw = client.get('/transcript/bot_webhook', headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in raw.headers
+        assert raw.json() == third.json()
+    
+    def test_msgpack_transcripts_use_a_speaker_table(self, client):
+        """Test msgpack bodies carry columns with speakers as table ids"""
+        msgpack = pytest.importorskip('msgpack')
+        for i, speaker in enumerate(['Alice', 'Bob', 'Alice']):
+            client.post('/webhooks/recall/transcript', json=webhook_event('bot_webhook', i, speaker, f'point {i}', float(i)))
+        
+        response = client.get('/transcript/bot_webhook', headers={'Accept': 'application/msgpack'})
+        delta = client.get('/transcript/bot_webhook?since=1', headers={'Accept': 'application/msgpack'})
+        
+        assert response.headers['content-type'] == 'application/msgpack'
+        body = msgpack.unpackb(response.content)
+        assert body['speakers'] == ['Alice', 'Bob']
+        assert body['speaker'] == [0, 1, 0]
+        assert body['text'] == ['point 0', 'point 1', 'point 2']
+        assert msgpack.unpackb(delta.content)['start'] == 1
+        assert msgpack.unpackb(delta.content)['next_cursor'] == 3
+        assert client.get('/transcript/bot_webhook', headers={'Accept': 'image/png'}).status_code == 406
+    
+    def test_webhook_token_is_checked(self, client):
+        """Test the shared webhook token is enforced when configured"""
+        event = webhook_event('bot_webhook', 1, 'Alice', 'Hello', 0.0)
+        with patch.dict('os.environ', {'RECALL_WEBHOOK_TOKEN': 'secret'}):
+            rejected = client.post('/webhooks/recall/transcript', json=event)
+            accepted = client.post('/webhooks/recall/transcript?token=secret', json=event)
+        
+        assert rejected.status_code == 401
+        assert accepted.status_code == 200
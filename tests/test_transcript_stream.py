@@ -0,0 +1,156 @@
+"""
+Unit tests for TranscriptBroadcaster
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from backend.services.transcript_stream import TranscriptBroadcaster
+from backend.services.transcription import utterance_from_segment
+
+
+def segment(speaker, *words):
+    """Build a Recall.ai style transcript segment"""
+    return {
+        'speaker': speaker,
+        'words': [
+            {'text': word, 'start_time': float(i), 'end_time': float(i) + 0.5}
+            for i, word in enumerate(words)
+        ]
+    }
+
+
+class TestTranscriptBroadcaster:
+    """Test cases for TranscriptBroadcaster"""
+    
+    @pytest.fixture
+    def service(self):
+        """Transcription service whose transcript grows on every fetch"""
+        transcripts = [
+            [segment('Alice', 'Hello', 'all')],
+            [segment('Alice', 'Hello', 'all'), segment('Bob', 'Hi')],
+        ]
+        
+        def since(bot_id, cursor):
+            segments = transcripts.pop(0) if len(transcripts) > 1 else transcripts[0]
+            new = [dict(utterance_from_segment(seg), index=i) for i, seg in enumerate(segments)]
+            return {'segments': new[cursor:], 'next_cursor': len(new)}
+        
+        service = Mock()
+        service.get_transcript_since = AsyncMock(side_effect=since)
+        return service
+    
+    def test_utterance_from_segment(self):
+        """Test segments are flattened into timed utterances"""
+        result = utterance_from_segment(segment('Alice', 'Hello', 'all'))
+        
+        assert result == {'speaker': 'Alice', 'text': 'Hello all', 'start_time': 0.0, 'end_time': 1.5}
+    
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_only_new_utterances(self, service):
+        """Test each push carries only utterances not sent before"""
+        broadcaster = TranscriptBroadcaster(service, poll_interval=0.01)
+        
+        async with broadcaster.subscribe('bot_123') as updates:
+            first = await asyncio.wait_for(updates.get(), 1)
+            second = await asyncio.wait_for(updates.get(), 1)
+        
+        assert first['start'] == 0
+        assert [u['text'] for u in first['utterances']] == ['Hello all']
+        assert second['start'] == 1
+        assert [u['speaker'] for u in second['utterances']] == ['Bob']
+    
+    @pytest.mark.asyncio
+    async def test_grown_last_utterance_is_sent_again(self):
+        """Test words added to the last Recall.ai segment reach subscribers"""
+        transcripts = [[segment('Alice', 'hello')], [segment('Alice', 'hello', 'world')]]
+        
+        def since(bot_id, cursor):
+            segments = transcripts.pop(0) if len(transcripts) > 1 else transcripts[0]
+            new = [dict(utterance_from_segment(seg), index=i) for i, seg in enumerate(segments)]
+            return {'segments': new[cursor:], 'next_cursor': len(new) - 1}
+        
+        service = Mock()
+        service.get_transcript_since = AsyncMock(side_effect=since)
+        broadcaster = TranscriptBroadcaster(service, poll_interval=0.01)
+        
+        async with broadcaster.subscribe('bot_123') as updates:
+            first = await asyncio.wait_for(updates.get(), 1)
+            second = await asyncio.wait_for(updates.get(), 1)
+        
+        assert first['utterances'][0]['text'] == 'hello'
+        assert second['start'] == 0
+        assert second['utterances'][0]['text'] == 'hello world'
+    
+    @pytest.mark.asyncio
+    async def test_one_fetcher_fans_out_to_all_subscribers(self, service):
+        """Test concurrent subscribers share a single upstream fetcher"""
+        broadcaster = TranscriptBroadcaster(service, poll_interval=0.05)
+        
+        async with broadcaster.subscribe('bot_123') as a, broadcaster.subscribe('bot_123') as b:
+            assert broadcaster.subscriber_count('bot_123') == 2
+            batch_a = await asyncio.wait_for(a.get(), 1)
+            batch_b = await asyncio.wait_for(b.get(), 1)
+            await asyncio.sleep(0.02)
+        
+        assert batch_a == batch_b
+        assert service.get_transcript_since.await_count == 1
+        assert broadcaster.subscriber_count('bot_123') == 0
+    
+    @pytest.mark.asyncio
+    async def test_late_subscriber_resumes_from_cursor(self, service):
+        """Test a subscriber joining later only gets utterances after `since`"""
+        broadcaster = TranscriptBroadcaster(service, poll_interval=0.01)
+        
+        async with broadcaster.subscribe('bot_123') as first:
+            await asyncio.wait_for(first.get(), 1)
+            await asyncio.wait_for(first.get(), 1)
+            async with broadcaster.subscribe('bot_123', since=1) as late:
+                batch = await asyncio.wait_for(late.get(), 1)
+        
+        assert batch['start'] == 1
+        assert len(batch['utterances']) == 1
+    
+    @pytest.mark.asyncio
+    async def test_fetcher_stops_without_subscribers(self, service):
+        """Test the upstream fetcher is cancelled when the last client leaves"""
+        broadcaster = TranscriptBroadcaster(service, poll_interval=0.01)
+        
+        async with broadcaster.subscribe('bot_123') as updates:
+            await asyncio.wait_for(updates.get(), 1)
+        calls = service.get_transcript_since.await_count
+        await asyncio.sleep(0.05)
+        
+        assert service.get_transcript_since.await_count == calls
+    
+    @pytest.mark.asyncio
+    async def test_store_appends_are_pushed_without_polling(self, service):
+        """Test webhook-fed bots are pushed on append instead of polled"""
+        from backend.services.transcript_store import TranscriptStore
+        store = TranscriptStore()
+        store.append('bot_123', 'Alice', 'Hello', 0.0, 1.0)
+        broadcaster = TranscriptBroadcaster(service, poll_interval=10, store=store)
+        
+        async with broadcaster.subscribe('bot_123') as updates:
+            first = await asyncio.wait_for(updates.get(), 1)
+            store.append('bot_123', 'Bob', 'Hi', 2.0, 3.0)
+            second = await asyncio.wait_for(updates.get(), 1)
+        
+        assert first['utterances'][0]['text'] == 'Hello'
+        assert second['start'] == 1
+        assert second['utterances'][0]['speaker'] == 'Bob'
+        service.get_transcript_since.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_subscribed_bots_stay_in_the_store(self, service):
+        """Test a bot is not evicted from the store while clients are subscribed"""
+        from backend.services.transcript_store import TranscriptStore
+        store = TranscriptStore(max_bots=1)
+        store.append('bot_123', 'Alice', 'Hello', 0.0, 1.0)
+        broadcaster = TranscriptBroadcaster(service, poll_interval=10, store=store)
+        
+        async with broadcaster.subscribe('bot_123'):
+            store.append('bot_456', 'Bob', 'Hi', 0.0, 1.0)
+            assert store.has('bot_123')
+        
+        store.append('bot_789', 'Carol', 'Hey', 0.0, 1.0)
+        assert not store.has('bot_123')
@@ -1,19 +1,44 @@
 """
 Unit tests for TranscriptionService
 """
+import asyncio
+import httpx
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import patch
+from backend.services.http_client import UpstreamClient, UpstreamConfig
+from backend.services.meeting_db import MeetingDatabase
 from backend.services.transcription import TranscriptionService
 
 
+def make_upstream(handler):
+    """Build a pooled upstream client that routes requests to a handler"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return UpstreamClient('recall', UpstreamConfig(backoff_base=0), client=client)
+
+
 class TestTranscriptionService:
     """Test cases for TranscriptionService"""
     
     @pytest.fixture
-    def service(self):
+    def requests_seen(self):
+        """Collect requests sent through the mock transport"""
+        return []
+    
+    @pytest.fixture
+    def service(self, requests_seen):
         """Create a TranscriptionService instance with mock API key"""
+        def handler(request):
+            requests_seen.append(request)
+            if request.method == 'POST':
+                return httpx.Response(200, json={'id': 'bot_123', 'status': 'joining'})
+            if request.method == 'DELETE':
+                return httpx.Response(200, json={'success': True})
+            if request.url.path.endswith('/transcript/'):
+                return httpx.Response(200, json={'transcript': 'Hello world'})
+            return httpx.Response(200, json={'id': 'bot_123', 'status': 'in_meeting'})
+        
         with patch.dict('os.environ', {'RECALL_API_KEY': 'test_key'}):
-            return TranscriptionService()
+            return TranscriptionService(upstream=make_upstream(handler))
     
     def test_init_with_api_key(self):
         """Test initialization with API key"""
@@ -27,55 +52,199 @@ class TestTranscriptionService:
             with pytest.raises(ValueError):
                 TranscriptionService()
     
-    @patch('backend.services.transcription.requests.post')
-    def test_join_meeting_success(self, mock_post, service):
+    @pytest.mark.asyncio
+    async def test_join_meeting_success(self, service, requests_seen):
         """Test successful meeting join"""
-        mock_response = Mock()
-        mock_response.json.return_value = {'id': 'bot_123', 'status': 'joining'}
-        mock_response.raise_for_status = Mock()
-        mock_post.return_value = mock_response
-        
-        result = service.join_meeting('https://zoom.us/j/123456789')
+        result = await service.join_meeting('https://zoom.us/j/123456789')
         
         assert result['id'] == 'bot_123'
         assert result['status'] == 'joining'
-        mock_post.assert_called_once()
+        assert len(requests_seen) == 1
+        assert requests_seen[0].headers['Authorization'] == 'Token test_key'
     
-    @patch('backend.services.transcription.requests.get')
-    def test_get_transcript_success(self, mock_get, service):
+    @pytest.mark.asyncio
+    async def test_get_transcript_success(self, service, requests_seen):
         """Test successful transcript retrieval"""
-        mock_response = Mock()
-        mock_response.json.return_value = {'transcript': 'Hello world'}
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
-        
-        result = service.get_transcript('bot_123')
+        result = await service.get_transcript('bot_123')
         
         assert result['transcript'] == 'Hello world'
-        mock_get.assert_called_once()
+        assert len(requests_seen) == 1
     
-    @patch('backend.services.transcription.requests.get')
-    def test_get_bot_status_success(self, mock_get, service):
+    @pytest.mark.asyncio
+    async def test_get_bot_status_success(self, service, requests_seen):
         """Test successful bot status retrieval"""
-        mock_response = Mock()
-        mock_response.json.return_value = {'id': 'bot_123', 'status': 'in_meeting'}
-        mock_response.raise_for_status = Mock()
-        mock_get.return_value = mock_response
-        
-        result = service.get_bot_status('bot_123')
+        result = await service.get_bot_status('bot_123')
         
         assert result['status'] == 'in_meeting'
-        mock_get.assert_called_once()
+        assert len(requests_seen) == 1
     
-    @patch('backend.services.transcription.requests.delete')
-    def test_leave_meeting_success(self, mock_delete, service):
+    @pytest.mark.asyncio
+    async def test_leave_meeting_success(self, service, requests_seen):
         """Test successful meeting leave"""
-        mock_response = Mock()
-        mock_response.json.return_value = {'success': True}
-        mock_response.raise_for_status = Mock()
-        mock_delete.return_value = mock_response
-        
-        result = service.leave_meeting('bot_123')
+        result = await service.leave_meeting('bot_123')
         
         assert result['success'] is True
-        mock_delete.assert_called_once()
+        assert len(requests_seen) == 1
+    
+    @pytest.mark.asyncio
+    async def test_http_error_is_raised(self):
+        """Test upstream errors propagate as httpx errors"""
+        upstream = make_upstream(lambda request: httpx.Response(500))
+        service = TranscriptionService(api_key='test_key', upstream=upstream)
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.get_transcript('bot_123')
+
+
+class TestIncrementalTranscript:
+    """Test cases for cursor-based and incremental transcript fetching"""
+    
+    @staticmethod
+    def segment(speaker, *words):
+        return {'speaker': speaker, 'words': [{'text': w, 'start_time': 0.0, 'end_time': 1.0} for w in words]}
+    
+    @pytest.fixture
+    def upstream_state(self):
+        """Transcript the mock Recall.ai serves, plus what it was asked"""
+        return {'segments': [], 'etag': None, 'requests': []}
+    
+    @pytest.fixture
+    def service(self, upstream_state):
+        """TranscriptionService backed by a mutable mock transcript"""
+        def handler(request):
+            upstream_state['requests'].append(request)
+            etag = upstream_state['etag']
+            if etag and request.headers.get('If-None-Match') == etag:
+                return httpx.Response(304)
+            headers = {'ETag': etag} if etag else {}
+            return httpx.Response(200, json=upstream_state['segments'], headers=headers)
+        
+        return TranscriptionService(api_key='test_key', upstream=make_upstream(handler))
+    
+    @pytest.mark.asyncio
+    async def test_since_returns_only_new_segments(self, service, upstream_state):
+        """Test a cursor returns the tail, from the last segment that may still grow"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hello')]
+        first = await service.get_transcript_since('bot_123')
+        upstream_state['segments'].append(self.segment('Carol', 'Welcome', 'all'))
+        second = await service.get_transcript_since('bot_123', first['next_cursor'])
+        
+        assert first['next_cursor'] == 1
+        assert [s['speaker'] for s in first['segments']] == ['Alice', 'Bob']
+        assert second['next_cursor'] == 2
+        assert [s['index'] for s in second['segments']] == [1, 2]
+        assert second['segments'][1] == {
+            'speaker': 'Carol', 'text': 'Welcome all', 'start_time': 0.0, 'end_time': 1.0, 'index': 2
+        }
+    
+    @pytest.mark.asyncio
+    async def test_growing_last_segment_is_sent_again(self, service, upstream_state):
+        """Test a client past the last segment still receives its later words"""
+        upstream_state['segments'] = [self.segment('Alice', 'hello')]
+        first = await service.get_transcript_since('bot_123')
+        upstream_state['segments'] = [self.segment('Alice', 'hello', 'world')]
+        second = await service.get_transcript_since('bot_123', first['next_cursor'])
+        
+        assert second['segments'][0]['index'] == 0
+        assert second['segments'][0]['text'] == 'hello world'
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_request(self, service, upstream_state):
+        """Test overlapping polls of one bot apply the tail once"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hel')]
+        await service.get_transcript('bot_123')
+        upstream_state['segments'] = [self.segment('Alice', 'Hi')] + [
+            self.segment('Bob', 'Hello'), self.segment('Carol', 'Hey'), self.segment('Dan', 'Yo'), self.segment('Eve', 'Hm')
+        ]
+        
+        results = await asyncio.gather(*(service.get_transcript('bot_123') for _ in range(3)))
+        
+        assert len(upstream_state['requests']) == 2
+        assert all(result == upstream_state['segments'] for result in results)
+        assert len(await service.get_transcript_model('bot_123')) == 5
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_poll_keeps_the_model(self, service, upstream_state):
+        """Test polling an unchanged transcript leaves cached encodings valid"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hello')]
+        model = await service.get_transcript_model('bot_123')
+        builds = []
+        model.encoded('key', lambda: builds.append(1) or 'body')
+        
+        for _ in range(3):
+            await service.get_transcript_model('bot_123')
+            model.encoded('key', lambda: builds.append(1) or 'body')
+        
+        assert builds == [1]
+    
+    @pytest.mark.asyncio
+    async def test_only_tail_is_parsed_when_prefix_is_unchanged(self, service, upstream_state):
+        """Test an extended response keeps earlier segment objects and updates the last"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hel')]
+        first = await service.get_transcript('bot_123')
+        cached_first = service._pulled['bot_123'].segments[0]
+        upstream_state['segments'] = [
+            self.segment('Alice', 'Hi'), self.segment('Bob', 'Hello', 'there'), self.segment('Carol', 'Hey')
+        ]
+        second = await service.get_transcript('bot_123')
+        
+        assert len(first) == 2
+        assert second == upstream_state['segments']
+        assert service._pulled['bot_123'].segments[0] is cached_first
+    
+    @pytest.mark.asyncio
+    async def test_model_follows_the_parsed_tail(self, service, upstream_state):
+        """Test the transcript model is updated in place as the tail changes"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hel')]
+        model = await service.get_transcript_model('bot_123')
+        upstream_state['segments'] = [
+            self.segment('Alice', 'Hi'), self.segment('Bob', 'Hello', 'there'), self.segment('Carol', 'Hey')
+        ]
+        
+        assert await service.get_transcript_model('bot_123') is model
+        assert model.render() == "Alice: Hi\nBob: Hello there\nCarol: Hey"
+        assert model.positions(speaker='Bob') == [1]
+    
+    @pytest.mark.asyncio
+    async def test_changed_prefix_is_fully_reparsed(self, service, upstream_state):
+        """Test a rewritten transcript is parsed from scratch"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi'), self.segment('Bob', 'Hello')]
+        await service.get_transcript('bot_123')
+        upstream_state['segments'] = [self.segment('Alicia', 'Hi')]
+        
+        result = await service.get_transcript('bot_123')
+        
+        assert result == upstream_state['segments']
+    
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_cache(self, service, upstream_state):
+        """Test the ETag is sent back and a 304 serves the cached segments"""
+        upstream_state['segments'] = [self.segment('Alice', 'Hi')]
+        upstream_state['etag'] = '"v1"'
+        await service.get_transcript('bot_123')
+        
+        result = await service.get_transcript_since('bot_123', 0)
+        
+        assert upstream_state['requests'][1].headers['If-None-Match'] == '"v1"'
+        assert result['next_cursor'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_archived_meeting_is_read_locally(self, service, upstream_state, tmp_path):
+        """Test a finished meeting's transcript is served from the database"""
+        service.database = MeetingDatabase(str(tmp_path / 'meetings.db'))
+        upstream_state['segments'] = [self.segment('Alice', 'Hi', 'all'), self.segment('Bob', 'Hello')]
+        
+        assert await service.archive('bot_123') == 2
+        service.database.flush()
+        upstream_state['segments'] = []
+        transcript = await service.get_transcript('bot_123')
+        delta = await service.get_transcript_since('bot_123', 1)
+        
+        assert len(upstream_state['requests']) == 1
+        assert [segment['speaker'] for segment in transcript] == ['Alice', 'Bob']
+        assert transcript[0]['words'][0]['text'] == 'Hi all'
+        assert delta['segments'] == [
+            {'speaker': 'Bob', 'text': 'Hello', 'start_time': 0.0, 'end_time': 1.0, 'index': 1}
+        ]
+        assert delta['next_cursor'] == 2
+        service.database.close()
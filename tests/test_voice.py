@@ -1,19 +1,37 @@
 """
 Unit tests for VoiceService
 """
+import base64
+import gzip
+import httpx
 import pytest
-from unittest.mock import Mock, patch
-from backend.services.voice import VoiceService
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.services.audio_cache import AudioCache
+from backend.services.http_client import UpstreamClient
+from backend.services.voice import AUDIO_FORMATS, VoiceService
 
 
 class TestVoiceService:
     """Test cases for VoiceService"""
     
     @pytest.fixture
-    def service(self):
+    def requests_seen(self):
+        """Collect requests sent through the mock transport"""
+        return []
+    
+    @pytest.fixture
+    def service(self, requests_seen):
         """Create a VoiceService instance with mock API key"""
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=b'audio_data')
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        upstream = UpstreamClient('cartesia', client=client)
         with patch.dict('os.environ', {'CARTESIA_API_KEY': 'test_key'}):
-            return VoiceService()
+            return VoiceService(upstream=upstream)
     
     def test_init_with_api_key(self):
         """Test initialization with API key"""
@@ -27,18 +45,13 @@ class TestVoiceService:
             with pytest.raises(ValueError):
                 VoiceService()
     
-    @patch('backend.services.voice.requests.post')
-    def test_generate_audio_success(self, mock_post, service):
+    @pytest.mark.asyncio
+    async def test_generate_audio_success(self, service, requests_seen):
         """Test successful audio generation"""
-        mock_response = Mock()
-        mock_response.content = b'audio_data'
-        mock_response.raise_for_status = Mock()
-        mock_post.return_value = mock_response
-        
-        result = service.generate_audio("Hello world")
+        result = await service.generate_audio("Hello world")
         
         assert result == b'audio_data'
-        mock_post.assert_called_once()
+        assert len(requests_seen) == 1
     
     @patch('builtins.open', create=True)
     def test_save_audio(self, mock_open, service):
@@ -50,20 +63,165 @@ class TestVoiceService:
         
         mock_file.write.assert_called_once_with(b'audio_data')
     
-    @patch('backend.services.voice.requests.post')
+    @pytest.mark.asyncio
     @patch('builtins.open', create=True)
-    def test_generate_and_save(self, mock_open, mock_post, service):
+    async def test_generate_and_save(self, mock_open, service, requests_seen):
         """Test combined generate and save"""
-        mock_response = Mock()
-        mock_response.content = b'audio_data'
-        mock_response.raise_for_status = Mock()
-        mock_post.return_value = mock_response
-        
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
         
-        result = service.generate_and_save("Hello world", "/tmp/test.wav")
+        result = await service.generate_and_save("Hello world", "/tmp/test.wav")
         
         assert result == "/tmp/test.wav"
-        mock_post.assert_called_once()
+        assert len(requests_seen) == 1
         mock_file.write.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_stream_audio_relays_chunks(self, requests_seen):
+        """Test streamed audio is passed through chunk by chunk"""
+        async def body():
+            for chunk in (b'RIFF', b'chunk-1', b'chunk-2'):
+                yield chunk
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=body())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service = VoiceService(api_key='test_key', upstream=UpstreamClient('cartesia', client=client))
+        
+        chunks = [chunk async for chunk in service.stream_audio("Hello world")]
+        
+        assert chunks == [b'RIFF', b'chunk-1', b'chunk-2']
+        assert len(requests_seen) == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_audio_decodes_content_encoding(self):
+        """Test compressed audio is decoded before it is relayed and cached"""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(
+            200, content=gzip.compress(b'RIFF-audio'), headers={'Content-Encoding': 'gzip'}
+        )))
+        service = VoiceService(api_key='test_key', upstream=UpstreamClient('cartesia', client=client))
+        
+        chunks = [chunk async for chunk in service.stream_audio("Hello world")]
+        
+        assert b''.join(chunks) == b'RIFF-audio'
+    
+    @pytest.mark.asyncio
+    async def test_stream_audio_raises_on_error(self):
+        """Test an upstream error is raised before any audio is yielded"""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(400)))
+        service = VoiceService(api_key='test_key', upstream=UpstreamClient('cartesia', client=client))
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in service.stream_audio("Hello world"):
+                pass
+    
+    def test_media_type(self, service):
+        """Test the response MIME type follows the output container"""
+        assert service.media_type() == 'audio/wav'
+        assert service.media_type({'container': 'mp3'}) == 'audio/mpeg'
+    
+    @pytest.mark.asyncio
+    async def test_repeated_text_is_served_from_cache(self, service, requests_seen):
+        """Test the same text, voice, model and format is synthesized once"""
+        first = await service.generate_audio("Hello   world")
+        second = await service.generate_audio("Hello world")
+        
+        assert first == second == b'audio_data'
+        assert len(requests_seen) == 1
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_keyed_by_format(self, service, requests_seen):
+        """Test a different output format is synthesized separately"""
+        await service.generate_audio("Hello world", output_format="wav_s16")
+        await service.generate_audio("Hello world", output_format="mp3")
+        
+        assert len(requests_seen) == 2
+    
+    @pytest.mark.asyncio
+    @patch('builtins.open', create=True)
+    async def test_generate_and_save_uses_cache(self, mock_open, service, requests_seen):
+        """Test generate_and_save does not call Cartesia for a cached clip"""
+        await service.generate_audio("Hello world")
+        await service.generate_and_save("Hello world", "/tmp/test.wav")
+        
+        assert len(requests_seen) == 1
+    
+    @pytest.mark.asyncio
+    async def test_streamed_audio_is_cached(self, requests_seen):
+        """Test a completed stream is served from the cache afterwards"""
+        async def body():
+            for chunk in (b'RIFF', b'chunk-1'):
+                yield chunk
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=body())
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service = VoiceService(api_key='test_key', upstream=UpstreamClient('cartesia', client=client))
+        streamed = [chunk async for chunk in service.stream_audio("Hello world")]
+        
+        assert await service.generate_audio("Hello world") == b''.join(streamed)
+        assert len(requests_seen) == 1
+    
+    def test_default_format_from_env(self):
+        """Test the default output format is selected by name from the environment"""
+        with patch.dict('os.environ', {'VOICE_AUDIO_FORMAT': 'wav_s16_16k'}):
+            service = VoiceService(api_key='test_key', cache=AudioCache())
+        
+        assert service.output_format == AUDIO_FORMATS['wav_s16_16k']
+        assert service.media_type() == 'audio/wav'
+    
+    def test_unknown_format_is_rejected(self, service):
+        """Test an unknown format name raises ValueError"""
+        with pytest.raises(ValueError):
+            service.resolve_format('flac')
+
+
+class TestSpeakEndpoint:
+    """Test cases for the /speak endpoint"""
+    
+    @pytest.fixture
+    def client(self):
+        """Test client for the API routes with synthesis stubbed out"""
+        env = {'RECALL_API_KEY': 'test', 'OPENAI_API_KEY': 'test', 'CARTESIA_API_KEY': 'test', 'MEETING_DB_PATH': ''}
+        with patch.dict('os.environ', env):
+            from api import routes
+            app = FastAPI()
+            app.include_router(routes.router)
+            with patch.object(routes.voice_service, 'generate_audio', AsyncMock(return_value=b'RIFF-audio')):
+                yield TestClient(app)
+    
+    def test_audio_is_base64_json_by_default(self, client):
+        """Test existing clients keep receiving JSON"""
+        response = client.post('/speak', json={'text': 'Hello', 'format': 'wav_s16'})
+        
+        assert response.json() == {'audio': base64.b64encode(b'RIFF-audio').decode(), 'format': 'wav'}
+    
+    def test_raw_audio_body_when_accepted(self, client):
+        """Test clients accepting audio get the bytes themselves"""
+        response = client.post('/speak', json={'text': 'Hello', 'format': 'wav_s16'}, headers={'Accept': 'audio/*'})
+        
+        assert response.headers['content-type'] == 'audio/wav'
+        assert response.content == b'RIFF-audio'
+    
+    def test_unavailable_without_api_key(self):
+        """Test /speak answers 503 without a Cartesia key while other routes keep working"""
+        env = {'RECALL_API_KEY': '', 'OPENAI_API_KEY': '', 'CARTESIA_API_KEY': '', 'MEETING_DB_PATH': ''}
+        with patch.dict('os.environ', env):
+            from api import routes
+            routes.voice_service.reset()
+            app = FastAPI()
+            app.include_router(routes.router)
+            client = TestClient(app)
+            try:
+                response = client.post('/speak', json={'text': 'Hello'})
+                bots = client.get('/bots')
+            finally:
+                routes.voice_service.reset()
+        
+        assert response.status_code == 503
+        assert 'CARTESIA_API_KEY' in response.json()['detail']
+        assert bots.status_code == 200